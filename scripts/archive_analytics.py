@@ -0,0 +1,40 @@
+#!python
+"""
+Archive raw module download analytics that are older than the retention period.
+
+Archived rows are exported to compressed NDJSON files in the analytics_archive
+directory of DATA_DIRECTORY and removed from the database.
+
+The script can be run whilst Terrareg is running and can be re-run, if interrupted.
+"""
+
+from argparse import ArgumentParser
+import sys
+
+sys.path.append('.')
+
+from terrareg.analytics_archiver import AnalyticsArchiver
+from terrareg.config import Config
+from terrareg.database import Database
+
+
+parser = ArgumentParser('archive_analytics')
+parser.add_argument('--retention-days', dest='retention_days', type=int, default=None,
+                    help='Number of days to retain raw analytics for. Defaults to ANALYTICS_RETENTION_DAYS')
+parser.add_argument('--batch-size', dest='batch_size', type=int, default=1000,
+                    help='Number of rows to archive in each batch')
+parser.add_argument('--batch-delay', dest='batch_delay', type=float, default=0,
+                    help='Number of seconds to wait between batches')
+args = parser.parse_args()
+
+retention_days = args.retention_days if args.retention_days is not None else Config().ANALYTICS_RETENTION_DAYS
+if retention_days <= 0:
+    print('Analytics retention is not configured, so no analytics have been archived')
+    sys.exit(0)
+
+Database.get().initialise()
+
+archived_rows = AnalyticsArchiver(
+    retention_days=retention_days, batch_size=args.batch_size, batch_delay=args.batch_delay
+).run()
+print(f'{archived_rows} analytics rows archived to {AnalyticsArchiver.get_archive_directory()}')
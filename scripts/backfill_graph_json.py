@@ -0,0 +1,31 @@
+#!python
+"""
+Generate and store graph JSON for module versions, submodules and examples
+that were extracted before graph JSON was pre-computed during extraction.
+
+Until graph JSON has been stored, it is generated from the terraform graph output
+on each request for the graph data.
+
+The script can be run whilst Terrareg is running and can be re-run, if interrupted.
+"""
+
+from argparse import ArgumentParser
+import sys
+
+sys.path.append('.')
+
+from terrareg.database import Database
+from terrareg.module_graph_backfiller import ModuleGraphBackfiller
+
+
+parser = ArgumentParser('backfill_graph_json')
+parser.add_argument('--batch-size', dest='batch_size', type=int, default=100,
+                    help='Number of rows to process in each batch')
+parser.add_argument('--batch-delay', dest='batch_delay', type=float, default=0,
+                    help='Number of seconds to wait between batches')
+args = parser.parse_args()
+
+Database.get().initialise()
+
+updated_rows = ModuleGraphBackfiller(batch_size=args.batch_size, batch_delay=args.batch_delay).run()
+print(f'Graph JSON stored for {updated_rows} module details rows')
@@ -0,0 +1,106 @@
+#!python
+"""
+Benchmark latency of module download requests, comparing synchronous recording
+of download analytics against asynchronous, batched, ingestion.
+
+Concurrent clients request the download endpoint of a module version and
+the latency of each request is recorded.
+
+By default, a temporary SQLite database is used. Use --database-url
+to benchmark against another database; the database will be initialised
+and test data will be removed after the benchmark.
+"""
+
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest.mock
+
+sys.path.append('.')
+
+parser = ArgumentParser('benchmark_analytics_ingestion')
+parser.add_argument('--requests', type=int, default=2000,
+                    help='Number of download requests to perform for each method')
+parser.add_argument('--concurrency', type=int, default=8,
+                    help='Number of concurrent clients')
+parser.add_argument('--database-url', dest='database_url', default=None,
+                    help='URL of database to benchmark against')
+args = parser.parse_args()
+
+temp_directory = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{temp_directory.name}/benchmark.db'
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.analytics_ingestion import AnalyticsIngestion
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.server import Server
+
+
+def get_percentile(timings, percentile):
+    """Return percentile of sorted timings."""
+    return timings[min(int(len(timings) * percentile / 100), len(timings) - 1)]
+
+
+def benchmark(app, url):
+    """Perform download requests from concurrent clients, returning sorted list of request latencies."""
+    timings = []
+    lock = threading.Lock()
+    requests_per_client = args.requests // args.concurrency
+
+    def run_client():
+        client = app.test_client()
+        client_timings = []
+        for _ in range(requests_per_client):
+            start_time = time.perf_counter()
+            res = client.get(url, headers={'User-Agent': 'Terraform/1.3.2'})
+            client_timings.append(time.perf_counter() - start_time)
+            assert res.status_code == 204
+        with lock:
+            timings.extend(client_timings)
+
+    threads = [threading.Thread(target=run_client) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(timings)
+
+
+# Server initialises database
+server = Server()
+db = Database.get()
+db.get_meta().create_all(db.get_engine())
+
+# Audit events for created objects require a request context
+with server._app.test_request_context():
+    namespace = Namespace.get('benchmark-analytics', create=True)
+    module_provider = ModuleProvider.get(Module(namespace, 'benchmark'), 'test', create=True)
+    module_version = ModuleVersion(module_provider, '1.0.0')
+    module_version._create_db_row()
+    module_version.update_attributes(published=True)
+
+url = '/v1/modules/benchmark-token__benchmark-analytics/benchmark/test/1.0.0/download'
+
+for name, async_ingestion in [('synchronous', False), ('asynchronous', True)]:
+    with unittest.mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_ASYNC', async_ingestion):
+        start_time = time.perf_counter()
+        timings = benchmark(server._app, url)
+        request_duration = time.perf_counter() - start_time
+        AnalyticsIngestion.stop()
+
+    print(f'{name}: {len(timings)} requests, {args.concurrency} clients, '
+          f'{len(timings) / request_duration:.0f} req/s, '
+          f'p50 {get_percentile(timings, 50) * 1000:.2f}ms, '
+          f'p99 {get_percentile(timings, 99) * 1000:.2f}ms, '
+          f'max {timings[-1] * 1000:.2f}ms')
+
+print(f'recorded downloads: {AnalyticsEngine.get_module_version_total_downloads(module_version)}')
+
+with server._app.test_request_context():
+    module_provider.delete()
+    with db.get_connection() as conn:
+        conn.execute(db.namespace.delete().where(db.namespace.c.id == namespace.pk))
@@ -0,0 +1,146 @@
+#!python
+"""
+Benchmark blob compression, comparing the cost of decoding compressed blobs
+against the time saved transferring smaller values from the database.
+
+By default, representative tfsec, terraform-docs and Terraform graph content is generated.
+Use --from-database to sample module details content from the configured database.
+"""
+
+from argparse import ArgumentParser
+import json
+import sys
+import timeit
+import unittest.mock
+
+sys.path.append('.')
+
+from terrareg.database import Database
+
+
+def generate_tfsec(result_count):
+    """Generate tfsec output, including passed results."""
+    return json.dumps({'results': [
+        {
+            'rule_id': f'AVD-AWS-{i % 120:04d}',
+            'long_id': f'aws-s3-rule-{i % 120}',
+            'rule_description': 'S3 Bucket should have encryption enabled',
+            'rule_provider': 'aws',
+            'rule_service': 's3',
+            'impact': 'The bucket objects could be read if compromised',
+            'resolution': 'Configure bucket encryption',
+            'links': ['https://aquasecurity.github.io/tfsec/latest/checks/aws/s3/enable-bucket-encryption/'],
+            'description': 'Bucket does not have encryption enabled',
+            'severity': ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'][i % 4],
+            'warning': False,
+            'status': i % 3,
+            'resource': f'module.bucket_{i}.aws_s3_bucket.this',
+            'location': {'filename': f'modules/bucket/main.tf', 'start_line': i, 'end_line': i + 10}
+        }
+        for i in range(result_count)
+    ]}, indent=2)
+
+
+def generate_terraform_docs(variable_count):
+    """Generate terraform-docs output."""
+    return json.dumps({
+        'inputs': [
+            {'name': f'variable_{i}', 'type': 'string', 'description': f'Description of variable {i}',
+             'default': None, 'required': True}
+            for i in range(variable_count)
+        ],
+        'outputs': [
+            {'name': f'output_{i}', 'description': f'Description of output {i}'}
+            for i in range(variable_count // 2)
+        ],
+        'providers': [{'name': 'aws', 'alias': None, 'version': None}],
+        'requirements': [],
+        'resources': [
+            {'type': 'aws_s3_bucket', 'name': f'bucket_{i}', 'provider': 'aws', 'source': 'hashicorp/aws',
+             'mode': 'managed', 'version': 'latest', 'description': None}
+            for i in range(variable_count)
+        ]
+    })
+
+
+def generate_terraform_graph(resource_count):
+    """Generate Terraform graph DOT output."""
+    lines = ['digraph {', '\tcompound = "true"', '\tnewrank = "true"', '\tsubgraph "root" {']
+    for i in range(resource_count):
+        lines.append(f'\t\t"[root] module.main.aws_s3_bucket.bucket_{i} (expand)" '
+                     f'[label = "module.main.aws_s3_bucket.bucket_{i}", shape = "box"]')
+        lines.append(f'\t\t"[root] module.main.aws_s3_bucket.bucket_{i} (expand)" -> '
+                     f'"[root] provider[\\"registry.terraform.io/hashicorp/aws\\"]"')
+    lines += ['\t}', '}']
+    return '\n'.join(lines)
+
+
+def get_database_samples(limit):
+    """Return sample content from module details in the database."""
+    db = Database.get()
+    db.initialise()
+    with db.get_connection() as conn:
+        rows = conn.execute(db.module_details.select().limit(limit)).fetchall()
+
+    samples = []
+    for row in rows:
+        for column in ['readme_content', 'terraform_docs', 'tfsec', 'infracost', 'terraform_graph']:
+            if row[column]:
+                samples.append((f'module_details {row["id"]} {column}', Database.decode_blob(row[column])))
+    return samples
+
+
+def benchmark(name, content, iterations, bandwidth):
+    """Benchmark encoding and decoding of content, returning row of results."""
+    with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_COMPRESSION', False):
+        raw = Database.encode_blob(content)
+    with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_COMPRESSION', True):
+        compressed = Database.encode_blob(content)
+        encode_time = timeit.timeit(lambda: Database.encode_blob(content), number=iterations) / iterations
+
+    raw_decode_time = timeit.timeit(lambda: Database.decode_blob(raw), number=iterations) / iterations
+    decode_time = timeit.timeit(lambda: Database.decode_blob(compressed), number=iterations) / iterations
+
+    # Time saved transferring smaller value, compared to additional cost of decoding
+    transfer_saving = (len(raw) - len(compressed)) / bandwidth
+    decode_cost = decode_time - raw_decode_time
+    return [
+        name,
+        len(raw),
+        len(compressed),
+        f'{len(raw) / len(compressed):.1f}x',
+        f'{encode_time * 1000:.3f}',
+        f'{decode_cost * 1000:.3f}',
+        f'{transfer_saving * 1000:.3f}',
+    ]
+
+
+parser = ArgumentParser('benchmark_blob_compression')
+parser.add_argument('--iterations', type=int, default=20,
+                    help='Number of iterations for timing encode/decode')
+parser.add_argument('--bandwidth-mbps', dest='bandwidth_mbps', type=float, default=1000,
+                    help='Network bandwidth to database, in megabits per second, used to calculate transfer time saved')
+parser.add_argument('--from-database', dest='from_database', action='store_true',
+                    help='Use module details content from database')
+parser.add_argument('--limit', type=int, default=20,
+                    help='Number of module details rows to sample from database')
+args = parser.parse_args()
+
+if args.from_database:
+    samples = get_database_samples(args.limit)
+else:
+    samples = [
+        ('tfsec (100 results)', generate_tfsec(100)),
+        ('tfsec (1000 results)', generate_tfsec(1000)),
+        ('terraform-docs (50 variables)', generate_terraform_docs(50)),
+        ('terraform graph (200 resources)', generate_terraform_graph(200)),
+        ('terraform graph (2000 resources)', generate_terraform_graph(2000)),
+    ]
+
+bandwidth = args.bandwidth_mbps * 1000 * 1000 / 8
+headers = ['content', 'raw bytes', 'compressed bytes', 'ratio', 'encode ms', 'extra decode ms', 'transfer saved ms']
+results = [benchmark(name, content, args.iterations, bandwidth) for name, content in samples]
+
+widths = [max(len(str(row[i])) for row in [headers] + results) for i in range(len(headers))]
+for row in [headers] + results:
+    print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
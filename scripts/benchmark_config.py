@@ -0,0 +1,79 @@
+#!python
+"""
+Benchmark reading configuration on the request path.
+
+Measures the time taken to read the configuration values used whilst
+handling a typical request, and the time taken for requests
+to endpoints that read configuration, using the Flask test client.
+
+By default, a temporary SQLite database is used. Use --database-url
+to benchmark against another database.
+"""
+
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+
+parser = ArgumentParser('benchmark_config')
+parser.add_argument('--iterations', type=int, default=10000,
+                    help='Number of times to read configuration values')
+parser.add_argument('--requests', type=int, default=1000,
+                    help='Number of requests to perform to each endpoint')
+parser.add_argument('--database-url', dest='database_url', default=None,
+                    help='URL of database to benchmark against')
+args = parser.parse_args()
+
+temp_directory = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{temp_directory.name}/benchmark.db'
+os.environ.setdefault('UPLOAD_API_KEYS', 'first-key,second-key')
+os.environ.setdefault('ANALYTICS_AUTH_KEYS', 'first-token:dev,second-token:prod')
+os.environ.setdefault('MODULE_LINKS', '[{"text": "Example link", "url": "https://example.com/{namespace}/{module}"}]')
+
+import terrareg.config
+from terrareg.database import Database
+from terrareg.server import Server
+
+
+def read_request_config():
+    """Read configuration values, as read whilst handling a module version request."""
+    terrareg.config.Config().DATABASE_URL
+    terrareg.config.Config().ALLOW_UNIDENTIFIED_DOWNLOADS
+    terrareg.config.Config().DISABLE_ANALYTICS
+    terrareg.config.Config().ANALYTICS_AUTH_KEYS
+    terrareg.config.Config().UPLOAD_API_KEYS
+    terrareg.config.Config().PUBLISH_API_KEYS
+    terrareg.config.Config().ENABLE_ACCESS_CONTROLS
+    terrareg.config.Config().ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER
+    terrareg.config.Config().ALLOW_CUSTOM_GIT_URL_MODULE_VERSION
+    terrareg.config.Config().TERRAFORM_EXAMPLE_VERSION_TEMPLATE
+    terrareg.config.Config().PUBLIC_URL
+    terrareg.config.Config().DOMAIN_NAME
+    terrareg.config.Config().ENABLE_BLOB_COMPRESSION
+    terrareg.config.Config().MODULE_SPECS_CACHE_MAX_SIZE
+    terrareg.config.Config().API_RESPONSE_CACHE_MAX_SIZE
+    terrareg.config.Config().API_RESPONSE_CACHE_CONTROL_MAX_AGE
+    terrareg.config.Config().EXAMPLE_FILE_EXTENSIONS
+    terrareg.config.Config().module_links
+    terrareg.config.Config().additional_module_tabs
+
+
+def benchmark(func, iterations):
+    """Call function, returning mean duration in microseconds."""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start_time) / iterations * 1000000
+
+
+server = Server()
+db = Database.get()
+db.get_meta().create_all(db.get_engine())
+client = server._app.test_client()
+
+print(f'read request config values: {benchmark(read_request_config, args.iterations):.1f}us')
+for url in ['/v1/terrareg/config', '/.well-known/terraform.json']:
+    print(f'GET {url}: {benchmark(lambda: client.get(url), args.requests):.1f}us')
@@ -0,0 +1,171 @@
+#!python
+"""
+Benchmark obtaining download counts for the module versions of a page of
+module list/search results, comparing a count of raw analytics rows for each
+module version, a sum of daily download counts for each module version,
+a single, grouped, query of daily download counts for all module versions
+and the module provider summary, which is used by the list and search endpoints.
+
+A temporary SQLite database is used, populated with module versions and
+raw analytics rows, distributed across the module versions and days.
+"""
+
+from argparse import ArgumentParser
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+
+parser = ArgumentParser('benchmark_download_counts')
+parser.add_argument('--module-versions', dest='module_versions', type=int, default=50,
+                    help='Number of module versions in results')
+parser.add_argument('--analytics-rows', dest='analytics_rows', type=int, default=1000000,
+                    help='Number of raw analytics rows')
+parser.add_argument('--days', type=int, default=365,
+                    help='Number of days that analytics rows are distributed across')
+parser.add_argument('--iterations', type=int, default=10,
+                    help='Number of iterations of each method')
+args = parser.parse_args()
+
+temp_directory = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f'sqlite:///{temp_directory.name}/benchmark.db'
+
+import sqlalchemy
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.server import Server
+
+
+# Server initialises database
+server = Server()
+db = Database.get()
+db.get_meta().create_all(db.get_engine())
+
+module_providers = []
+module_versions = []
+# Audit events for created objects require a request context
+with server._app.test_request_context():
+    namespace = Namespace.get('benchmark-downloads', create=True)
+    for itx in range(args.module_versions):
+        module_provider = ModuleProvider.get(Module(namespace, f'module{itx}'), 'test', create=True)
+        module_version = ModuleVersion(module_provider, '1.0.0')
+        module_version._create_db_row()
+        module_version.publish()
+        module_providers.append(module_provider)
+        module_versions.append(module_version)
+module_version_ids = [module_version.pk for module_version in module_versions]
+
+start_date = datetime.datetime(2023, 1, 1)
+with db.get_connection() as conn:
+    batch_size = 10000
+    for batch_start in range(0, args.analytics_rows, batch_size):
+        conn.execute(db.analytics.insert(), [
+            {
+                'parent_module_version': module_version_ids[itx % len(module_version_ids)],
+                'timestamp': start_date + datetime.timedelta(days=(itx // len(module_version_ids)) % args.days),
+                'terraform_version': '1.3.2',
+                'analytics_token': f'application-{itx % 100}',
+                'auth_token': None,
+                'environment': 'Default'
+            }
+            for itx in range(batch_start, min(batch_start + batch_size, args.analytics_rows))
+        ])
+
+    # Populate daily download counts from raw analytics
+    conn.execute(db.analytics_daily.insert().from_select(
+        ['parent_module_version', 'day', 'environment', 'analytics_token', 'download_count'],
+        sqlalchemy.select(
+            db.analytics.c.parent_module_version,
+            sqlalchemy.func.date(db.analytics.c.timestamp),
+            db.analytics.c.environment,
+            db.analytics.c.analytics_token,
+            sqlalchemy.func.count()
+        ).group_by(
+            db.analytics.c.parent_module_version,
+            sqlalchemy.func.date(db.analytics.c.timestamp),
+            db.analytics.c.environment,
+            db.analytics.c.analytics_token
+        )
+    ))
+
+# Update download counts in module provider summaries
+for module_provider in module_providers:
+    module_provider.update_summary()
+
+
+def count_raw_analytics():
+    """Count raw analytics rows for each module version."""
+    with db.get_connection() as conn:
+        return {
+            module_version_id: conn.execute(
+                sqlalchemy.select(sqlalchemy.func.count()).select_from(db.analytics).where(
+                    db.analytics.c.parent_module_version == module_version_id
+                )
+            ).scalar()
+            for module_version_id in module_version_ids
+        }
+
+
+def sum_daily_counts():
+    """Sum daily download counts for each module version."""
+    return {
+        module_version.pk: AnalyticsEngine.get_module_version_total_downloads(module_version)
+        for module_version in module_versions
+    }
+
+
+def bulk_daily_counts():
+    """Sum daily download counts for all module versions in a single query."""
+    select = sqlalchemy.select(
+        db.analytics_daily.c.parent_module_version,
+        sqlalchemy.func.sum(db.analytics_daily.c.download_count).label('download_count')
+    ).where(
+        db.analytics_daily.c.parent_module_version.in_(module_version_ids)
+    ).group_by(
+        db.analytics_daily.c.parent_module_version
+    )
+    download_counts = {module_version_id: 0 for module_version_id in module_version_ids}
+    with db.get_connection() as conn:
+        for row in conn.execute(select):
+            download_counts[row['parent_module_version']] = int(row['download_count'])
+    return download_counts
+
+
+def module_provider_summary_counts():
+    """Obtain download counts of latest module versions from module provider summaries in a single query."""
+    with db.get_connection() as conn:
+        return {
+            row['latest_version_id']: row['download_count']
+            for row in conn.execute(db.module_provider_summary.select().where(
+                db.module_provider_summary.c.module_provider_id.in_([
+                    module_provider.pk for module_provider in module_providers
+                ])
+            ))
+        }
+
+
+expected_counts = None
+for name, method in [
+        ('count of raw analytics per module version', count_raw_analytics),
+        ('sum of daily counts per module version', sum_daily_counts),
+        ('single query of daily counts', bulk_daily_counts),
+        ('module provider summary', module_provider_summary_counts)]:
+    timings = []
+    for _ in range(args.iterations):
+        start_time = time.perf_counter()
+        counts = method()
+        timings.append(time.perf_counter() - start_time)
+
+    if expected_counts is None:
+        expected_counts = counts
+    assert counts == expected_counts
+
+    timings.sort()
+    print(f'{name}: {args.module_versions} module versions, {args.analytics_rows} analytics rows, '
+          f'median {timings[len(timings) // 2] * 1000:.2f}ms, '
+          f'max {timings[-1] * 1000:.2f}ms')
@@ -0,0 +1,101 @@
+#!python
+"""
+Benchmark importing example files during module extraction.
+
+A synthetic module containing a single example with many files is generated
+and the example files are imported using the previous method (an insert and
+an update of content for each file) and the batched insert used by the module extractor.
+
+By default, a temporary SQLite database is used. Use --database-url
+to benchmark against another database; the database will be initialised
+and test data will be removed after the benchmark.
+"""
+
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+
+parser = ArgumentParser('benchmark_example_file_import')
+parser.add_argument('--file-count', dest='file_count', type=int, default=500,
+                    help='Number of files to generate in example')
+parser.add_argument('--iterations', type=int, default=3,
+                    help='Number of times to import example files using each method')
+parser.add_argument('--database-url', dest='database_url', default=None,
+                    help='URL of database to benchmark against')
+args = parser.parse_args()
+
+temp_directory = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{temp_directory.name}/benchmark.db'
+
+from terrareg.database import Database
+from terrareg.models import Example, ExampleFile, Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_extractor import ModuleExtractor
+from terrareg.server import Server
+
+
+def import_example_files_individually(module_extractor, example):
+    """Import example files, creating each file and updating content individually."""
+    example_directory = os.path.join(module_extractor.module_directory, example.path)
+    for file_name in sorted(os.listdir(example_directory)):
+        with open(os.path.join(example_directory, file_name), 'r') as fh:
+            content = ''.join(fh.readlines())
+        example_file = ExampleFile.create(example=example, path=f'{example.path}/{file_name}')
+        example_file.update_attributes(content=content)
+
+
+def import_example_files_batched(module_extractor, example):
+    """Import example files using module extractor."""
+    module_extractor._extract_example_files(example=example)
+
+
+def benchmark(import_method, module_extractor, example):
+    """Import example files, returning list of timings for each iteration."""
+    db = Database.get()
+    timings = []
+    for _ in range(args.iterations):
+        start_time = time.time()
+        with db.start_transaction():
+            import_method(module_extractor, example)
+        timings.append(time.time() - start_time)
+
+        # Remove imported files
+        with db.get_connection() as conn:
+            conn.execute(db.example_file.delete().where(db.example_file.c.submodule_id == example.pk))
+    return timings
+
+
+# Server initialises database
+server = Server()
+db = Database.get()
+db.get_meta().create_all(db.get_engine())
+
+# Audit events for created objects require a request context
+with server._app.test_request_context():
+    namespace = Namespace.get('benchmark-example-files', create=True)
+    module_provider = ModuleProvider.get(Module(namespace, 'benchmark'), 'test', create=True)
+    module_version = ModuleVersion(module_provider, '1.0.0')
+    module_version._create_db_row()
+    example = Example.create(module_version=module_version, module_path='examples/benchmark')
+
+    with ModuleExtractor(module_version) as module_extractor:
+        # Generate example files in extraction directory
+        example_directory = os.path.join(module_extractor.module_directory, example.path)
+        os.makedirs(example_directory)
+        for itx in range(args.file_count):
+            with open(os.path.join(example_directory, f'file_{itx:04d}.tf'), 'w') as fh:
+                fh.write(f'variable "input_{itx}" {{\n  type    = string\n  default = "{itx}"\n}}\n')
+
+        for name, import_method in [('individual insert and update', import_example_files_individually),
+                                    ('batched insert', import_example_files_batched)]:
+            timings = benchmark(import_method, module_extractor, example)
+            print(f'{name}: {args.file_count} files, '
+                  f'min {min(timings) * 1000:.1f}ms, '
+                  f'mean {sum(timings) / len(timings) * 1000:.1f}ms')
+
+    module_provider.delete()
+    with db.get_connection() as conn:
+        conn.execute(db.namespace.delete().where(db.namespace.c.id == namespace.pk))
@@ -0,0 +1,36 @@
+#!python
+"""
+Move content of existing module details (README content, terraform-docs output, tfsec results,
+infracost output and Terraform graph data) into the de-duplicated blob store.
+
+This should be run after enabling ENABLE_BLOB_STORE, to de-duplicate content
+stored before the blob store was enabled.
+
+The script can be run whilst Terrareg is running and can be re-run, if interrupted.
+"""
+
+from argparse import ArgumentParser
+import sys
+
+sys.path.append('.')
+
+from terrareg.blob_store_migrator import BlobStoreMigrator
+from terrareg.config import Config
+from terrareg.database import Database
+
+
+parser = ArgumentParser('migrate_blob_store')
+parser.add_argument('--batch-size', dest='batch_size', type=int, default=100,
+                    help='Number of rows to process in each batch')
+parser.add_argument('--batch-delay', dest='batch_delay', type=float, default=0,
+                    help='Number of seconds to wait between batches')
+args = parser.parse_args()
+
+if not Config().ENABLE_BLOB_STORE:
+    print('Blob store is not enabled, so no content has been moved')
+    sys.exit(0)
+
+Database.get().initialise()
+
+updated_rows = BlobStoreMigrator(batch_size=args.batch_size, batch_delay=args.batch_delay).run()
+print(f'{updated_rows} module details rows moved to blob store')
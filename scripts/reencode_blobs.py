@@ -0,0 +1,31 @@
+#!python
+"""
+Re-encode blob values stored in the database, using the current blob compression configuration.
+
+This compresses content stored before compression was enabled
+(or decompresses content, if ENABLE_BLOB_COMPRESSION has been disabled).
+
+The script can be run whilst Terrareg is running.
+"""
+
+from argparse import ArgumentParser
+import sys
+
+sys.path.append('.')
+
+from terrareg.blob_reencoder import BlobReencoder
+from terrareg.database import Database
+
+
+parser = ArgumentParser('reencode_blobs')
+parser.add_argument('--batch-size', dest='batch_size', type=int, default=100,
+                    help='Number of rows to process in each batch')
+parser.add_argument('--batch-delay', dest='batch_delay', type=float, default=0,
+                    help='Number of seconds to wait between batches')
+args = parser.parse_args()
+
+Database.get().initialise()
+
+updated_rows = BlobReencoder(batch_size=args.batch_size, batch_delay=args.batch_delay).run()
+for table_name, count in updated_rows.items():
+    print(f'{table_name}: {count} rows re-encoded')
@@ -0,0 +1,64 @@
+"""Add pre-computed graph JSON to module details
+
+Revision ID: 5e8a7c2d94f1
+Revises: c3a5f1d8e2b7
+Create Date: 2023-02-18 10:41:52.804113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy.dialects.mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a7c2d94f1'
+down_revision = 'c3a5f1d8e2b7'
+branch_labels = None
+depends_on = None
+
+
+def _medium_blob():
+    """Return column type for medium blob."""
+    return sa.LargeBinary(length=((2 ** 24) - 1)).with_variant(sqlalchemy.dialects.mysql.MEDIUMBLOB(), "mysql")
+
+
+def _get_tables():
+    """Return table objects for module_details and blob_store tables."""
+    module_details = sa.table(
+        'module_details',
+        sa.column('terraform_graph_json_sha256', sa.String)
+    )
+    blob_store = sa.table(
+        'blob_store',
+        sa.column('sha256', sa.String),
+        sa.column('content', sa.LargeBinary),
+        sa.column('reference_count', sa.Integer)
+    )
+    return module_details, blob_store
+
+
+def upgrade():
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('terraform_graph_json', _medium_blob(), nullable=True))
+        batch_op.add_column(sa.Column('terraform_graph_json_sha256', sa.String(length=64), nullable=True))
+
+    # Graph JSON for existing module details is generated
+    # and stored by scripts/backfill_graph_json.py
+
+
+def downgrade():
+    # Remove references to graph JSON content in blob store
+    module_details, blob_store = _get_tables()
+    conn = op.get_bind()
+
+    for row in conn.execute(sa.select(module_details.c.terraform_graph_json_sha256).where(
+                module_details.c.terraform_graph_json_sha256 != None
+            )).fetchall():
+        conn.execute(blob_store.update().where(
+            blob_store.c.sha256 == row['terraform_graph_json_sha256']
+        ).values(reference_count=blob_store.c.reference_count - 1))
+    conn.execute(blob_store.delete().where(blob_store.c.reference_count <= 0))
+
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        batch_op.drop_column('terraform_graph_json_sha256')
+        batch_op.drop_column('terraform_graph_json')
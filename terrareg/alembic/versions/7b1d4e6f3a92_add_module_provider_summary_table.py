@@ -0,0 +1,120 @@
+"""Add module provider summary table
+
+Revision ID: 7b1d4e6f3a92
+Revises: 5e8a7c2d94f1
+Create Date: 2023-02-25 09:12:37.550218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1d4e6f3a92'
+down_revision = '5e8a7c2d94f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'module_provider_summary',
+        sa.Column('module_provider_id', sa.Integer(), nullable=False),
+        sa.Column('namespace', sa.String(length=128), nullable=False),
+        sa.Column('module', sa.String(length=128), nullable=False),
+        sa.Column('provider', sa.String(length=128), nullable=False),
+        sa.Column('verified', sa.Boolean(), nullable=True),
+        sa.Column('latest_version_id', sa.Integer(), nullable=True),
+        sa.Column('latest_version', sa.String(length=128), nullable=True),
+        sa.Column('owner', sa.String(length=128), nullable=True),
+        sa.Column('description', sa.String(length=1024), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('internal', sa.Boolean(), nullable=True),
+        sa.Column('download_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['module_provider_id'], ['module_provider.id'], name='fk_module_provider_summary_module_provider_id_module_provider_id', onupdate='CASCADE', ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['latest_version_id'], ['module_version.id'], name='fk_module_provider_summary_latest_version_id_module_version_id', onupdate='CASCADE', ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('module_provider_id')
+    )
+    op.create_index('ix_module_provider_summary_namespace_module_provider', 'module_provider_summary', ['namespace', 'module', 'provider'], unique=False)
+    op.create_index('ix_module_provider_summary_latest_version_id', 'module_provider_summary', ['latest_version_id'], unique=False)
+    op.create_index('ix_module_provider_summary_published_at', 'module_provider_summary', ['published_at'], unique=False)
+
+    # Populate summary for all existing module providers
+    namespace = sa.table(
+        'namespace',
+        sa.column('id', sa.Integer),
+        sa.column('namespace', sa.String)
+    )
+    module_provider = sa.table(
+        'module_provider',
+        sa.column('id', sa.Integer),
+        sa.column('namespace_id', sa.Integer),
+        sa.column('module', sa.String),
+        sa.column('provider', sa.String),
+        sa.column('verified', sa.Boolean),
+        sa.column('latest_version_id', sa.Integer)
+    )
+    module_version = sa.table(
+        'module_version',
+        sa.column('id', sa.Integer),
+        sa.column('version', sa.String),
+        sa.column('owner', sa.String),
+        sa.column('description', sa.String),
+        sa.column('published_at', sa.DateTime),
+        sa.column('internal', sa.Boolean)
+    )
+    analytics = sa.table(
+        'analytics',
+        sa.column('parent_module_version', sa.Integer)
+    )
+    module_provider_summary = sa.table(
+        'module_provider_summary',
+        *[sa.column(column) for column in [
+            'module_provider_id', 'namespace', 'module', 'provider', 'verified',
+            'latest_version_id', 'latest_version', 'owner', 'description',
+            'published_at', 'internal', 'download_count'
+        ]]
+    )
+
+    op.get_bind().execute(module_provider_summary.insert().from_select(
+        [
+            'module_provider_id', 'namespace', 'module', 'provider', 'verified',
+            'latest_version_id', 'latest_version', 'owner', 'description',
+            'published_at', 'internal', 'download_count'
+        ],
+        sa.select(
+            module_provider.c.id,
+            namespace.c.namespace,
+            module_provider.c.module,
+            module_provider.c.provider,
+            module_provider.c.verified,
+            module_version.c.id,
+            module_version.c.version,
+            module_version.c.owner,
+            module_version.c.description,
+            module_version.c.published_at,
+            module_version.c.internal,
+            sa.select(
+                sa.func.count()
+            ).select_from(
+                analytics
+            ).where(
+                analytics.c.parent_module_version == module_version.c.id
+            ).scalar_subquery()
+        ).select_from(
+            module_provider
+        ).join(
+            namespace,
+            module_provider.c.namespace_id == namespace.c.id
+        ).outerjoin(
+            module_version,
+            module_provider.c.latest_version_id == module_version.c.id
+        )
+    ))
+
+
+def downgrade():
+    op.drop_index('ix_module_provider_summary_published_at', table_name='module_provider_summary')
+    op.drop_index('ix_module_provider_summary_latest_version_id', table_name='module_provider_summary')
+    op.drop_index('ix_module_provider_summary_namespace_module_provider', table_name='module_provider_summary')
+    op.drop_table('module_provider_summary')
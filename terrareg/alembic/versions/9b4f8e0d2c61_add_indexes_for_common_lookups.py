@@ -0,0 +1,76 @@
+"""Add indexes for common lookups
+
+Revision ID: 9b4f8e0d2c61
+Revises: 210586684f86
+Create Date: 2023-02-04 10:12:31.482214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4f8e0d2c61'
+down_revision = '210586684f86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.create_index('ix_session_expiry', ['expiry'], unique=False)
+
+    with op.batch_alter_table('namespace', schema=None) as batch_op:
+        batch_op.create_index('ix_namespace_namespace', ['namespace'], unique=False)
+
+    with op.batch_alter_table('module_provider', schema=None) as batch_op:
+        batch_op.create_index('ix_module_provider_namespace_id_module_provider', ['namespace_id', 'module', 'provider'], unique=False)
+
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.create_index('ix_module_version_module_provider_id_version', ['module_provider_id', 'version'], unique=False)
+
+    with op.batch_alter_table('submodule', schema=None) as batch_op:
+        # Limit length of path in index for MySQL, to keep within maximum index key length
+        batch_op.create_index('ix_submodule_parent_module_version_type_path', ['parent_module_version', 'type', 'path'], unique=False,
+                              mysql_length={'path': 255})
+
+    with op.batch_alter_table('analytics', schema=None) as batch_op:
+        batch_op.create_index('ix_analytics_timestamp', ['timestamp'], unique=False)
+
+    with op.batch_alter_table('example_file', schema=None) as batch_op:
+        batch_op.create_index('ix_example_file_submodule_id_path', ['submodule_id', 'path'], unique=False)
+
+    with op.batch_alter_table('module_version_file', schema=None) as batch_op:
+        batch_op.create_index('ix_module_version_file_module_version_id_path', ['module_version_id', 'path'], unique=False)
+
+    with op.batch_alter_table('audit_history', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_history_timestamp', ['timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('audit_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_history_timestamp')
+
+    with op.batch_alter_table('module_version_file', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_version_file_module_version_id_path')
+
+    with op.batch_alter_table('example_file', schema=None) as batch_op:
+        batch_op.drop_index('ix_example_file_submodule_id_path')
+
+    with op.batch_alter_table('analytics', schema=None) as batch_op:
+        batch_op.drop_index('ix_analytics_timestamp')
+
+    with op.batch_alter_table('submodule', schema=None) as batch_op:
+        batch_op.drop_index('ix_submodule_parent_module_version_type_path')
+
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_version_module_provider_id_version')
+
+    with op.batch_alter_table('module_provider', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_provider_namespace_id_module_provider')
+
+    with op.batch_alter_table('namespace', schema=None) as batch_op:
+        batch_op.drop_index('ix_namespace_namespace')
+
+    with op.batch_alter_table('session', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_expiry')
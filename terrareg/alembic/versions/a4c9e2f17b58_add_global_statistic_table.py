@@ -0,0 +1,31 @@
+"""Add global statistic table
+
+Revision ID: a4c9e2f17b58
+Revises: 7b1d4e6f3a92
+Create Date: 2023-03-04 11:27:44.183905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c9e2f17b58'
+down_revision = '7b1d4e6f3a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Statistics are calculated when they are first obtained
+    op.create_table(
+        'global_statistic',
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('global_statistic')
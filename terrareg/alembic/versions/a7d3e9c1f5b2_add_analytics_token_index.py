@@ -0,0 +1,29 @@
+"""Add index of analytics by module version and analytics token
+
+Revision ID: a7d3e9c1f5b2
+Revises: f3b9d1e6a7c2
+Create Date: 2023-03-25 09:31:17.204851
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9c1f5b2'
+down_revision = 'f3b9d1e6a7c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('analytics', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_analytics_parent_module_version_analytics_token',
+            ['parent_module_version', 'analytics_token', 'environment', 'auth_token'],
+            unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('analytics', schema=None) as batch_op:
+        batch_op.drop_index('ix_analytics_parent_module_version_analytics_token')
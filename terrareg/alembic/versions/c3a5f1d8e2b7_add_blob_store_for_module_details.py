@@ -0,0 +1,81 @@
+"""Add blob store for module details
+
+Revision ID: c3a5f1d8e2b7
+Revises: 9b4f8e0d2c61
+Create Date: 2023-02-11 14:25:09.318562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy.dialects.mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a5f1d8e2b7'
+down_revision = '9b4f8e0d2c61'
+branch_labels = None
+depends_on = None
+
+
+BLOB_COLUMNS = ['readme_content', 'terraform_docs', 'tfsec', 'infracost', 'terraform_graph']
+
+
+def _medium_blob():
+    """Return column type for medium blob."""
+    return sa.LargeBinary(length=((2 ** 24) - 1)).with_variant(sqlalchemy.dialects.mysql.MEDIUMBLOB(), "mysql")
+
+
+def _get_tables():
+    """Return table objects for module_details and blob_store tables."""
+    module_details = sa.table(
+        'module_details',
+        sa.column('id', sa.Integer),
+        *[sa.column(column, sa.LargeBinary) for column in BLOB_COLUMNS],
+        *[sa.column(f'{column}_sha256', sa.String) for column in BLOB_COLUMNS]
+    )
+    blob_store = sa.table(
+        'blob_store',
+        sa.column('sha256', sa.String),
+        sa.column('content', sa.LargeBinary),
+        sa.column('reference_count', sa.Integer)
+    )
+    return module_details, blob_store
+
+
+def upgrade():
+    op.create_table(
+        'blob_store',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('content', _medium_blob(), nullable=True),
+        sa.Column('reference_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        for column in BLOB_COLUMNS:
+            batch_op.add_column(sa.Column(f'{column}_sha256', sa.String(length=64), nullable=True))
+
+    # Existing content is moved into the blob store by scripts/migrate_blob_store.py,
+    # which is run once the blob store has been enabled
+
+
+def downgrade():
+    # Restore content from blob store into module details
+    module_details, blob_store = _get_tables()
+    conn = op.get_bind()
+
+    for column in BLOB_COLUMNS:
+        sha256_column = module_details.c[f'{column}_sha256']
+        conn.execute(module_details.update().where(
+            sha256_column != None
+        ).values(**{
+            column: sa.select(blob_store.c.content).where(
+                blob_store.c.sha256 == sha256_column
+            ).scalar_subquery()
+        }))
+
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        for column in BLOB_COLUMNS:
+            batch_op.drop_column(f'{column}_sha256')
+
+    op.drop_table('blob_store')
@@ -0,0 +1,56 @@
+"""Add major, minor and patch columns to module version
+
+Revision ID: d5f3b8a1c6e4
+Revises: a4c9e2f17b58
+Create Date: 2023-03-11 14:02:19.627341
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f3b8a1c6e4'
+down_revision = 'a4c9e2f17b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_major', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('version_minor', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('version_patch', sa.Integer(), nullable=True))
+
+    # Populate version parts for existing module versions
+    module_version = sa.table(
+        'module_version',
+        sa.column('id', sa.Integer),
+        sa.column('version', sa.String),
+        sa.column('version_major', sa.Integer),
+        sa.column('version_minor', sa.Integer),
+        sa.column('version_patch', sa.Integer)
+    )
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(module_version.c.id, module_version.c.version)).fetchall():
+        match = re.match(r'^([0-9]+)\.([0-9]+)\.([0-9]+)', row['version'] or '')
+        if not match:
+            print(f'Unable to determine version parts of module version {row["id"]}: {row["version"]}')
+            continue
+
+        conn.execute(module_version.update().where(
+            module_version.c.id == row['id']
+        ).values(
+            version_major=int(match.group(1)),
+            version_minor=int(match.group(2)),
+            version_patch=int(match.group(3))
+        ))
+
+
+def downgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_column('version_patch')
+        batch_op.drop_column('version_minor')
+        batch_op.drop_column('version_major')
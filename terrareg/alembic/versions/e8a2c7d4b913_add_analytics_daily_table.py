@@ -0,0 +1,72 @@
+"""Add analytics daily table
+
+Revision ID: e8a2c7d4b913
+Revises: d5f3b8a1c6e4
+Create Date: 2023-03-14 19:41:05.281734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a2c7d4b913'
+down_revision = 'd5f3b8a1c6e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analytics_daily',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('parent_module_version', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('environment', sa.String(length=128), nullable=True),
+        sa.Column('analytics_token', sa.String(length=128), nullable=True),
+        sa.Column('download_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_daily_parent_module_version_day', 'analytics_daily', ['parent_module_version', 'day'], unique=False)
+    op.create_index('ix_analytics_daily_day', 'analytics_daily', ['day'], unique=False)
+
+    # Populate daily download counts from existing analytics
+    analytics = sa.table(
+        'analytics',
+        sa.column('parent_module_version', sa.Integer),
+        sa.column('timestamp', sa.DateTime),
+        sa.column('environment', sa.String),
+        sa.column('analytics_token', sa.String)
+    )
+    analytics_daily = sa.table(
+        'analytics_daily',
+        sa.column('parent_module_version', sa.Integer),
+        sa.column('day', sa.Date),
+        sa.column('environment', sa.String),
+        sa.column('analytics_token', sa.String),
+        sa.column('download_count', sa.Integer)
+    )
+    day = sa.func.date(analytics.c.timestamp)
+    op.get_bind().execute(analytics_daily.insert().from_select(
+        ['parent_module_version', 'day', 'environment', 'analytics_token', 'download_count'],
+        sa.select(
+            analytics.c.parent_module_version,
+            day,
+            analytics.c.environment,
+            analytics.c.analytics_token,
+            sa.func.count()
+        ).where(
+            analytics.c.timestamp != None
+        ).group_by(
+            analytics.c.parent_module_version,
+            day,
+            analytics.c.environment,
+            analytics.c.analytics_token
+        )
+    ))
+
+
+def downgrade():
+    op.drop_index('ix_analytics_daily_day', table_name='analytics_daily')
+    op.drop_index('ix_analytics_daily_parent_module_version_day', table_name='analytics_daily')
+    op.drop_table('analytics_daily')
@@ -0,0 +1,95 @@
+"""Add analytics token latest table
+
+Revision ID: f3b9d1e6a7c2
+Revises: e8a2c7d4b913
+Create Date: 2023-03-18 10:12:48.903127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d1e6a7c2'
+down_revision = 'e8a2c7d4b913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analytics_token_latest',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('module_provider_id', sa.Integer(), nullable=False),
+        sa.Column('analytics_token', sa.String(length=128), nullable=True),
+        sa.Column('environment', sa.String(length=128), nullable=True),
+        sa.Column('parent_module_version', sa.Integer(), nullable=False),
+        sa.Column('terraform_version', sa.String(length=128), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['module_provider_id'], ['module_provider.id'], name='fk_analytics_token_latest_module_provider_id_module_provider_id', onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analytics_token_latest_module_provider_id_analytics_token', 'analytics_token_latest', ['module_provider_id', 'analytics_token', 'environment'], unique=False)
+    op.create_index('ix_analytics_token_latest_parent_module_version', 'analytics_token_latest', ['parent_module_version'], unique=False)
+
+    # Populate latest download of each analytics token from existing analytics
+    analytics = sa.table(
+        'analytics',
+        sa.column('id', sa.Integer),
+        sa.column('parent_module_version', sa.Integer),
+        sa.column('timestamp', sa.DateTime),
+        sa.column('terraform_version', sa.String),
+        sa.column('analytics_token', sa.String),
+        sa.column('environment', sa.String)
+    )
+    module_version = sa.table(
+        'module_version',
+        sa.column('id', sa.Integer),
+        sa.column('module_provider_id', sa.Integer)
+    )
+    analytics_token_latest = sa.table(
+        'analytics_token_latest',
+        sa.column('module_provider_id', sa.Integer),
+        sa.column('analytics_token', sa.String),
+        sa.column('environment', sa.String),
+        sa.column('parent_module_version', sa.Integer),
+        sa.column('terraform_version', sa.String),
+        sa.column('timestamp', sa.DateTime)
+    )
+    id_subquery = sa.select(
+        sa.func.max(analytics.c.id)
+    ).select_from(
+        analytics
+    ).join(
+        module_version,
+        module_version.c.id == analytics.c.parent_module_version
+    ).group_by(
+        module_version.c.module_provider_id,
+        analytics.c.analytics_token,
+        analytics.c.environment
+    )
+    op.get_bind().execute(analytics_token_latest.insert().from_select(
+        ['module_provider_id', 'analytics_token', 'environment',
+         'parent_module_version', 'terraform_version', 'timestamp'],
+        sa.select(
+            module_version.c.module_provider_id,
+            analytics.c.analytics_token,
+            analytics.c.environment,
+            analytics.c.parent_module_version,
+            analytics.c.terraform_version,
+            analytics.c.timestamp
+        ).select_from(
+            analytics
+        ).join(
+            module_version,
+            module_version.c.id == analytics.c.parent_module_version
+        ).where(
+            analytics.c.id.in_(id_subquery)
+        )
+    ))
+
+
+def downgrade():
+    op.drop_index('ix_analytics_token_latest_parent_module_version', table_name='analytics_token_latest')
+    op.drop_index('ix_analytics_token_latest_module_provider_id_analytics_token', table_name='analytics_token_latest')
+    op.drop_table('analytics_token_latest')
@@ -1,64 +1,58 @@
 
+import contextlib
 import re
 import datetime
 
 
 import sqlalchemy
 
+import terrareg.analytics_ingestion
+from terrareg.cache import Cache
 from terrareg.database import Database
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
+from terrareg.module_specs_cache import ModuleSpecsCache
 from terrareg.config import Config
 import terrareg.models
 
 
 class AnalyticsEngine:
 
-    _ARE_TOKENS_ENABLED = None
-    _ARE_ENVIRONMENTS_ENABLED = None
-    _TOKEN_ENVIRONMENT_MAPPING = None
+    # Cache of values derived from analytics auth key configuration
+    _CONFIG_CACHE = Cache('analytics_config', local=True)
+
+    # Cache of generated prometheus metrics, which include metrics specific to the process
+    _PROMETHEUS_METRICS_CACHE = Cache('prometheus_metrics', local=True)
 
     DEFAULT_ENVIRONMENT_NAME = 'Default'
 
     @classmethod
     def are_tokens_enabled(cls):
         """Determine if tokens are enabled."""
-        if AnalyticsEngine._ARE_TOKENS_ENABLED is None:
-            AnalyticsEngine._ARE_TOKENS_ENABLED = bool(Config().ANALYTICS_AUTH_KEYS)
-        return AnalyticsEngine._ARE_TOKENS_ENABLED
+        return cls._CONFIG_CACHE.get_or_set(
+            'are_tokens_enabled',
+            lambda: bool(Config().ANALYTICS_AUTH_KEYS)
+        )
 
     @classmethod
     def are_environments_enabled(cls):
         """Determine if token environments are enabled."""
-        if AnalyticsEngine._ARE_ENVIRONMENTS_ENABLED is None:
-            AnalyticsEngine._ARE_ENVIRONMENTS_ENABLED = (
+        return cls._CONFIG_CACHE.get_or_set(
+            'are_environments_enabled',
+            lambda: (
                 AnalyticsEngine.are_tokens_enabled() and
                 not (len(Config().ANALYTICS_AUTH_KEYS) == 1 and len(Config().ANALYTICS_AUTH_KEYS[0].split(':')) == 1)
             )
-        return AnalyticsEngine._ARE_ENVIRONMENTS_ENABLED
+        )
 
     @classmethod
     def get_token_environment_mapping(cls):
         """Determine if token environments are enabled."""
-        if AnalyticsEngine._TOKEN_ENVIRONMENT_MAPPING is None:
-            AnalyticsEngine._TOKEN_ENVIRONMENT_MAPPING = {
+        return cls._CONFIG_CACHE.get_or_set(
+            'token_environment_mapping',
+            lambda: {
                 analytics_auth_key.split(':')[0]: analytics_auth_key.split(':')[1]
                 for analytics_auth_key in Config().ANALYTICS_AUTH_KEYS
             } if AnalyticsEngine.are_environments_enabled() else {}
-        return AnalyticsEngine._TOKEN_ENVIRONMENT_MAPPING
-
-    @staticmethod
-    def _join_filter_analytics_table_by_module_provider(db, query, module_provider):
-        """Join query to module_version table and filter by module_version."""
-        return query.join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
-        ).join(
-            db.module_provider,
-            db.module_version.c.module_provider_id == db.module_provider.c.id
-        ).join(
-            db.namespace,
-            db.module_provider.c.namespace_id == db.namespace.c.id
-        ).where(
-            db.module_provider.c.id == module_provider.pk
         )
 
     @staticmethod
@@ -91,39 +85,221 @@ class AnalyticsEngine:
         terraform_version: str,
         user_agent: str,
         auth_token: str):
-        """Store information about module version download in database."""
+        """
+        Record module version download.
+
+        If asynchronous analytics ingestion is enabled, the download is queued,
+        otherwise, the download is stored in database.
+        """
+        module_provider = module_version._module_provider
+        event = {
+            'module_version_id': module_version.pk,
+            'module_provider_id': module_provider.pk,
+            'namespace': module_provider._module._namespace.name,
+            'module': module_provider._module.name,
+            'provider': module_provider.name,
+            'timestamp': datetime.datetime.now().isoformat(),
+            'analytics_token': analytics_token,
+            'terraform_version': terraform_version,
+            'user_agent': user_agent,
+            'auth_token': auth_token
+        }
+
+        if Config().ANALYTICS_INGESTION_ASYNC:
+            terrareg.analytics_ingestion.AnalyticsIngestion.enqueue(event)
+            return
+
+        AnalyticsEngine.record_download_events([event])
+        module_provider.clear_summary_row_cache()
+
+    @staticmethod
+    def record_download_events(events: list):
+        """
+        Store module version downloads in database, using a single multi-row insert statement.
+
+        The downloads and download counts are updated in a single transaction,
+        using the current transaction, if one has been started.
+
+        Each event is a dict, created by record_module_version_download.
+        """
+        if not events:
+            return
+
+        rows = []
+        daily_counts = {}
+        latest_downloads = {}
+        download_counts = {}
+        for event in events:
+            # If Terraform version not present from header,
+            # attempt to determine from user agent
+            terraform_version = event['terraform_version']
+            if not terraform_version:
+                user_agent_match = re.match(r'^Terraform/(\d+\.\d+\.\d+)$', event['user_agent'] or '')
+                if user_agent_match:
+                    terraform_version = user_agent_match.group(1)
+
+            rows.append({
+                'parent_module_version': event['module_version_id'],
+                'timestamp': datetime.datetime.fromisoformat(event['timestamp']),
+                'terraform_version': terraform_version,
+                'analytics_token': event['analytics_token'],
+                'auth_token': event['auth_token'],
+                # Obtain environment from auth token.
+                'environment': AnalyticsEngine.get_environment_from_token(event['auth_token'])
+            })
+
+            daily_count_key = (
+                rows[-1]['parent_module_version'],
+                rows[-1]['timestamp'].date(),
+                rows[-1]['environment'],
+                rows[-1]['analytics_token']
+            )
+            daily_counts[daily_count_key] = daily_counts.get(daily_count_key, 0) + 1
 
-        # If Terraform version not present from header,
-        # attempt to determine from user agent
-        if not terraform_version:
-            user_agent_match = re.match(r'^Terraform/(\d+\.\d+\.\d+)$', user_agent)
-            if user_agent_match:
-                terraform_version = user_agent_match.group(1)
+            # Use latest download for each module provider, analytics token and environment
+            latest_download_key = (event['module_provider_id'], rows[-1]['analytics_token'], rows[-1]['environment'])
+            if (latest_download_key not in latest_downloads or
+                    latest_downloads[latest_download_key]['timestamp'] <= rows[-1]['timestamp']):
+                latest_downloads[latest_download_key] = rows[-1]
 
-        # Obtain environment from auth token.
-        # If auth token is not provided, 
-        environment = AnalyticsEngine.get_environment_from_token(auth_token)
+            download_count_key = (event['module_provider_id'], event['module_version_id'])
+            download_counts[download_count_key] = download_counts.get(download_count_key, 0) + 1
 
-        # Insert analytics details into DB
         db = Database.get()
-        insert_statement = db.analytics.insert().values(
-            parent_module_version=module_version.pk,
-            timestamp=datetime.datetime.now(),
-            terraform_version=terraform_version,
-            analytics_token=analytics_token,
-            auth_token=auth_token,
-            environment=environment
+        transaction = (
+            contextlib.nullcontext()
+            if Database.get_current_transaction() is not None else
+            Database.start_transaction()
         )
+        with transaction:
+            # Insert analytics details into DB
+            with db.get_connection() as conn:
+                conn.execute(db.analytics.insert().values(rows))
+
+            AnalyticsEngine._increment_daily_download_counts(daily_counts)
+            AnalyticsEngine._update_latest_token_downloads(latest_downloads)
+            terrareg.models.ModuleProvider.increment_summary_download_counts(download_counts)
+            GlobalStatistics.increment(GlobalStatistic.DOWNLOAD_COUNT, len(rows))
+
+    @staticmethod
+    def _increment_daily_download_counts(daily_counts: dict):
+        """
+        Increment download counts in analytics_daily table, inserting rows for new combinations.
+
+        daily_counts is a dict of number of downloads, keyed by tuple of
+        module version ID, day, environment and analytics token.
+        """
+        db = Database.get()
         with db.get_connection() as conn:
-            conn.execute(insert_statement)
+            for (module_version_id, day, environment, analytics_token), count in daily_counts.items():
+                res = conn.execute(db.analytics_daily.update().where(
+                    db.analytics_daily.c.parent_module_version == module_version_id,
+                    db.analytics_daily.c.day == day,
+                    db.analytics_daily.c.environment == environment,
+                    db.analytics_daily.c.analytics_token == analytics_token
+                ).values(
+                    download_count=db.analytics_daily.c.download_count + count
+                ))
+                if not res.rowcount:
+                    conn.execute(db.analytics_daily.insert().values(
+                        parent_module_version=module_version_id,
+                        day=day,
+                        environment=environment,
+                        analytics_token=analytics_token,
+                        download_count=count
+                    ))
 
-    def get_total_downloads():
-        """Return number of downloads for a given module version."""
+    @staticmethod
+    def _update_latest_token_downloads(latest_downloads: dict):
+        """
+        Update latest download of module providers for analytics tokens, in analytics_token_latest table.
+
+        latest_downloads is a dict of analytics rows, keyed by tuple of
+        module provider ID, analytics token and environment.
+        Rows are only updated if the download is newer than the existing latest download.
+        """
         db = Database.get()
-        select = sqlalchemy.select(
-            [sqlalchemy.func.count()]
+        with db.get_connection() as conn:
+            for (module_provider_id, analytics_token, environment), row in latest_downloads.items():
+                key_where = [
+                    db.analytics_token_latest.c.module_provider_id == module_provider_id,
+                    db.analytics_token_latest.c.analytics_token == analytics_token,
+                    db.analytics_token_latest.c.environment == environment
+                ]
+                values = {
+                    'parent_module_version': row['parent_module_version'],
+                    'terraform_version': row['terraform_version'],
+                    'timestamp': row['timestamp']
+                }
+                res = conn.execute(db.analytics_token_latest.update().where(
+                    *key_where,
+                    sqlalchemy.or_(
+                        db.analytics_token_latest.c.timestamp == None,
+                        db.analytics_token_latest.c.timestamp <= row['timestamp']
+                    )
+                ).values(**values))
+
+                # Insert row, if there is not an existing row with a newer download
+                if not res.rowcount and conn.execute(
+                        sqlalchemy.select(db.analytics_token_latest.c.id).where(*key_where).limit(1)).fetchone() is None:
+                    conn.execute(db.analytics_token_latest.insert().values(
+                        module_provider_id=module_provider_id,
+                        analytics_token=analytics_token,
+                        environment=environment,
+                        **values
+                    ))
+
+    @staticmethod
+    def _rebuild_latest_token_downloads(module_provider_ids: list):
+        """Replace latest downloads of analytics tokens for module providers from the analytics table."""
+        db = Database.get()
+
+        # Obtain the MAX (latest) analytics row IDs of each module provider,
+        # grouped by analytics token and environment.
+        id_subquery = sqlalchemy.select(
+            sqlalchemy.func.max(db.analytics.c.id)
         ).select_from(
             db.analytics
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics.c.parent_module_version
+        ).where(
+            db.module_version.c.module_provider_id.in_(module_provider_ids)
+        ).group_by(
+            db.module_version.c.module_provider_id,
+            db.analytics.c.analytics_token,
+            db.analytics.c.environment
+        )
+
+        with db.get_connection() as conn:
+            conn.execute(db.analytics_token_latest.delete().where(
+                db.analytics_token_latest.c.module_provider_id.in_(module_provider_ids)
+            ))
+            conn.execute(db.analytics_token_latest.insert().from_select(
+                ['module_provider_id', 'analytics_token', 'environment',
+                 'parent_module_version', 'terraform_version', 'timestamp'],
+                sqlalchemy.select(
+                    db.module_version.c.module_provider_id,
+                    db.analytics.c.analytics_token,
+                    db.analytics.c.environment,
+                    db.analytics.c.parent_module_version,
+                    db.analytics.c.terraform_version,
+                    db.analytics.c.timestamp
+                ).select_from(
+                    db.analytics
+                ).join(
+                    db.module_version,
+                    db.module_version.c.id == db.analytics.c.parent_module_version
+                ).where(
+                    db.analytics.c.id.in_(id_subquery)
+                )
+            ))
+
+    def get_total_downloads():
+        """Return number of downloads of all module versions."""
+        db = Database.get()
+        select = sqlalchemy.select(
+            sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_daily.c.download_count), 0)
         )
         with db.get_connection() as conn:
             res = conn.execute(select)
@@ -201,14 +377,9 @@ class AnalyticsEngine:
         """Return number of downloads for a given module version."""
         db = Database.get()
         select = sqlalchemy.select(
-            [sqlalchemy.func.count()]
-        ).select_from(
-            db.analytics
-        ).join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
+            sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_daily.c.download_count), 0)
         ).where(
-            db.module_version.c.id == module_version.pk
+            db.analytics_daily.c.parent_module_version == module_version.pk
         )
         with db.get_connection() as conn:
             res = conn.execute(select)
@@ -216,30 +387,79 @@ class AnalyticsEngine:
 
     @staticmethod
     def get_module_provider_download_stats(module_provider):
-        """Return number of downloads for intervals."""
+        """
+        Return number of downloads for intervals.
+
+        Downloads for whole days within each interval are obtained from the analytics_daily table.
+        Downloads on the first day of each interval, which is only partially within the interval,
+        are counted from the analytics table, unless the first day is outside of the
+        analytics retention period.
+        """
         db = Database.get()
-        stats = {}
-        for i in [(7, 'week'), (31, 'month'), (365, 'year'), (None, 'total')]:
+        now = datetime.datetime.now()
+        retention_days = Config().ANALYTICS_RETENTION_DAYS
+
+        # Start of each interval and the first day that is obtained from daily download counts.
+        intervals = []
+        for days, name in [(7, 'week'), (31, 'month'), (365, 'year')]:
+            from_timestamp = now - datetime.timedelta(days=days)
+            if retention_days and days >= retention_days:
+                # Raw analytics may have been archived for the first day of the interval,
+                # so all downloads of the first day are included
+                intervals.append((name, None, from_timestamp.date()))
+            else:
+                intervals.append((name, from_timestamp, from_timestamp.date() + datetime.timedelta(days=1)))
+
+        module_version_ids = sqlalchemy.select(
+            db.module_version.c.id
+        ).where(
+            db.module_version.c.module_provider_id == module_provider.pk
+        ).scalar_subquery()
+
+        def sum_if(condition, value):
+            return sqlalchemy.func.coalesce(sqlalchemy.func.sum(
+                sqlalchemy.case((condition, value), else_=0)
+            ), 0)
+
+        daily_select = sqlalchemy.select(
+            *[
+                sum_if(db.analytics_daily.c.day >= first_day, db.analytics_daily.c.download_count).label(name)
+                for name, _, first_day in intervals
+            ],
+            sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_daily.c.download_count), 0).label('total')
+        ).where(
+            db.analytics_daily.c.parent_module_version.in_(module_version_ids)
+        )
 
-            select = sqlalchemy.select(
-                [sqlalchemy.func.count()]
-            ).select_from(
-                db.analytics
+        first_day_conditions = {
+            name: sqlalchemy.and_(
+                db.analytics.c.timestamp >= from_timestamp,
+                db.analytics.c.timestamp < datetime.datetime.combine(first_day, datetime.time())
             )
-            select = AnalyticsEngine._join_filter_analytics_table_by_module_provider(
-                db=db, query=select, module_provider=module_provider)
-
-            # If a checking a given time frame, limit by number of days
-            if i[0]:
-                from_timestamp = datetime.datetime.now() - datetime.timedelta(days=i[0])
-                select = select.where(
-                    db.analytics.c.timestamp >= from_timestamp
-                )
-
-            with db.get_connection() as conn:
-                res = conn.execute(select)
-                stats[i[1]] = res.scalar()
+            for name, from_timestamp, first_day in intervals
+            if from_timestamp is not None
+        }
 
+        with db.get_connection() as conn:
+            daily_row = conn.execute(daily_select).fetchone()
+
+            first_day_row = {}
+            if first_day_conditions:
+                first_day_row = conn.execute(sqlalchemy.select(
+                    *[
+                        sum_if(condition, 1).label(name)
+                        for name, condition in first_day_conditions.items()
+                    ]
+                ).where(
+                    db.analytics.c.parent_module_version.in_(module_version_ids),
+                    sqlalchemy.or_(*first_day_conditions.values())
+                )).fetchone()
+
+        stats = {
+            name: int(daily_row[name]) + int(first_day_row[name] if name in first_day_conditions else 0)
+            for name, _, _ in intervals
+        }
+        stats['total'] = int(daily_row['total'])
         return stats
 
 
@@ -248,38 +468,25 @@ class AnalyticsEngine:
         """Return list of users for module provider."""
         db = Database.get()
 
-        # Obtain a list of the MAX (latest) analytics row IDs,
-        # grouped by analytics token and environment.
-        id_subquery = sqlalchemy.select(
-            [
-                sqlalchemy.func.max(db.analytics.c.id)
-            ]
-        ).select_from(
-            db.analytics
-        )
-        id_subquery = AnalyticsEngine._join_filter_analytics_table_by_module_provider(
-            db=db, query=id_subquery,
-            module_provider=module_provider)
-
-        id_subquery = id_subquery.group_by(
-            db.analytics.c.analytics_token,
-            db.analytics.c.environment
-        )
-
-        # Select all required fields for the given IDs
-        # obtained from subquery.
-        select = sqlalchemy.select([
-            db.analytics.c.environment,
-            db.analytics.c.analytics_token,
+        # Select latest download of each analytics token and environment,
+        # ordered by latest download first, to ignore any duplicate rows.
+        select = sqlalchemy.select(
+            db.analytics_token_latest.c.environment,
+            db.analytics_token_latest.c.analytics_token,
             db.module_version.c.version,
-            db.analytics.c.terraform_version,
-            db.analytics.c.timestamp
-        ]).select_from(
-            db.analytics
+            db.analytics_token_latest.c.terraform_version,
+            db.analytics_token_latest.c.timestamp
+        ).select_from(
+            db.analytics_token_latest
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics_token_latest.c.parent_module_version
+        ).where(
+            db.analytics_token_latest.c.module_provider_id == module_provider.pk
+        ).order_by(
+            db.analytics_token_latest.c.timestamp.desc(),
+            db.analytics_token_latest.c.id.desc()
         )
-        select = AnalyticsEngine._join_filter_analytics_table_by_module_provider(
-            db=db, query=select, module_provider=module_provider)
-        select = select.where(db.analytics.c.id.in_(id_subquery))
 
         token_version_mapping = {}
         # Convert list of environments to a map,
@@ -293,7 +500,12 @@ class AnalyticsEngine:
         with db.get_connection() as conn:
             res = conn.execute(select)
 
+            seen_keys = set()
             for row in res:
+                # Skip duplicate rows, which are older than the first row for the analytics token and environment
+                if (row['analytics_token'], row['environment']) in seen_keys:
+                    continue
+                seen_keys.add((row['analytics_token'], row['environment']))
 
                 # Check if row is usable
                 ## Skip any rows without ananlytics tokens, if they are required.
@@ -338,12 +550,45 @@ class AnalyticsEngine:
     @classmethod
     def delete_analytics_for_module_version(cls, module_version):
         """Delete all analytics for given module version."""
+        cls.delete_analytics_for_module_version_ids([module_version.pk])
+
+    @classmethod
+    def delete_analytics_for_module_version_ids(cls, module_version_ids):
+        """Delete all analytics for module versions with given IDs."""
         db = Database.get()
 
         with db.get_connection() as conn:
+            # Obtain number of downloads from daily download counts,
+            # as raw analytics may have been archived
+            download_count = conn.execute(sqlalchemy.select(
+                sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_daily.c.download_count), 0)
+            ).where(
+                db.analytics_daily.c.parent_module_version.in_(module_version_ids)
+            )).scalar()
+
             conn.execute(db.analytics.delete().where(
-                db.analytics.c.parent_module_version == module_version.pk
+                db.analytics.c.parent_module_version.in_(module_version_ids)
             ))
+            conn.execute(db.analytics_daily.delete().where(
+                db.analytics_daily.c.parent_module_version.in_(module_version_ids)
+            ))
+
+            # Obtain module providers with latest downloads of the module versions,
+            # which must be replaced with downloads of other module versions
+            module_provider_ids = [
+                row['module_provider_id']
+                for row in conn.execute(sqlalchemy.select(
+                    db.analytics_token_latest.c.module_provider_id
+                ).where(
+                    db.analytics_token_latest.c.parent_module_version.in_(module_version_ids)
+                ).group_by(
+                    db.analytics_token_latest.c.module_provider_id
+                )).fetchall()
+            ]
+        if module_provider_ids:
+            cls._rebuild_latest_token_downloads(module_provider_ids)
+
+        GlobalStatistics.increment(GlobalStatistic.DOWNLOAD_COUNT, -download_count)
 
     @classmethod
     def migrate_analytics_to_new_module_version(cls, old_version_version_pk, new_module_version):
@@ -356,46 +601,92 @@ class AnalyticsEngine:
             ).values(
                 parent_module_version=new_module_version.pk
             ))
+            conn.execute(db.analytics_daily.update().where(
+                db.analytics_daily.c.parent_module_version == old_version_version_pk
+            ).values(
+                parent_module_version=new_module_version.pk
+            ))
+            conn.execute(db.analytics_token_latest.update().where(
+                db.analytics_token_latest.c.parent_module_version == old_version_version_pk
+            ).values(
+                parent_module_version=new_module_version.pk
+            ))
 
     @classmethod
     def get_module_provider_version_statistics(cls):
-        """Return number of major, minor and patch releases for a module version"""
-        major_count = 0
-        minor_count = 0
-        patch_count = 0
-        for namespace in terrareg.models.Namespace.get_all(only_published=True):
-            for module in namespace.get_all_modules():
-                for module_provider in module.get_providers():
-                    versions = module_provider.get_versions(include_beta=False, include_unpublished=False)
-                    # Reverse versions, so that the they increase in value
-                    versions.reverse()
-
-                    # Setup variable to hold previous version
-                    previous_version = None
-                    for module_version in versions:
-                        # Split version number by . and convert each version part to integers
-                        version_split = [int(v) for v in module_version.version.split('.')]
-                        # If this is the first version, count as a major release,
-                        # otherwise, check if major version has increased since last seen release
-                        if previous_version is None or version_split[0] > previous_version[0]:
-                            major_count += 1
-                        # Check if version is a minor change
-                        elif version_split[1] > previous_version[1]:
-                            minor_count += 1
-                        # Check if version is a patch change
-                        elif version_split[2] > previous_version[2]:
-                            patch_count += 1
-                        else:
-                            print('Unable to determine version change between:', previous_version, 'and', version_split)
-
-                        previous_version = version_split
+        """
+        Return number of major, minor and patch releases across all module providers.
+
+        Only published, non-beta, versions are counted.
+        The first version of each major version of a module provider is a major release,
+        the first version of each minor version within a major version is a minor release
+        and all other versions are patch releases.
+        """
+        db = Database.get()
+
+        # Count versions for each minor version of each module provider
+        minor_versions = sqlalchemy.select(
+            db.module_version.c.module_provider_id,
+            db.module_version.c.version_major,
+            sqlalchemy.func.count().label('version_count')
+        ).where(
+            db.module_version.c.published == True,
+            db.module_version.c.beta == False
+        ).group_by(
+            db.module_version.c.module_provider_id,
+            db.module_version.c.version_major,
+            db.module_version.c.version_minor
+        ).subquery()
+
+        # Count minor versions and versions for each major version of each module provider
+        major_versions = sqlalchemy.select(
+            sqlalchemy.func.count().label('minor_count'),
+            sqlalchemy.func.sum(minor_versions.c.version_count).label('version_count')
+        ).select_from(
+            minor_versions
+        ).group_by(
+            minor_versions.c.module_provider_id,
+            minor_versions.c.version_major
+        ).subquery()
+
+        select = sqlalchemy.select(
+            sqlalchemy.func.count().label('major_count'),
+            sqlalchemy.func.sum(major_versions.c.minor_count).label('minor_count'),
+            sqlalchemy.func.sum(major_versions.c.version_count).label('version_count')
+        ).select_from(
+            major_versions
+        )
+
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        major_count = row['major_count']
+        minor_count = int(row['minor_count'] or 0)
+        version_count = int(row['version_count'] or 0)
 
         # Return all 3 counts
-        return major_count, minor_count, patch_count
+        return major_count, minor_count - major_count, version_count - minor_count
 
     @classmethod
     def get_prometheus_metrics(cls):
-        """Return prometheus metrics for modules and usage."""
+        """
+        Return prometheus metrics for modules and usage.
+
+        The metrics are cached for PROMETHEUS_METRICS_CACHE_TTL seconds,
+        so that frequent scraping does not re-generate them on each request.
+        """
+        ttl = Config().PROMETHEUS_METRICS_CACHE_TTL
+        if ttl <= 0:
+            return cls._generate_prometheus_metrics()
+        return cls._PROMETHEUS_METRICS_CACHE.get_or_set(
+            'metrics',
+            cls._generate_prometheus_metrics,
+            ttl=ttl
+        )
+
+    @classmethod
+    def _generate_prometheus_metrics(cls):
+        """Generate prometheus metrics for modules and usage."""
         prometheus_generator = PrometheusGenerator()
         
         module_count_metric = PrometheusMetric(
@@ -436,17 +727,95 @@ class AnalyticsEngine:
         )
         db = Database.get()
         with db.get_connection() as conn:
-            rows = conn.execute(AnalyticsEngine.get_global_module_usage_base_query(include_empty_auth_token=True)).fetchall()
-        for row in rows:
-            module_provider_usage_metric.add_data_row(
-                value='1',
-                labels={'module_provider_id': '{}/{}/{}'.format(row['namespace'], row['module'], row['provider']),
-                        'analytics_token': row['analytics_token']}
-            )
+            # Stream rows from the database, rather than loading all rows into memory
+            res = conn.execution_options(stream_results=True).execute(
+                AnalyticsEngine.get_global_module_usage_base_query(include_empty_auth_token=True))
+            for row in res:
+                module_provider_usage_metric.add_data_row(
+                    value='1',
+                    labels={'module_provider_id': '{}/{}/{}'.format(row['namespace'], row['module'], row['provider']),
+                            'analytics_token': row['analytics_token']}
+                )
         prometheus_generator.add_metric(module_provider_usage_metric)
 
+        for metric in cls.get_database_pool_metrics():
+            prometheus_generator.add_metric(metric)
+
+        for metric in cls.get_module_specs_cache_metrics():
+            prometheus_generator.add_metric(metric)
+
+        for metric in cls.get_analytics_ingestion_metrics():
+            prometheus_generator.add_metric(metric)
+
         return prometheus_generator.generate()
 
+    @staticmethod
+    def get_database_pool_metrics():
+        """Return list of prometheus metrics for database connection pool."""
+        pool_statistics = Database.get_pool_statistics()
+        metrics = []
+        for name, type_, help in [
+                ('connections_created', 'counter', 'Total number of database connections created by the connection pool'),
+                ('checkouts', 'counter', 'Total number of database connections checked out from the connection pool'),
+                ('checkout_wait_seconds', 'counter', 'Total time spent waiting for database connections from the connection pool'),
+                ('size', 'gauge', 'Configured size of the database connection pool'),
+                ('checkedout', 'gauge', 'Number of database connections currently checked out from the connection pool'),
+                ('overflow', 'gauge', 'Number of overflow database connections currently open')]:
+            # Only add metrics that are supported by the connection pool
+            if name not in pool_statistics:
+                continue
+            metric = PrometheusMetric(
+                name=f'database_pool_{name}',
+                type_=type_,
+                help=help
+            )
+            metric.add_data_row(value=pool_statistics[name])
+            metrics.append(metric)
+        return metrics
+
+
+    @staticmethod
+    def get_module_specs_cache_metrics():
+        """Return list of prometheus metrics for cache of parsed terraform-docs output."""
+        cache_statistics = ModuleSpecsCache.get_statistics()
+        metrics = []
+        for name, type_, help in [
+                ('hits', 'counter', 'Total number of lookups of parsed terraform-docs output found in the cache'),
+                ('misses', 'counter', 'Total number of lookups of parsed terraform-docs output not found in the cache'),
+                ('evictions', 'counter', 'Total number of parsed terraform-docs outputs removed from the cache due to size limit'),
+                ('entries', 'gauge', 'Number of parsed terraform-docs outputs in the cache'),
+                ('size_bytes', 'gauge', 'Estimated size of parsed terraform-docs outputs in the cache')]:
+            metric = PrometheusMetric(
+                name=f'module_specs_cache_{name}',
+                type_=type_,
+                help=help
+            )
+            metric.add_data_row(value=cache_statistics[name])
+            metrics.append(metric)
+        return metrics
+
+
+    @staticmethod
+    def get_analytics_ingestion_metrics():
+        """Return list of prometheus metrics for queue of asynchronous analytics ingestion."""
+        ingestion_statistics = terrareg.analytics_ingestion.AnalyticsIngestion.get_statistics()
+        metrics = []
+        for name, type_, help in [
+                ('queue_depth', 'gauge', 'Number of module downloads waiting in the analytics ingestion queue, including downloads waiting to be retried'),
+                ('enqueued', 'counter', 'Total number of module downloads added to the analytics ingestion queue'),
+                ('recorded', 'counter', 'Total number of queued module downloads inserted into the database'),
+                ('dropped', 'counter', 'Total number of module downloads not recorded due to the analytics ingestion queue being full'),
+                ('failed', 'counter', 'Total number of queued module downloads that could not be inserted into the database and were queued to be retried'),
+                ('batches', 'counter', 'Total number of batches of queued module downloads inserted into the database')]:
+            metric = PrometheusMetric(
+                name=f'analytics_ingestion_{name}',
+                type_=type_,
+                help=help
+            )
+            metric.add_data_row(value=ingestion_statistics[name])
+            metrics.append(metric)
+        return metrics
+
 
 class PrometheusMetric:
     """Prometheus metric"""
@@ -461,15 +830,15 @@ class PrometheusMetric:
             f'# TYPE {self._name} {self._type}'
         ]
 
-    def add_data_row(self, value, labels=None):
-        """Add data row, with optional labels"""
+    def add_data_row(self, value, labels=None, name_suffix=''):
+        """Add data row, with optional labels and suffix to metric name, such as '_bucket' for histograms."""
         labels = {} if labels is None else labels
         label_strings = [f'{key}="{labels[key]}"' for key in labels]
         label_string = ', '.join(label_strings)
         if label_string:
             label_string = '{' + label_string + '}'
 
-        self._lines.append(f'{self._name}{label_string} {value}')
+        self._lines.append(f'{self._name}{name_suffix}{label_string} {value}')
 
     def generate(self):
         """Return generated lines for metric."""
@@ -0,0 +1,119 @@
+"""Provide archival of raw module download analytics that are older than the retention period."""
+
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import sqlalchemy
+
+import terrareg.config
+from terrareg.database import Database
+
+
+class AnalyticsArchiver:
+    """
+    Archive raw analytics rows older than the retention period, exporting them to
+    compressed NDJSON files in the analytics archive directory and removing them from the database.
+
+    Download counts of archived rows are retained in the analytics_daily table.
+    The latest row for each module version, analytics token, environment and auth token
+    is retained, so that the latest usage of each analytics token is still available.
+
+    Rows are archived in batches, each written to its own archive file and removed
+    in a separate statement, with an optional delay between batches,
+    to avoid locking the analytics table for long when run against a live installation.
+    If archival is interrupted, it can be re-run to continue archiving the remaining rows.
+    """
+
+    def __init__(self, retention_days: int, batch_size: int=1000, batch_delay: float=0):
+        """Store member variables."""
+        self._retention_days = retention_days
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+
+    @staticmethod
+    def get_archive_directory():
+        """Return directory containing archive files."""
+        return os.path.join(terrareg.config.Config().DATA_DIRECTORY, 'analytics_archive')
+
+    @staticmethod
+    def _get_has_newer_row_column():
+        """
+        Return column determining whether a newer row exists for the same module version,
+        analytics token, environment and auth token, using the index of these columns.
+        """
+        db = Database.get()
+        newer_analytics = db.analytics.alias('newer_analytics')
+        return sqlalchemy.exists().where(
+            newer_analytics.c.parent_module_version == db.analytics.c.parent_module_version,
+            newer_analytics.c.analytics_token.is_not_distinct_from(db.analytics.c.analytics_token),
+            newer_analytics.c.environment.is_not_distinct_from(db.analytics.c.environment),
+            newer_analytics.c.auth_token.is_not_distinct_from(db.analytics.c.auth_token),
+            newer_analytics.c.id > db.analytics.c.id
+        ).label('has_newer_row')
+
+    def _write_archive_file(self, rows):
+        """Write rows to compressed NDJSON archive file, named by the range of row IDs."""
+        directory = self.get_archive_directory()
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to temporary file and rename, so that incomplete archive files are never present
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw_fh, gzip.open(raw_fh, 'wt') as fh:
+                for row in rows:
+                    fh.write(json.dumps({
+                        'id': row['id'],
+                        'parent_module_version': row['parent_module_version'],
+                        'timestamp': row['timestamp'].isoformat() if row['timestamp'] else None,
+                        'terraform_version': row['terraform_version'],
+                        'analytics_token': row['analytics_token'],
+                        'auth_token': row['auth_token'],
+                        'environment': row['environment']
+                    }) + '\n')
+            os.replace(temp_path, os.path.join(directory, f"analytics-{rows[0]['id']}-{rows[-1]['id']}.ndjson.gz"))
+        except:
+            os.unlink(temp_path)
+            raise
+
+    def run(self):
+        """Archive all rows older than the retention period, returning the number of archived rows."""
+        db = Database.get()
+        archived_rows = 0
+        last_id = None
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=self._retention_days)
+
+        while True:
+            select = sqlalchemy.select(
+                db.analytics,
+                self._get_has_newer_row_column()
+            ).where(
+                db.analytics.c.timestamp < cutoff
+            ).order_by(db.analytics.c.id).limit(self._batch_size)
+            if last_id is not None:
+                select = select.where(db.analytics.c.id > last_id)
+
+            with db.get_connection() as conn:
+                rows = conn.execute(select).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            # Retain the latest row for each module version, analytics token, environment and auth token
+            rows = [row for row in rows if row['has_newer_row']]
+            if rows:
+                # Rows are only removed once they have been written to the archive
+                self._write_archive_file(rows)
+                with db.get_connection() as conn:
+                    conn.execute(db.analytics.delete().where(
+                        db.analytics.c.id.in_([row['id'] for row in rows])
+                    ))
+                archived_rows += len(rows)
+
+            if self._batch_delay:
+                time.sleep(self._batch_delay)
+
+        return archived_rows
@@ -0,0 +1,401 @@
+"""Provide asynchronous, batched, ingestion of module download analytics."""
+
+import atexit
+from collections import deque
+import json
+import os
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+
+import sqlalchemy
+
+import terrareg.analytics
+import terrareg.config
+from terrareg.database import Database
+
+
+class AnalyticsIngestion:
+    """
+    Bounded in-process queue of module download events, which are inserted
+    into the database in batches by a background thread.
+
+    Events are inserted once ANALYTICS_INGESTION_BATCH_SIZE events are queued,
+    or after ANALYTICS_INGESTION_FLUSH_INTERVAL milliseconds.
+    Once the queue is full, callers wait up to ANALYTICS_INGESTION_QUEUE_TIMEOUT
+    milliseconds for space in the queue, after which the event is dropped.
+
+    Each batch is inserted, along with the download counts, in a single transaction.
+    Events that cannot be inserted are retried by the background thread, with an
+    exponential backoff, and count towards the size of the queue until they are inserted.
+
+    If ANALYTICS_INGESTION_SPOOL_DIRECTORY is configured, each event is also appended
+    to a spool file for the current process, which is removed once the events have
+    been inserted. If a batch cannot be inserted, the spool file is replaced with the events
+    that have not been inserted. Spool files of processes that are no longer running are
+    inserted by the next process to start the queue.
+    """
+
+    # Number of seconds to wait before retrying events that could not be inserted,
+    # which is doubled after each failure, up to the maximum
+    RETRY_INITIAL_DELAY = 1
+    RETRY_MAX_DELAY = 60
+
+    _CONDITION = threading.Condition()
+    _EVENTS = deque()
+    # Tuples of events that could not be inserted and path of spool file containing them
+    _FAILED_BATCHES = deque()
+    _RETRY_DELAY = 0
+    _RETRY_TIME = 0
+    # Spool file of the current process, which is kept open whilst events are appended to it
+    _SPOOL_FILE = None
+    _THREAD = None
+    # Process that started the background thread, used to restart the thread in forked processes
+    _PID = None
+    _STOP = False
+    _STATISTICS = None
+
+    @staticmethod
+    def _get_empty_statistics():
+        """Return statistics of queue before any events have been queued."""
+        return {
+            'enqueued': 0,
+            'recorded': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0,
+        }
+
+    @classmethod
+    def _get_spool_directory(cls):
+        """Return spool directory, or None, if not configured."""
+        return terrareg.config.Config().ANALYTICS_INGESTION_SPOOL_DIRECTORY or None
+
+    @classmethod
+    def _get_spool_path(cls, directory: str):
+        """Return path of spool file that events are appended to by the current process."""
+        return os.path.join(directory, f'{os.getpid()}.ndjson')
+
+    @classmethod
+    def _ensure_started(cls):
+        """Start background thread, if it is not running in the current process. Must be called whilst holding the lock."""
+        if cls._PID == os.getpid() and cls._THREAD is not None and cls._THREAD.is_alive():
+            return
+
+        if cls._PID != os.getpid():
+            # Discard events queued by parent process, which remain in the spool of the parent process
+            cls._EVENTS.clear()
+            cls._FAILED_BATCHES.clear()
+            cls._RETRY_DELAY = 0
+            cls._SPOOL_FILE = None
+            cls._STATISTICS = cls._get_empty_statistics()
+            cls._PID = os.getpid()
+
+            spool_directory = cls._get_spool_directory()
+            if spool_directory is not None:
+                os.makedirs(spool_directory, exist_ok=True)
+                cls._recover_spool_files(spool_directory)
+
+            atexit.register(cls.stop)
+
+        cls._STOP = False
+        cls._THREAD = threading.Thread(target=cls._run, name='analytics-ingestion', daemon=True)
+        cls._THREAD.start()
+
+    @staticmethod
+    def _is_process_running(pid: int):
+        """Return whether process is running."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    @classmethod
+    def _recover_spool_files(cls, directory: str):
+        """
+        Queue events from spool files of processes that are no longer running. Must be called whilst holding the lock.
+
+        Spool files of the current process ID are from a previous process, since the current process has not yet spooled any events.
+        """
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith('.ndjson'):
+                continue
+            try:
+                pid = int(file_name.split('.')[0].split('-')[0])
+            except ValueError:
+                continue
+            if pid != os.getpid() and cls._is_process_running(pid):
+                continue
+
+            # Rename spool file, to claim it from other processes recovering spool files.
+            # Events are appended to the spool file of the current process,
+            # so that they are retained until they are inserted.
+            recovery_path = os.path.join(directory, f'.recovering-{uuid.uuid4().hex}')
+            try:
+                os.rename(os.path.join(directory, file_name), recovery_path)
+            except FileNotFoundError:
+                continue
+
+            with open(recovery_path, 'r') as fh:
+                events = []
+                for line in fh:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        # Ignore partially written events
+                        continue
+            cls._spool_events(events)
+            cls._EVENTS.extend(events)
+            os.unlink(recovery_path)
+
+    @classmethod
+    def _spool_events(cls, events: list):
+        """
+        Append events to spool file of current process, if spool is enabled. Must be called whilst holding the lock.
+
+        The spool file is opened on first use and kept open until it is rotated,
+        so that appending an event only writes the event.
+        """
+        if not events:
+            return
+
+        if cls._SPOOL_FILE is None:
+            spool_directory = cls._get_spool_directory()
+            if spool_directory is None:
+                return
+            # Use line buffering, so that each event is written to the file once it is appended
+            cls._SPOOL_FILE = open(cls._get_spool_path(spool_directory), 'a', buffering=1)
+
+        cls._SPOOL_FILE.write(''.join(f'{json.dumps(event)}\n' for event in events))
+
+    @classmethod
+    def _replace_spool_file(cls, spool_path: str, events: list):
+        """Atomically replace content of spool file with events."""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(spool_path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(''.join(f'{json.dumps(event)}\n' for event in events))
+            os.replace(temp_path, spool_path)
+        except:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def _rotate_spool(cls):
+        """
+        Rename spool file of current process, returning the new path, or None, if there is no spool file.
+
+        Must be called whilst holding the lock, so that the renamed spool file
+        contains all events that have been removed from the queue.
+        """
+        if cls._SPOOL_FILE is not None:
+            cls._SPOOL_FILE.close()
+            cls._SPOOL_FILE = None
+
+        spool_directory = cls._get_spool_directory()
+        if spool_directory is None:
+            return None
+
+        spool_path = cls._get_spool_path(spool_directory)
+        batch_path = os.path.join(spool_directory, f'{os.getpid()}-{uuid.uuid4().hex}.ndjson')
+        try:
+            os.rename(spool_path, batch_path)
+        except FileNotFoundError:
+            return None
+        return batch_path
+
+    @classmethod
+    def enqueue(cls, event: dict):
+        """
+        Add download event to queue, returning whether the event was queued.
+
+        If the queue is full, waits for space in the queue, up to the configured timeout.
+        """
+        config = terrareg.config.Config()
+        deadline = time.monotonic() + (config.ANALYTICS_INGESTION_QUEUE_TIMEOUT / 1000)
+
+        with cls._CONDITION:
+            cls._ensure_started()
+
+            while cls._get_queue_depth() >= config.ANALYTICS_INGESTION_QUEUE_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    cls._STATISTICS['dropped'] += 1
+                    return False
+                cls._CONDITION.wait(remaining)
+
+            cls._spool_events([event])
+            cls._EVENTS.append(event)
+            cls._STATISTICS['enqueued'] += 1
+
+            # Wake background thread, once a batch is available
+            if len(cls._EVENTS) >= config.ANALYTICS_INGESTION_BATCH_SIZE:
+                cls._CONDITION.notify_all()
+        return True
+
+    @classmethod
+    def _get_queue_depth(cls):
+        """Return number of queued events, including events waiting to be retried. Must be called whilst holding the lock."""
+        return len(cls._EVENTS) + sum(len(events) for events, _ in cls._FAILED_BATCHES)
+
+    @classmethod
+    def _take_events(cls):
+        """Remove all events from queue, returning tuple of events and path of spool file containing them. Must be called whilst holding the lock."""
+        events = list(cls._EVENTS)
+        cls._EVENTS.clear()
+        spool_path = cls._rotate_spool() if events else None
+
+        # Wake callers waiting for space in the queue
+        cls._CONDITION.notify_all()
+        return events, spool_path
+
+    @classmethod
+    def _take_failed_batches(cls, ignore_retry_delay: bool=False):
+        """
+        Remove batches of events that are due to be retried, returning list of tuples of events and spool file path.
+
+        Must be called whilst holding the lock.
+        """
+        if not cls._FAILED_BATCHES or (not ignore_retry_delay and time.monotonic() < cls._RETRY_TIME):
+            return []
+
+        failed_batches = list(cls._FAILED_BATCHES)
+        cls._FAILED_BATCHES.clear()
+        cls._CONDITION.notify_all()
+        return failed_batches
+
+    @classmethod
+    def _filter_existing_module_versions(cls, events: list):
+        """Return events for module versions that still exist, as module versions may be deleted whilst events are queued."""
+        module_version_ids = set(event['module_version_id'] for event in events)
+        db = Database.get()
+        with db.get_connection() as conn:
+            existing_ids = set(
+                row['id']
+                for row in conn.execute(sqlalchemy.select(db.module_version.c.id).where(
+                    db.module_version.c.id.in_(module_version_ids)
+                ))
+            )
+        return [event for event in events if event['module_version_id'] in existing_ids]
+
+    @classmethod
+    def _record_events(cls, events: list, spool_path: str):
+        """
+        Insert events into database, in batches, removing spool file once all events have been inserted.
+
+        If the events cannot be inserted, the events that have not been inserted are
+        queued to be retried, returning False.
+        """
+        batch_size = max(terrareg.config.Config().ANALYTICS_INGESTION_BATCH_SIZE, 1)
+        recorded = 0
+        try:
+            events = cls._filter_existing_module_versions(events)
+            while recorded < len(events):
+                # Each batch is inserted in a single transaction
+                batch = events[recorded:recorded + batch_size]
+                terrareg.analytics.AnalyticsEngine.record_download_events(batch)
+                recorded += len(batch)
+                with cls._CONDITION:
+                    cls._STATISTICS['recorded'] += len(batch)
+                    cls._STATISTICS['batches'] += 1
+        except Exception:
+            traceback.print_exc()
+            remaining_events = events[recorded:]
+
+            # Inserted events are removed from the spool file, so they are not inserted again
+            # and the events that have not been inserted remain in the spool file, if spool is enabled,
+            # so that they are inserted by another process, if the current process exits before they are inserted.
+            if spool_path is not None:
+                cls._replace_spool_file(spool_path, remaining_events)
+
+            with cls._CONDITION:
+                cls._STATISTICS['failed'] += len(remaining_events)
+                cls._FAILED_BATCHES.append((remaining_events, spool_path))
+                cls._RETRY_DELAY = min(cls._RETRY_DELAY * 2, cls.RETRY_MAX_DELAY) if cls._RETRY_DELAY else cls.RETRY_INITIAL_DELAY
+                cls._RETRY_TIME = time.monotonic() + cls._RETRY_DELAY
+                # Wake background thread, so that it waits until the retry is due
+                cls._CONDITION.notify_all()
+            return False
+
+        if spool_path is not None:
+            os.unlink(spool_path)
+
+        # Once events have been inserted, retry any failed events immediately
+        with cls._CONDITION:
+            cls._RETRY_DELAY = 0
+            cls._RETRY_TIME = 0
+            if cls._FAILED_BATCHES:
+                cls._CONDITION.notify_all()
+        return True
+
+    @classmethod
+    def _record_batches(cls, batches: list):
+        """
+        Insert list of tuples of events and spool file paths.
+
+        Once a batch cannot be inserted, the remaining batches are queued to be retried, without being inserted.
+        """
+        for index, (events, spool_path) in enumerate(batches):
+            if not cls._record_events(events, spool_path):
+                with cls._CONDITION:
+                    cls._FAILED_BATCHES.extend(batches[index + 1:])
+                return
+
+    @classmethod
+    def _run(cls):
+        """Insert queued events and retry failed events, until stopped."""
+        while True:
+            with cls._CONDITION:
+                config = terrareg.config.Config()
+                flush_time = time.monotonic() + (config.ANALYTICS_INGESTION_FLUSH_INTERVAL / 1000)
+                while not cls._STOP and len(cls._EVENTS) < config.ANALYTICS_INGESTION_BATCH_SIZE:
+                    # Wait until the flush interval has passed, or until failed events are due to be retried,
+                    # re-calculating the retry time when woken, as events may have failed whilst waiting
+                    wake_time = min(flush_time, cls._RETRY_TIME) if cls._FAILED_BATCHES else flush_time
+                    timeout = wake_time - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    cls._CONDITION.wait(timeout)
+                if cls._STOP:
+                    return
+                batches = cls._take_failed_batches()
+                events, spool_path = cls._take_events()
+
+            if events:
+                batches.append((events, spool_path))
+            cls._record_batches(batches)
+
+    @classmethod
+    def flush(cls):
+        """Insert all queued events and events waiting to be retried into database, in the current thread."""
+        with cls._CONDITION:
+            batches = cls._take_failed_batches(ignore_retry_delay=True)
+            events, spool_path = cls._take_events()
+        if events:
+            batches.append((events, spool_path))
+        cls._record_batches(batches)
+
+    @classmethod
+    def stop(cls):
+        """Stop background thread and insert remaining queued events."""
+        with cls._CONDITION:
+            cls._STOP = True
+            cls._CONDITION.notify_all()
+            thread = cls._THREAD
+            cls._THREAD = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        cls.flush()
+
+    @classmethod
+    def get_statistics(cls):
+        """Return dict of queue statistics for the current process."""
+        with cls._CONDITION:
+            if cls._PID != os.getpid():
+                return dict(cls._get_empty_statistics(), queue_depth=0)
+            return dict(cls._STATISTICS, queue_depth=cls._get_queue_depth())
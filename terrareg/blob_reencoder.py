@@ -0,0 +1,82 @@
+"""Provide re-encoding of existing blob values stored in the database."""
+
+import time
+
+import sqlalchemy
+
+from terrareg.database import Database
+import terrareg.models
+
+
+class BlobReencoder:
+    """
+    Re-encode blob values stored in the database, using the current blob compression configuration.
+
+    Rows are processed in batches, with an optional delay between batches,
+    to limit the load on the database when run against a live installation.
+    """
+
+    def __init__(self, batch_size: int=100, batch_delay: float=0):
+        """Store member variables."""
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+
+    def _get_tables(self):
+        """Return list of tables, primary key column and blob columns to be re-encoded."""
+        db = Database.get()
+        return [
+            (db.module_details, db.module_details.c.id, terrareg.models.ModuleDetails.BLOB_COLUMNS),
+            (db.blob_store, db.blob_store.c.sha256, ['content']),
+            (db.module_version, db.module_version.c.id, ['variable_template']),
+            (db.example_file, db.example_file.c.id, ['content']),
+            (db.module_version_file, db.module_version_file.c.id, ['content']),
+        ]
+
+    def reencode_table(self, table, primary_key, columns):
+        """Re-encode blob columns of table, returning the number of updated rows."""
+        db = Database.get()
+        updated_rows = 0
+        last_primary_key = None
+
+        while True:
+            select = sqlalchemy.select(
+                primary_key,
+                *[table.c[column] for column in columns]
+            ).order_by(primary_key).limit(self._batch_size)
+            if last_primary_key is not None:
+                select = select.where(primary_key > last_primary_key)
+
+            with db.get_connection() as conn:
+                rows = conn.execute(select).fetchall()
+                if not rows:
+                    break
+
+                for row in rows:
+                    last_primary_key = row[primary_key.name]
+
+                    update_values = {}
+                    for column in columns:
+                        value = row[column]
+                        if value is None:
+                            continue
+                        reencoded_value = Database.compress_blob(Database.decompress_blob(value))
+                        if reencoded_value != value:
+                            update_values[column] = reencoded_value
+
+                    if update_values:
+                        conn.execute(table.update().where(
+                            primary_key == last_primary_key
+                        ).values(**update_values))
+                        updated_rows += 1
+
+            if self._batch_delay:
+                time.sleep(self._batch_delay)
+
+        return updated_rows
+
+    def run(self):
+        """Re-encode all blob columns, returning dict of number of updated rows for each table."""
+        return {
+            table.name: self.reencode_table(table=table, primary_key=primary_key, columns=columns)
+            for table, primary_key, columns in self._get_tables()
+        }
@@ -0,0 +1,125 @@
+"""Provide content-addressed storage of blob values."""
+
+import collections
+import hashlib
+
+import sqlalchemy
+
+from terrareg.database import Database
+
+
+class BlobStore:
+    """
+    Store blob content in the database, keyed by SHA256 of the content.
+
+    Identical content is stored once, with a reference count
+    of the number of objects referencing the content.
+    Content is removed once no references to it remain.
+    """
+
+    @staticmethod
+    def get_hash(content: bytes):
+        """
+        Return SHA256 hash of content.
+
+        The hash is generated from the uncompressed content, so that
+        identical content matches, regardless of whether it has been compressed.
+        """
+        return hashlib.sha256(Database.decompress_blob(content)).hexdigest()
+
+    @classmethod
+    def put(cls, content: bytes):
+        """Store content, incrementing reference count if content already exists, and return hash of content."""
+        sha256 = cls.get_hash(content)
+        db = Database.get()
+        increment_reference = db.blob_store.update().where(
+            db.blob_store.c.sha256 == sha256
+        ).values(
+            reference_count=db.blob_store.c.reference_count + 1
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(increment_reference)
+            if res.rowcount:
+                return sha256
+
+            try:
+                conn.execute(db.blob_store.insert().values(
+                    sha256=sha256,
+                    content=content,
+                    reference_count=1
+                ))
+            except sqlalchemy.exc.IntegrityError:
+                # If the content has been inserted since checking for it,
+                # increment the reference count of the new row
+                conn.execute(increment_reference)
+
+        return sha256
+
+    @classmethod
+    def get(cls, sha256: str):
+        """Return content for hash, or None if it does not exist."""
+        return cls.get_many([sha256]).get(sha256, None)
+
+    @classmethod
+    def get_many(cls, sha256s):
+        """Return dict of content, keyed by hash, for all of the given hashes that exist."""
+        sha256s = set(sha256s)
+        if not sha256s:
+            return {}
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.blob_store.c.sha256,
+            db.blob_store.c.content
+        ).where(
+            db.blob_store.c.sha256.in_(sha256s)
+        )
+        with db.get_connection() as conn:
+            return {
+                row['sha256']: row['content']
+                for row in conn.execute(select)
+            }
+
+    @classmethod
+    def release(cls, sha256: str):
+        """Decrement reference count of content, removing the content if it is no longer referenced."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.blob_store.update().where(
+                db.blob_store.c.sha256 == sha256
+            ).values(
+                reference_count=db.blob_store.c.reference_count - 1
+            ))
+            conn.execute(db.blob_store.delete().where(
+                db.blob_store.c.sha256 == sha256,
+                db.blob_store.c.reference_count <= 0
+            ))
+
+    @classmethod
+    def release_many(cls, sha256s):
+        """
+        Decrement reference counts of content for list of hashes, removing content that is no longer referenced.
+
+        Hashes that appear multiple times in the list have their reference count
+        decremented once for each occurrence.
+        """
+        # Group hashes by the number of references to remove,
+        # so that a single update is performed for each distinct count
+        hashes_by_count = collections.defaultdict(list)
+        for sha256, count in collections.Counter(sha256s).items():
+            hashes_by_count[count].append(sha256)
+        if not hashes_by_count:
+            return
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            for count, count_sha256s in hashes_by_count.items():
+                conn.execute(db.blob_store.update().where(
+                    db.blob_store.c.sha256.in_(count_sha256s)
+                ).values(
+                    reference_count=db.blob_store.c.reference_count - count
+                ))
+            conn.execute(db.blob_store.delete().where(
+                db.blob_store.c.sha256.in_(set(sha256s)),
+                db.blob_store.c.reference_count <= 0
+            ))
@@ -0,0 +1,92 @@
+"""Provide moving of existing module details content into the blob store."""
+
+import time
+
+import sqlalchemy
+
+from terrareg.blob_store import BlobStore
+from terrareg.database import Database
+import terrareg.models
+
+
+class BlobStoreMigrator:
+    """
+    Move content stored against module details rows into the de-duplicated blob store.
+
+    Rows are processed in batches, with an optional delay between batches,
+    to limit the load on the database when run against a live installation.
+    Each row is locked and moved in its own transaction, so that concurrent
+    updates of module details do not conflict with the migration.
+    """
+
+    def __init__(self, batch_size: int=100, batch_delay: float=0):
+        """Store member variables."""
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+
+    def _migrate_row(self, id_: int):
+        """Move content of module details row into the blob store, returning whether the row was updated."""
+        db = Database.get()
+        columns = terrareg.models.ModuleDetails.BLOB_COLUMNS
+
+        with Database.start_transaction():
+            with db.get_connection() as conn:
+                row = conn.execute(sqlalchemy.select(
+                    *[db.module_details.c[column] for column in columns],
+                    *[db.module_details.c[f'{column}_sha256'] for column in columns]
+                ).where(
+                    db.module_details.c.id == id_
+                ).with_for_update()).fetchone()
+
+            if row is None:
+                return False
+
+            update_values = {}
+            for column in columns:
+                if row[column] is None or row[f'{column}_sha256']:
+                    continue
+                update_values[f'{column}_sha256'] = BlobStore.put(row[column])
+                update_values[column] = None
+
+            if not update_values:
+                return False
+
+            with db.get_connection() as conn:
+                conn.execute(db.module_details.update().where(
+                    db.module_details.c.id == id_
+                ).values(**update_values))
+
+        return True
+
+    def run(self):
+        """Move content of all module details rows into the blob store, returning the number of updated rows."""
+        db = Database.get()
+        columns = terrareg.models.ModuleDetails.BLOB_COLUMNS
+        updated_rows = 0
+        last_id = 0
+
+        while True:
+            # Select IDs of rows that have content stored against them
+            select = sqlalchemy.select(
+                db.module_details.c.id
+            ).where(
+                db.module_details.c.id > last_id,
+                sqlalchemy.or_(*[
+                    db.module_details.c[column] != None
+                    for column in columns
+                ])
+            ).order_by(db.module_details.c.id).limit(self._batch_size)
+            with db.get_connection() as conn:
+                ids = [row['id'] for row in conn.execute(select)]
+            if not ids:
+                break
+
+            for id_ in ids:
+                if self._migrate_row(id_):
+                    updated_rows += 1
+            last_id = ids[-1]
+
+            if self._batch_delay:
+                time.sleep(self._batch_delay)
+
+        return updated_rows
@@ -0,0 +1,640 @@
+"""Provide caches with pluggable storage backends, expiry, size limits and tag-based invalidation."""
+
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import redis
+
+import terrareg.config
+from terrareg.database import Database
+
+
+class CacheTags:
+    """
+    Tags identifying the data that cached values are generated from.
+
+    Values are stored with the tags of the data used to generate them,
+    and model changes invalidate the tags of the modified data.
+    """
+
+    @staticmethod
+    def module_details(module_details_id: int):
+        """Return tags for values generated from module details."""
+        return [f'module_details:{module_details_id}']
+
+    @staticmethod
+    def module(namespace_name: str, module_name: str):
+        """Return tags for values generated from all providers of a module."""
+        return [f'module:{namespace_name}/{module_name}']
+
+    @staticmethod
+    def module_provider(namespace_name: str, module_name: str, provider_name: str):
+        """Return tags for values generated from a module provider."""
+        return [f'module_provider:{namespace_name}/{module_name}/{provider_name}']
+
+
+class BaseCacheBackend:
+    """Base storage backend for a named cache."""
+
+    def __init__(self, name: str):
+        """Store member variables."""
+        self._name = name
+
+    def get(self, key: str):
+        """Return value for key, or None if the key is not stored, has expired or a tag has been invalidated."""
+        raise NotImplementedError
+
+    def set(self, key: str, value, size: int, max_size: int, ttl: int, tags: list):
+        """Store value, returning the number of entries evicted to stay within the maximum size."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove value for key, if it exists."""
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: list):
+        """Remove all values stored with any of the tags."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all values."""
+        raise NotImplementedError
+
+    def get_size(self):
+        """Return tuple of number of entries and size of entries in bytes, or None values if not known."""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(BaseCacheBackend):
+    """
+    Least-recently-used cache, held in the memory of the current process.
+
+    Values are stored without being copied, so must not be modified by callers.
+    """
+
+    def __init__(self, name: str):
+        """Initialise entries."""
+        super(MemoryCacheBackend, self).__init__(name)
+        self._lock = threading.Lock()
+        # Mapping of key to tuple of (value, size, expiry time, tags)
+        self._entries = OrderedDict()
+        # Mapping of tag to set of keys
+        self._tags = {}
+        self._size = 0
+
+    def get(self, key: str):
+        """Return value for key, or None if the key is not stored or has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry[2] is not None and entry[2] < time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value, size: int, max_size: int, ttl: int, tags: list):
+        """Store value, evicting least-recently-used entries to stay within the maximum size."""
+        expiry = (time.monotonic() + ttl) if ttl else None
+        evictions = 0
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, size, expiry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._size += size
+
+            while self._size > max_size:
+                self._remove(next(iter(self._entries)))
+                evictions += 1
+        return evictions
+
+    def _remove(self, key: str):
+        """Remove entry, if it exists. Must be called whilst holding the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        _, size, _, tags = entry
+        self._size -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def delete(self, key: str):
+        """Remove value for key, if it exists."""
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tags(self, tags: list):
+        """Remove all entries with any of the tags."""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, [])):
+                    self._remove(key)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def get_size(self):
+        """Return number of entries and total size of entries."""
+        with self._lock:
+            return len(self._entries), self._size
+
+
+class FilesystemCacheBackend(BaseCacheBackend):
+    """
+    Cache stored in a local directory, which can be shared between processes on the same host.
+
+    Each value is pickled into a file, along with the current token of each of its tags.
+    Invalidating a tag replaces its token, so values stored with the previous token are
+    treated as missing when they are next read.
+    Least-recently-read files are removed once the maximum size is exceeded.
+    """
+
+    def __init__(self, name: str, directory: str):
+        """Store directories for entries and tag tokens."""
+        super(FilesystemCacheBackend, self).__init__(name)
+        self._entry_directory = os.path.join(directory, name, 'entries')
+        self._tag_directory = os.path.join(directory, name, 'tags')
+        self._lock = threading.Lock()
+        # Estimated size of entries, which is calculated when first required
+        self._size = None
+
+    @staticmethod
+    def _get_file_name(value: str):
+        """Return file name for key or tag."""
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+    def _write_file(self, directory: str, file_name: str, content: bytes):
+        """Atomically write content to file."""
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(content)
+            os.replace(temp_path, os.path.join(directory, file_name))
+        except:
+            os.unlink(temp_path)
+            raise
+
+    def _get_tag_tokens(self, tags: list):
+        """Return dict of current token for each tag."""
+        tokens = {}
+        for tag in tags:
+            try:
+                with open(os.path.join(self._tag_directory, self._get_file_name(tag)), 'rb') as fh:
+                    tokens[tag] = fh.read()
+            except FileNotFoundError:
+                tokens[tag] = None
+        return tokens
+
+    def _remove_file(self, path: str):
+        """Remove file, if it exists."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str):
+        """Return value for key, or None if the key is not stored, has expired or a tag has been invalidated."""
+        path = os.path.join(self._entry_directory, self._get_file_name(key))
+        try:
+            with open(path, 'rb') as fh:
+                entry_key, expiry, tag_tokens, value = pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if entry_key != key:
+            return None
+
+        if ((expiry is not None and expiry < time.time()) or
+                self._get_tag_tokens(list(tag_tokens)) != tag_tokens):
+            self._remove_file(path)
+            return None
+
+        # Update modification time, which is used to determine least-recently-read entries
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def set(self, key: str, value, size: int, max_size: int, ttl: int, tags: list):
+        """Store value, removing least-recently-read entries to stay within the maximum size."""
+        expiry = (time.time() + ttl) if ttl else None
+        content = pickle.dumps((key, expiry, self._get_tag_tokens(tags), value))
+        if len(content) > max_size:
+            return 0
+
+        self._write_file(self._entry_directory, self._get_file_name(key), content)
+
+        with self._lock:
+            if self._size is None:
+                _, self._size = self._scan()
+            else:
+                self._size += len(content)
+
+            if self._size <= max_size:
+                return 0
+            return self._prune(max_size)
+
+    def _scan(self):
+        """Return list of tuples of (modification time, size, path) for all entries and total size of entries."""
+        entries = []
+        try:
+            with os.scandir(self._entry_directory) as it:
+                for dir_entry in it:
+                    if dir_entry.name.startswith('.'):
+                        continue
+                    try:
+                        stat = dir_entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        except FileNotFoundError:
+            pass
+        return entries, sum(entry[1] for entry in entries)
+
+    def _prune(self, max_size: int):
+        """Remove least-recently-read entries until total size is within maximum size. Must be called whilst holding the lock."""
+        entries, self._size = self._scan()
+        evictions = 0
+        for _, size, path in sorted(entries):
+            if self._size <= max_size:
+                break
+            self._remove_file(path)
+            self._size -= size
+            evictions += 1
+        return evictions
+
+    def delete(self, key: str):
+        """Remove value for key, if it exists."""
+        self._remove_file(os.path.join(self._entry_directory, self._get_file_name(key)))
+
+    def invalidate_tags(self, tags: list):
+        """Replace token for each tag, so that values stored with the previous tokens are no longer returned."""
+        for tag in tags:
+            self._write_file(self._tag_directory, self._get_file_name(tag), uuid.uuid4().hex.encode('utf-8'))
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            shutil.rmtree(self._entry_directory, ignore_errors=True)
+            self._size = 0
+
+    def get_size(self):
+        """Return number of entries and total size of entries."""
+        entries, size = self._scan()
+        return len(entries), size
+
+
+class RedisCacheBackend(BaseCacheBackend):
+    """
+    Cache stored in a server implementing the Redis protocol, which can be shared between hosts.
+
+    Expiry of values is performed by the server and eviction of values
+    is performed according to the memory policy of the server.
+    Each value is stored with the current token of each of its tags.
+    Invalidating a tag replaces its token, so values stored with the previous token are
+    treated as missing when they are next read.
+
+    Errors communicating with the server are logged and otherwise ignored: reading values is treated
+    as a cache miss and storing, removing and invalidating values has no effect.
+    Since invalidations are lost whilst the server is unreachable, values stored before an
+    outage may be stale until they expire, once the server is reachable again.
+    """
+
+    def __init__(self, name: str, url: str):
+        """Create client for server."""
+        super(RedisCacheBackend, self).__init__(name)
+        self._client = redis.Redis.from_url(url)
+        self._prefix = f'terrareg:cache:{name}:'
+
+    def _log_error(self, action: str, exc: Exception):
+        """Log error communicating with the server."""
+        print(f'Unable to {action} in cache {self._name}: {str(exc)}')
+
+    def _get_entry_key(self, key: str):
+        """Return server key for value."""
+        return f'{self._prefix}entry:{key}'
+
+    def _get_tag_key(self, tag: str):
+        """Return server key for tag token."""
+        return f'{self._prefix}tag:{tag}'
+
+    def _get_tag_tokens(self, tags: list):
+        """Return dict of current token for each tag."""
+        if not tags:
+            return {}
+        return dict(zip(tags, self._client.mget([self._get_tag_key(tag) for tag in tags])))
+
+    def get(self, key: str):
+        """Return value for key, or None if the key is not stored, has expired or a tag has been invalidated."""
+        try:
+            content = self._client.get(self._get_entry_key(key))
+            if content is None:
+                return None
+
+            tag_tokens, value = pickle.loads(content)
+            if self._get_tag_tokens(list(tag_tokens)) != tag_tokens:
+                self._client.delete(self._get_entry_key(key))
+                return None
+        except redis.RedisError as exc:
+            self._log_error('read value', exc)
+            return None
+
+        return value
+
+    def set(self, key: str, value, size: int, max_size: int, ttl: int, tags: list):
+        """Store value, with expiry performed by the server."""
+        try:
+            self._client.set(
+                self._get_entry_key(key),
+                pickle.dumps((self._get_tag_tokens(tags), value)),
+                ex=(ttl or None)
+            )
+        except redis.RedisError as exc:
+            self._log_error('store value', exc)
+        return 0
+
+    def delete(self, key: str):
+        """Remove value for key, if it exists."""
+        try:
+            self._client.delete(self._get_entry_key(key))
+        except redis.RedisError as exc:
+            self._log_error('remove value', exc)
+
+    def invalidate_tags(self, tags: list):
+        """Replace token for each tag, so that values stored with the previous tokens are no longer returned."""
+        if not tags:
+            return
+        try:
+            self._client.mset({self._get_tag_key(tag): uuid.uuid4().hex for tag in tags})
+        except redis.RedisError as exc:
+            self._log_error('invalidate tags', exc)
+
+    def clear(self):
+        """Remove all entries."""
+        try:
+            keys = list(self._client.scan_iter(match=f'{self._prefix}entry:*'))
+            if keys:
+                self._client.delete(*keys)
+        except redis.RedisError as exc:
+            self._log_error('clear values', exc)
+
+    def get_size(self):
+        """Return None values, as the number and size of entries are not tracked."""
+        return None, None
+
+
+class Cache:
+    """
+    Named cache, storing values in the configured cache backend.
+
+    Values are stored with a list of tags, identifying the data used to generate them.
+    Invalidating a tag removes the values with the tag from all caches.
+
+    Since values may be generated whilst a change to the data is in progress,
+    values are not stored if one of their tags is invalidated whilst they are generated
+    (when a generation is passed to set) and invalidations performed within a
+    database transaction are repeated once the transaction has ended.
+
+    Caches that are created as local always use the in-memory backend,
+    which is used for values that are specific to the process, or where
+    sharing parsed objects between requests is the purpose of the cache.
+    """
+
+    # Maximum size, in bytes, of caches without a configured maximum size
+    DEFAULT_MAX_SIZE = 1048576
+
+    _LOCK = threading.Lock()
+    # List of all caches, used for invalidating tags across caches
+    _CACHES = []
+    # Incremented on each invalidation within the current process
+    _GENERATION = 0
+    # Generation of the most recent invalidation of each tag, in order of invalidation
+    _TAG_GENERATIONS = OrderedDict()
+    # Maximum number of tags to hold the generation of invalidation for
+    _MAX_TAG_GENERATIONS = 10000
+    # Values generated before this generation are not stored,
+    # set when caches are cleared or tags are removed from _TAG_GENERATIONS
+    _MINIMUM_GENERATION = 0
+
+    def __init__(self, name: str, max_size_config: str=None, ttl: int=None, local: bool=False):
+        """Store member variables and register cache."""
+        self._name = name
+        self._max_size_config = max_size_config
+        self._ttl = ttl
+        self._local = local
+        self._backend = None
+        self._backend_lock = threading.Lock()
+        self._statistics_lock = threading.Lock()
+        self._statistics = {}
+        self.reset_statistics()
+
+        with Cache._LOCK:
+            Cache._CACHES.append(self)
+
+    @property
+    def name(self):
+        """Return name of cache."""
+        return self._name
+
+    @property
+    def max_size(self):
+        """Return maximum size of cache, in bytes."""
+        if self._max_size_config is None:
+            return self.DEFAULT_MAX_SIZE
+        return getattr(terrareg.config.Config(), self._max_size_config)
+
+    def _create_backend(self):
+        """Create backend, based on configured backend type."""
+        config = terrareg.config.Config()
+        backend_type = terrareg.config.CacheBackendType.MEMORY if self._local else config.CACHE_BACKEND
+        if backend_type is terrareg.config.CacheBackendType.FILESYSTEM:
+            return FilesystemCacheBackend(name=self._name, directory=config.CACHE_DIRECTORY)
+        elif backend_type is terrareg.config.CacheBackendType.REDIS:
+            return RedisCacheBackend(name=self._name, url=config.CACHE_REDIS_URL)
+        return MemoryCacheBackend(name=self._name)
+
+    def get_backend(self):
+        """Return backend, creating it on first use."""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = self._create_backend()
+        return self._backend
+
+    def _increment_statistic(self, name: str, count: int=1):
+        """Increment statistic."""
+        with self._statistics_lock:
+            self._statistics[name] += count
+
+    def get(self, key: str):
+        """Return cached value, or None if the value is not cached."""
+        value = self.get_backend().get(key)
+        self._increment_statistic('misses' if value is None else 'hits')
+        return value
+
+    def set(self, key: str, value, tags: list=None, ttl: int=None, size: int=None, generation: int=None):
+        """
+        Store value, returning whether the value was stored.
+
+        Values larger than the maximum size of the cache are not stored and
+        values are not stored if any of the tags have been invalidated since the generation was obtained.
+        If the size is not provided, the size of the pickled value is used.
+        """
+        max_size = self.max_size
+        # Do not cache any values, if the cache is disabled
+        if max_size <= 0:
+            return False
+
+        if size is None:
+            size = len(value) if isinstance(value, (bytes, str)) else len(pickle.dumps(value))
+        # Do not cache values larger than the entire cache
+        if size > max_size:
+            return False
+
+        if generation is not None and Cache._is_invalidated_since(generation, tags or []):
+            return False
+
+        evictions = self.get_backend().set(
+            key=key, value=value, size=size, max_size=max_size,
+            ttl=(ttl if ttl is not None else self._ttl),
+            tags=list(tags or [])
+        )
+        if evictions:
+            self._increment_statistic('evictions', evictions)
+        return True
+
+    def get_or_set(self, key: str, generate, tags: list=None, ttl: int=None):
+        """Return cached value, generating and storing the value if it is not cached."""
+        value = self.get(key)
+        if value is None:
+            generation = Cache.get_generation()
+            value = generate()
+            if value is not None:
+                self.set(key, value, tags=tags, ttl=ttl, generation=generation)
+        return value
+
+    def delete(self, key: str):
+        """Remove cached value."""
+        self.get_backend().delete(key)
+
+    def invalidate(self, tags: list):
+        """Remove values with any of the tags from this cache only."""
+        self.get_backend().invalidate_tags(list(tags))
+        self._increment_statistic('invalidations')
+
+    def clear(self):
+        """Remove all values from cache."""
+        with Cache._LOCK:
+            Cache._GENERATION += 1
+            Cache._MINIMUM_GENERATION = Cache._GENERATION
+        self.get_backend().clear()
+
+    def reset_statistics(self):
+        """Reset hit, miss, eviction and invalidation counts."""
+        with self._statistics_lock:
+            self._statistics = {
+                'hits': 0,
+                'misses': 0,
+                'evictions': 0,
+                'invalidations': 0,
+            }
+
+    def get_statistics(self):
+        """
+        Return dict of cache statistics.
+
+        The number of entries and size of entries are None, if they are not supported by the backend.
+        """
+        entries, size = self.get_backend().get_size()
+        with self._statistics_lock:
+            return dict(
+                self._statistics,
+                entries=entries,
+                size_bytes=size
+            )
+
+    @classmethod
+    def get_generation(cls):
+        """Return current generation, to be passed to set when storing a value."""
+        with cls._LOCK:
+            return cls._GENERATION
+
+    @classmethod
+    def _is_invalidated_since(cls, generation: int, tags: list):
+        """Return whether any of the tags have been invalidated, or caches cleared, since the generation."""
+        with cls._LOCK:
+            if generation < cls._MINIMUM_GENERATION:
+                return True
+            return any(
+                cls._TAG_GENERATIONS.get(tag, 0) > generation
+                for tag in tags
+            )
+
+    @classmethod
+    def _invalidate_tags(cls, tags: list):
+        """Remove all values with any of the tags from all caches."""
+        with cls._LOCK:
+            cls._GENERATION += 1
+            for tag in tags:
+                cls._TAG_GENERATIONS.pop(tag, None)
+                cls._TAG_GENERATIONS[tag] = cls._GENERATION
+            # Remove generations of least-recently invalidated tags,
+            # treating values generated before their invalidation as invalidated
+            while len(cls._TAG_GENERATIONS) > cls._MAX_TAG_GENERATIONS:
+                _, tag_generation = cls._TAG_GENERATIONS.popitem(last=False)
+                cls._MINIMUM_GENERATION = max(cls._MINIMUM_GENERATION, tag_generation)
+            caches = list(cls._CACHES)
+        for cache in caches:
+            cache.invalidate(tags)
+
+    @classmethod
+    def invalidate_tags(cls, tags: list):
+        """
+        Remove all values with any of the tags from all caches.
+
+        If called within a database transaction, the values are removed
+        again once the transaction has ended, to remove any values generated
+        from data before the transaction was committed.
+        """
+        tags = list(tags)
+        cls._invalidate_tags(tags)
+        Database.call_after_transaction(lambda: cls._invalidate_tags(tags))
+
+    @classmethod
+    def clear_all(cls):
+        """Remove all values from all caches."""
+        with cls._LOCK:
+            caches = list(cls._CACHES)
+        for cache in caches:
+            cache.clear()
+
+    @classmethod
+    def reset_backends(cls):
+        """Remove backends from all caches, so that they are re-created using the current configuration."""
+        with cls._LOCK:
+            caches = list(cls._CACHES)
+        for cache in caches:
+            with cache._backend_lock:
+                cache._backend = None
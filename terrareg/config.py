@@ -1,6 +1,8 @@
 
 from enum import Enum
+import json
 import os
+import threading
 
 from terrareg.errors import InvalidBooleanConfigurationError
 
@@ -12,9 +14,141 @@ class ModuleVersionReindexMode(Enum):
     PROHIBIT = "prohibit"
 
 
-class Config:
+class CacheBackendType(Enum):
+    """Cache storage backends"""
+    MEMORY = "memory"
+    FILESYSTEM = "filesystem"
+    REDIS = "redis"
 
-    @property
+
+class config_property:
+    """
+    Config property, whose value is calculated once for each config snapshot.
+
+    Values are stored in the snapshot, rather than the instance dictionary, so that
+    replacing the attribute on the Config class (e.g. when patching config in tests)
+    takes precedence over the stored value.
+    """
+
+    def __init__(self, fget):
+        """Store getter function."""
+        self.fget = fget
+        self.__name__ = fget.__name__
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, instance, owner=None):
+        """Return stored value, calculating the value if it has not yet been calculated."""
+        if instance is None:
+            return self
+
+        values = instance._values
+        try:
+            return values[self.__name__]
+        except KeyError:
+            pass
+
+        value = self.fget(instance)
+        values[self.__name__] = value
+        return value
+
+    def __set__(self, instance, value):
+        """Prevent modification of config."""
+        raise AttributeError(f'Config is immutable: {self.__name__}')
+
+
+class Config:
+    """
+    Immutable snapshot of configuration, read from environment variables.
+
+    A snapshot is created on first use, reading and validating all configuration,
+    and the same snapshot is returned by each subsequent call to Config().
+    Values derived from the configuration, such as parsed JSON, are also calculated once.
+
+    Use Config.reload() to create a new snapshot after environment variables have been modified.
+    """
+
+    _SNAPSHOT = None
+    _SNAPSHOT_LOCK = threading.Lock()
+
+    # Names of values derived from config, which are calculated when a snapshot is created
+    _DERIVED_VALUES = [
+        'additional_module_tabs',
+        'module_links',
+        'git_provider_config',
+        'ignore_analytics_token_auth_key_set',
+    ]
+
+    def __new__(cls):
+        """Return current snapshot, creating it if it does not exist."""
+        snapshot = cls._SNAPSHOT
+        if snapshot is None:
+            with cls._SNAPSHOT_LOCK:
+                snapshot = cls._SNAPSHOT
+                if snapshot is None:
+                    snapshot = cls._create_snapshot()
+                    cls._SNAPSHOT = snapshot
+        return snapshot
+
+    @classmethod
+    def _create_snapshot(cls):
+        """Create snapshot, calculating all config and derived values, so that invalid configuration raises an error."""
+        snapshot = object.__new__(cls)
+        object.__setattr__(snapshot, '_values', {})
+        object.__setattr__(snapshot, '_derived_values', {})
+        for name in dir(cls):
+            if isinstance(getattr(cls, name), config_property) or name in cls._DERIVED_VALUES:
+                getattr(snapshot, name)
+        return snapshot
+
+    @classmethod
+    def reload(cls):
+        """Create new snapshot from current environment variables, returning the new snapshot."""
+        snapshot = cls._create_snapshot()
+        with cls._SNAPSHOT_LOCK:
+            cls._SNAPSHOT = snapshot
+        return snapshot
+
+    def __setattr__(self, name, value):
+        """Prevent modification of config."""
+        raise AttributeError(f'Config is immutable: {name}')
+
+    def _get_derived_value(self, name, source_name, derive):
+        """
+        Return value derived from a config value.
+
+        The derived value is stored whilst the config value is unchanged,
+        which may change if the attribute on the Config class is replaced.
+        """
+        source = getattr(self, source_name)
+        derived_value = self._derived_values.get(name)
+        if derived_value is not None and derived_value[0] is source:
+            return derived_value[1]
+
+        value = derive(source)
+        self._derived_values[name] = (source, value)
+        return value
+
+    @property
+    def additional_module_tabs(self):
+        """Return parsed ADDITIONAL_MODULE_TABS config. The value is shared and must not be modified."""
+        return self._get_derived_value('additional_module_tabs', 'ADDITIONAL_MODULE_TABS', json.loads)
+
+    @property
+    def module_links(self):
+        """Return parsed MODULE_LINKS config. The value is shared and must not be modified."""
+        return self._get_derived_value('module_links', 'MODULE_LINKS', json.loads)
+
+    @property
+    def git_provider_config(self):
+        """Return parsed GIT_PROVIDER_CONFIG config. The value is shared and must not be modified."""
+        return self._get_derived_value('git_provider_config', 'GIT_PROVIDER_CONFIG', json.loads)
+
+    @property
+    def ignore_analytics_token_auth_key_set(self):
+        """Return set of IGNORE_ANALYTICS_TOKEN_AUTH_KEYS, for key lookups."""
+        return self._get_derived_value('ignore_analytics_token_auth_key_set', 'IGNORE_ANALYTICS_TOKEN_AUTH_KEYS', frozenset)
+
+    @config_property
     def INTERNAL_EXTRACTION_ANALYITCS_TOKEN(self):
         """
         Analaytics token used by Terraform initialised by the registry.
@@ -26,7 +160,7 @@ class Config:
         """
         return os.environ.get('INTERNAL_EXTRACTION_ANALYITCS_TOKEN', 'internal-terrareg-analytics-token')
 
-    @property
+    @config_property
     def IGNORE_ANALYTICS_TOKEN_AUTH_KEYS(self):
         """
         A list of a Terraform auth keys that can be used to authenticate to the registry
@@ -48,7 +182,7 @@ class Config:
             if auth_key
         ]
 
-    @property
+    @config_property
     def PUBLIC_URL(self):
         """
         The URL that is used for accessing Terrareg by end-users.
@@ -66,7 +200,7 @@ class Config:
         """
         return os.environ.get('PUBLIC_URL', None)
 
-    @property
+    @config_property
     def DOMAIN_NAME(self):
         """
         Domain name that the system is hosted on.
@@ -77,11 +211,11 @@ class Config:
         """
         return os.environ.get('DOMAIN_NAME', None)
 
-    @property
+    @config_property
     def DATA_DIRECTORY(self):
         return os.path.join(os.environ.get('DATA_DIRECTORY', os.getcwd()), 'data')
 
-    @property
+    @config_property
     def DATABASE_URL(self):
         """
         URL for database.
@@ -93,14 +227,237 @@ class Config:
         """
         return os.environ.get('DATABASE_URL', 'sqlite:///modules.db')
 
-    @property
+    @config_property
+    def DATABASE_READ_URL(self):
+        """
+        Comma-separated list of URLs for read-only replicas of the database.
+
+        When set, read queries performed during GET requests are sent to one of the replicas,
+        chosen at random for each request.
+
+        Writes, transactions and any queries performed after a write within the same request
+        use the primary database (`DATABASE_URL`).
+
+        Leave empty to use the primary database for all queries.
+        """
+        return [
+            attr for attr in os.environ.get('DATABASE_READ_URL', '').split(',') if attr
+        ]
+
+    @config_property
+    def ENABLE_BLOB_STORE(self):
+        """
+        Whether to store module details (README content, terraform-docs output, tfsec results, infracost output and Terraform graph data)
+        in a de-duplicated blob store.
+
+        Identical content, such as the README of unchanged module versions, submodules and examples, is stored once in the database and referenced by its SHA256 hash.
+
+        When disabled, content is stored against each module version, submodule and example.
+        Content that has already been stored in the blob store will continue to be used.
+
+        Content stored before the blob store was enabled is moved into the blob store by running `scripts/migrate_blob_store.py`.
+        """
+        return self.convert_boolean(os.environ.get('ENABLE_BLOB_STORE', 'True'))
+
+    @config_property
+    def ENABLE_BLOB_COMPRESSION(self):
+        """
+        Whether to compress large content stored in the database,
+        such as README content, terraform-docs output, tfsec results, Terraform graph data,
+        example files, additional module files and variable templates.
+
+        Content stored before compression was enabled, or whilst compression is disabled,
+        can still be read.
+        """
+        return self.convert_boolean(os.environ.get('ENABLE_BLOB_COMPRESSION', 'True'))
+
+    @config_property
+    def CACHE_BACKEND(self):
+        """
+        Storage backend used for caches of rendered HTML, Terraform registry API responses
+        and identity provider metadata.
+
+        This can be set to one of:
+         * 'memory' - Caches are held in the memory of each Terrareg process.
+         * 'filesystem' - Caches are stored in `CACHE_DIRECTORY`, which is shared by all Terrareg processes on the host.
+         * 'redis' - Caches are stored in the server configured in `CACHE_REDIS_URL`, which can be shared by all Terrareg hosts.
+
+        The cache of parsed terraform-docs output is always held in the memory of each Terrareg process.
+        """
+        return CacheBackendType(os.environ.get('CACHE_BACKEND', 'memory'))
+
+    @config_property
+    def CACHE_DIRECTORY(self):
+        """
+        Directory used to store caches, when `CACHE_BACKEND` is set to 'filesystem'.
+
+        Defaults to a 'cache' directory within the data directory.
+        """
+        return os.environ.get('CACHE_DIRECTORY', os.path.join(self.DATA_DIRECTORY, 'cache'))
+
+    @config_property
+    def CACHE_REDIS_URL(self):
+        """
+        URL of server, implementing the Redis protocol, used to store caches, when `CACHE_BACKEND` is set to 'redis'.
+
+        For example: `redis://localhost:6379/0`
+
+        Expiry and eviction of cached values is performed by the server, so the server should be configured
+        with a `maxmemory` limit and an eviction policy, such as `allkeys-lru`.
+        """
+        return os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    @config_property
+    def MODULE_SPECS_CACHE_MAX_SIZE(self):
+        """
+        Maximum size, in bytes, of the in-memory cache of parsed terraform-docs output for module versions, submodules and examples.
+
+        The cache is held in each Terrareg process, with the least recently used entries removed once the size is exceeded.
+
+        Set to 0 to disable the cache.
+        """
+        return int(os.environ.get('MODULE_SPECS_CACHE_MAX_SIZE', 67108864))
+
+    @config_property
+    def RENDERED_HTML_CACHE_MAX_SIZE(self):
+        """
+        Maximum size, in bytes, of the cache of HTML rendered from README files and markdown additional module files.
+
+        When using the 'memory' or 'filesystem' `CACHE_BACKEND`, the least recently used entries are removed once the size is exceeded.
+
+        Set to 0 to disable the cache.
+        """
+        return int(os.environ.get('RENDERED_HTML_CACHE_MAX_SIZE', 33554432))
+
+    @config_property
+    def API_RESPONSE_CACHE_MAX_SIZE(self):
+        """
+        Maximum size, in bytes, of the cache of Terraform registry API responses
+        for module versions, module provider details and module details.
+
+        When using the 'memory' or 'filesystem' `CACHE_BACKEND`, the least recently used entries are removed once the size is exceeded.
+        Entries are removed when the module provider, or its module versions, are modified.
+
+        Set to 0 to disable the cache. ETags are still returned for responses when the cache is disabled.
+        """
+        return int(os.environ.get('API_RESPONSE_CACHE_MAX_SIZE', 33554432))
+
+    @config_property
+    def API_RESPONSE_CACHE_CONTROL_MAX_AGE(self):
+        """
+        Number of seconds that clients may use cached Terraform registry API responses for,
+        before revalidating them using the ETag of the response.
+
+        Set to 0 to require that clients always revalidate responses.
+        """
+        return int(os.environ.get('API_RESPONSE_CACHE_CONTROL_MAX_AGE', 0))
+
+    @config_property
+    def API_RESPONSE_CACHE_DOWNLOADS_TTL(self):
+        """
+        Number of seconds that cached Terraform registry API responses containing download counts
+        (module provider details, module version details and module details) are stored for.
+
+        Recording downloads does not remove cached responses, so download counts in these responses
+        may be out of date by up to this number of seconds.
+
+        Set to 0 to only regenerate these responses when the module provider, or its module versions, are modified.
+        """
+        return int(os.environ.get('API_RESPONSE_CACHE_DOWNLOADS_TTL', 300))
+
+    @config_property
+    def GLOBAL_STATISTICS_REFRESH_INTERVAL(self):
+        """
+        Number of seconds after which aggregated statistics, such as the most downloaded
+        module provider of the week shown on the homepage, are re-calculated.
+
+        Counters, such as the total number of modules and downloads, are updated as they change.
+        """
+        return int(os.environ.get('GLOBAL_STATISTICS_REFRESH_INTERVAL', 3600))
+
+    @config_property
+    def PROMETHEUS_METRICS_CACHE_TTL(self):
+        """
+        Number of seconds that the output of the Prometheus `/metrics` endpoint is cached for,
+        by each Terrareg process.
+
+        This should be lower than the scrape interval of Prometheus.
+        Set to 0 to generate the metrics on each request.
+        """
+        return int(os.environ.get('PROMETHEUS_METRICS_CACHE_TTL', 10))
+
+    @config_property
+    def SERVER_METRICS_DIRECTORY(self):
+        """
+        Directory used to share server metrics, such as request latency and database query durations,
+        between Terrareg processes on the same host.
+
+        When running multiple worker processes, this should be set to a directory that is writable by all processes.
+        Each process periodically stores its metrics in the directory and the Prometheus `/metrics` endpoint
+        returns the combined metrics of all processes.
+        Metrics of processes that have exited are removed from the directory when the `/metrics` endpoint is requested,
+        so the directory must not be shared between hosts or containers with separate process namespaces.
+
+        If not set, the `/metrics` endpoint only returns server metrics of the process handling the request.
+        """
+        return os.environ.get('SERVER_METRICS_DIRECTORY', '')
+
+    @config_property
+    def DATABASE_POOL_SIZE(self):
+        """
+        Number of database connections to keep open in the connection pool.
+
+        This is not used for SQLite databases.
+        """
+        return int(os.environ.get('DATABASE_POOL_SIZE', 5))
+
+    @config_property
+    def DATABASE_POOL_MAX_OVERFLOW(self):
+        """
+        Maximum number of database connections that can be opened in addition to `DATABASE_POOL_SIZE`,
+        when all connections in the pool are in use.
+
+        This is not used for SQLite databases.
+        """
+        return int(os.environ.get('DATABASE_POOL_MAX_OVERFLOW', 10))
+
+    @config_property
+    def DATABASE_POOL_TIMEOUT(self):
+        """
+        Number of seconds to wait for a connection to become available in the connection pool,
+        before giving up.
+
+        This is not used for SQLite databases.
+        """
+        return int(os.environ.get('DATABASE_POOL_TIMEOUT', 30))
+
+    @config_property
+    def DATABASE_POOL_RECYCLE(self):
+        """
+        Number of seconds after which database connections are re-created.
+
+        Set to `-1` to disable connection recycling.
+        """
+        return int(os.environ.get('DATABASE_POOL_RECYCLE', 300))
+
+    @config_property
+    def DATABASE_POOL_PRE_PING(self):
+        """
+        Whether to check database connections are alive when they are obtained from the connection pool.
+
+        Disabling this avoids a round trip to the database for each connection checkout,
+        but may result in errors if the database closes idle connections.
+        """
+        return self.convert_boolean(os.environ.get('DATABASE_POOL_PRE_PING', 'True'))
+
+    @config_property
     def LISTEN_PORT(self):
         """
         Port for server to listen on.
         """
         return int(os.environ.get('LISTEN_PORT', 5000))
 
-    @property
+    @config_property
     def SSL_CERT_PRIVATE_KEY(self):
         """
         Path to SSL private certificate key.
@@ -113,7 +470,7 @@ class Config:
         """
         return os.environ.get('SSL_CERT_PRIVATE_KEY', None)
 
-    @property
+    @config_property
     def SSL_CERT_PUBLIC_KEY(self):
         """
         Path to SSL public key.
@@ -126,7 +483,7 @@ class Config:
         """
         return os.environ.get('SSL_CERT_PUBLIC_KEY', None)
 
-    @property
+    @config_property
     def ALLOW_UNIDENTIFIED_DOWNLOADS(self):
         """
         Whether modules can be downloaded with Terraform
@@ -135,7 +492,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('ALLOW_UNIDENTIFIED_DOWNLOADS', 'False'))
 
-    @property
+    @config_property
     def DISABLE_ANALYTICS(self):
         """
         Disable module download anaytics.
@@ -146,27 +503,102 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('DISABLE_ANALYTICS', 'False'))
 
-    @property
+    @config_property
+    def ANALYTICS_INGESTION_ASYNC(self):
+        """
+        Whether module downloads are recorded asynchronously.
+
+        When enabled, downloads are added to an in-process queue and inserted into the database
+        in batches by a background thread, rather than being inserted whilst handling the download request.
+        Download counts in the UI and API are updated once the queued downloads have been inserted.
+
+        The queue is configured using the `ANALYTICS_INGESTION_*` configs.
+        """
+        return self.convert_boolean(os.environ.get('ANALYTICS_INGESTION_ASYNC', 'False'))
+
+    @config_property
+    def ANALYTICS_INGESTION_QUEUE_SIZE(self):
+        """
+        Maximum number of downloads held in the queue of each process, when `ANALYTICS_INGESTION_ASYNC` is enabled.
+
+        Once the queue is full, download requests wait up to `ANALYTICS_INGESTION_QUEUE_TIMEOUT`
+        milliseconds for space in the queue, after which the download is not recorded.
+        """
+        return int(os.environ.get('ANALYTICS_INGESTION_QUEUE_SIZE', 10000))
+
+    @config_property
+    def ANALYTICS_INGESTION_QUEUE_TIMEOUT(self):
+        """
+        Number of milliseconds that download requests wait for space in a full analytics ingestion queue,
+        before the download is dropped without being recorded.
+        """
+        return int(os.environ.get('ANALYTICS_INGESTION_QUEUE_TIMEOUT', 100))
+
+    @config_property
+    def ANALYTICS_INGESTION_BATCH_SIZE(self):
+        """
+        Maximum number of downloads inserted into the database in a single statement, when `ANALYTICS_INGESTION_ASYNC` is enabled.
+
+        Queued downloads are inserted once this many downloads are queued, or after `ANALYTICS_INGESTION_FLUSH_INTERVAL`.
+        """
+        return int(os.environ.get('ANALYTICS_INGESTION_BATCH_SIZE', 500))
+
+    @config_property
+    def ANALYTICS_INGESTION_FLUSH_INTERVAL(self):
+        """
+        Maximum number of milliseconds that downloads are queued for, before being inserted into the database,
+        when `ANALYTICS_INGESTION_ASYNC` is enabled.
+        """
+        return int(os.environ.get('ANALYTICS_INGESTION_FLUSH_INTERVAL', 1000))
+
+    @config_property
+    def ANALYTICS_INGESTION_SPOOL_DIRECTORY(self):
+        """
+        Directory used to store queued downloads, when `ANALYTICS_INGESTION_ASYNC` is enabled,
+        so that downloads are not lost if a process exits before they are inserted into the database.
+
+        Downloads that were queued by processes that are no longer running are inserted by the next process to queue a download.
+        Downloads that could not be inserted are retried by the process that queued them and remain in the spool directory until they are inserted.
+
+        If not set, queued downloads are only held in memory.
+        """
+        return os.environ.get('ANALYTICS_INGESTION_SPOOL_DIRECTORY', '')
+
+    @config_property
+    def ANALYTICS_RETENTION_DAYS(self):
+        """
+        Number of days that raw module download analytics are retained for.
+
+        Older downloads are archived by `scripts/archive_analytics.py`, which exports them to compressed NDJSON files
+        in the `analytics_archive` directory of `DATA_DIRECTORY` and removes them from the database.
+        Download counts are retained in daily download statistics and the latest download
+        of each module version by each analytics token is retained.
+
+        When set to `0`, raw analytics are retained indefinitely.
+        """
+        return int(os.environ.get('ANALYTICS_RETENTION_DAYS', 0))
+
+    @config_property
     def DEBUG(self):
         """Whether flask and sqlalchemy is setup in debug mode."""
         return self.convert_boolean(os.environ.get('DEBUG', 'False'))
 
-    @property
+    @config_property
     def THREADED(self):
         """Whether flask is configured to enable threading"""
         return self.convert_boolean(os.environ.get('THREADED', 'True'))
 
-    @property
+    @config_property
     def ANALYTICS_TOKEN_PHRASE(self):
         """Name of analytics token to provide in responses (e.g. `application name`, `team name` etc.)"""
         return os.environ.get('ANALYTICS_TOKEN_PHRASE', 'analytics token')
 
-    @property
+    @config_property
     def ANALYTICS_TOKEN_DESCRIPTION(self):
         """Describe to be provided to user about analytics token (e.g. `The name of your application`)"""
         return os.environ.get('ANALYTICS_TOKEN_DESCRIPTION', '')
 
-    @property
+    @config_property
     def EXAMPLE_ANALYTICS_TOKEN(self):
         """
         Example analytics token to provide in responses (e.g. my-tf-application, my-slack-channel etc.).
@@ -178,7 +610,7 @@ class Config:
         """
         return os.environ.get('EXAMPLE_ANALYTICS_TOKEN', 'my-tf-application')
 
-    @property
+    @config_property
     def ALLOWED_PROVIDERS(self):
         """
         Comma-seperated list of allowed providers.
@@ -189,24 +621,24 @@ class Config:
             attr for attr in os.environ.get('ALLOWED_PROVIDERS', '').split(',') if attr
         ]
 
-    @property
+    @config_property
     def TRUSTED_NAMESPACES(self):
         """Comma-separated list of trusted namespaces."""
         return [
             attr for attr in os.environ.get('TRUSTED_NAMESPACES', '').split(',') if attr
         ]
 
-    @property
+    @config_property
     def TRUSTED_NAMESPACE_LABEL(self):
         """Custom name for 'trusted namespace' in UI."""
         return os.environ.get('TRUSTED_NAMESPACE_LABEL', 'Trusted')
 
-    @property
+    @config_property
     def CONTRIBUTED_NAMESPACE_LABEL(self):
         """Custom name for 'contributed namespace' in UI."""
         return os.environ.get('CONTRIBUTED_NAMESPACE_LABEL', 'Contributed')
 
-    @property
+    @config_property
     def VERIFIED_MODULE_NAMESPACES(self):
         """
         List of namespaces, who's modules will be automatically set to verified.
@@ -215,12 +647,12 @@ class Config:
             attr for attr in os.environ.get('VERIFIED_MODULE_NAMESPACES', '').split(',') if attr
         ]
 
-    @property
+    @config_property
     def VERIFIED_MODULE_LABEL(self):
         """Custom name for 'verified module' in UI."""
         return os.environ.get('VERIFIED_MODULE_LABEL', 'Verified')
 
-    @property
+    @config_property
     def DISABLE_TERRAREG_EXCLUSIVE_LABELS(self):
         """
         Whether to disable 'terrareg exclusive' labels from feature tabs in UI.
@@ -229,7 +661,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('DISABLE_TERRAREG_EXCLUSIVE_LABELS', 'False'))
 
-    @property
+    @config_property
     def DELETE_EXTERNALLY_HOSTED_ARTIFACTS(self):
         """
         Whether uploaded modules, that provide an external URL for the artifact,
@@ -238,7 +670,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('DELETE_EXTERNALLY_HOSTED_ARTIFACTS', 'False'))
 
-    @property
+    @config_property
     def ALLOW_MODULE_HOSTING(self):
         """
         Whether uploaded modules can be downloaded directly.
@@ -246,7 +678,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('ALLOW_MODULE_HOSTING', 'True'))
 
-    @property
+    @config_property
     def REQUIRED_MODULE_METADATA_ATTRIBUTES(self):
         """
         Comma-seperated list of metadata attributes that each uploaded module _must_ contain, otherwise the upload is aborted.
@@ -255,17 +687,17 @@ class Config:
             attr for attr in os.environ.get('REQUIRED_MODULE_METADATA_ATTRIBUTES', '').split(',') if attr
         ]
 
-    @property
+    @config_property
     def APPLICATION_NAME(self):
         """Name of application to be displayed in web interface."""
         return os.environ.get('APPLICATION_NAME', 'Terrareg')
 
-    @property
+    @config_property
     def LOGO_URL(self):
         """URL of logo to be used in web interface."""
         return os.environ.get('LOGO_URL', '/static/images/logo.png')
 
-    @property
+    @config_property
     def ANALYTICS_AUTH_KEYS(self):
         """
         List of comma-separated values for Terraform auth tokens for deployment environments.
@@ -284,7 +716,7 @@ class Config:
             token for token in os.environ.get('ANALYTICS_AUTH_KEYS', '').split(',') if token
         ]
 
-    @property
+    @config_property
     def UPLOAD_API_KEYS(self):
         """
         List of comma-separated list of API keys to upload/import new module versions.
@@ -299,7 +731,7 @@ class Config:
             if token
         ]
 
-    @property
+    @config_property
     def PUBLISH_API_KEYS(self):
         """
         List of comma-separated list of API keys to publish module versions.
@@ -312,14 +744,14 @@ class Config:
             if token
         ]
 
-    @property
+    @config_property
     def ADMIN_AUTHENTICATION_TOKEN(self):
         """
         Password/API key to for authentication as the built-in admin user.
         """
         return os.environ.get('ADMIN_AUTHENTICATION_TOKEN', None)
 
-    @property
+    @config_property
     def SECRET_KEY(self):
         """
         Flask secret key used for encrypting sessions.
@@ -328,14 +760,14 @@ class Config:
         """
         return os.environ.get('SECRET_KEY', None)
 
-    @property
+    @config_property
     def ADMIN_SESSION_EXPIRY_MINS(self):
         """
         Session timeout for admin cookie sessions
         """
         return int(os.environ.get('ADMIN_SESSION_EXPIRY_MINS', 60))
 
-    @property
+    @config_property
     def AUTO_PUBLISH_MODULE_VERSIONS(self):
         """
         Whether new module versions (either via upload, import or hook) are automatically
@@ -348,7 +780,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('AUTO_PUBLISH_MODULE_VERSIONS', 'True'))
 
-    @property
+    @config_property
     def MODULE_VERSION_REINDEX_MODE(self):
         """
         This configuration defines how re-indexes a module version, that already exists, behaves.
@@ -360,7 +792,7 @@ class Config:
         """
         return ModuleVersionReindexMode(os.environ.get('MODULE_VERSION_REINDEX_MODE', 'legacy'))
 
-    @property
+    @config_property
     def AUTO_CREATE_MODULE_PROVIDER(self):
         """
         Whether to automatically create module providers when
@@ -370,7 +802,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('AUTO_CREATE_MODULE_PROVIDER', 'True'))
 
-    @property
+    @config_property
     def AUTO_CREATE_NAMESPACE(self):
         """
         Whether to automatically create namespaces when
@@ -380,7 +812,7 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('AUTO_CREATE_NAMESPACE', 'True'))
 
-    @property
+    @config_property
     def MODULES_DIRECTORY(self):
         """
         Directory with a module's source that contains sub-modules.
@@ -393,7 +825,7 @@ class Config:
         """
         return os.environ.get('MODULES_DIRECTORY', 'modules')
 
-    @property
+    @config_property
     def EXAMPLES_DIRECTORY(self):
         """
         Directory with a module's source that contains examples.
@@ -404,7 +836,7 @@ class Config:
         """
         return os.environ.get('EXAMPLES_DIRECTORY', 'examples')
 
-    @property
+    @config_property
     def GIT_CLONE_TIMEOUT(self):
         """
         Timeout for git clone commands in seconds.
@@ -416,7 +848,7 @@ class Config:
         val = os.environ.get('GIT_CLONE_TIMEOUT', '300')
         return None if val is None else int(val)
 
-    @property
+    @config_property
     def GIT_PROVIDER_CONFIG(self):
         """
         Git provider config.
@@ -450,21 +882,21 @@ class Config:
         """
         return os.environ.get('GIT_PROVIDER_CONFIG', '[]')
 
-    @property
+    @config_property
     def ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER(self):
         """
         Whether module providers can specify their own git repository source.
         """
         return self.convert_boolean(os.environ.get('ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER', 'True'))
 
-    @property
+    @config_property
     def ALLOW_CUSTOM_GIT_URL_MODULE_VERSION(self):
         """
         Whether module versions can specify git repository in terrareg config.
         """
         return self.convert_boolean(os.environ.get('ALLOW_CUSTOM_GIT_URL_MODULE_VERSION', 'True'))
 
-    @property
+    @config_property
     def TERRAFORM_EXAMPLE_VERSION_TEMPLATE(self):
         """
         Template of version number string to be used in Terraform examples in the UI.
@@ -484,14 +916,14 @@ class Config:
         """
         return os.environ.get('TERRAFORM_EXAMPLE_VERSION_TEMPLATE', '{major}.{minor}.{patch}')
 
-    @property
+    @config_property
     def AUTOGENERATE_MODULE_PROVIDER_DESCRIPTION(self):
         """
         Whether to automatically generate module provider descriptions, if they are not provided in terrareg metadata file of the module.
         """
         return self.convert_boolean(os.environ.get('AUTOGENERATE_MODULE_PROVIDER_DESCRIPTION', 'True'))
 
-    @property
+    @config_property
     def AUTOGENERATE_USAGE_BUILDER_VARIABLES(self):
         """
         Whether to automatically generate usage builder variables from the required variables and their descriptions.
@@ -500,14 +932,14 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('AUTOGENERATE_USAGE_BUILDER_VARIABLES', 'True'))
 
-    @property
+    @config_property
     def ENABLE_SECURITY_SCANNING(self):
         """
         Whether to perform security scans of uploaded modules and display them against the module, submodules and examples.
         """
         return self.convert_boolean(os.environ.get('ENABLE_SECURITY_SCANNING', 'True'))
 
-    @property
+    @config_property
     def INFRACOST_API_KEY(self):
         """
         API key for Infracost.
@@ -521,7 +953,7 @@ class Config:
         """
         return os.environ.get('INFRACOST_API_KEY', None)
 
-    @property
+    @config_property
     def INFRACOST_PRICING_API_ENDPOINT(self):
         """
         Self-hosted infracost pricing API endpoint.
@@ -530,14 +962,14 @@ class Config:
         """
         return os.environ.get('INFRACOST_PRICING_API_ENDPOINT', None)
 
-    @property
+    @config_property
     def INFRACOST_TLS_INSECURE_SKIP_VERIFY(self):
         """
         Whether to skip TLS verification for self-hosted pricing endpoints
         """
         return self.convert_boolean(os.environ.get('INFRACOST_TLS_INSECURE_SKIP_VERIFY', 'False'))
 
-    @property
+    @config_property
     def ADDITIONAL_MODULE_TABS(self):
         """
         Set additional markdown files from a module to be displayed in the UI.
@@ -559,7 +991,7 @@ class Config:
         """
         return os.environ.get('ADDITIONAL_MODULE_TABS', '[["Release Notes", ["RELEASE_NOTES.md", "CHANGELOG.md"]], ["License", ["LICENSE"]]]')
 
-    @property
+    @config_property
     def MODULE_LINKS(self):
         """
         List of custom links to display on module provides.
@@ -584,7 +1016,7 @@ class Config:
         """
         return os.environ.get('MODULE_LINKS', '[]')
 
-    @property
+    @config_property
     def ENABLE_ACCESS_CONTROLS(self):
         """
         Enables role based access controls for SSO users.
@@ -596,28 +1028,28 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('ENABLE_ACCESS_CONTROLS', 'False'))
 
-    @property
+    @config_property
     def OPENID_CONNECT_LOGIN_TEXT(self):
         """
         Text for sign in button for OpenID Connect authentication
         """
         return os.environ.get('OPENID_CONNECT_LOGIN_TEXT', 'Login using OpenID Connect')
 
-    @property
+    @config_property
     def OPENID_CONNECT_CLIENT_ID(self):
         """
         Client ID for OpenID Conect authentication
         """
         return os.environ.get('OPENID_CONNECT_CLIENT_ID', None)
 
-    @property
+    @config_property
     def OPENID_CONNECT_CLIENT_SECRET(self):
         """
         Client secret for OpenID Conect authentication
         """
         return os.environ.get('OPENID_CONNECT_CLIENT_SECRET', None)
 
-    @property
+    @config_property
     def OPENID_CONNECT_ISSUER(self):
         """
         Base Issuer URL for OpenID Conect authentication.
@@ -626,7 +1058,7 @@ class Config:
         """
         return os.environ.get('OPENID_CONNECT_ISSUER', None)
 
-    @property
+    @config_property
     def OPENID_CONNECT_SCOPES(self):
         """
         Comma-seperated list of scopes to be included in OpenID authentication request.
@@ -642,7 +1074,7 @@ class Config:
             if scope
         ]
 
-    @property
+    @config_property
     def OPENID_CONNECT_DEBUG(self):
         """
         Enable debug of OpenID connect via stdout.
@@ -651,21 +1083,21 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('OPENID_CONNECT_DEBUG', 'False'))
 
-    @property
+    @config_property
     def SAML2_LOGIN_TEXT(self):
         """
         Text for sign in button for SAML2 authentication
         """
         return os.environ.get('SAML2_LOGIN_TEXT', 'Login using SAML')
 
-    @property
+    @config_property
     def SAML2_IDP_METADATA_URL(self):
         """
         SAML2 provider metadata url
         """
         return os.environ.get('SAML2_IDP_METADATA_URL', None)
 
-    @property
+    @config_property
     def SAML2_ISSUER_ENTITY_ID(self):
         """
         SAML2 provider entity ID.
@@ -674,14 +1106,14 @@ class Config:
         """
         return os.environ.get('SAML2_ISSUER_ENTITY_ID', None)
 
-    @property
+    @config_property
     def SAML2_ENTITY_ID(self):
         """
         SAML2 provider entity ID of the application.
         """
         return os.environ.get('SAML2_ENTITY_ID', None)
 
-    @property
+    @config_property
     def SAML2_PUBLIC_KEY(self):
         """
         SAML2 public key for this application.
@@ -690,7 +1122,7 @@ class Config:
         """
         return os.environ.get('SAML2_PUBLIC_KEY', None)
 
-    @property
+    @config_property
     def SAML2_PRIVATE_KEY(self):
         """
         SAML2 private key for this application.
@@ -706,14 +1138,14 @@ class Config:
         """
         return os.environ.get('SAML2_PRIVATE_KEY', None)
 
-    @property
+    @config_property
     def SAML2_GROUP_ATTRIBUTE(self):
         """
         SAML2 user data group attribute.
         """
         return os.environ.get('SAML2_GROUP_ATTRIBUTE', 'groups')
 
-    @property
+    @config_property
     def SAML2_DEBUG(self):
         """
         Enable debug of Saml2 via stdout.
@@ -722,21 +1154,21 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('SAML2_DEBUG', 'False'))
 
-    @property
+    @config_property
     def DEFAULT_TERRAFORM_VERSION(self):
         """
         Default version of Terraform that will be used to extract module, if terraform required_version has not been specified.
         """
         return os.environ.get("DEFAULT_TERRAFORM_VERSION", "1.3.6")
 
-    @property
+    @config_property
     def TERRAFORM_ARCHIVE_MIRROR(self):
         """
         Mirror for obtaining version list and downloading Terraform
         """
         return os.environ.get("TERRAFORM_ARCHIVE_MIRROR", "https://releases.hashicorp.com/terraform")
 
-    @property
+    @config_property
     def MANAGE_TERRAFORM_RC_FILE(self):
         """
         Whether terrareg with manage (overwrite) the terraform.rc file in the user's home directory.
@@ -750,12 +1182,12 @@ class Config:
         """
         return self.convert_boolean(os.environ.get("MANAGE_TERRAFORM_RC_FILE", "False"))
 
-    @property
+    @config_property
     def SENTRY_DSN(self):
         """DSN Integration URL for sentry"""
         return os.environ.get("SENTRY_DSN", "")
 
-    @property
+    @config_property
     def SENTRY_TRACES_SAMPLE_RATE(self):
         """
         Sample rate for capturing traces in sentry.
@@ -764,7 +1196,7 @@ class Config:
         """
         return float(os.environ.get("SENTRY_TRACES_SAMPLE_RATE", "1.0"))
 
-    @property
+    @config_property
     def EXAMPLE_FILE_EXTENSIONS(self):
         """
         Comma-separated list of file extensions to be extracted/shown in example file lists.
@@ -1,5 +1,10 @@
 """Provide database class."""
 
+import random
+import threading
+import time
+import zlib
+
 import sqlalchemy
 import sqlalchemy.dialects.mysql
 
@@ -17,25 +22,68 @@ class Database():
 
     _META = None
     _ENGINE = None
+    _READ_ENGINES = None
     _INSTANCE = None
+    _POOL_STATISTICS = None
+    _POOL_STATISTICS_LOCK = threading.Lock()
 
     blob_encoding_format = 'utf-8'
     MEDIUM_BLOB_SIZE = ((2 ** 24) - 1)
 
+    # Header prepended to compressed blob values.
+    # The null byte does not occur in encoded text,
+    # so blobs stored before compression was introduced are not mistaken
+    # for compressed values.
+    COMPRESSED_BLOB_HEADER = b'\x00TRZ1'
+    # Minimum size of blob values to attempt to compress
+    BLOB_COMPRESSION_MIN_SIZE = 512
+
+    # Large columns for each table, which are not obtained when
+    # selecting rows for model objects and are, instead, obtained
+    # when first accessed.
+    DEFERRED_COLUMNS = {
+        'module_version': ['variable_template'],
+        'module_details': ['readme_content', 'terraform_docs', 'tfsec', 'infracost', 'terraform_graph', 'terraform_graph_json'],
+    }
+
     @staticmethod
     def encode_blob(value):
         """Encode string as a blog value"""
         # Convert any untruthful values to empty string
         if not value:
             value = ''
-        return value.encode(Database.blob_encoding_format)
+        return Database.compress_blob(value.encode(Database.blob_encoding_format))
 
     @staticmethod
     def decode_blob(value):
         """Decode blob as a string."""
         if value is None:
             return None
-        return value.decode(Database.blob_encoding_format)
+        return Database.decompress_blob(value).decode(Database.blob_encoding_format)
+
+    @staticmethod
+    def compress_blob(value: bytes):
+        """
+        Compress encoded blob value, if compression is enabled and the value is large enough
+        to benefit from compression.
+        """
+        if (not terrareg.config.Config().ENABLE_BLOB_COMPRESSION or
+                len(value) < Database.BLOB_COMPRESSION_MIN_SIZE or
+                value.startswith(Database.COMPRESSED_BLOB_HEADER)):
+            return value
+
+        compressed_value = Database.COMPRESSED_BLOB_HEADER + zlib.compress(value)
+        # Only use compressed value if it is smaller than the original
+        if len(compressed_value) >= len(value):
+            return value
+        return compressed_value
+
+    @staticmethod
+    def decompress_blob(value: bytes):
+        """Decompress blob value, if it has been compressed."""
+        if value is not None and value.startswith(Database.COMPRESSED_BLOB_HEADER):
+            return zlib.decompress(value[len(Database.COMPRESSED_BLOB_HEADER):])
+        return value
 
     @staticmethod
     def medium_blob():
@@ -53,12 +101,39 @@ class Database():
         self._namespace = None
         self._module_provider = None
         self._module_details = None
+        self._blob_store = None
         self._module_version = None
+        self._module_provider_summary = None
         self._sub_module = None
         self._analytics = None
+        self._analytics_daily = None
+        self._analytics_token_latest = None
         self._example_file = None
         self._module_version_file = None
-        self.transaction_connection = None
+        self._global_statistic = None
+        # Transaction outside of request context, held for each thread,
+        # so that transactions of background threads are not used by other threads
+        self._thread_transaction = threading.local()
+
+    @property
+    def transaction_connection(self):
+        """Return connection of current transaction outside of a request context, for the current thread."""
+        return getattr(self._thread_transaction, 'connection', None)
+
+    @transaction_connection.setter
+    def transaction_connection(self, value):
+        """Set connection of current transaction outside of a request context, for the current thread."""
+        self._thread_transaction.connection = value
+
+    @property
+    def transaction_object(self):
+        """Return current transaction outside of a request context, for the current thread."""
+        return getattr(self._thread_transaction, 'transaction', None)
+
+    @transaction_object.setter
+    def transaction_object(self, value):
+        """Set current transaction outside of a request context, for the current thread."""
+        self._thread_transaction.transaction = value
 
     @property
     def session(self):
@@ -109,6 +184,13 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._module_details
 
+    @property
+    def blob_store(self):
+        """Return blob_store table."""
+        if self._blob_store is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._blob_store
+
     @property
     def module_version(self):
         """Return module_version table."""
@@ -116,6 +198,13 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._module_version
 
+    @property
+    def module_provider_summary(self):
+        """Return module_provider_summary table."""
+        if self._module_provider_summary is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._module_provider_summary
+
     @property
     def sub_module(self):
         """Return submodule table."""
@@ -130,6 +219,20 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._analytics
 
+    @property
+    def analytics_daily(self):
+        """Return analytics_daily table."""
+        if self._analytics_daily is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._analytics_daily
+
+    @property
+    def analytics_token_latest(self):
+        """Return analytics_token_latest table."""
+        if self._analytics_token_latest is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._analytics_token_latest
+
     @property
     def example_file(self):
         """Return analytics table."""
@@ -144,6 +247,13 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._module_version_file
 
+    @property
+    def global_statistic(self):
+        """Return global_statistic table."""
+        if self._global_statistic is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._global_statistic
+
     @property
     def audit_history(self):
         """Audit history table."""
@@ -157,6 +267,8 @@ class Database():
         cls._INSTANCE = None
         cls._META = None
         cls._ENGINE = None
+        cls._READ_ENGINES = None
+        cls._POOL_STATISTICS = None
 
     @classmethod
     def get(cls):
@@ -176,14 +288,84 @@ class Database():
     def get_engine(cls):
         """Get singleton instance of engine."""
         if cls._ENGINE is None:
-            cls._ENGINE = sqlalchemy.create_engine(
-                terrareg.config.Config().DATABASE_URL,
-                echo=terrareg.config.Config().DEBUG,
-                pool_pre_ping=True,
-                pool_recycle=300
-            )
+            cls._ENGINE = cls._create_engine(terrareg.config.Config().DATABASE_URL)
         return cls._ENGINE
 
+    @classmethod
+    def get_read_engines(cls):
+        """Return list of engines for read-only replicas."""
+        if cls._READ_ENGINES is None:
+            cls._READ_ENGINES = [
+                cls._create_engine(url)
+                for url in terrareg.config.Config().DATABASE_READ_URL
+            ]
+        return cls._READ_ENGINES
+
+    @classmethod
+    def _create_engine(cls, url):
+        """Create engine for database URL, using connection pool configuration."""
+        config = terrareg.config.Config()
+        engine_kwargs = {
+            'echo': config.DEBUG,
+            'pool_pre_ping': config.DATABASE_POOL_PRE_PING,
+            'pool_recycle': config.DATABASE_POOL_RECYCLE,
+        }
+        # SQLite does not use a queue pool,
+        # so pool sizing arguments are not supported
+        if sqlalchemy.engine.make_url(url).get_backend_name() != 'sqlite':
+            engine_kwargs['pool_size'] = config.DATABASE_POOL_SIZE
+            engine_kwargs['max_overflow'] = config.DATABASE_POOL_MAX_OVERFLOW
+            engine_kwargs['pool_timeout'] = config.DATABASE_POOL_TIMEOUT
+
+        engine = sqlalchemy.create_engine(
+            url,
+            **engine_kwargs
+        )
+        cls._register_pool_events(engine)
+        return engine
+
+    @classmethod
+    def _register_pool_events(cls, engine):
+        """Register connection pool event handlers to record pool statistics."""
+        if cls._POOL_STATISTICS is None:
+            cls._POOL_STATISTICS = {
+                'connections_created': 0,
+                'checkouts': 0,
+                'checkout_wait_seconds': 0.0,
+            }
+
+        @sqlalchemy.event.listens_for(engine.pool, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            cls._increment_pool_statistic('connections_created', 1)
+
+        @sqlalchemy.event.listens_for(engine.pool, 'checkout')
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            cls._increment_pool_statistic('checkouts', 1)
+
+    @classmethod
+    def _increment_pool_statistic(cls, name, value):
+        """Increment connection pool statistic."""
+        with cls._POOL_STATISTICS_LOCK:
+            if cls._POOL_STATISTICS is not None:
+                cls._POOL_STATISTICS[name] += value
+
+    @classmethod
+    def get_pool_statistics(cls):
+        """
+        Return dict of connection pool statistics.
+
+        Pool size, checked out and overflow counts are only available
+        for connection pools that support them.
+        """
+        engine = cls.get_engine()
+        with cls._POOL_STATISTICS_LOCK:
+            statistics = dict(cls._POOL_STATISTICS)
+
+        for attribute in ['size', 'checkedout', 'overflow']:
+            if hasattr(engine.pool, attribute):
+                statistics[attribute] = getattr(engine.pool, attribute)()
+        return statistics
+
     def initialise(self):
         """Initialise database schema."""
         meta = self.get_meta()
@@ -196,7 +378,8 @@ class Database():
         self._session = sqlalchemy.Table(
             'session', meta,
             sqlalchemy.Column('id', sqlalchemy.String(128), primary_key=True),
-            sqlalchemy.Column('expiry', sqlalchemy.DateTime, nullable=False)
+            sqlalchemy.Column('expiry', sqlalchemy.DateTime, nullable=False),
+            sqlalchemy.Index('ix_session_expiry', 'expiry')
         )
 
         self._user_group = sqlalchemy.Table(
@@ -244,7 +427,8 @@ class Database():
             'namespace', meta,
             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
             sqlalchemy.Column('namespace', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
-            sqlalchemy.Column('display_name', sqlalchemy.String(GENERAL_COLUMN_SIZE))
+            sqlalchemy.Column('display_name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Index('ix_namespace_namespace', 'namespace')
         )
 
         self._module_provider = sqlalchemy.Table(
@@ -286,7 +470,8 @@ class Database():
                     use_alter=True
                 ),
                 nullable=True
-            )
+            ),
+            sqlalchemy.Index('ix_module_provider_namespace_id_module_provider', 'namespace_id', 'module', 'provider')
         )
 
         self._module_details = sqlalchemy.Table(
@@ -296,7 +481,24 @@ class Database():
             sqlalchemy.Column('terraform_docs', Database.medium_blob()),
             sqlalchemy.Column('tfsec', Database.medium_blob()),
             sqlalchemy.Column('infracost', Database.medium_blob()),
-            sqlalchemy.Column('terraform_graph', Database.medium_blob())
+            sqlalchemy.Column('terraform_graph', Database.medium_blob()),
+            # Graph JSON generated from terraform_graph for each combination of graph options
+            sqlalchemy.Column('terraform_graph_json', Database.medium_blob()),
+            # SHA256 of content stored in blob store, used in place of the above blob columns
+            sqlalchemy.Column('readme_content_sha256', sqlalchemy.String(64)),
+            sqlalchemy.Column('terraform_docs_sha256', sqlalchemy.String(64)),
+            sqlalchemy.Column('tfsec_sha256', sqlalchemy.String(64)),
+            sqlalchemy.Column('infracost_sha256', sqlalchemy.String(64)),
+            sqlalchemy.Column('terraform_graph_sha256', sqlalchemy.String(64)),
+            sqlalchemy.Column('terraform_graph_json_sha256', sqlalchemy.String(64))
+        )
+
+        # Content-addressed storage of blobs, de-duplicating identical content
+        self._blob_store = sqlalchemy.Table(
+            'blob_store', meta,
+            sqlalchemy.Column('sha256', sqlalchemy.String(64), primary_key=True),
+            sqlalchemy.Column('content', Database.medium_blob()),
+            sqlalchemy.Column('reference_count', sqlalchemy.Integer, nullable=False)
         )
 
         self._module_version = sqlalchemy.Table(
@@ -312,6 +514,10 @@ class Database():
                 nullable=False
             ),
             sqlalchemy.Column('version', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            # Numeric parts of version, allowing versions to be compared in queries
+            sqlalchemy.Column('version_major', sqlalchemy.Integer),
+            sqlalchemy.Column('version_minor', sqlalchemy.Integer),
+            sqlalchemy.Column('version_patch', sqlalchemy.Integer),
             sqlalchemy.Column(
                 'module_details_id',
                 sqlalchemy.ForeignKey(
@@ -333,7 +539,48 @@ class Database():
             sqlalchemy.Column('variable_template', Database.medium_blob()),
             sqlalchemy.Column('internal', sqlalchemy.Boolean, nullable=False),
             sqlalchemy.Column('published', sqlalchemy.Boolean),
-            sqlalchemy.Column('extraction_version', sqlalchemy.Integer)
+            sqlalchemy.Column('extraction_version', sqlalchemy.Integer),
+            sqlalchemy.Index('ix_module_version_module_provider_id_version', 'module_provider_id', 'version')
+        )
+
+        # Denormalised summary of each module provider and its latest version,
+        # used for listing and searching module providers without joining to
+        # the latest module version and counting analytics for each result.
+        # Maintained by ModuleProvider.update_summary
+        self._module_provider_summary = sqlalchemy.Table(
+            'module_provider_summary', meta,
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_module_provider_summary_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                primary_key=True
+            ),
+            sqlalchemy.Column('namespace', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('module', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('provider', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('verified', sqlalchemy.Boolean),
+            sqlalchemy.Column(
+                'latest_version_id',
+                sqlalchemy.ForeignKey(
+                    'module_version.id',
+                    name='fk_module_provider_summary_latest_version_id_module_version_id',
+                    onupdate='CASCADE',
+                    ondelete='SET NULL'),
+                nullable=True
+            ),
+            sqlalchemy.Column('latest_version', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('owner', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('description', sqlalchemy.String(LARGE_COLUMN_SIZE)),
+            sqlalchemy.Column('published_at', sqlalchemy.DateTime),
+            sqlalchemy.Column('internal', sqlalchemy.Boolean),
+            # Number of downloads of the latest version
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.Index('ix_module_provider_summary_namespace_module_provider', 'namespace', 'module', 'provider'),
+            sqlalchemy.Index('ix_module_provider_summary_latest_version_id', 'latest_version_id'),
+            sqlalchemy.Index('ix_module_provider_summary_published_at', 'published_at')
         )
 
         self._sub_module = sqlalchemy.Table(
@@ -360,7 +607,10 @@ class Database():
             ),
             sqlalchemy.Column('type', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
             sqlalchemy.Column('path', sqlalchemy.String(LARGE_COLUMN_SIZE)),
-            sqlalchemy.Column('name', sqlalchemy.String(GENERAL_COLUMN_SIZE))
+            sqlalchemy.Column('name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            # Limit length of path in index for MySQL, to keep within maximum index key length
+            sqlalchemy.Index('ix_submodule_parent_module_version_type_path', 'parent_module_version', 'type', 'path',
+                             mysql_length={'path': 255})
         )
 
         self._analytics = sqlalchemy.Table(
@@ -371,7 +621,53 @@ class Database():
             sqlalchemy.Column('terraform_version', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
             sqlalchemy.Column('analytics_token', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
             sqlalchemy.Column('auth_token', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
-            sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE))
+            sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Index('ix_analytics_timestamp', 'timestamp'),
+            # Used to determine whether newer downloads exist when archiving analytics
+            sqlalchemy.Index('ix_analytics_parent_module_version_analytics_token',
+                             'parent_module_version', 'analytics_token', 'environment', 'auth_token')
+        )
+
+        # Number of downloads of each module version for each day, environment and analytics token,
+        # maintained as downloads are recorded in the analytics table.
+        # Rows are not unique, as concurrent downloads may insert duplicate rows,
+        # so download counts must be summed.
+        self._analytics_daily = sqlalchemy.Table(
+            'analytics_daily', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column('parent_module_version', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.Column('day', sqlalchemy.Date, nullable=False),
+            sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('analytics_token', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.Index('ix_analytics_daily_parent_module_version_day', 'parent_module_version', 'day'),
+            sqlalchemy.Index('ix_analytics_daily_day', 'day')
+        )
+
+        # Latest download of each module provider for each analytics token and environment,
+        # maintained as downloads are recorded in the analytics table.
+        # Rows are not unique, as concurrent downloads may insert duplicate rows,
+        # so the row with the latest timestamp must be used.
+        self._analytics_token_latest = sqlalchemy.Table(
+            'analytics_token_latest', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_analytics_token_latest_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                nullable=False
+            ),
+            sqlalchemy.Column('analytics_token', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('parent_module_version', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.Column('terraform_version', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('timestamp', sqlalchemy.DateTime),
+            sqlalchemy.Index('ix_analytics_token_latest_module_provider_id_analytics_token',
+                             'module_provider_id', 'analytics_token', 'environment'),
+            sqlalchemy.Index('ix_analytics_token_latest_parent_module_version', 'parent_module_version')
         )
 
         self._example_file = sqlalchemy.Table(
@@ -387,7 +683,8 @@ class Database():
                 nullable=False
             ),
             sqlalchemy.Column('path', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
-            sqlalchemy.Column('content', Database.medium_blob())
+            sqlalchemy.Column('content', Database.medium_blob()),
+            sqlalchemy.Index('ix_example_file_submodule_id_path', 'submodule_id', 'path')
         )
 
         # Additional files for module provider (e.g. additional README files)
@@ -404,7 +701,8 @@ class Database():
                 nullable=False
             ),
             sqlalchemy.Column('path', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
-            sqlalchemy.Column('content', Database.medium_blob())
+            sqlalchemy.Column('content', Database.medium_blob()),
+            sqlalchemy.Index('ix_module_version_file_module_version_id_path', 'module_version_id', 'path')
         )
 
         self._audit_history = sqlalchemy.Table(
@@ -416,7 +714,16 @@ class Database():
             sqlalchemy.Column('object_type', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
             sqlalchemy.Column('object_id', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
             sqlalchemy.Column('old_value', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
-            sqlalchemy.Column('new_value', sqlalchemy.String(GENERAL_COLUMN_SIZE))
+            sqlalchemy.Column('new_value', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Index('ix_audit_history_timestamp', 'timestamp')
+        )
+
+        # Pre-calculated statistics, maintained by GlobalStatistics
+        self._global_statistic = sqlalchemy.Table(
+            'global_statistic', meta,
+            sqlalchemy.Column('name', sqlalchemy.String(GENERAL_COLUMN_SIZE), primary_key=True),
+            sqlalchemy.Column('value', sqlalchemy.Integer),
+            sqlalchemy.Column('updated_at', sqlalchemy.DateTime, nullable=False)
         )
 
     def select_module_version_joined_module_provider(self, *select_args):
@@ -429,14 +736,52 @@ class Database():
             self.namespace, self.module_provider.c.namespace_id==self.namespace.c.id
         )
 
-    def select_module_provider_joined_latest_module_version(self, *select_args):
-        """Perform select on module_provider, joined to latest version from module_version table."""
+    @classmethod
+    def get_non_deferred_columns(cls, table):
+        """Return columns of table, excluding large columns that are deferred until they are accessed."""
+        deferred_columns = cls.DEFERRED_COLUMNS.get(table.name, [])
+        return [
+            column
+            for column in table.c
+            if column.name not in deferred_columns
+        ]
+
+    @classmethod
+    def get_labelled_columns(cls, table):
+        """
+        Return non-deferred columns of table, labelled with the table name,
+        allowing columns of multiple tables with the same name to be selected together.
+        """
+        return [
+            column.label(f'{table.name}_{column.name}')
+            for column in cls.get_non_deferred_columns(table)
+        ]
+
+    @classmethod
+    def get_labelled_row(cls, table, row):
+        """Return dict of values for table from row, selected using labelled columns of the table."""
+        return {
+            column.name: row[f'{table.name}_{column.name}']
+            for column in cls.get_non_deferred_columns(table)
+        }
+
+    def select_module_provider_summary(self, *select_args):
+        """
+        Perform select on module_provider_summary, joined to module_provider, git_provider
+        and latest version from module_version table, selecting labelled columns of each table.
+        """
         return sqlalchemy.select(
+            *self.get_labelled_columns(self.module_provider_summary),
+            *self.get_labelled_columns(self.module_provider),
+            *self.get_labelled_columns(self.module_version),
+            *self.get_labelled_columns(self.git_provider),
             *select_args
-        ).select_from(self.module_provider).join(
-            self.module_version, self.module_provider.c.latest_version_id==self.module_version.c.id
-        ).join(
-            self.namespace, self.module_provider.c.namespace_id==self.namespace.c.id
+        ).select_from(self.module_provider_summary).join(
+            self.module_provider, self.module_provider_summary.c.module_provider_id==self.module_provider.c.id
+        ).outerjoin(
+            self.module_version, self.module_provider_summary.c.latest_version_id==self.module_version.c.id
+        ).outerjoin(
+            self.git_provider, self.module_provider.c.git_provider_id==self.git_provider.c.id
         )
 
     @classmethod
@@ -454,14 +799,78 @@ class Database():
 
         return None
 
+    @classmethod
+    def call_after_transaction(cls, callback):
+        """
+        Call callback once the current transaction has been committed or rolled back.
+
+        Returns whether a transaction is active. If not, the callback is not called.
+        """
+        if has_request_context():
+            transaction = flask.g.get('database_transaction', None)
+        else:
+            transaction = cls.get().transaction_object
+
+        if transaction is None:
+            return False
+
+        transaction.add_exit_callback(callback)
+        return True
+
     @classmethod
     def start_transaction(cls):
         """Start DB transaction, store in current context and return"""
         # Check if currently in transaction
         if cls.get_current_transaction():
             raise Exception('Already within database transaction')
-        conn = Database.get().get_connection()
-        return Transaction(conn)
+
+        # Use connection for current request, if in a request context
+        if has_request_context():
+            return Transaction(cls.get_request_connection())
+        return Transaction(cls._connect(), close_connection=True)
+
+    @classmethod
+    def _connect(cls, engine=None):
+        """Obtain new connection from engine, recording time spent waiting for connection pool."""
+        if engine is None:
+            engine = cls.get_engine()
+        start_time = time.time()
+        conn = engine.connect()
+        cls._increment_pool_statistic('checkout_wait_seconds', time.time() - start_time)
+        return conn
+
+    @classmethod
+    def get_request_connection(cls):
+        """Return database connection for current request, creating a new connection, if one does not exist."""
+        if flask.g.get('database_request_connection', None) is None:
+            flask.g.database_request_connection = cls._connect()
+        return flask.g.database_request_connection
+
+    @classmethod
+    def get_read_request_connection(cls):
+        """Return connection to read-only replica for current request, creating a new connection, if one does not exist."""
+        if flask.g.get('database_read_request_connection', None) is None:
+            flask.g.database_read_request_connection = cls._connect(engine=random.choice(cls.get_read_engines()))
+        return flask.g.database_read_request_connection
+
+    @classmethod
+    def release_request_connection(cls, *args, **kwargs):
+        """Close database connections for current request, returning them to the connection pool."""
+        for attribute in ['database_request_connection', 'database_read_request_connection']:
+            conn = flask.g.pop(attribute, None)
+            if conn is not None:
+                conn.close()
+
+    @classmethod
+    def _should_use_read_replica(cls):
+        """Whether read queries in the current request can be sent to a read-only replica."""
+        return (
+            bool(cls.get_read_engines()) and
+            flask.request.method in ['GET', 'HEAD'] and
+            # Once the primary database has been used in the request,
+            # use it for all further queries, so that any writes are visible.
+            flask.g.get('database_request_connection', None) is None
+        )
 
     @classmethod
     def get_connection(cls):
@@ -472,8 +881,15 @@ class Database():
             # to handle 'with get_connection():'
             return TransactionConnectionWrapper(current_transaction)
 
+        # If in a request context, re-use single connection for the request.
+        # The connection is released when the request is torn down.
+        if has_request_context():
+            if cls._should_use_read_replica():
+                return ReadReplicaConnectionWrapper()
+            return TransactionConnectionWrapper(cls.get_request_connection())
+
         # If transaction is not currently active, return database connection
-        return cls.get().get_engine().connect()
+        return cls._connect()
 
 
 class TransactionConnectionWrapper:
@@ -491,6 +907,45 @@ class TransactionConnectionWrapper:
         self._transaction = None
 
 
+class ReadReplicaConnectionWrapper:
+    """
+    Connection wrapper, sending select statements to a read-only replica
+    and all other statements to the primary database.
+    """
+
+    def __init__(self, execution_options: dict=None):
+        """Store execution options to apply to connections."""
+        self._execution_options = execution_options or {}
+
+    def __enter__(self):
+        """On enter, return self, to route executed statements."""
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        """Do nothing on exit, as connections are released at the end of the request."""
+        pass
+
+    def execute(self, statement, *args, **kwargs):
+        """Execute statement, using read-only replica for selects, if the primary database has not been used."""
+        if (isinstance(statement, sqlalchemy.sql.expression.SelectBase) and
+                flask.g.get('database_request_connection', None) is None):
+            conn = Database.get_read_request_connection()
+        else:
+            conn = Database.get_request_connection()
+
+        if self._execution_options:
+            conn = conn.execution_options(**self._execution_options)
+        return conn.execute(statement, *args, **kwargs)
+
+    def execution_options(self, **options):
+        """Return wrapper, applying execution options to the connection that statements are routed to."""
+        return ReadReplicaConnectionWrapper(execution_options=dict(self._execution_options, **options))
+
+    def __getattr__(self, name):
+        """Pass any other attributes through to primary database connection."""
+        return getattr(Database.get_request_connection(), name)
+
+
 class Transaction:
     """Custom wrapper for database tranaction."""
 
@@ -504,11 +959,17 @@ class Transaction:
         """Return database connection object."""
         return self._connection
 
-    def __init__(self, connection):
-        """Store database connection."""
+    def __init__(self, connection, close_connection=False):
+        """Store database connection and whether the connection should be closed once the transaction has ended."""
         self._connection = connection
+        self._close_connection = close_connection
         self._transaction_outer = None
-    
+        self._exit_callbacks = []
+
+    def add_exit_callback(self, callback):
+        """Register callback to be called once the transaction has ended."""
+        self._exit_callbacks.append(callback)
+
     def __enter__(self):
         """Start transaction and store in current context."""
         self._transaction_outer = self._connection.begin()
@@ -519,8 +980,10 @@ class Transaction:
         # returned by any get_connection methods
         if has_request_context():
             flask.g.database_transaction_connection = self._connection
+            flask.g.database_transaction = self
         else:
-            Database.get().transaction = self._connection
+            Database.get().transaction_connection = self._connection
+            Database.get().transaction_object = self
 
         return self
 
@@ -528,8 +991,17 @@ class Transaction:
         """End transaction and remove from current context."""
         if has_request_context():
             flask.g.database_transaction_connection = None
+            flask.g.database_transaction = None
         else:
-            Database.get().transaction = None
+            Database.get().transaction_connection = None
+            Database.get().transaction_object = None
+
+        try:
+            self._transaction_outer.__exit__(*args, **kwargs)
+        finally:
+            if self._close_connection:
+                self._connection.close()
 
-        self._transaction_outer.__exit__(*args, **kwargs)
+        for callback in self._exit_callbacks:
+            callback()
 
@@ -0,0 +1,171 @@
+"""Provide global statistics, such as those displayed on the homepage."""
+
+import datetime
+from enum import Enum
+
+import sqlalchemy
+
+from terrareg.config import Config
+from terrareg.database import Database
+
+
+class GlobalStatistic(Enum):
+    """Statistic stored in the global_statistic table."""
+
+    # Counters, which are updated as objects are created and deleted
+    NAMESPACE_COUNT = 'namespace_count'
+    MODULE_PROVIDER_COUNT = 'module_provider_count'
+    MODULE_VERSION_COUNT = 'module_version_count'
+    DOWNLOAD_COUNT = 'download_count'
+
+    # Aggregates, which are re-calculated once they are older than the refresh interval
+    MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK = 'most_downloaded_module_provider_this_week'
+
+
+class GlobalStatistics:
+    """
+    Statistics stored in the global_statistic table, allowing them to be read without aggregating source tables.
+
+    Counters are incremented and decremented, in the same transaction, as objects are created and deleted.
+    Aggregates are re-calculated when they are obtained, once they are older than
+    the GLOBAL_STATISTICS_REFRESH_INTERVAL.
+
+    Statistics that have not been calculated, or have been reset, are calculated
+    from the source tables when they are next obtained.
+    """
+
+    PERIODIC_STATISTICS = [
+        GlobalStatistic.MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK
+    ]
+
+    @staticmethod
+    def _calculate_most_downloaded_module_provider_this_week():
+        """
+        Return ID of module provider with most downloads in the past week.
+
+        Downloads are obtained from daily download counts of the past 7 days, including the current day.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider.c.id
+        ).select_from(
+            db.analytics_daily
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics_daily.c.parent_module_version
+        ).join(
+            db.module_provider,
+            db.module_provider.c.id == db.module_version.c.module_provider_id
+        ).where(
+            db.analytics_daily.c.day > (
+                datetime.date.today() -
+                datetime.timedelta(days=7)
+            ),
+            db.module_version.c.published == True,
+            db.module_version.c.beta == False,
+            db.module_version.c.internal == False
+        ).group_by(
+            db.module_provider.c.id
+        ).order_by(
+            sqlalchemy.func.sum(db.analytics_daily.c.download_count).desc()
+        ).limit(1)
+
+        with db.get_connection() as conn:
+            return conn.execute(select).scalar()
+
+    @classmethod
+    def _calculate(cls, statistic: GlobalStatistic):
+        """Calculate value of statistic from source tables."""
+        # Imported on use, as models and analytics import this module to maintain counters
+        import terrareg.analytics
+        import terrareg.models
+
+        if statistic is GlobalStatistic.NAMESPACE_COUNT:
+            return terrareg.models.Namespace.get_total_count()
+        elif statistic is GlobalStatistic.MODULE_PROVIDER_COUNT:
+            return terrareg.models.ModuleProvider.get_total_count()
+        elif statistic is GlobalStatistic.MODULE_VERSION_COUNT:
+            return terrareg.models.ModuleVersion.get_total_count()
+        elif statistic is GlobalStatistic.DOWNLOAD_COUNT:
+            return terrareg.analytics.AnalyticsEngine.get_total_downloads()
+        elif statistic is GlobalStatistic.MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK:
+            return cls._calculate_most_downloaded_module_provider_this_week()
+        raise ValueError(f'Unknown statistic: {statistic}')
+
+    @classmethod
+    def get(cls, *statistics: GlobalStatistic):
+        """
+        Return dict of values for statistics, keyed by statistic,
+        calculating any statistics that have not been calculated or require refreshing.
+        """
+        db = Database.get()
+        select = db.global_statistic.select().where(
+            db.global_statistic.c.name.in_([statistic.value for statistic in statistics])
+        )
+        with db.get_connection() as conn:
+            rows = {
+                row['name']: row
+                for row in conn.execute(select)
+            }
+
+        refresh_before = datetime.datetime.now() - datetime.timedelta(
+            seconds=Config().GLOBAL_STATISTICS_REFRESH_INTERVAL)
+        values = {}
+        for statistic in statistics:
+            row = rows.get(statistic.value)
+            if row is None or (statistic in cls.PERIODIC_STATISTICS and row['updated_at'] < refresh_before):
+                values[statistic] = cls.refresh(statistic)
+            else:
+                values[statistic] = row['value']
+        return values
+
+    @classmethod
+    def refresh(cls, statistic: GlobalStatistic):
+        """Re-calculate statistic from source tables, returning the new value."""
+        value = cls._calculate(statistic)
+
+        db = Database.get()
+        values = {
+            'value': value,
+            'updated_at': datetime.datetime.now()
+        }
+        with db.get_connection() as conn:
+            res = conn.execute(db.global_statistic.update().where(
+                db.global_statistic.c.name == statistic.value
+            ).values(**values))
+            if not res.rowcount:
+                try:
+                    conn.execute(db.global_statistic.insert().values(name=statistic.value, **values))
+                except sqlalchemy.exc.IntegrityError:
+                    # Statistic has been calculated by another request
+                    pass
+
+        return value
+
+    @classmethod
+    def increment(cls, statistic: GlobalStatistic, amount: int=1):
+        """
+        Increment counter by amount, which may be negative.
+
+        Counters that have not been calculated are left to be calculated when they are next obtained.
+        """
+        if not amount:
+            return
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.global_statistic.update().where(
+                db.global_statistic.c.name == statistic.value
+            ).values(
+                value=db.global_statistic.c.value + amount,
+                updated_at=datetime.datetime.now()
+            ))
+
+    @classmethod
+    def reset(cls, statistic: GlobalStatistic):
+        """Remove value of statistic, so that it is re-calculated when it is next obtained."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.global_statistic.delete().where(
+                db.global_statistic.c.name == statistic.value
+            ))
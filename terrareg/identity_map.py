@@ -0,0 +1,65 @@
+"""Provide request-scoped identity map for model objects."""
+
+from flask import has_request_context
+import flask
+
+
+class IdentityMap:
+    """
+    Identity map of model objects, stored against the current request.
+
+    Model objects are registered once their database row has been loaded,
+    allowing subsequent lookups for the same object, within the same request,
+    to return the existing object (and its cached row), rather than re-querying the database.
+
+    Outside of a request context, nothing is stored and all lookups miss.
+    """
+
+    @staticmethod
+    def _get_objects():
+        """Return dict of objects for current request, or None if not in a request context."""
+        if not has_request_context():
+            return None
+
+        if flask.g.get('model_identity_map', None) is None:
+            flask.g.model_identity_map = {}
+        return flask.g.model_identity_map
+
+    @staticmethod
+    def _get_key(obj):
+        """Return identity map key for object."""
+        return (obj.__class__, obj._identity_key)
+
+    @classmethod
+    def get(cls, obj):
+        """Return registered object with the same identity as the given object, if one exists."""
+        objects = cls._get_objects()
+        if objects is None:
+            return None
+        return objects.get(cls._get_key(obj), None)
+
+    @classmethod
+    def resolve(cls, obj):
+        """Return registered object with the same identity, falling back to the given object."""
+        mapped_obj = cls.get(obj)
+        return mapped_obj if mapped_obj is not None else obj
+
+    @classmethod
+    def add(cls, obj):
+        """Register object in identity map, if an object with the same identity is not already present."""
+        objects = cls._get_objects()
+        if objects is not None:
+            objects.setdefault(cls._get_key(obj), obj)
+
+    @classmethod
+    def remove(cls, obj):
+        """Remove object with identity of given object from identity map."""
+        objects = cls._get_objects()
+        if objects is not None:
+            objects.pop(cls._get_key(obj), None)
+
+    @classmethod
+    def clear(cls):
+        """Remove all objects from identity map for current request."""
+        if has_request_context():
+            flask.g.model_identity_map = {}
@@ -1,4 +1,5 @@
 
+import contextlib
 import datetime
 from enum import Enum
 import os
@@ -6,14 +7,20 @@ from distutils.version import LooseVersion
 import json
 import re
 import secrets
+import shutil
 import sqlalchemy
 import urllib.parse
 
 import markdown
-import pygraphviz
-import networkx as nx
 import terrareg.analytics
 from terrareg.database import Database
+from terrareg.identity_map import IdentityMap
+from terrareg.blob_store import BlobStore
+from terrareg.module_graph import ModuleGraph
+from terrareg.cache import Cache, CacheTags
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
+from terrareg.module_specs_cache import ModuleSpecsCache
+from terrareg.rendered_html_cache import RenderedHtmlCache
 import terrareg.config
 import terrareg.audit
 import terrareg.audit_action
@@ -414,7 +421,7 @@ class GitProvider:
     @staticmethod
     def initialise_from_config():
         """Load git providers from config into database."""
-        git_provider_config = json.loads(terrareg.config.Config().GIT_PROVIDER_CONFIG)
+        git_provider_config = terrareg.config.Config().git_provider_config
         db = Database.get()
         for git_provider_config in git_provider_config:
             # Validate provider config
@@ -502,11 +509,20 @@ class GitProvider:
     @classmethod
     def get(cls, id):
         """Create object and validate that it exists."""
-        git_provider = cls(id=id)
+        git_provider = IdentityMap.resolve(cls(id=id))
         if git_provider._get_db_row() is None:
             return None
         return git_provider
 
+    @classmethod
+    def _from_db_row(cls, row):
+        """Return instance of object, using pre-fetched database row."""
+        obj = IdentityMap.resolve(cls(id=row['id']))
+        if obj._row_cache is None:
+            obj._row_cache = row
+            IdentityMap.add(obj)
+        return obj
+
     @property
     def pk(self):
         """Return DB ID for git provider."""
@@ -538,6 +554,11 @@ class GitProvider:
             return self.pk == __o.pk
         return super(GitProvider, self).__eq__(__o)
 
+    @property
+    def _identity_key(self):
+        """Return key for identifying object in identity map."""
+        return self._id
+
     def __init__(self, id):
         """Store member variable for ID."""
         self._id = id
@@ -553,7 +574,11 @@ class GitProvider:
             )
             with db.get_connection() as conn:
                 res = conn.execute(select)
-                return res.fetchone()
+                self._row_cache = res.fetchone()
+
+            if self._row_cache is not None:
+                IdentityMap.add(self)
+
         return self._row_cache
 
 
@@ -562,7 +587,7 @@ class Namespace(object):
     @classmethod
     def get(cls, name, create=False):
         """Create object and ensure the object exists."""
-        obj = cls(name=name)
+        obj = IdentityMap.resolve(cls(name=name))
 
         # If there is no row, the module provider does not exist
         if obj._get_db_row() is None:
@@ -635,6 +660,8 @@ class Namespace(object):
         with db.get_connection() as conn:
             conn.execute(module_provider_insert)
 
+        GlobalStatistics.increment(GlobalStatistic.NAMESPACE_COUNT)
+
     @classmethod
     def create(cls, name, display_name=None):
         """Create instance of object in database."""
@@ -707,29 +734,17 @@ class Namespace(object):
 
         if only_published:
             # If only getting namespaces, with published/visible versions,
-            # query module provider, joining to latest module version
-            modules_query = db.select_module_provider_joined_latest_module_version(
-                db.module_provider
-            )
-
-            modules_query = modules_query.where(
-                db.module_version.c.published == True,
-                db.module_version.c.beta == False
-            )
-
-            modules_query = modules_query.subquery()
-
+            # query module provider summaries with a latest version
             namespace_query = sqlalchemy.select(
-                db.namespace.c.namespace
+                db.module_provider_summary.c.namespace
             ).select_from(
-                modules_query
-            ).join(
-                db.namespace,
-                db.namespace.c.id==modules_query.c.namespace_id
+                db.module_provider_summary
+            ).where(
+                db.module_provider_summary.c.latest_version_id != None
             ).group_by(
-                db.namespace.c.namespace
+                db.module_provider_summary.c.namespace
             ).order_by(
-                db.namespace.c.namespace
+                db.module_provider_summary.c.namespace
             )
         else:
             namespace_query = sqlalchemy.select(
@@ -806,6 +821,11 @@ class Namespace(object):
         """Return display name for namespace"""
         return self._get_db_row()["display_name"]
 
+    @property
+    def _identity_key(self):
+        """Return key for identifying object in identity map."""
+        return self._name
+
     def __init__(self, name: str):
         """Validate name and store member variables"""
         self._name = name
@@ -814,6 +834,12 @@ class Namespace(object):
     def _get_db_row(self):
         """Return database row for namespace."""
         if self._cache_db_row is None:
+            # Use row from pre-existing object in current request, if available
+            mapped_obj = IdentityMap.get(self)
+            if mapped_obj is not None and mapped_obj is not self:
+                self._cache_db_row = mapped_obj._get_db_row()
+                return self._cache_db_row
+
             db = Database.get()
             select = db.namespace.select(
             ).where(
@@ -823,6 +849,9 @@ class Namespace(object):
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
 
+            if self._cache_db_row is not None:
+                IdentityMap.add(self)
+
         return self._cache_db_row
 
     def get_view_url(self):
@@ -858,6 +887,30 @@ class Namespace(object):
             for module in modules
         ]
 
+    def get_module_providers(self, offset=0, limit=None):
+        """
+        Return module providers in namespace, ordered by module and provider name,
+        obtained from module provider summaries with their latest versions.
+        """
+        db = Database.get()
+        select = db.select_module_provider_summary(
+        ).where(
+            db.module_provider_summary.c.namespace == self.name
+        ).order_by(
+            db.module_provider_summary.c.module,
+            db.module_provider_summary.c.provider
+        ).offset(max(offset, 0))
+        if limit is not None:
+            select = select.limit(max(limit, 0))
+
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        return [
+            ModuleProvider._from_summary_row(namespace=self, row=row)
+            for row in rows
+        ]
+
     def create_data_directory(self):
         """Create data directory and data directories of parents."""
         # Check if data directory exists
@@ -868,7 +921,7 @@ class Namespace(object):
         """Obtain module links that are applicable to namespace"""
         links = filter(
             lambda x: x.get('namespaces', None) is None or self.name in x.get('namespaces', []),
-            json.loads(terrareg.config.Config().MODULE_LINKS))
+            terrareg.config.Config().module_links)
         return links
 
 
@@ -941,6 +994,12 @@ class Module(object):
 class ModuleDetails:
     """Object to store common details between root module, submodules and examples."""
 
+    # Blob columns, which may be stored in the blob store
+    BLOB_COLUMNS = ['readme_content', 'terraform_docs', 'tfsec', 'infracost', 'terraform_graph', 'terraform_graph_json']
+
+    # Maximum number of module details to delete in a single statement
+    DELETE_BATCH_SIZE = 500
+
     @classmethod
     def create(cls):
         """Create instance of object in database."""
@@ -960,260 +1019,244 @@ class ModuleDetails:
     @property
     def terraform_docs(self):
         """Return terraform_docs column"""
-        if self._get_db_row():
-            return self._get_db_row()['terraform_docs']
-        return None
+        return self._get_blob('terraform_docs')
 
     @property
     def readme_content(self):
         """Return readme_content column"""
-        if self._get_db_row():
-            return self._get_db_row()['readme_content']
-        return None
+        return self._get_blob('readme_content')
 
     @property
     def tfsec(self):
         """Return tfsec data."""
         # If module scanning is disabled, do not return the tfsec output
-        if (terrareg.config.Config().ENABLE_SECURITY_SCANNING and
-                self._get_db_row() is not None and
-                self._get_db_row()['tfsec']):
-            return json.loads(self._get_db_row()['tfsec'])
+        if terrareg.config.Config().ENABLE_SECURITY_SCANNING:
+            tfsec = self._get_blob('tfsec')
+            if tfsec:
+                return json.loads(Database.decode_blob(tfsec))
         return {'results': None}
 
     @property
     def infracost(self):
         """Return infracost data."""
-        db_row = self._get_db_row()
-        if (db_row is not None and
-                db_row['infracost']):
-            return json.loads(db_row['infracost'])
+        infracost = self._get_blob('infracost')
+        if infracost:
+            return json.loads(Database.decode_blob(infracost))
         return {}
 
     @property
     def terraform_graph(self):
         """Return decoded terraform graph data."""
-        db_row = self._get_db_row()
-        if db_row and db_row["terraform_graph"]:
-            return Database.decode_blob(db_row["terraform_graph"])
+        terraform_graph = self._get_blob('terraform_graph')
+        if terraform_graph:
+            return Database.decode_blob(terraform_graph)
         return None
 
+    @property
+    def terraform_graph_json(self):
+        """Return dict of pre-computed graph JSON for each combination of graph options."""
+        terraform_graph_json = self._get_blob('terraform_graph_json')
+        if terraform_graph_json:
+            return json.loads(Database.decode_blob(terraform_graph_json))
+        return None
+
+    def get_module_specs(self):
+        """
+        Return parsed terraform-docs output.
+
+        The parsed output is cached between requests and must not be modified.
+        """
+        db_row = self._get_db_row()
+        if db_row is None:
+            return {}
+
+        terraform_docs_sha256 = db_row['terraform_docs_sha256']
+        module_specs = ModuleSpecsCache.get(self.pk, terraform_docs_sha256=terraform_docs_sha256)
+        if module_specs is None:
+            raw_json = Database.decode_blob(self.terraform_docs)
+            module_specs = json.loads(raw_json) if raw_json else {}
+            ModuleSpecsCache.put(
+                self.pk, module_specs,
+                size=len(raw_json) if raw_json else 0,
+                terraform_docs_sha256=terraform_docs_sha256
+            )
+        return module_specs
+
     def get_graph_json(self, full_resource_names=False, full_module_names=False):
-        """Return graph JSON for resources."""
+        """
+        Return graph JSON for resources.
+
+        Graph JSON is pre-computed for each combination of options during module extraction
+        and by scripts/backfill_graph_json.py for existing module details.
+        If it is not present, it is generated from the terraform graph output, without being stored.
+        """
+        graph_json = self.terraform_graph_json
+        if graph_json is not None:
+            return graph_json[ModuleGraph.get_key(full_resource_names, full_module_names)]
+
         terraform_graph = self.terraform_graph
         if not terraform_graph:
             return None
 
-        # Generate NX graph from terraform graphviz output
-        graph = pygraphviz.AGraph(terraform_graph)
-        nx_graph = nx.nx_agraph.from_agraph(graph)
+        return ModuleGraph.generate(
+            terraform_graph=terraform_graph,
+            infracost=self.infracost,
+            full_resource_names=full_resource_names,
+            full_module_names=full_module_names
+        )
 
-        infracost = self.infracost
-        resource_costs = {}
-        remove_item_iteration_re = re.compile(r'\[[^\]]+\]')
-        if infracost:
-            for resource in self.infracost["projects"][0]["breakdown"]["resources"]:
-                if not resource["monthlyCost"]:
-                    continue
-
-                name = remove_item_iteration_re.sub("", resource["name"])
-                if name not in resource_costs:
-                    resource_costs[name] = 0
-                resource_costs[name] += round((float(resource["monthlyCost"]) * 12), 2)
-
-        module_var_output_local_re = re.compile(r'^(module\.[^\.]+\.)+(var|local|output)\.[^\.]+$')
-        # Capture modules resources, such as:
-        # module.module1
-        # module.module1.module.module2
-        module_re = re.compile(r'^(?:module\.[^\.]+\.)*(?:module\.([^\.]+))$')
-        # Capture data resources, such as:
-        # data.aws_s3_bucket.test
-        # module.module1.data.aws_s3_bucket.test
-        # module.module1.module.module2.data.aws_s3_bucket.test
-        data_re = re.compile(r'^((?:module\.[^\.]+\.)+)data\.([^\.]+)\.([^\.])+$')
-        # Capture resources, such as:
-        # aws_s3_bucket.test
-        # module.module1.aws_s3_bucket.test
-        # module.module1.module.module2.aws_s3_bucket.test
-        resource_re = re.compile(r'^((?:module\.[^\.]+\.)*)([^\.]+)\.([^\.]+)$')
-
-        # Store node renames, to be renamed after initial iteration
-        renames = {}
-        # Store nodes to be removed
-        to_remove = []
-        # Store labels to be pushed to graph JSON
-        labels = {}
-        # Stoe type mappings for determing node attributes
-        type_mapping = {}
-        # Store parents of attirbutes to modules, used for
-        # parent mapping in JSON
-        parents = {}
-
-        def remove_node(node):
-            """Add a node to the remove_nodes list, if they are not already present"""
-            if node not in to_remove:
-                to_remove.append(node)
-
-        for node_label in nx_graph.nodes:
-            # Remove leading '[root] ' name and expand/close suffices from node names
-            name = node_label.replace('[root] ', '').replace(' (expand)', '').replace(' (close)', '')
-
-            # Check for root vars, outputs and locals
-            if name.startswith('output.') or name.startswith('var.') or name.startswith('local.'):
-                remove_node(node_label)
-
-            # Remove any module vars/outputs/locals
-            elif module_var_output_local_re.match(name):
-                remove_node(node_label)
-
-            # handle all other nodes
-            else:
-                # Rename to shortened name
-                renames[node_label] = name
-
-                # Match node name to type regexes
-                module_match = module_re.match(name)
-                resource_match = resource_re.match(name)
-                data_match = data_re.match(name)
-
-                # Create labels and type mapping
-                if name == "root":
-                    # Match root module
-                    labels[name] = "Root Module"
-                    type_mapping[name] = "module"
-
-                # Match submodules
-                elif module_match:
-                    if full_module_names:
-                        labels[name] = name
-                    else:
-                        labels[name] = module_match.group(1)
-
-                    type_mapping[name] = "module"
-
-                elif data_match:
-                    type_mapping[name] = "data"
-                    parents[name] = data_match.group(1).strip(".") or "root"
-
-                    if full_resource_names:
-                        labels[name] = name
-                    else:
-                        labels[name] = f"(data) {data_match.group(2)}.{data_match.group(3)}"
-
-                # Ensure resource RE is performed last,
-                # as this could also match module_re
-                elif resource_match:
-                    type_mapping[name] = "resource"
-                    if full_resource_names:
-                        labels[name] = name
-                    else:
-                        labels[name] = f"{resource_match.group(2)}.{resource_match.group(3)}"
-
-                    # Add cost to label, if available
-                    if name in resource_costs:
-                        labels[name] += f" (${resource_costs[name]}/year)"
-                    parents[name] = resource_match.group(1).strip(".") or "root"
-
-                # Discard any unrecognised types
-                else:
-                    remove_node(name)
-                    print("Unable to match node to type", name)
+    def store_graph_json(self):
+        """
+        Generate and store graph JSON for each combination of graph options,
+        if it has not already been stored.
 
-        # Perform rename of nodes
-        nx_graph = nx.relabel_nodes(nx_graph, renames)
+        Returns whether graph JSON was stored.
+        """
+        terraform_graph = self.terraform_graph
+        if not terraform_graph or self.terraform_graph_json is not None:
+            return False
 
-        # Remove any nodes marked for removal
-        for node in to_remove:
-            nx_graph.remove_node(node)
+        graph_json = json.dumps(ModuleGraph.generate_all(terraform_graph=terraform_graph, infracost=self.infracost))
 
-        # Convert to JSON for cytoscape
-        cytoscape_json = {
-            "nodes": [],
-            "edges": []
-        }
+        db = Database.get()
+        transaction = (
+            contextlib.nullcontext()
+            if Database.get_current_transaction() is not None else
+            Database.start_transaction()
+        )
+        with transaction:
+            # Lock row and check that graph JSON has not been stored since it was generated
+            select = self.get_db_where(
+                db=db,
+                statement=sqlalchemy.select(
+                    db.module_details.c.terraform_graph_json,
+                    db.module_details.c.terraform_graph_json_sha256
+                )
+            ).with_for_update()
+            with db.get_connection() as conn:
+                row = conn.execute(select).fetchone()
+            if row is None:
+                return False
+            stored_graph_json = (
+                BlobStore.get(row['terraform_graph_json_sha256'])
+                if row['terraform_graph_json_sha256'] else
+                row['terraform_graph_json']
+            )
+            if Database.decode_blob(stored_graph_json):
+                return False
 
-        for node in nx_graph.nodes:
-            data = {
-                "id": node,
-                "label": labels.get(node),
-                "child_count": list(parents.values()).count(node)
-            }
+            self.update_attributes(terraform_graph_json=graph_json)
 
-            style = {}
-            if type_mapping[node] == "module":
-                style = {
-                    'color': '#000000',
-                    'background-color': '#F8F7F9',
-                    'font-weight': 'bold',
-                    'text-valign': 'top',
-                }
-            # Add red outline to resources that have an associated cost
-            if node in resource_costs:
-                style['border-style'] = 'solid'
-                style['border-width'] = '2px'
-                style['border-color'] = 'red'
-
-            # Add parent if available
-            parent = parents.get(node, None)
-            if parent:
-                data["parent"] = parent
-
-            cytoscape_json["nodes"].append({
-                "data": data,
-                "style": style
-            })
+        return True
 
-        # Add edges to graph
-        seen_module_links = []
-        for edge in nx_graph.edges:
-            # Only add edges for module-module links
-            if (type_mapping[edge[0]] == "module" and type_mapping[edge[1]] == "module" and
-                    # Only link modules in one direction, where module is a sub-module of another,
-                    # to avoid links in both directions
-                    edge[0] in edge[1]):
-                # Mark module as having been seen in edges
-                seen_module_links.append(edge[1])
-
-                cytoscape_json["edges"].append({
-                    "data": {
-                        "id": f"{edge[0]}.{edge[1]}",
-                        "source": edge[0],
-                        "target": edge[1]
-                    },
-                    "classes": [
-                        f"{type_mapping[edge[0]]}-{type_mapping[edge[1]]}"
-                    ]
-                })
-
-        # Iterate through all modukes...
-        for module, type_mapping in type_mapping.items():
-            if type_mapping == "module":
-                # If a module link has not already been seen,
-                # add a link to root module
-                if module not in seen_module_links and module != "root":
-                    cytoscape_json["edges"].append({
-                        "data": {
-                            "id": f"root.{module}",
-                            "source": module,
-                            "target": "root"
-                        },
-                        "classes": [
-                            f"{module}-root"
-                        ]
-                    })
+    @property
+    def _identity_key(self):
+        """Return key for identifying object in identity map."""
+        return self._id
 
-        return cytoscape_json
+    @classmethod
+    def get_by_ids(cls, ids):
+        """Return dict of module details objects, keyed by ID, obtaining all rows in a single query."""
+        ids = set(ids)
+        if not ids:
+            return {}
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            *db.get_non_deferred_columns(db.module_details)
+        ).where(
+            db.module_details.c.id.in_(ids)
+        )
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        return {
+            row['id']: cls._from_db_row(row)
+            for row in rows
+        }
+
+    @classmethod
+    def _from_db_row(cls, row):
+        """Return instance of object, using pre-fetched database row."""
+        obj = IdentityMap.resolve(cls(id=row['id']))
+        if obj._cache_db_row is None:
+            obj._cache_db_row = row
+            IdentityMap.add(obj)
+        return obj
 
     def __init__(self, id: int):
         """Store member variables."""
         self._id = id
         self._cache_db_row = None
+        self._cache_blobs = {}
+
+    def _get_blob(self, column):
+        """
+        Return value of blob column, obtaining content from blob store, if it is stored in the blob store.
+
+        Blob columns are not obtained with the database row and are
+        obtained and cached on first access.
+        """
+        db_row = self._get_db_row()
+        if db_row is None:
+            return None
+
+        if column not in self._cache_blobs:
+            sha256 = db_row[f'{column}_sha256']
+            if sha256:
+                self._cache_blobs[column] = BlobStore.get(sha256)
+            else:
+                self._cache_blobs[column] = self._get_deferred_column(column)
+        return self._cache_blobs[column]
+
+    def _get_deferred_column(self, column):
+        """Obtain value of single column, which is not obtained with the database row."""
+        db = Database.get()
+        select = self.get_db_where(
+            db=db,
+            statement=sqlalchemy.select(db.module_details.c[column])
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+        return row[column] if row else None
+
+    def _get_blob_store_hashes(self):
+        """
+        Return dict of blob store hashes for each blob column, obtained directly from the database.
+
+        The row is locked until the end of the current transaction,
+        so that concurrent updates do not release the same previous content.
+        """
+        db = Database.get()
+        select = self.get_db_where(
+            db=db,
+            statement=sqlalchemy.select(*[
+                db.module_details.c[f'{column}_sha256']
+                for column in self.BLOB_COLUMNS
+            ])
+        ).with_for_update()
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+        if row is None:
+            return {}
+        return {
+            column: row[f'{column}_sha256']
+            for column in self.BLOB_COLUMNS
+        }
 
     def _get_db_row(self):
         """Return database row for module details."""
         if self._cache_db_row is None:
+            # Use row from pre-existing object in current request, if available
+            mapped_obj = IdentityMap.get(self)
+            if mapped_obj is not None and mapped_obj is not self:
+                self._cache_db_row = mapped_obj._get_db_row()
+                self._cache_blobs = mapped_obj._cache_blobs
+                return self._cache_db_row
+
             db = Database.get()
-            select = db.module_details.select(
+            select = sqlalchemy.select(
+                *db.get_non_deferred_columns(db.module_details)
             ).where(
                 db.module_details.c.id == self.pk
             )
@@ -1221,6 +1264,9 @@ class ModuleDetails:
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
 
+            if self._cache_db_row is not None:
+                IdentityMap.add(self)
+
         return self._cache_db_row
 
     def get_db_where(self, db: Database, statement):
@@ -1231,32 +1277,110 @@ class ModuleDetails:
 
     def update_attributes(self, **kwargs):
         """Update DB row."""
-        # Check for any blob and encode the values
-        for kwarg in kwargs:
-            if kwarg in ['readme_content', 'terraform_docs', 'tfsec', 'infracost', 'terraform_graph']:
+        blob_columns = [kwarg for kwarg in kwargs if kwarg in self.BLOB_COLUMNS]
+
+        # Perform reading of previous hashes, storing of new content,
+        # update of row and release of previous content in a single transaction
+        transaction = (
+            contextlib.nullcontext()
+            if Database.get_current_transaction() is not None else
+            Database.start_transaction()
+        )
+        with transaction:
+            previous_hashes = self._get_blob_store_hashes() if blob_columns else {}
+
+            # Check for any blob and encode the values
+            for kwarg in blob_columns:
                 kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
 
-        db = Database.get()
-        update = self.get_db_where(
-            db=db, statement=db.module_details.update()
-        ).values(**kwargs)
-        with db.get_connection() as conn:
-            conn.execute(update)
+                # Move content to blob store, if enabled
+                if terrareg.config.Config().ENABLE_BLOB_STORE:
+                    kwargs[f'{kwarg}_sha256'] = BlobStore.put(kwargs[kwarg])
+                    kwargs[kwarg] = None
+                else:
+                    kwargs[f'{kwarg}_sha256'] = None
 
-        # Remove cached DB row
+            db = Database.get()
+            update = self.get_db_where(
+                db=db, statement=db.module_details.update()
+            ).values(**kwargs)
+            with db.get_connection() as conn:
+                conn.execute(update)
+
+            # Remove references to previous content in blob store,
+            # after new content has been stored
+            for kwarg in blob_columns:
+                if previous_hashes.get(kwarg):
+                    BlobStore.release(previous_hashes[kwarg])
+
+        # Remove cached DB row, blob values, module specs and rendered HTML
         self._cache_db_row = None
+        self._cache_blobs.clear()
+        Cache.invalidate_tags(CacheTags.module_details(self.pk))
+        IdentityMap.remove(self)
 
     def delete(self):
         """Delete from database."""
         assert self.pk is not None
         db = Database.get()
 
+        transaction = (
+            contextlib.nullcontext()
+            if Database.get_current_transaction() is not None else
+            Database.start_transaction()
+        )
+        with transaction:
+            previous_hashes = self._get_blob_store_hashes()
+
+            with db.get_connection() as conn:
+                # Delete module details from module_details table
+                delete_statement = db.module_details.delete().where(
+                    db.module_details.c.id == self.pk
+                )
+                conn.execute(delete_statement)
+
+            # Remove references to content in blob store
+            for sha256 in previous_hashes.values():
+                if sha256:
+                    BlobStore.release(sha256)
+
+        # Invalidate cached DB row, blob values, module specs and rendered HTML
+        self._cache_db_row = None
+        self._cache_blobs.clear()
+        Cache.invalidate_tags(CacheTags.module_details(self.pk))
+        IdentityMap.remove(self)
+
+    @classmethod
+    def delete_by_ids(cls, ids):
+        """
+        Delete module details with the given IDs, using set-based statements,
+        and remove references to their content in the blob store.
+        """
+        ids = sorted(set(ids))
+        db = Database.get()
+        hash_columns = [db.module_details.c[f'{column}_sha256'] for column in cls.BLOB_COLUMNS]
+
+        sha256s = []
         with db.get_connection() as conn:
-            # Delete module details from module_details table
-            delete_statement = db.module_details.delete().where(
-                db.module_details.c.id == self.pk
-            )
-            conn.execute(delete_statement)
+            # Delete in batches, to limit the number of bound parameters in each statement
+            for batch_start in range(0, len(ids), cls.DELETE_BATCH_SIZE):
+                batch_ids = ids[batch_start:batch_start + cls.DELETE_BATCH_SIZE]
+                rows = conn.execute(sqlalchemy.select(*hash_columns).where(
+                    db.module_details.c.id.in_(batch_ids)
+                )).fetchall()
+                sha256s += [row[column.name] for row in rows for column in hash_columns if row[column.name]]
+
+                conn.execute(db.module_details.delete().where(
+                    db.module_details.c.id.in_(batch_ids)
+                ))
+
+        BlobStore.release_many(sha256s)
+
+        Cache.invalidate_tags([
+            tag
+            for id_ in ids
+            for tag in CacheTags.module_details(id_)
+        ])
 
 
 class ProviderLogo:
@@ -1426,6 +1550,10 @@ class ModuleProvider(object):
             conn.execute(module_provider_insert)
 
         obj = cls(module=module, name=name)
+        obj.update_summary()
+
+        # Remove cached values generated from the module, which may include its providers
+        obj.invalidate_cache()
 
         terrareg.audit.AuditEvent.create_audit_event(
             action=terrareg.audit_action.AuditAction.MODULE_PROVIDER_CREATE,
@@ -1439,7 +1567,7 @@ class ModuleProvider(object):
     @classmethod
     def get(cls, module, name, create=False):
         """Create object and ensure the object exists."""
-        obj = cls(module=module, name=name)
+        obj = IdentityMap.resolve(cls(module=module, name=name))
 
         # If there is no row, the module provider does not exist
         if obj._get_db_row() is None:
@@ -1581,12 +1709,46 @@ class ModuleProvider(object):
         """Return base directory."""
         return safe_join_paths(self._module.base_directory, self._name)
 
+    @property
+    def _identity_key(self):
+        """Return key for identifying object in identity map."""
+        return self.id
+
+    @classmethod
+    def _from_summary_row(cls, row, namespace=None):
+        """
+        Return instance of object, using pre-fetched row selected using Database.select_module_provider_summary.
+
+        The module provider, its summary, latest version and git provider
+        are all populated from the row, avoiding querying for each of them.
+        """
+        db = Database.get()
+        summary_row = Database.get_labelled_row(db.module_provider_summary, row)
+        if namespace is None:
+            namespace = Namespace(name=summary_row['namespace'])
+        module = Module(namespace=namespace, name=summary_row['module'])
+
+        obj = IdentityMap.resolve(cls(module=module, name=summary_row['provider']))
+        if obj._cache_db_row is None:
+            obj._cache_db_row = Database.get_labelled_row(db.module_provider, row)
+            IdentityMap.add(obj)
+        if obj._cache_summary_row is None:
+            obj._cache_summary_row = summary_row
+
+        if summary_row['latest_version_id'] is not None:
+            ModuleVersion._from_db_row(module_provider=obj, row=Database.get_labelled_row(db.module_version, row))
+        if obj._cache_db_row['git_provider_id'] is not None:
+            GitProvider._from_db_row(Database.get_labelled_row(db.git_provider, row))
+
+        return obj
+
     def __init__(self, module: Module, name: str):
         """Validate name and store member variables."""
         self._validate_name(name)
         self._module = module
         self._name = name
         self._cache_db_row = None
+        self._cache_summary_row = None
 
     def get_db_where(self, db, statement):
         """Filter DB query by where for current object."""
@@ -1597,6 +1759,12 @@ class ModuleProvider(object):
     def _get_db_row(self):
         """Return database row for module provider."""
         if self._cache_db_row is None:
+            # Use row from pre-existing object in current request, if available
+            mapped_obj = IdentityMap.get(self)
+            if mapped_obj is not None and mapped_obj is not self:
+                self._cache_db_row = mapped_obj._get_db_row()
+                return self._cache_db_row
+
             db = Database.get()
             select = db.module_provider.select(
             ).join(
@@ -1611,30 +1779,154 @@ class ModuleProvider(object):
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
 
+            if self._cache_db_row is not None:
+                IdentityMap.add(self)
+
         return self._cache_db_row
 
+    def _get_summary_row(self):
+        """Return row of module provider summary."""
+        if self._cache_summary_row is None:
+            # Use row from pre-existing object in current request, if available
+            mapped_obj = IdentityMap.get(self)
+            if mapped_obj is not None and mapped_obj is not self:
+                self._cache_summary_row = mapped_obj._get_summary_row()
+                return self._cache_summary_row
+
+            db = Database.get()
+            select = db.module_provider_summary.select(
+            ).where(
+                db.module_provider_summary.c.module_provider_id == self.pk
+            )
+            with db.get_connection() as conn:
+                res = conn.execute(select)
+                self._cache_summary_row = res.fetchone()
+
+        return self._cache_summary_row
+
+    def update_summary(self):
+        """
+        Update module provider summary from the module provider and its latest version.
+
+        Must be called, in the same transaction, whenever the module provider,
+        its latest version or the attributes of the latest version are modified.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider,
+            db.module_provider.c.verified,
+            db.module_version.c.id.label('latest_version_id'),
+            db.module_version.c.version.label('latest_version'),
+            db.module_version.c.owner,
+            db.module_version.c.description,
+            db.module_version.c.published_at,
+            db.module_version.c.internal
+        ).select_from(
+            db.module_provider
+        ).join(
+            db.namespace,
+            db.module_provider.c.namespace_id == db.namespace.c.id
+        ).outerjoin(
+            db.module_version,
+            db.module_provider.c.latest_version_id == db.module_version.c.id
+        ).where(
+            db.module_provider.c.id == self.pk
+        )
+        with db.get_connection() as conn:
+            values = dict(conn.execute(select).fetchone())
+
+            # Calculate download count within the update statement, rather than
+            # selecting it beforehand, so that download counts incremented by
+            # concurrently recorded downloads are not overwritten
+            values['download_count'] = sqlalchemy.select(
+                sqlalchemy.func.coalesce(sqlalchemy.func.sum(db.analytics_daily.c.download_count), 0)
+            ).where(
+                db.analytics_daily.c.parent_module_version == values['latest_version_id']
+            ).scalar_subquery()
+
+            update = db.module_provider_summary.update().where(
+                db.module_provider_summary.c.module_provider_id == self.pk
+            ).values(**values)
+            res = conn.execute(update)
+            if not res.rowcount:
+                try:
+                    conn.execute(db.module_provider_summary.insert().values(
+                        module_provider_id=self.pk,
+                        **values
+                    ))
+                except sqlalchemy.exc.IntegrityError:
+                    # If the summary has been inserted since attempting to update it,
+                    # update the new row
+                    conn.execute(update)
+
+        self._cache_summary_row = None
+
+    def clear_summary_row_cache(self):
+        """Remove cached summary row, so that it is re-read, such as after download counts have been modified."""
+        self._cache_summary_row = None
+
+    @staticmethod
+    def increment_summary_download_counts(download_counts: dict):
+        """
+        Increment download counts of module provider summaries, for downloads of the latest version of each module provider.
+
+        download_counts is a dict of number of downloads, keyed by tuple of module provider ID and module version ID.
+        """
+        db = Database.get()
+        with db.get_connection() as conn:
+            for (module_provider_id, module_version_id), count in download_counts.items():
+                conn.execute(db.module_provider_summary.update().where(
+                    db.module_provider_summary.c.module_provider_id == module_provider_id,
+                    db.module_provider_summary.c.latest_version_id == module_version_id
+                ).values(
+                    download_count=db.module_provider_summary.c.download_count + count
+                ))
+
     def delete(self):
         """DELETE module provider, all module version and all associated subversions."""
+        db = Database.get()
+
+        # Remove reference to latest version, before deleting versions
+        self.update_attributes(latest_version_id=None)
+
         # Delete all versions
-        for module_version in self.get_versions(include_beta=True, include_unpublished=True):
-            module_version.delete()
+        deleted_version_count = ModuleVersion.delete_module_versions(
+            module_version_where=(db.module_version.c.module_provider_id == self.pk)
+        )
 
+        # Create single audit event for module provider,
+        # including the number of versions that were deleted
         terrareg.audit.AuditEvent.create_audit_event(
             action=terrareg.audit_action.AuditAction.MODULE_PROVIDER_DELETE,
             object_type=self.__class__.__name__,
             object_id=self.id,
-            old_value=None, new_value=None
+            old_value=f'{deleted_version_count} module versions', new_value=None
         )
 
-        db = Database.get()
-
         with db.get_connection() as conn:
+            # Delete summary of module provider
+            conn.execute(db.module_provider_summary.delete().where(
+                db.module_provider_summary.c.module_provider_id == self.pk
+            ))
+
             # Delete module from module_version table
             delete_statement = db.module_provider.delete().where(
                 db.module_provider.c.id == self.pk
             )
             conn.execute(delete_statement)
 
+        # Remove data directory for module provider and all versions
+        if os.path.isdir(self.base_directory):
+            shutil.rmtree(self.base_directory)
+
+        # Invalidate cached DB row and cached values generated from the module provider
+        self._cache_db_row = None
+        self._cache_summary_row = None
+        IdentityMap.remove(self)
+        self.invalidate_cache()
+
     def get_git_provider(self):
         """Return the git provider associated with this module provider."""
         if self._get_db_row()['git_provider_id']:
@@ -1675,8 +1967,26 @@ class ModuleProvider(object):
         with db.get_connection() as conn:
             conn.execute(update)
 
-        # Remove cached DB row
+        self.update_summary()
+
+        # Remove cached DB row and cached values generated from the module provider
         self._cache_db_row = None
+        IdentityMap.remove(self)
+        self.invalidate_cache()
+
+    @staticmethod
+    def get_cache_tags(namespace_name: str, module_name: str, provider_name: str):
+        """Return tags of cached values generated from module provider."""
+        return (
+            CacheTags.module_provider(namespace_name, module_name, provider_name) +
+            CacheTags.module(namespace_name, module_name)
+        )
+
+    def invalidate_cache(self):
+        """Remove cached values, such as API responses, generated from the module provider."""
+        Cache.invalidate_tags(self.get_cache_tags(
+            self._module._namespace.name, self._module.name, self.name
+        ))
 
     def update_verified(self, verified):
         """Update verified flag of module provider."""
@@ -1951,21 +2261,11 @@ class ModuleProvider(object):
 
     def get_latest_version(self):
         """Return latest published version of module."""
-        db = Database.get()
-        select = sqlalchemy.select(db.module_version.c.version).select_from(db.module_provider).join(
-            db.module_version,
-            db.module_provider.c.latest_version_id==db.module_version.c.id
-        ).where(
-            db.module_provider.c.id==self.pk
-        )
-        with db.get_connection() as conn:
-            res = conn.execute(select)
-            version = res.fetchone()
-
-        if version is None:
+        summary_row = self._get_summary_row()
+        if summary_row is None or summary_row['latest_version'] is None:
             return None
 
-        return ModuleVersion(module_provider=self, version=version['version'])
+        return IdentityMap.resolve(ModuleVersion(module_provider=self, version=summary_row['latest_version']))
 
     def calculate_latest_version(self):
         """Obtain all versions of module and sort by semantec version numbers to obtain latest version."""
@@ -2006,10 +2306,12 @@ class ModuleProvider(object):
         """Return all module provider versions."""
         db = Database.get()
 
-        select = db.select_module_version_joined_module_provider(
-            db.module_version.c.version
+        # Select all columns of module version, except for large deferred
+        # columns, allowing the rows to be cached against each module version object
+        select = sqlalchemy.select(
+            *db.get_non_deferred_columns(db.module_version)
         ).where(
-            db.module_provider.c.id == self.pk
+            db.module_version.c.module_provider_id == self.pk
         )
         # Remove unpublished versions, it not including them
         if not include_unpublished:
@@ -2025,7 +2327,7 @@ class ModuleProvider(object):
         with db.get_connection() as conn:
             res = conn.execute(select)
             module_versions = [
-                ModuleVersion(module_provider=self, version=r['version'])
+                ModuleVersion._from_db_row(module_provider=self, row=r)
                 for r in res
             ]
         module_versions.sort(
@@ -2130,7 +2432,7 @@ class TerraformSpecsObject(object):
     @classmethod
     def get(cls, *args, **kwargs):
         """Create object and ensure the object exists."""
-        obj = cls(*args, **kwargs)
+        obj = IdentityMap.resolve(cls(*args, **kwargs))
 
         # If there is no row, return None
         if obj._get_db_row() is None:
@@ -2142,6 +2444,7 @@ class TerraformSpecsObject(object):
         """Setup member variables."""
         self._module_specs = None
         self._tfsec_results = None
+        self._cache_module_details = None
 
     @property
     def module_version(self):
@@ -2173,6 +2476,11 @@ class TerraformSpecsObject(object):
         """Return primary key of database row"""
         return self._get_db_row()['id']
 
+    @property
+    def _identity_key(self):
+        """Return key for identifying object in identity map."""
+        return self.id
+
     @property
     def registry_id(self):
         """Return registry path ID (with excludes version)."""
@@ -2280,27 +2588,53 @@ module "{self.module_version.module_provider.module.name}" {{
 
             module_details = self.module_details
             if module_details:
-                raw_json = Database.decode_blob(module_details.terraform_docs)
-                if raw_json:
-                    module_specs = json.loads(raw_json)
+                module_specs = module_details.get_module_specs()
             self._module_specs = module_specs
         return self._module_specs
 
     def get_readme_html(self, server_hostname):
-        """Replace examples in README and convert readme markdown to HTML"""
+        """
+        Replace examples in README and convert readme markdown to HTML.
+
+        The rendered HTML is cached between requests.
+        """
+        module_details = self.module_details
+        if not module_details:
+            return None
+
+        cache_key = self._get_readme_html_cache_key(module_details, server_hostname)
+        readme_html = RenderedHtmlCache.get(module_details.pk, 'README.md', cache_key)
+        if readme_html is not None:
+            return readme_html
+
         readme_md = self.get_readme_content(sanitise=False)
         if readme_md:
             readme_md = self.replace_source_in_file(
                 readme_md, server_hostname)
             readme_html = convert_markdown_to_html(file_name='README.md', markdown_html=readme_md)
-            return sanitise_html_content(readme_html, allow_markdown_html=True)
+            readme_html = sanitise_html_content(readme_html, allow_markdown_html=True)
+            RenderedHtmlCache.put(module_details.pk, 'README.md', cache_key, readme_html)
+            return readme_html
         return None
 
+    def _get_readme_html_cache_key(self, module_details, server_hostname):
+        """Return values, other than the module details, that the README HTML is rendered from."""
+        db_row = module_details._get_db_row()
+        return (
+            db_row['readme_content_sha256'] if db_row else None,
+            self.get_terraform_url_and_version_strings(request_domain=server_hostname, module_path=''),
+            tuple(self.module_version.get_terraform_example_version_comment())
+        )
+
     @property
     def module_details(self):
         """Return instance of ModuleDetails for object."""
         if self._get_db_row() and self._get_db_row()['module_details_id']:
-            return ModuleDetails(id=self._get_db_row()['module_details_id'])
+            module_details_id = self._get_db_row()['module_details_id']
+            # Re-use module details object, unless module details ID has changed
+            if self._cache_module_details is None or self._cache_module_details.pk != module_details_id:
+                self._cache_module_details = ModuleDetails(id=module_details_id)
+            return self._cache_module_details
         else:
             return None
 
@@ -2458,6 +2792,12 @@ class ModuleVersion(TerraformSpecsObject):
             raise InvalidVersionError('Version is invalid')
         return bool(match.group(1))
 
+    @staticmethod
+    def _split_version(version):
+        """Return tuple of major, minor and patch numbers of version."""
+        major, minor, patch = version.split('-', 1)[0].split('.')
+        return int(major), int(minor), int(patch)
+
     @property
     def is_submodule(self):
         """Whether object is submodule."""
@@ -2563,7 +2903,7 @@ class ModuleVersion(TerraformSpecsObject):
     @property
     def variable_template(self):
         """Return variable template for module version."""
-        raw_json = Database.decode_blob(self._get_db_row()['variable_template'])
+        raw_json = Database.decode_blob(self._get_deferred_column('variable_template'))
         variables = json.loads(raw_json) if raw_json else []
 
         # Set default values for each user-defined variable
@@ -2667,12 +3007,22 @@ class ModuleVersion(TerraformSpecsObject):
         """Return whether the version is the latest version for the module provider"""
         return self._module_provider.get_latest_version() == self
 
+    @classmethod
+    def _from_db_row(cls, module_provider: ModuleProvider, row):
+        """Return instance of object, using pre-fetched database row."""
+        obj = IdentityMap.resolve(cls(module_provider=module_provider, version=row['version']))
+        if obj._cache_db_row is None:
+            obj._cache_db_row = row
+            IdentityMap.add(obj)
+        return obj
+
     def __init__(self, module_provider: ModuleProvider, version: str):
         """Setup member variables."""
         self._extracted_beta_flag = self._validate_version(version)
         self._module_provider = module_provider
         self._version = version
         self._cache_db_row = None
+        self._cache_deferred_columns = {}
         super(ModuleVersion, self).__init__()
 
     def __eq__(self, __o):
@@ -2684,8 +3034,17 @@ class ModuleVersion(TerraformSpecsObject):
     def _get_db_row(self):
         """Get object from database"""
         if self._cache_db_row is None:
+            # Use row from pre-existing object in current request, if available
+            mapped_obj = IdentityMap.get(self)
+            if mapped_obj is not None and mapped_obj is not self:
+                self._cache_db_row = mapped_obj._get_db_row()
+                self._cache_deferred_columns = mapped_obj._cache_deferred_columns
+                return self._cache_db_row
+
             db = Database.get()
-            select = db.module_version.select().join(
+            select = sqlalchemy.select(
+                *db.get_non_deferred_columns(db.module_version)
+            ).select_from(db.module_version).join(
                 db.module_provider, db.module_version.c.module_provider_id == db.module_provider.c.id
             ).where(
                 db.module_provider.c.id == self._module_provider.pk,
@@ -2694,8 +3053,24 @@ class ModuleVersion(TerraformSpecsObject):
             with db.get_connection() as conn:
                 res = conn.execute(select)
                 self._cache_db_row = res.fetchone()
+
+            if self._cache_db_row is not None:
+                IdentityMap.add(self)
         return self._cache_db_row
 
+    def _get_deferred_column(self, column):
+        """Return value of large column, which is not obtained with the database row, caching the value."""
+        if column not in self._cache_deferred_columns:
+            db = Database.get()
+            select = self.get_db_where(
+                db=db,
+                statement=sqlalchemy.select(db.module_version.c[column])
+            )
+            with db.get_connection() as conn:
+                row = conn.execute(select).fetchone()
+            self._cache_deferred_columns[column] = row[column] if row else None
+        return self._cache_deferred_columns[column]
+
     def get_terraform_example_version_string(self):
         """Return formatted string of version parameter for example Terraform."""
         # For beta versions, pass an exact version constraint.
@@ -2921,6 +3296,11 @@ class ModuleVersion(TerraformSpecsObject):
 
     def get_total_downloads(self):
         """Obtain total number of downloads for module version."""
+        # Use download count from module provider summary for the latest version
+        summary_row = self._module_provider._get_summary_row()
+        if summary_row is not None and summary_row['latest_version_id'] == self.pk:
+            return summary_row['download_count']
+
         return terrareg.analytics.AnalyticsEngine.get_module_version_total_downloads(
             module_version=self
         )
@@ -2949,7 +3329,7 @@ class ModuleVersion(TerraformSpecsObject):
         api_details.update(self.get_api_details(target_terraform_version=target_terraform_version))
 
         tab_files = [module_version_file.path for module_version_file in self.module_version_files]
-        additional_module_tabs = json.loads(terrareg.config.Config().ADDITIONAL_MODULE_TABS)
+        additional_module_tabs = terrareg.config.Config().additional_module_tabs
         tab_file_mapping = {}
         for tab_config in additional_module_tabs:
             for file in tab_config[1]:
@@ -3014,33 +3394,100 @@ class ModuleVersion(TerraformSpecsObject):
                 kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
 
         db = Database.get()
+        is_latest_version = self._module_provider._get_db_row()['latest_version_id'] == self.pk
         update = self.get_db_where(
             db=db, statement=db.module_version.update()
         ).values(**kwargs)
         with db.get_connection() as conn:
             conn.execute(update)
 
-        # Clear cached DB row
+        # Clear cached DB row, deferred column values and cached values generated from the module provider
         self._cache_db_row = None
+        self._cache_deferred_columns.clear()
+        IdentityMap.remove(self)
+        if is_latest_version:
+            self._module_provider.update_summary()
+        self._module_provider.invalidate_cache()
 
-    def delete(self, delete_related_analytics=True):
-        """Delete module version and all associated submodules."""
-        for example in self.get_examples():
-            example.delete()
+    @classmethod
+    def delete_module_versions(cls, module_version_where, delete_related_analytics=True):
+        """
+        Delete all module versions matching where clause on the module_version table,
+        along with their submodules, examples, example files, additional files and module details.
+
+        Rows are deleted with set-based statements, rather than deleting each object individually.
+        Returns number of deleted module versions.
+        """
+        db = Database.get()
+        module_version_ids = sqlalchemy.select(db.module_version.c.id).where(module_version_where)
+        submodule_ids = sqlalchemy.select(db.sub_module.c.id).where(
+            db.sub_module.c.parent_module_version.in_(module_version_ids)
+        )
+
+        with db.get_connection() as conn:
+            # Obtain IDs of module details for module versions and submodules,
+            # which are deleted after the rows that reference them
+            module_details_ids = [
+                row['module_details_id']
+                for row in conn.execute(sqlalchemy.union(
+                    sqlalchemy.select(db.module_version.c.module_details_id).where(module_version_where),
+                    sqlalchemy.select(db.sub_module.c.module_details_id).where(
+                        db.sub_module.c.parent_module_version.in_(module_version_ids)
+                    )
+                )).fetchall()
+                if row['module_details_id'] is not None
+            ]
 
-        for submodule in self.get_submodules():
-            submodule.delete()
+            # Obtain IDs of module providers of module versions,
+            # to determine which no longer have any module versions
+            module_provider_ids = [
+                row['module_provider_id']
+                for row in conn.execute(
+                    sqlalchemy.select(db.module_version.c.module_provider_id).where(
+                        module_version_where
+                    ).group_by(db.module_version.c.module_provider_id)
+                ).fetchall()
+            ]
+
+            conn.execute(db.example_file.delete().where(
+                db.example_file.c.submodule_id.in_(submodule_ids)
+            ))
+            conn.execute(db.sub_module.delete().where(
+                db.sub_module.c.parent_module_version.in_(module_version_ids)
+            ))
+            conn.execute(db.module_version_file.delete().where(
+                db.module_version_file.c.module_version_id.in_(module_version_ids)
+            ))
 
         if delete_related_analytics:
-            terrareg.analytics.AnalyticsEngine.delete_analytics_for_module_version(self)
+            terrareg.analytics.AnalyticsEngine.delete_analytics_for_module_version_ids(module_version_ids)
 
-        # Delete associated module details
-        module_details = self.module_details
-        if module_details:
-            module_details.delete()
+        with db.get_connection() as conn:
+            res = conn.execute(db.module_version.delete().where(module_version_where))
 
-        db = Database.get()
+            remaining_module_provider_count = conn.execute(
+                sqlalchemy.select(
+                    sqlalchemy.func.count(sqlalchemy.distinct(db.module_version.c.module_provider_id))
+                ).where(
+                    db.module_version.c.module_provider_id.in_(module_provider_ids)
+                )
+            ).scalar() if module_provider_ids else 0
+
+        ModuleDetails.delete_by_ids(module_details_ids)
+
+        GlobalStatistics.increment(GlobalStatistic.MODULE_VERSION_COUNT, -res.rowcount)
+        GlobalStatistics.increment(
+            GlobalStatistic.MODULE_PROVIDER_COUNT,
+            remaining_module_provider_count - len(module_provider_ids))
+        GlobalStatistics.reset(GlobalStatistic.MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK)
+
+        # Remove any objects for deleted rows from the identity map
+        IdentityMap.clear()
 
+        return res.rowcount
+
+    def delete(self, delete_related_analytics=True):
+        """Delete module version and all associated submodules."""
         terrareg.audit.AuditEvent.create_audit_event(
             action=terrareg.audit_action.AuditAction.MODULE_VERSION_DELETE,
             object_type=self.__class__.__name__,
@@ -3049,15 +3496,16 @@ class ModuleVersion(TerraformSpecsObject):
             new_value=None
         )
 
-        with db.get_connection() as conn:
-            # Delete module from module_version table
-            delete_statement = db.module_version.delete().where(
-                db.module_version.c.id == self.pk
-            )
-            conn.execute(delete_statement)
+        db = Database.get()
+        self.delete_module_versions(
+            module_version_where=(db.module_version.c.id == self.pk),
+            delete_related_analytics=delete_related_analytics
+        )
 
-            # Invalidate cache for previous DB row
-            self._cache_db_row = None
+        # Invalidate cache for previous DB row and cached values generated from the module provider
+        self._cache_db_row = None
+        self._cache_deferred_columns.clear()
+        self._module_provider.invalidate_cache()
 
         # Update latest version of parent module
         new_latest_version = self._module_provider.calculate_latest_version()
@@ -3091,16 +3539,33 @@ class ModuleVersion(TerraformSpecsObject):
             self.delete(delete_related_analytics=False)
 
         with db.get_connection() as conn:
+            # Determine if module provider has any existing versions
+            is_first_version = conn.execute(
+                sqlalchemy.select(db.module_version.c.id).where(
+                    db.module_version.c.module_provider_id == self._module_provider.pk
+                ).limit(1)
+            ).fetchone() is None
+
             # Insert new module into table
+            version_major, version_minor, version_patch = self._split_version(self.version)
             insert_statement = db.module_version.insert().values(
                 module_provider_id=self._module_provider.pk,
                 version=self.version,
+                version_major=version_major,
+                version_minor=version_minor,
+                version_patch=version_patch,
                 published=False,
                 beta=self._extracted_beta_flag,
                 internal=False
             )
             conn.execute(insert_statement)
 
+        GlobalStatistics.increment(GlobalStatistic.MODULE_VERSION_COUNT)
+        if is_first_version:
+            GlobalStatistics.increment(GlobalStatistic.MODULE_PROVIDER_COUNT)
+
+        self._module_provider.invalidate_cache()
+
         # Migrate analytics from old module version ID to new module version
         if old_module_version_pk is not None:
             terrareg.analytics.AnalyticsEngine.migrate_analytics_to_new_module_version(
@@ -3118,12 +3583,9 @@ class ModuleVersion(TerraformSpecsObject):
             db.sub_module.c.type == Submodule.TYPE
         )
         with db.get_connection() as conn:
-            res = conn.execute(select)
+            rows = conn.execute(select).fetchall()
 
-            return [
-                Submodule(module_version=self, module_path=r['path'])
-                for r in res
-            ]
+        return Submodule._from_db_rows(module_version=self, rows=rows)
 
     def get_examples(self):
         """Return list of submodules."""
@@ -3134,12 +3596,9 @@ class ModuleVersion(TerraformSpecsObject):
             db.sub_module.c.type == Example.TYPE
         )
         with db.get_connection() as conn:
-            res = conn.execute(select)
+            rows = conn.execute(select).fetchall()
 
-            return [
-                Example(module_version=self, module_path=r['path'])
-                for r in res
-            ]
+        return Example._from_db_rows(module_version=self, rows=rows)
 
 
 class BaseSubmodule(TerraformSpecsObject):
@@ -3223,6 +3682,23 @@ class BaseSubmodule(TerraformSpecsObject):
         """Return module version"""
         return self._module_version
 
+    @classmethod
+    def _from_db_rows(cls, module_version: ModuleVersion, rows):
+        """
+        Return list of objects from pre-fetched database rows,
+        obtaining module details for all objects in a single query.
+        """
+        module_details = ModuleDetails.get_by_ids(
+            [row['module_details_id'] for row in rows if row['module_details_id']]
+        )
+        objects = []
+        for row in rows:
+            obj = cls(module_version=module_version, module_path=row['path'])
+            obj._cache_db_row = row
+            obj._cache_module_details = module_details.get(row['module_details_id'])
+            objects.append(obj)
+        return objects
+
     def __init__(self, module_version: ModuleVersion, module_path: str):
         self._module_version = module_version
         self._module_path = module_path
@@ -3421,12 +3897,12 @@ class FileObject:
         self._cache_db_row = None
 
     def delete(self):
-        """Delete example file from DB."""
+        """Delete file from DB."""
         db = Database.get()
 
         with db.get_connection() as conn:
-            delete_statement = db.example_file.delete().where(
-                db.example_file.c.id == self.pk
+            delete_statement = self.get_db_table().delete().where(
+                self.get_db_table().c.id == self.pk
             )
             conn.execute(delete_statement)
 
@@ -3457,6 +3933,30 @@ class ExampleFile(FileObject):
         # Return instance of object
         return cls(example=example, path=path)
 
+    @classmethod
+    def create_many(cls, example: Example, files: dict):
+        """
+        Create example files, with content, using a single insert statement.
+
+        Files are provided as a dict of file path to file content.
+        """
+        if not files:
+            return []
+
+        db = Database.get()
+        submodule_id = example.pk
+        with db.get_connection() as conn:
+            conn.execute(db.example_file.insert(), [
+                {
+                    'submodule_id': submodule_id,
+                    'path': path,
+                    'content': Database.encode_blob(content)
+                }
+                for path, content in files.items()
+            ])
+
+        return [cls(example=example, path=path) for path in files]
+
     @staticmethod
     def get_by_path(module_version: ModuleVersion, file_path: str):
         """Return example file object by file path and module version"""
@@ -3557,11 +4057,51 @@ class ModuleVersionFile(FileObject):
         # Return instance of object
         return cls(module_version=module_version, path=path)
 
+    @classmethod
+    def create_many(cls, module_version: ModuleVersion, files: dict):
+        """
+        Create module version files, with content, using a single insert statement.
+
+        Files are provided as a dict of file path to file content.
+        """
+        if not files:
+            return []
+
+        db = Database.get()
+        module_version_id = module_version.pk
+        with db.get_connection() as conn:
+            conn.execute(db.module_version_file.insert(), [
+                {
+                    'module_version_id': module_version_id,
+                    'path': path,
+                    'content': Database.encode_blob(content)
+                }
+                for path, content in files.items()
+            ])
+
+        return [cls(module_version=module_version, path=path) for path in files]
+
     def __init__(self, module_version: ModuleVersion, path: str):
         """Store identifying data."""
         self._module_version = module_version
         super(ModuleVersionFile, self).__init__(path)
 
+    def update_attributes(self, **kwargs):
+        """Update DB row and remove cached rendered HTML."""
+        super(ModuleVersionFile, self).update_attributes(**kwargs)
+        self._invalidate_rendered_html()
+
+    def delete(self):
+        """Delete from DB and remove cached rendered HTML."""
+        super(ModuleVersionFile, self).delete()
+        self._invalidate_rendered_html()
+
+    def _invalidate_rendered_html(self):
+        """Remove cached rendered HTML for files of module version."""
+        module_details = self._module_version.module_details
+        if module_details is not None:
+            RenderedHtmlCache.invalidate(module_details.pk)
+
     def _get_db_row(self):
         """Return DB row for git provider."""
         if self._cache_db_row is None:
@@ -3576,7 +4116,25 @@ class ModuleVersionFile(FileObject):
         return self._cache_db_row
 
     def get_content(self):
-        """Return content to be displayed in UI"""
+        """
+        Return content to be displayed in UI.
+
+        The rendered HTML is cached between requests, using the module details of the module version.
+        """
+        module_details = self._module_version.module_details
+        if module_details is not None:
+            content = RenderedHtmlCache.get(module_details.pk, self.path, ())
+            if content is not None:
+                return content
+
+        content = self._render_content()
+
+        if module_details is not None:
+            RenderedHtmlCache.put(module_details.pk, self.path, (), content)
+        return content
+
+    def _render_content(self):
+        """Return sanitised HTML for content of file."""
         # Convert markdown files to HTML
         if self.path.lower().endswith('.md'):
             # Perform sanitisation of markdown after
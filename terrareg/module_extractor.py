@@ -23,6 +23,7 @@ import markdown
 
 from terrareg.models import BaseSubmodule, Example, ExampleFile, ModuleVersion, Submodule, ModuleDetails, ModuleVersionFile
 from terrareg.database import Database
+from terrareg.module_graph import ModuleGraph
 from terrareg.errors import (
     UnableToProcessTerraformError,
     UnknownFiletypeError,
@@ -35,6 +36,7 @@ from terrareg.errors import (
 from terrareg.utils import PathDoesNotExistError, get_public_url_details, safe_iglob, safe_join_paths
 from terrareg.config import Config
 from terrareg.constants import EXTRACTION_VERSION
+from terrareg.server_metrics import ServerMetrics
 
 
 class ModuleExtractor:
@@ -98,7 +100,8 @@ class ModuleExtractor:
                 os.unlink(terraform_docs_config_path)
 
         try:
-            terradocs_output = subprocess.check_output(['terraform-docs', 'json', module_path])
+            with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='terraform_docs'):
+                terradocs_output = subprocess.check_output(['terraform-docs', 'json', module_path])
         except subprocess.CalledProcessError as exc:
             raise UnableToProcessTerraformError(
                 'An error occurred whilst processing the terraform code.' +
@@ -125,11 +128,12 @@ class ModuleExtractor:
 
             # Run tfswitch
             try:
-                subprocess.check_output(
-                    ["tfswitch", "--mirror", Config().TERRAFORM_ARCHIVE_MIRROR, "--bin", self.terraform_binary],
-                    env=tfswitch_env,
-                    cwd=module_path
-                )
+                with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='tfswitch'):
+                    subprocess.check_output(
+                        ["tfswitch", "--mirror", Config().TERRAFORM_ARCHIVE_MIRROR, "--bin", self.terraform_binary],
+                        env=tfswitch_env,
+                        cwd=module_path
+                    )
             except subprocess.CalledProcessError as exc:
                 print("An error occured whilst running tfswitch:", str(exc))
                 raise TerraformVersionSwitchError(
@@ -144,12 +148,13 @@ class ModuleExtractor:
     def _run_tfsec(self, module_path):
         """Run tfsec and return output."""
         try:
-            raw_output = subprocess.check_output([
-                'tfsec',
-                '--ignore-hcl-errors', '--format', 'json', '--no-module-downloads', '--soft-fail',
-                '--no-colour', '--include-ignored', '--include-passed', '--disable-grouping',
-                module_path
-            ])
+            with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='tfsec'):
+                raw_output = subprocess.check_output([
+                    'tfsec',
+                    '--ignore-hcl-errors', '--format', 'json', '--no-module-downloads', '--soft-fail',
+                    '--no-colour', '--include-ignored', '--include-passed', '--disable-grouping',
+                    module_path
+                ])
         except subprocess.CalledProcessError as exc:
             raise UnableToProcessTerraformError(
                 'An error occurred whilst performing security scan of code.' +
@@ -228,7 +233,8 @@ terraform {{
         self._override_tf_backend(module_path=module_path)
 
         try:
-            subprocess.check_call([self.terraform_binary, "init"], cwd=module_path)
+            with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='terraform_init'):
+                subprocess.check_call([self.terraform_binary, "init"], cwd=module_path)
         except subprocess.CalledProcessError:
             return False
         return True
@@ -236,10 +242,11 @@ terraform {{
     def _get_graph_data(self, module_path):
         """Run inframap and generate graphiz"""
         try:
-            terraform_graph_data = subprocess.check_output(
-                [self.terraform_binary, "graph"],
-                cwd=module_path
-            )
+            with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='terraform_graph'):
+                terraform_graph_data = subprocess.check_output(
+                    [self.terraform_binary, "graph"],
+                    cwd=module_path
+                )
         except subprocess.CalledProcessError as exc:
             print("Failed to generate Terraform graph data:", str(exc))
             print(exc.output.decode('utf-8'))
@@ -296,32 +303,49 @@ terraform {{
         """Extract addition files for populating tabs in UI"""
         config = Config()
 
-        files_extracted = []
+        files_extracted = {}
         # Iterate through all files of all additionally defined tabs
-        for tab_config in json.loads(config.ADDITIONAL_MODULE_TABS):
+        for tab_config in config.additional_module_tabs:
             for file_name in tab_config[1]:
                 path = safe_join_paths(self.extract_directory, file_name)
                 # Check if file exists
                 if file_name in files_extracted or not os.path.exists(path):
                     continue
 
-                # Read file contents and create DB record
+                # Read file contents
                 with open(path, 'r') as fh:
-                    file_content = ''.join(fh.readlines())
+                    files_extracted[file_name] = ''.join(fh.readlines())
 
-                module_version_file = ModuleVersionFile.create(module_version=self._module_version, path=file_name)
-                module_version_file.update_attributes(content=file_content)
+        # Create DB records for all files
+        ModuleVersionFile.create_many(module_version=self._module_version, files=files_extracted)
 
     def _generate_archive(self):
         """Generate archive of extracted module"""
-        # Create tar.gz
-        with tarfile.open(self._module_version.archive_path_tar_gz, "w:gz") as tar:
-            tar.add(self.extract_directory, arcname='', recursive=True)
-        # Create zip
-        shutil.make_archive(
-            re.sub(r'\.zip$', '', self._module_version.archive_path_zip),
-            'zip',
-            self.extract_directory)
+        with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='archive'):
+            # Create tar.gz
+            with tarfile.open(self._module_version.archive_path_tar_gz, "w:gz") as tar:
+                tar.add(self.extract_directory, arcname='', recursive=True)
+            # Create zip
+            shutil.make_archive(
+                re.sub(r'\.zip$', '', self._module_version.archive_path_zip),
+                'zip',
+                self.extract_directory)
+
+    @staticmethod
+    def _generate_graph_json(terraform_graph, infracost):
+        """
+        Generate graph JSON for each combination of graph options.
+
+        Returns None if terraform graph output is not available or graph JSON could not be generated,
+        in which case, graph data is generated when it is requested.
+        """
+        if not terraform_graph:
+            return None
+        try:
+            return json.dumps(ModuleGraph.generate_all(terraform_graph=terraform_graph, infracost=infracost))
+        except Exception as exc:
+            print('An error occured whilst generating graph data:', str(exc))
+            return None
 
     def _create_module_details(self, readme_content, terraform_docs, tfsec, terraform_graph, infracost=None):
         """Create module details row."""
@@ -331,7 +355,8 @@ terraform {{
             terraform_docs=json.dumps(terraform_docs),
             tfsec=json.dumps(tfsec),
             infracost=json.dumps(infracost) if infracost else None,
-            terraform_graph=terraform_graph
+            terraform_graph=terraform_graph,
+            terraform_graph_json=self._generate_graph_json(terraform_graph=terraform_graph, infracost=infracost)
         )
         return module_details
 
@@ -427,12 +452,13 @@ terraform {{
         with tempfile.NamedTemporaryFile(delete=False) as output_file:
             output_file.close()
             try:
-                subprocess.check_output(
-                    ['infracost', 'breakdown', '--path', example.path,
-                     '--format', 'json', '--out-file', output_file.name],
-                    cwd=self.module_directory,
-                    env=infracost_env
-                )
+                with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='infracost'):
+                    subprocess.check_output(
+                        ['infracost', 'breakdown', '--path', example.path,
+                         '--format', 'json', '--out-file', output_file.name],
+                        cwd=self.module_directory,
+                        env=infracost_env
+                    )
             except subprocess.CalledProcessError as exc:
                 raise UnableToProcessTerraformError(
                     'An error occurred whilst performing cost analysis of code.' +
@@ -449,6 +475,7 @@ terraform {{
     def _extract_example_files(self, example: Example):
         """Extract all terraform files in example and insert into DB"""
         example_base_dir = safe_join_paths(self.module_directory, example.path)
+        example_files = {}
         for extension in Config().EXAMPLE_FILE_EXTENSIONS:
             for tf_file_path in safe_iglob(base_dir=example_base_dir,
                                         pattern=f'*.{extension}',
@@ -459,13 +486,10 @@ terraform {{
 
                 # Obtain contents of file
                 with open(tf_file_path, 'r') as file_fd:
-                    content = ''.join(file_fd.readlines())
+                    example_files[tf_file] = ''.join(file_fd.readlines())
 
-                # Create example file and update content attribute
-                example_file = ExampleFile.create(example=example, path=tf_file)
-                example_file.update_attributes(
-                    content=content
-                )
+        # Create all example files, with content
+        ExampleFile.create_many(example=example, files=example_files)
 
     def _scan_submodules(self, subdirectory: str, submodule_class: Type[BaseSubmodule]):
         """Scan for submodules and extract details."""
@@ -687,16 +711,17 @@ class GitModuleExtractor(ModuleExtractor):
         git_url = self._module_version._module_provider.get_git_clone_url()
 
         try:
-            subprocess.check_output([
-                    'git', 'clone', '--single-branch',
-                    '--branch', self._module_version.source_git_tag,
-                    git_url,
-                    self.extract_directory
-                ],
-                stderr=subprocess.STDOUT,
-                env=env,
-                timeout=Config().GIT_CLONE_TIMEOUT
-            )
+            with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='clone'):
+                subprocess.check_output([
+                        'git', 'clone', '--single-branch',
+                        '--branch', self._module_version.source_git_tag,
+                        git_url,
+                        self.extract_directory
+                    ],
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    timeout=Config().GIT_CLONE_TIMEOUT
+                )
         except subprocess.CalledProcessError as exc:
             error = 'Unknown error occurred during git clone'
             for line in exc.output.decode('utf-8').split('\n'):
@@ -0,0 +1,242 @@
+"""Provide generation of graph data for modules, from terraform graph output."""
+
+import re
+
+import pygraphviz
+import networkx as nx
+
+
+class ModuleGraph:
+    """Generate Cytoscape graph JSON from terraform graph output."""
+
+    # Combinations of full_resource_names and full_module_names options,
+    # that graph JSON is pre-computed for
+    OPTION_COMBINATIONS = [
+        (False, False),
+        (False, True),
+        (True, False),
+        (True, True),
+    ]
+
+    @staticmethod
+    def get_key(full_resource_names: bool, full_module_names: bool):
+        """Return key of graph JSON for combination of options."""
+        return 'full_resource_names={},full_module_names={}'.format(
+            str(bool(full_resource_names)).lower(),
+            str(bool(full_module_names)).lower()
+        )
+
+    @classmethod
+    def generate_all(cls, terraform_graph: str, infracost: dict):
+        """Return dict of graph JSON for each combination of options, keyed by get_key."""
+        return {
+            cls.get_key(full_resource_names, full_module_names): cls.generate(
+                terraform_graph=terraform_graph,
+                infracost=infracost,
+                full_resource_names=full_resource_names,
+                full_module_names=full_module_names
+            )
+            for full_resource_names, full_module_names in cls.OPTION_COMBINATIONS
+        }
+
+    @staticmethod
+    def generate(terraform_graph: str, infracost: dict, full_resource_names: bool=False, full_module_names: bool=False):
+        """Return graph JSON for resources."""
+        # Generate NX graph from terraform graphviz output
+        graph = pygraphviz.AGraph(terraform_graph)
+        nx_graph = nx.nx_agraph.from_agraph(graph)
+
+        resource_costs = {}
+        remove_item_iteration_re = re.compile(r'\[[^\]]+\]')
+        if infracost:
+            for resource in infracost["projects"][0]["breakdown"]["resources"]:
+                if not resource["monthlyCost"]:
+                    continue
+
+                name = remove_item_iteration_re.sub("", resource["name"])
+                if name not in resource_costs:
+                    resource_costs[name] = 0
+                resource_costs[name] += round((float(resource["monthlyCost"]) * 12), 2)
+
+        module_var_output_local_re = re.compile(r'^(module\.[^\.]+\.)+(var|local|output)\.[^\.]+$')
+        # Capture modules resources, such as:
+        # module.module1
+        # module.module1.module.module2
+        module_re = re.compile(r'^(?:module\.[^\.]+\.)*(?:module\.([^\.]+))$')
+        # Capture data resources, such as:
+        # data.aws_s3_bucket.test
+        # module.module1.data.aws_s3_bucket.test
+        # module.module1.module.module2.data.aws_s3_bucket.test
+        data_re = re.compile(r'^((?:module\.[^\.]+\.)+)data\.([^\.]+)\.([^\.])+$')
+        # Capture resources, such as:
+        # aws_s3_bucket.test
+        # module.module1.aws_s3_bucket.test
+        # module.module1.module.module2.aws_s3_bucket.test
+        resource_re = re.compile(r'^((?:module\.[^\.]+\.)*)([^\.]+)\.([^\.]+)$')
+
+        # Store node renames, to be renamed after initial iteration
+        renames = {}
+        # Store nodes to be removed
+        to_remove = []
+        # Store labels to be pushed to graph JSON
+        labels = {}
+        # Stoe type mappings for determing node attributes
+        type_mapping = {}
+        # Store parents of attirbutes to modules, used for
+        # parent mapping in JSON
+        parents = {}
+
+        def remove_node(node):
+            """Add a node to the remove_nodes list, if they are not already present"""
+            if node not in to_remove:
+                to_remove.append(node)
+
+        for node_label in nx_graph.nodes:
+            # Remove leading '[root] ' name and expand/close suffices from node names
+            name = node_label.replace('[root] ', '').replace(' (expand)', '').replace(' (close)', '')
+
+            # Check for root vars, outputs and locals
+            if name.startswith('output.') or name.startswith('var.') or name.startswith('local.'):
+                remove_node(node_label)
+
+            # Remove any module vars/outputs/locals
+            elif module_var_output_local_re.match(name):
+                remove_node(node_label)
+
+            # handle all other nodes
+            else:
+                # Rename to shortened name
+                renames[node_label] = name
+
+                # Match node name to type regexes
+                module_match = module_re.match(name)
+                resource_match = resource_re.match(name)
+                data_match = data_re.match(name)
+
+                # Create labels and type mapping
+                if name == "root":
+                    # Match root module
+                    labels[name] = "Root Module"
+                    type_mapping[name] = "module"
+
+                # Match submodules
+                elif module_match:
+                    if full_module_names:
+                        labels[name] = name
+                    else:
+                        labels[name] = module_match.group(1)
+
+                    type_mapping[name] = "module"
+
+                elif data_match:
+                    type_mapping[name] = "data"
+                    parents[name] = data_match.group(1).strip(".") or "root"
+
+                    if full_resource_names:
+                        labels[name] = name
+                    else:
+                        labels[name] = f"(data) {data_match.group(2)}.{data_match.group(3)}"
+
+                # Ensure resource RE is performed last,
+                # as this could also match module_re
+                elif resource_match:
+                    type_mapping[name] = "resource"
+                    if full_resource_names:
+                        labels[name] = name
+                    else:
+                        labels[name] = f"{resource_match.group(2)}.{resource_match.group(3)}"
+
+                    # Add cost to label, if available
+                    if name in resource_costs:
+                        labels[name] += f" (${resource_costs[name]}/year)"
+                    parents[name] = resource_match.group(1).strip(".") or "root"
+
+                # Discard any unrecognised types
+                else:
+                    remove_node(name)
+                    print("Unable to match node to type", name)
+
+        # Perform rename of nodes
+        nx_graph = nx.relabel_nodes(nx_graph, renames)
+
+        # Remove any nodes marked for removal
+        for node in to_remove:
+            nx_graph.remove_node(node)
+
+        # Convert to JSON for cytoscape
+        cytoscape_json = {
+            "nodes": [],
+            "edges": []
+        }
+
+        for node in nx_graph.nodes:
+            data = {
+                "id": node,
+                "label": labels.get(node),
+                "child_count": list(parents.values()).count(node)
+            }
+
+            style = {}
+            if type_mapping[node] == "module":
+                style = {
+                    'color': '#000000',
+                    'background-color': '#F8F7F9',
+                    'font-weight': 'bold',
+                    'text-valign': 'top',
+                }
+            # Add red outline to resources that have an associated cost
+            if node in resource_costs:
+                style['border-style'] = 'solid'
+                style['border-width'] = '2px'
+                style['border-color'] = 'red'
+
+            # Add parent if available
+            parent = parents.get(node, None)
+            if parent:
+                data["parent"] = parent
+
+            cytoscape_json["nodes"].append({
+                "data": data,
+                "style": style
+            })
+
+        # Add edges to graph
+        seen_module_links = []
+        for edge in nx_graph.edges:
+            # Only add edges for module-module links
+            if (type_mapping[edge[0]] == "module" and type_mapping[edge[1]] == "module" and
+                    # Only link modules in one direction, where module is a sub-module of another,
+                    # to avoid links in both directions
+                    edge[0] in edge[1]):
+                # Mark module as having been seen in edges
+                seen_module_links.append(edge[1])
+
+                cytoscape_json["edges"].append({
+                    "data": {
+                        "id": f"{edge[0]}.{edge[1]}",
+                        "source": edge[0],
+                        "target": edge[1]
+                    },
+                    "classes": [
+                        f"{type_mapping[edge[0]]}-{type_mapping[edge[1]]}"
+                    ]
+                })
+
+        # Iterate through all modukes...
+        for module, type_mapping in type_mapping.items():
+            if type_mapping == "module":
+                # If a module link has not already been seen,
+                # add a link to root module
+                if module not in seen_module_links and module != "root":
+                    cytoscape_json["edges"].append({
+                        "data": {
+                            "id": f"root.{module}",
+                            "source": module,
+                            "target": "root"
+                        },
+                        "classes": [
+                            f"{module}-root"
+                        ]
+                    })
+
+        return cytoscape_json
@@ -0,0 +1,71 @@
+"""Provide generation of graph JSON for existing module details."""
+
+import time
+
+import sqlalchemy
+
+from terrareg.database import Database
+import terrareg.models
+
+
+class ModuleGraphBackfiller:
+    """
+    Generate and store graph JSON for module details that have terraform graph output,
+    but were extracted before graph JSON was pre-computed.
+
+    Rows are processed in batches, with an optional delay between batches,
+    to limit the load on the database when run against a live installation.
+    """
+
+    def __init__(self, batch_size: int=100, batch_delay: float=0):
+        """Store member variables."""
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+
+    def run(self):
+        """Generate graph JSON for all module details without graph JSON, returning the number of updated rows."""
+        db = Database.get()
+        updated_rows = 0
+        last_id = 0
+
+        while True:
+            # Select module details with terraform graph output and
+            # without graph JSON, either stored against the row or in the blob store
+            select = sqlalchemy.select(
+                db.module_details.c.id
+            ).select_from(
+                db.module_details.outerjoin(
+                    db.blob_store,
+                    db.blob_store.c.sha256 == db.module_details.c.terraform_graph_json_sha256
+                )
+            ).where(
+                db.module_details.c.id > last_id,
+                sqlalchemy.or_(
+                    db.module_details.c.terraform_graph != None,
+                    db.module_details.c.terraform_graph_sha256 != None
+                ),
+                sqlalchemy.func.coalesce(
+                    sqlalchemy.func.length(db.module_details.c.terraform_graph_json),
+                    sqlalchemy.func.length(db.blob_store.c.content),
+                    0
+                ) == 0
+            ).order_by(db.module_details.c.id).limit(self._batch_size)
+            with db.get_connection() as conn:
+                ids = [row['id'] for row in conn.execute(select)]
+            if not ids:
+                break
+
+            for id_ in ids:
+                try:
+                    if terrareg.models.ModuleDetails(id=id_).store_graph_json():
+                        updated_rows += 1
+                except Exception as exc:
+                    # Skip module details with graph output that cannot be parsed,
+                    # for which graph data continues to be generated when requested
+                    print(f'An error occured whilst generating graph data for module details {id_}:', str(exc))
+            last_id = ids[-1]
+
+            if self._batch_delay:
+                time.sleep(self._batch_delay)
+
+        return updated_rows
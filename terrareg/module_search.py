@@ -1,10 +1,9 @@
 
-import datetime
-
 import sqlalchemy
 from terrareg.config import Config
 
 from terrareg.database import Database
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
 import terrareg.models
 from terrareg.filters import NamespaceTrustFilter
 
@@ -57,26 +56,33 @@ class ModuleSearch(object):
 
     @classmethod
     def _get_search_query_filter(cls, query: str):
-        """Filter query based on wildcarded match of fields."""
+        """
+        Return where clauses for filtering module provider summaries by
+        wildcarded match of fields, and relevance of each summary to the query.
+        """
 
         db = Database.get()
-        wheres = []
+        summary = db.module_provider_summary
+        wheres = [
+            # Only include module providers with a published latest version
+            summary.c.latest_version_id != None
+        ]
         point_sum = None
         if query:
             for query_part in query.split():
 
-                wildcarded_query_part = '%{0}%'.format(query_part)               
+                wildcarded_query_part = '%{0}%'.format(query_part)
                 point_value = sqlalchemy.cast(
                     sqlalchemy.case(
-                            (db.module_provider.c.module.like(query_part), 20),
-                            (db.namespace.c.namespace.like(query_part), 18),
-                            (db.module_provider.c.provider.like(query_part), 14),
-                            (db.module_version.c.description.like(query_part), 13),
-                            (db.module_version.c.owner.like(query_part), 12),
-                            (db.module_provider.c.module.like(wildcarded_query_part), 5),
-                            (db.module_version.c.description.like(wildcarded_query_part), 4),
-                            (db.module_version.c.owner.like(wildcarded_query_part), 3),
-                            (db.namespace.c.namespace.like(wildcarded_query_part), 2),
+                            (summary.c.module.like(query_part), 20),
+                            (summary.c.namespace.like(query_part), 18),
+                            (summary.c.provider.like(query_part), 14),
+                            (summary.c.description.like(query_part), 13),
+                            (summary.c.owner.like(query_part), 12),
+                            (summary.c.module.like(wildcarded_query_part), 5),
+                            (summary.c.description.like(wildcarded_query_part), 4),
+                            (summary.c.owner.like(wildcarded_query_part), 3),
+                            (summary.c.namespace.like(wildcarded_query_part), 2),
                         else_=0
                     ),
                     sqlalchemy.Integer
@@ -87,37 +93,16 @@ class ModuleSearch(object):
                     point_sum += point_value
                 wheres.append(
                     sqlalchemy.or_(
-                        db.module_provider.c.provider.like(query_part),
-                        db.module_provider.c.module.like(wildcarded_query_part),
-                        db.module_version.c.description.like(wildcarded_query_part),
-                        db.module_version.c.owner.like(wildcarded_query_part),
-                        db.namespace.c.namespace.like(wildcarded_query_part)
+                        summary.c.provider.like(query_part),
+                        summary.c.module.like(wildcarded_query_part),
+                        summary.c.description.like(wildcarded_query_part),
+                        summary.c.owner.like(wildcarded_query_part),
+                        summary.c.namespace.like(wildcarded_query_part)
                     )
                 )
 
-        relevance = sqlalchemy.sql.expression.label('relevance', point_sum)
-        select = db.select_module_provider_joined_latest_module_version(
-            db.module_provider,
-            db.module_version,
-            db.namespace,
-            relevance
-        )
-        for where_ in wheres:
-            select = select.where(where_)
-
-        # Filter search by published module versions,
-        # remove beta versions
-        # and group by module provider ID
-        select = select.where(
-            db.module_version.c.published == True,
-            db.module_version.c.beta == False
-        ).group_by(
-            db.module_provider.c.id
-        ).order_by(
-            sqlalchemy.desc(relevance)
-        )
-
-        return select
+        relevance = sqlalchemy.sql.expression.label('relevance', point_sum) if point_sum is not None else None
+        return wheres, relevance
 
     @classmethod
     def search_module_providers(
@@ -138,69 +123,80 @@ class ModuleSearch(object):
         offset = 0 if offset < 0 else offset
 
         db = Database.get()
+        summary = db.module_provider_summary
 
-        select = cls._get_search_query_filter(query)
+        wheres, relevance = cls._get_search_query_filter(query)
 
         # If provider has been supplied, select by that
         if providers:
-            select = select.where(
-                db.module_provider.c.provider.in_(providers)
+            wheres.append(
+                summary.c.provider.in_(providers)
             )
 
         # If namespace has been supplied, select by that
         if namespaces:
-            select = select.where(
-                db.namespace.c.namespace.in_(namespaces)
+            wheres.append(
+                summary.c.namespace.in_(namespaces)
             )
 
         # If namespace has been supplied, select by that
         if modules:
-            select = select.where(
-                db.module_provider.c.module.in_(modules)
+            wheres.append(
+                summary.c.module.in_(modules)
             )
 
         # Filter by verified modules, if requested
         if verified:
-            select = select.where(
-                db.module_provider.c.verified == True
+            wheres.append(
+                summary.c.verified == True
             )
 
         # Filter internal modules, if not being included
         if not include_internal:
-            select = select.where(
-                db.module_version.c.internal == False
+            wheres.append(
+                summary.c.internal == False
             )
 
         if namespace_trust_filters is not NamespaceTrustFilter.UNSPECIFIED:
             or_query = []
             if NamespaceTrustFilter.TRUSTED_NAMESPACES in namespace_trust_filters:
-                or_query.append(db.namespace.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES)))
+                or_query.append(summary.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES)))
             if NamespaceTrustFilter.CONTRIBUTED in namespace_trust_filters:
-                or_query.append(~db.namespace.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES)))
-            select = select.where(sqlalchemy.or_(*or_query))
-
-
-        # Group by and order by namespace, module and provider
-        select = select.group_by(
-            db.namespace.c.namespace,
-            db.module_provider.c.module,
-            db.module_provider.c.provider
+                or_query.append(~summary.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES)))
+            wheres.append(sqlalchemy.or_(*or_query))
+
+        # Order by relevance, followed by order of creation of module providers
+        order_by = [
+            summary.c.module_provider_id
+        ]
+        if relevance is not None:
+            order_by.insert(0, sqlalchemy.desc(relevance))
+
+        limited_search = db.select_module_provider_summary(
+            *([relevance] if relevance is not None else [])
+        ).where(
+            *wheres
+        ).order_by(
+            *order_by
+        ).limit(limit).offset(offset)
+        count_search = sqlalchemy.select(
+            sqlalchemy.func.count().label('count')
+        ).select_from(
+            summary
+        ).where(
+            *wheres
         )
 
-        limited_search = select.limit(limit).offset(offset)
-        count_search = sqlalchemy.select(sqlalchemy.func.count().label('count')).select_from(select.subquery())
-
         with db.get_connection() as conn:
             res = conn.execute(limited_search)
             count_result = conn.execute(count_search)
 
             count = count_result.fetchone()['count']
 
-            module_providers = []
-            for r in res:
-                namespace = terrareg.models.Namespace(name=r['namespace'])
-                module = terrareg.models.Module(namespace=namespace, name=r['module'])
-                module_providers.append(terrareg.models.ModuleProvider(module=module, name=r['provider']))
+            module_providers = [
+                terrareg.models.ModuleProvider._from_summary_row(row=r)
+                for r in res
+            ]
 
         return ModuleSearchResults(
             offset=offset,
@@ -213,68 +209,48 @@ class ModuleSearch(object):
     def get_search_filters(cls, query):
         """Get list of search filters and filter counts."""
         db = Database.get()
-        main_select = cls._get_search_query_filter(query)
+        summary = db.module_provider_summary
+        wheres, _ = cls._get_search_query_filter(query)
 
         # Remove any internal modules
-        main_select = main_select.where(
-            db.module_version.c.internal == False
+        wheres.append(
+            summary.c.internal == False
         )
 
+        def count_select(*additional_wheres):
+            """Return query for number of matching module providers."""
+            return sqlalchemy.select(
+                sqlalchemy.func.count().label('count')
+            ).select_from(
+                summary
+            ).where(
+                *wheres,
+                *additional_wheres
+            )
+
         with db.get_connection() as conn:
-            verified_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        db.module_provider.c.verified==True
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            trusted_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        db.namespace.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            contributed_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        ~db.namespace.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
-                    ).subquery()
-                )
-            ).fetchone()['count']
+            verified_count = conn.execute(count_select(
+                summary.c.verified == True
+            )).fetchone()['count']
+
+            trusted_count = conn.execute(count_select(
+                summary.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
+            )).fetchone()['count']
+
+            contributed_count = conn.execute(count_select(
+                ~summary.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
+            )).fetchone()['count']
 
-            provider_subquery = main_select.group_by(
-                db.namespace.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ).subquery()
             provider_res = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count'), provider_subquery.c.provider]
-                ).select_from(
-                    provider_subquery
-                ).group_by(provider_subquery.c.provider)
+                count_select().add_columns(
+                    summary.c.provider
+                ).group_by(summary.c.provider)
             )
 
-            namespace_subquery = main_select.group_by(
-                db.namespace.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ).subquery()
             namespace_res = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count'), namespace_subquery.c.namespace]
-                ).select_from(
-                    namespace_subquery
-                ).group_by(namespace_subquery.c.namespace)
+                count_select().add_columns(
+                    summary.c.namespace
+                ).group_by(summary.c.namespace)
             )
 
             return {
@@ -295,15 +271,12 @@ class ModuleSearch(object):
     def get_most_recently_published():
         """Return module with most recent published date."""
         db = Database.get()
-        select = db.select_module_provider_joined_latest_module_version(
-            db.module_version,
-            db.module_provider,
-            db.namespace
+        select = db.select_module_provider_summary(
         ).where(
-            db.module_version.c.published == True,
-            db.module_version.c.beta == False,
-            db.module_version.c.internal == False
-        ).order_by(db.module_version.c.published_at.desc(), 
+            db.module_provider_summary.c.latest_version_id != None,
+            db.module_provider_summary.c.internal == False
+        ).order_by(
+            db.module_provider_summary.c.published_at.desc()
         ).limit(1)
 
         with db.get_connection() as conn:
@@ -315,65 +288,32 @@ class ModuleSearch(object):
         if not row:
             return None
 
-        namespace = terrareg.models.Namespace(name=row['namespace'])
-        module = terrareg.models.Module(namespace=namespace,
-                                        name=row['module'])
-        module_provider = terrareg.models.ModuleProvider(module=module,
-                                                         name=row['provider'])
-        return terrareg.models.ModuleVersion(module_provider=module_provider,
-                                             version=row['version'])
+        module_provider = terrareg.models.ModuleProvider._from_summary_row(row=row)
+        return module_provider.get_latest_version()
 
     @staticmethod
     def get_most_downloaded_module_provider_this_Week():
         """Obtain module provider with most downloads this week."""
+        module_provider_id = GlobalStatistics.get(
+            GlobalStatistic.MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK
+        )[GlobalStatistic.MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK]
+
+        # If there have been no downloads, return None
+        if module_provider_id is None:
+            return None
+
         db = Database.get()
-        counts = sqlalchemy.select(
-            [
-                sqlalchemy.func.count().label('download_count'),
-                db.namespace.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ]
-        ).select_from(
-            db.analytics
-        ).join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
-        ).join(
-            db.module_provider,
-            db.module_provider.c.id == db.module_version.c.module_provider_id
-        ).join(
-            db.namespace,
-            db.module_provider.c.namespace_id == db.namespace.c.id
+        select = db.select_module_provider_summary(
         ).where(
-            db.analytics.c.timestamp >= (
-                datetime.datetime.now() -
-                datetime.timedelta(days=7)
-            ),
-            db.module_version.c.published == True,
-            db.module_version.c.beta == False,
-            db.module_version.c.internal == False
-        ).group_by(
-            db.namespace.c.id,
-            db.module_provider.c.module,
-            db.module_provider.c.provider
-        ).subquery()
-
-        select = counts.select(
-        ).order_by(
-            counts.c.download_count.desc()
-        ).limit(1)
+            db.module_provider_summary.c.module_provider_id == module_provider_id
+        )
 
         with db.get_connection() as conn:
             res = conn.execute(select)
             row = res.fetchone()
 
-        # If there are no rows, return None
+        # If the module provider no longer exists, return None
         if not row:
             return None
 
-        namespace = terrareg.models.Namespace(name=row['namespace'])
-        module = terrareg.models.Module(namespace=namespace,
-                                        name=row['module'])
-        return terrareg.models.ModuleProvider(module=module,
-                                              name=row['provider'])
+        return terrareg.models.ModuleProvider._from_summary_row(row=row)
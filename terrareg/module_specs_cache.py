@@ -0,0 +1,59 @@
+"""Provide process-wide cache of parsed terraform-docs output."""
+
+from terrareg.cache import Cache, CacheTags
+
+
+class ModuleSpecsCache:
+    """
+    Least-recently-used cache of parsed terraform-docs output, keyed by module details ID.
+
+    The terraform-docs output of module details does not change once extracted,
+    so the parsed output can be shared between requests.
+    The size of each entry is estimated using the size of the raw JSON, with
+    least-recently-used entries evicted once the configured maximum size is exceeded.
+
+    The cache is always held in the memory of the current process, since it holds
+    the parsed objects themselves. Cached values are shared and must not be modified by callers.
+    """
+
+    _CACHE = Cache('module_specs', max_size_config='MODULE_SPECS_CACHE_MAX_SIZE', local=True)
+
+    @staticmethod
+    def _get_key(module_details_id: int, terraform_docs_sha256: str):
+        """Return cache key for module details."""
+        return f'{module_details_id}:{terraform_docs_sha256}'
+
+    @classmethod
+    def get(cls, module_details_id: int, terraform_docs_sha256: str=None):
+        """
+        Return cached module specs for module details, or None if the module specs are not cached.
+
+        If the blob store hash of the terraform docs is provided, the cached
+        entry is only returned if it was generated from the same content.
+        """
+        return cls._CACHE.get(cls._get_key(module_details_id, terraform_docs_sha256))
+
+    @classmethod
+    def put(cls, module_details_id: int, module_specs: dict, size: int, terraform_docs_sha256: str=None):
+        """Store module specs for module details, evicting least-recently-used entries to stay within the maximum size."""
+        cls._CACHE.set(
+            cls._get_key(module_details_id, terraform_docs_sha256),
+            module_specs,
+            tags=CacheTags.module_details(module_details_id),
+            size=size
+        )
+
+    @classmethod
+    def invalidate(cls, module_details_id: int):
+        """Remove cached module specs for module details."""
+        cls._CACHE.invalidate(CacheTags.module_details(module_details_id))
+
+    @classmethod
+    def clear(cls):
+        """Remove all entries from cache."""
+        cls._CACHE.clear()
+
+    @classmethod
+    def get_statistics(cls):
+        """Return dict of cache statistics."""
+        return cls._CACHE.get_statistics()
@@ -7,13 +7,15 @@ import jwt
 import requests
 import oauthlib.oauth2
 
+from terrareg.cache import Cache
 import terrareg.config
 from terrareg.utils import get_public_url_details
 
 
 class OpenidConnect:
 
-    _METADATA_CONFIG = None
+    # Cache of well-known metadata, keyed by issuer, retained for 12 hours
+    _METADATA_CACHE = Cache('openid_connect_metadata', ttl=int(datetime.timedelta(hours=12).total_seconds()))
 
     _JWKS_CLIENT = None
 
@@ -53,11 +55,11 @@ class OpenidConnect:
         if not cls.is_enabled():
             return None
 
-        if cls._METADATA_CONFIG is None:
-            res = requests.get(terrareg.config.Config().OPENID_CONNECT_ISSUER + '/.well-known/openid-configuration')
-            cls._METADATA_CONFIG = res.json()
-
-        return cls._METADATA_CONFIG
+        issuer = terrareg.config.Config().OPENID_CONNECT_ISSUER
+        return cls._METADATA_CACHE.get_or_set(
+            issuer,
+            lambda: requests.get(issuer + '/.well-known/openid-configuration').json()
+        )
 
     @classmethod
     def generate_state(cls):
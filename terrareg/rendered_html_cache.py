@@ -0,0 +1,54 @@
+"""Provide cache of HTML rendered from README and additional module files."""
+
+from terrareg.cache import Cache, CacheTags
+
+
+class RenderedHtmlCache:
+    """
+    Cache of sanitised HTML, rendered from markdown files of module versions,
+    submodules and examples, stored in the configured cache backend.
+
+    Entries are keyed by module details ID, file name and a tuple of the remaining
+    values that the HTML is rendered from, such as the public hostname and the
+    example version string of the module version, which changes when newer versions are published.
+    All entries for module details are removed when the module details are modified or deleted.
+
+    The size of each entry is the length of the rendered HTML, with least-recently-used
+    entries evicted once the configured maximum size is exceeded.
+    """
+
+    _CACHE = Cache('rendered_html', max_size_config='RENDERED_HTML_CACHE_MAX_SIZE')
+
+    @staticmethod
+    def _get_key(module_details_id: int, file_name: str, key: tuple):
+        """Return cache key for rendered file."""
+        return repr((module_details_id, file_name, key))
+
+    @classmethod
+    def get(cls, module_details_id: int, file_name: str, key: tuple):
+        """Return cached HTML, or None if the HTML is not cached."""
+        return cls._CACHE.get(cls._get_key(module_details_id, file_name, key))
+
+    @classmethod
+    def put(cls, module_details_id: int, file_name: str, key: tuple, html: str):
+        """Store rendered HTML, evicting least-recently-used entries to stay within the maximum size."""
+        cls._CACHE.set(
+            cls._get_key(module_details_id, file_name, key),
+            html,
+            tags=CacheTags.module_details(module_details_id)
+        )
+
+    @classmethod
+    def invalidate(cls, module_details_id: int):
+        """Remove all cached HTML for module details."""
+        cls._CACHE.invalidate(CacheTags.module_details(module_details_id))
+
+    @classmethod
+    def clear(cls):
+        """Remove all entries from cache."""
+        cls._CACHE.clear()
+
+    @classmethod
+    def get_statistics(cls):
+        """Return dict of cache statistics."""
+        return cls._CACHE.get_statistics()
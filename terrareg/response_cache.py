@@ -0,0 +1,57 @@
+"""Provide cache of Terraform registry API responses."""
+
+import hashlib
+
+from terrareg.cache import Cache
+
+
+class ResponseCache:
+    """
+    Cache of serialised API responses, keyed by endpoint, path and relevant query arguments,
+    stored in the configured cache backend.
+
+    Each entry is stored with a strong ETag and the tags of the module and module provider
+    used to generate the response (see CacheTags).
+    Model changes invalidate the tags for the affected module providers,
+    which removes all responses generated from them.
+    Downloads do not invalidate responses, so responses containing download counts
+    are stored with a TTL, limiting how out of date the download counts can be.
+    """
+
+    _CACHE = Cache('api_responses', max_size_config='API_RESPONSE_CACHE_MAX_SIZE')
+
+    @staticmethod
+    def get_generation():
+        """Return current generation, to be passed to put when storing a response."""
+        return Cache.get_generation()
+
+    @classmethod
+    def get(cls, key: str):
+        """Return tuple of cached response body and ETag, or None if the response is not cached."""
+        return cls._CACHE.get(key)
+
+    @staticmethod
+    def get_etag(body: bytes):
+        """Return strong ETag for response body."""
+        return hashlib.sha256(body).hexdigest()
+
+    @classmethod
+    def put(cls, key: str, body: bytes, tags: list, generation: int, ttl: int=None):
+        """
+        Store response body, returning the ETag of the response.
+
+        The response is not stored if an invalidation has occurred since the generation was obtained.
+        """
+        etag = cls.get_etag(body)
+        cls._CACHE.set(key, (body, etag), tags=tags, size=len(body), generation=generation, ttl=ttl)
+        return etag
+
+    @classmethod
+    def clear(cls):
+        """Remove all entries from cache."""
+        cls._CACHE.clear()
+
+    @classmethod
+    def get_statistics(cls):
+        """Return dict of cache statistics."""
+        return cls._CACHE.get_statistics()
@@ -5,15 +5,16 @@ import onelogin.saml2.auth
 import onelogin.saml2.idp_metadata_parser
 import onelogin.saml2.utils
 
+from terrareg.cache import Cache
 import terrareg.config
 from terrareg.utils import get_public_url_details
 
 class Saml2:
 
-    _IDP_METADATA = None
-    _IDP_METADATA_REFRESH_DATE = None
     # Retain IdP keys cache for 12 hours
     _IDP_METADATA_REFRESH_INTERVAL = datetime.timedelta(hours=12)
+    # Cache of IdP metadata, keyed by metadata URL and issuer entity ID
+    _IDP_METADATA_CACHE = Cache('saml2_idp_metadata', ttl=int(_IDP_METADATA_REFRESH_INTERVAL.total_seconds()))
 
     @classmethod
     def is_enabled(cls):
@@ -92,20 +93,18 @@ class Saml2:
     @classmethod
     def get_idp_metadata(cls):
         """Obtain metadata from IdP"""
-        if (not cls._IDP_METADATA or
-                cls._IDP_METADATA_REFRESH_DATE is None or
-                cls._IDP_METADATA_REFRESH_DATE < datetime.datetime.now()):
-            config = terrareg.config.Config()
-
-            args = {}
-            if config.SAML2_ISSUER_ENTITY_ID:
-                args['entity_id'] = config.SAML2_ISSUER_ENTITY_ID
-            cls._IDP_METADATA = onelogin.saml2.idp_metadata_parser.OneLogin_Saml2_IdPMetadataParser.parse_remote(
+        config = terrareg.config.Config()
+
+        args = {}
+        if config.SAML2_ISSUER_ENTITY_ID:
+            args['entity_id'] = config.SAML2_ISSUER_ENTITY_ID
+
+        return cls._IDP_METADATA_CACHE.get_or_set(
+            f'{config.SAML2_IDP_METADATA_URL}:{config.SAML2_ISSUER_ENTITY_ID}',
+            lambda: onelogin.saml2.idp_metadata_parser.OneLogin_Saml2_IdPMetadataParser.parse_remote(
                 config.SAML2_IDP_METADATA_URL,
                 **args)
-            cls._IDP_METADATA_REFRESH_DATE = datetime.datetime.now() + cls._IDP_METADATA_REFRESH_INTERVAL
-
-        return cls._IDP_METADATA
+        )
 
     @classmethod
     def get_self_url(cls, request):
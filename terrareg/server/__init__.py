@@ -12,6 +12,7 @@ import terrareg.database
 import terrareg.models
 import terrareg.errors
 import terrareg.auth
+from terrareg.server_metrics import ServerMetrics
 from .base_handler import BaseHandler
 from terrareg.server.api import *
 
@@ -126,6 +127,12 @@ class Server(BaseHandler):
         terrareg.database.Database.get().initialise()
         terrareg.models.GitProvider.initialise_from_config()
 
+        # Return database connection for each request to the connection pool
+        self._app.teardown_request(terrareg.database.Database.release_request_connection)
+
+        # Record request latency and database queries for prometheus metrics
+        ServerMetrics.register_app(self._app)
+
         self._register_routes()
 
     def _get_upload_directory(self):
@@ -2,6 +2,8 @@
 from flask_restful import reqparse
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
+from terrareg.cache import CacheTags
+import terrareg.config
 import terrareg.models
 import terrareg.module_search
 
@@ -22,9 +24,18 @@ class ApiModuleDetails(ErrorCatchingResource):
 
         namespace, _ = terrareg.models.Namespace.extract_analytics_token(namespace)
 
+        return self._get_cached_response(
+            key=f'module_details:{namespace}/{name}?offset={args.offset}&limit={args.limit}',
+            tags=CacheTags.module(namespace, name),
+            ttl=terrareg.config.Config().API_RESPONSE_CACHE_DOWNLOADS_TTL,
+            generate_response=lambda: self._get_module_details(namespace, name, args.offset, args.limit)
+        )
+
+    def _get_module_details(self, namespace, name, offset, limit):
+        """Generate latest version details for each provider of module."""
         search_results = terrareg.module_search.ModuleSearch.search_module_providers(
-            offset=args.offset,
-            limit=args.limit,
+            offset=offset,
+            limit=limit,
             namespaces=[namespace],
             modules=[name]
         )
@@ -1,5 +1,7 @@
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
+from terrareg.cache import CacheTags
+import terrareg.config
 import terrareg.models
 
 
@@ -9,6 +11,15 @@ class ApiModuleProviderDetails(ErrorCatchingResource):
         """Return list of version."""
 
         namespace, _ = terrareg.models.Namespace.extract_analytics_token(namespace)
+        return self._get_cached_response(
+            key=f'module_provider_details:{namespace}/{name}/{provider}',
+            tags=CacheTags.module_provider(namespace, name, provider),
+            ttl=terrareg.config.Config().API_RESPONSE_CACHE_DOWNLOADS_TTL,
+            generate_response=lambda: self._get_module_provider_details(namespace, name, provider)
+        )
+
+    def _get_module_provider_details(self, namespace, name, provider):
+        """Generate details of latest version of module provider."""
         _, _, module_provider, error = self.get_module_provider_by_names(namespace, name, provider)
         if error:
             return self._get_404_response()
@@ -18,4 +29,3 @@ class ApiModuleProviderDetails(ErrorCatchingResource):
             return self._get_404_response()
 
         return module_version.get_api_details()
-
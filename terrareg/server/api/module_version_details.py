@@ -1,5 +1,7 @@
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
+from terrareg.cache import CacheTags
+import terrareg.config
 import terrareg.models
 
 
@@ -9,9 +11,17 @@ class ApiModuleVersionDetails(ErrorCatchingResource):
         """Return list of version."""
 
         namespace, _ = terrareg.models.Namespace.extract_analytics_token(namespace)
+        return self._get_cached_response(
+            key=f'module_version_details:{namespace}/{name}/{provider}/{version}',
+            tags=CacheTags.module_provider(namespace, name, provider),
+            ttl=terrareg.config.Config().API_RESPONSE_CACHE_DOWNLOADS_TTL,
+            generate_response=lambda: self._get_module_version_details(namespace, name, provider, version)
+        )
+
+    def _get_module_version_details(self, namespace, name, provider, version):
+        """Generate details of module version."""
         _, _, _, module_version, error = self.get_module_version_by_name(namespace, name, provider, version)
         if error:
             return self._get_404_response()
 
         return module_version.get_api_details()
-
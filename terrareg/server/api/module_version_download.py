@@ -42,7 +42,7 @@ class ApiModuleVersionDownload(ErrorCatchingResource):
             pass
 
         # Determine if auth token is one the auth tokens for ignore anlaytics token check
-        elif auth_token in terrareg.config.Config().IGNORE_ANALYTICS_TOKEN_AUTH_KEYS:
+        elif auth_token in terrareg.config.Config().ignore_analytics_token_auth_key_set:
             pass
 
         # otherwise, if module download should be rejected due to
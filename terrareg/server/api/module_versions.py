@@ -1,5 +1,6 @@
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
+from terrareg.cache import CacheTags
 import terrareg.models
 
 
@@ -9,6 +10,14 @@ class ApiModuleVersions(ErrorCatchingResource):
         """Return list of version."""
 
         namespace, _ = terrareg.models.Namespace.extract_analytics_token(namespace)
+        return self._get_cached_response(
+            key=f'module_versions:{namespace}/{name}/{provider}',
+            tags=CacheTags.module_provider(namespace, name, provider),
+            generate_response=lambda: self._get_versions(namespace, name, provider)
+        )
+
+    def _get_versions(self, namespace, name, provider):
+        """Generate list of versions for module provider."""
         namespace, module, module_provider, error = self.get_module_provider_by_names(namespace, name, provider)
         if error:
             return self._get_404_response()
@@ -3,6 +3,7 @@ from flask import make_response
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
 import terrareg.analytics
+from terrareg.server_metrics import ServerMetrics
 
 
 class PrometheusMetrics(ErrorCatchingResource):
@@ -10,9 +11,12 @@ class PrometheusMetrics(ErrorCatchingResource):
 
     def _get(self):
         """
-        Return Prometheus metrics for global statistics and module provider statistics
+        Return Prometheus metrics for global statistics, module provider statistics and the server
         """
-        response = make_response(terrareg.analytics.AnalyticsEngine.get_prometheus_metrics())
+        response = make_response('\n'.join([
+            terrareg.analytics.AnalyticsEngine.get_prometheus_metrics(),
+            ServerMetrics.generate()
+        ]))
         response.headers['content-type'] = 'text/plain; version=0.0.4'
 
         return response
@@ -1,7 +1,6 @@
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
-import terrareg.models
-import terrareg.analytics
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
 
 
 class ApiTerraregGlobalStatsSummary(ErrorCatchingResource):
@@ -9,9 +8,15 @@ class ApiTerraregGlobalStatsSummary(ErrorCatchingResource):
 
     def _get(self):
         """Return number of namespaces, modules, module versions and downloads"""
+        statistics = GlobalStatistics.get(
+            GlobalStatistic.NAMESPACE_COUNT,
+            GlobalStatistic.MODULE_PROVIDER_COUNT,
+            GlobalStatistic.MODULE_VERSION_COUNT,
+            GlobalStatistic.DOWNLOAD_COUNT
+        )
         return {
-            'namespaces': terrareg.models.Namespace.get_total_count(),
-            'modules': terrareg.models.ModuleProvider.get_total_count(),
-            'module_versions': terrareg.models.ModuleVersion.get_total_count(),
-            'downloads': terrareg.analytics.AnalyticsEngine.get_total_downloads()
+            'namespaces': statistics[GlobalStatistic.NAMESPACE_COUNT],
+            'modules': statistics[GlobalStatistic.MODULE_PROVIDER_COUNT],
+            'module_versions': statistics[GlobalStatistic.MODULE_VERSION_COUNT],
+            'downloads': statistics[GlobalStatistic.DOWNLOAD_COUNT]
         }
@@ -1,7 +1,11 @@
 
+from flask import request, Response
 from flask_restful import Resource
+from flask_restful.representations.json import output_json
 
 from terrareg.server.base_handler import BaseHandler
+from terrareg.response_cache import ResponseCache
+import terrareg.config
 import terrareg.errors
 import terrareg.models
 
@@ -59,6 +63,38 @@ class ErrorCatchingResource(Resource, BaseHandler):
                 "message": str(exc)
             }, 500
 
+    def _get_cached_response(self, key, tags, generate_response, ttl=None):
+        """
+        Return response from API response cache, generating and caching it, if it is not present.
+
+        generate_response is called to generate the response data, if the response is not cached.
+        If ttl is provided, the response is regenerated once it has been cached for ttl seconds.
+        Error responses, returned as a tuple of data and status code, are not cached.
+        A strong ETag is returned with the response and 304 is returned if it matches
+        the If-None-Match header of the request.
+        """
+        cached_response = ResponseCache.get(key)
+        if cached_response is None:
+            generation = ResponseCache.get_generation()
+            response_data = generate_response()
+            if isinstance(response_data, tuple):
+                return response_data
+
+            body = output_json(response_data, 200).get_data()
+            etag = ResponseCache.put(key=key, body=body, tags=tags, generation=generation, ttl=ttl)
+        else:
+            body, etag = cached_response
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=200, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'max-age={max_age}, must-revalidate'.format(
+            max_age=terrareg.config.Config().API_RESPONSE_CACHE_CONTROL_MAX_AGE
+        )
+        return response
+
     def _get_404_response(self):
         """Return common 404 error"""
         return {'errors': ['Not Found']}, 404
@@ -0,0 +1,347 @@
+"""Provide Prometheus instrumentation of request handling, database queries and module extraction."""
+
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+import threading
+import time
+
+import flask
+import sqlalchemy
+
+import terrareg.config
+from terrareg.analytics import PrometheusGenerator, PrometheusMetric
+
+
+class Histogram:
+    """Histogram metric, counting observations in cumulative buckets for each combination of label values."""
+
+    def __init__(self, name: str, help: str, label_names: list, buckets: list):
+        """Store member variables."""
+        self.name = name
+        self.help = help
+        self.label_names = list(label_names)
+        self.buckets = list(buckets)
+
+    def get_empty_value(self):
+        """Return value for label values without observations, containing count for each bucket, sum and count."""
+        return {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+
+    def add_observation(self, value: dict, amount: float):
+        """Add observation to value."""
+        for itx, upper_bound in enumerate(self.buckets):
+            if amount <= upper_bound:
+                value['buckets'][itx] += 1
+        value['sum'] += amount
+        value['count'] += 1
+
+    def merge_values(self, value: dict, other: dict):
+        """Add counts of other value to value."""
+        value['buckets'] = [a + b for a, b in zip(value['buckets'], other['buckets'])]
+        value['sum'] += other['sum']
+        value['count'] += other['count']
+
+    def generate(self, values: dict):
+        """Return prometheus metric for values, keyed by tuple of label values."""
+        metric = PrometheusMetric(name=self.name, type_='histogram', help=self.help)
+        for label_values in sorted(values):
+            value = values[label_values]
+            labels = dict(zip(self.label_names, label_values))
+            for upper_bound, count in zip(self.buckets, value['buckets']):
+                metric.add_data_row(value=count, labels=dict(labels, le=str(upper_bound)), name_suffix='_bucket')
+            metric.add_data_row(value=value['count'], labels=dict(labels, le='+Inf'), name_suffix='_bucket')
+            metric.add_data_row(value=value['sum'], labels=labels, name_suffix='_sum')
+            metric.add_data_row(value=value['count'], labels=labels, name_suffix='_count')
+        return metric
+
+
+class ServerMetrics:
+    """
+    Metrics of the server itself, such as request latency, database queries and module extraction stages.
+
+    Observations are held in the memory of each process.
+    If SERVER_METRICS_DIRECTORY is configured, each process periodically stores
+    its metrics in the directory and the metrics of all processes are combined
+    when generating prometheus metrics.
+    Metrics stored by processes that are no longer running are removed when metrics are combined.
+    """
+
+    # Latency buckets, in seconds, of requests and database queries
+    LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+    # Duration buckets, in seconds, of module extraction stages
+    EXTRACTION_BUCKETS = [0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0]
+    # Buckets for number of database queries performed by a request
+    QUERY_COUNT_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+    REQUEST_DURATION = Histogram(
+        name='request_duration_seconds',
+        help='Time taken to handle requests, by endpoint class',
+        label_names=['endpoint', 'method', 'status'],
+        buckets=LATENCY_BUCKETS
+    )
+    REQUEST_DATABASE_QUERIES = Histogram(
+        name='request_database_queries',
+        help='Number of database queries performed whilst handling requests, by endpoint class',
+        label_names=['endpoint'],
+        buckets=QUERY_COUNT_BUCKETS
+    )
+    DATABASE_QUERY_DURATION = Histogram(
+        name='database_query_duration_seconds',
+        help='Time taken to execute database queries, by statement type',
+        label_names=['statement'],
+        buckets=LATENCY_BUCKETS
+    )
+    MODULE_EXTRACTION_STAGE_DURATION = Histogram(
+        name='module_extraction_stage_duration_seconds',
+        help='Time taken to perform each stage of module extraction',
+        label_names=['stage'],
+        buckets=EXTRACTION_BUCKETS
+    )
+
+    HISTOGRAMS = [
+        REQUEST_DURATION,
+        REQUEST_DATABASE_QUERIES,
+        DATABASE_QUERY_DURATION,
+        MODULE_EXTRACTION_STAGE_DURATION
+    ]
+
+    # Minimum number of seconds between storing metrics of the current process in the metrics directory
+    STORE_INTERVAL = 1
+
+    _LOCK = threading.Lock()
+    # Mapping of histogram name to dict of values, keyed by tuple of label values
+    _VALUES = {}
+    # Process that values were recorded by, used to discard values inherited from a parent process
+    _PID = None
+    _LAST_STORED = 0
+    _DATABASE_EVENTS_REGISTERED = False
+
+    @classmethod
+    def _get_values(cls):
+        """Return values for current process. Must be called whilst holding the lock."""
+        if cls._PID != os.getpid():
+            cls._PID = os.getpid()
+            cls._VALUES = {histogram.name: {} for histogram in cls.HISTOGRAMS}
+            cls._LAST_STORED = 0
+        return cls._VALUES
+
+    @classmethod
+    def observe(cls, histogram: Histogram, amount: float, **labels):
+        """Record observation in histogram."""
+        label_values = tuple(str(labels.get(label_name, '')) for label_name in histogram.label_names)
+        with cls._LOCK:
+            values = cls._get_values()[histogram.name]
+            if label_values not in values:
+                values[label_values] = histogram.get_empty_value()
+            histogram.add_observation(values[label_values], amount)
+
+        cls._store_values(force=False)
+
+    @classmethod
+    @contextmanager
+    def time(cls, histogram: Histogram, **labels):
+        """Context manager to record time taken within context in histogram."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe(histogram, time.perf_counter() - start_time, **labels)
+
+    @classmethod
+    def _export_values(cls):
+        """Return copy of values of current process, containing list of label values and value for each histogram."""
+        with cls._LOCK:
+            return {
+                name: [
+                    [list(label_values), dict(value, buckets=list(value['buckets']))]
+                    for label_values, value in values.items()
+                ]
+                for name, values in cls._get_values().items()
+            }
+
+    @classmethod
+    def _get_directory(cls):
+        """Return directory for sharing metrics between processes, or None, if not configured."""
+        return terrareg.config.Config().SERVER_METRICS_DIRECTORY or None
+
+    @classmethod
+    def _store_values(cls, force: bool):
+        """Store values of current process in metrics directory, if it has not been stored within the store interval."""
+        directory = cls._get_directory()
+        if directory is None:
+            return
+
+        with cls._LOCK:
+            if not force and time.monotonic() - cls._LAST_STORED < cls.STORE_INTERVAL:
+                return
+            cls._LAST_STORED = time.monotonic()
+        content = json.dumps(cls._export_values())
+
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(content)
+            os.replace(temp_path, os.path.join(directory, f'{os.getpid()}.json'))
+        except:
+            os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def _is_process_running(pid: int):
+        """Return whether process is running."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Process exists, but is owned by another user
+            pass
+        return True
+
+    @classmethod
+    def _get_combined_values(cls):
+        """Return values combined from all processes that have stored metrics, or values of the current process."""
+        directory = cls._get_directory()
+        if directory is None:
+            return cls._export_values()
+
+        cls._store_values(force=True)
+        combined = {histogram.name: [] for histogram in cls.HISTOGRAMS}
+        for file_name in os.listdir(directory):
+            if file_name.startswith('.') or not file_name.endswith('.json'):
+                continue
+
+            # Remove metrics of processes that have exited
+            try:
+                pid = int(file_name[:-len('.json')])
+            except ValueError:
+                continue
+            if pid != os.getpid() and not cls._is_process_running(pid):
+                try:
+                    os.unlink(os.path.join(directory, file_name))
+                except FileNotFoundError:
+                    pass
+                continue
+
+            try:
+                with open(os.path.join(directory, file_name), 'r') as fh:
+                    process_values = json.load(fh)
+            except (FileNotFoundError, ValueError):
+                continue
+            for name in combined:
+                combined[name] += process_values.get(name, [])
+        return combined
+
+    @classmethod
+    def get_prometheus_metrics(cls):
+        """Return list of prometheus metrics for server."""
+        combined = cls._get_combined_values()
+        metrics = []
+        for histogram in cls.HISTOGRAMS:
+            values = {}
+            for label_values, value in combined[histogram.name]:
+                label_values = tuple(label_values)
+                if label_values not in values:
+                    values[label_values] = histogram.get_empty_value()
+                histogram.merge_values(values[label_values], value)
+            metrics.append(histogram.generate(values))
+        return metrics
+
+    @classmethod
+    def generate(cls):
+        """Generate prometheus metrics output for server."""
+        prometheus_generator = PrometheusGenerator()
+        for metric in cls.get_prometheus_metrics():
+            prometheus_generator.add_metric(metric)
+        return prometheus_generator.generate()
+
+    @classmethod
+    def reset(cls):
+        """Remove all observations of the current process."""
+        with cls._LOCK:
+            cls._PID = None
+            cls._get_values()
+
+    @staticmethod
+    def _get_request_endpoint():
+        """Return name of endpoint class handling the current request."""
+        view_function = flask.current_app.view_functions.get(flask.request.endpoint)
+        view_class = getattr(view_function, 'view_class', None)
+        if view_class is not None:
+            return view_class.__name__
+        return flask.request.endpoint or 'unmatched'
+
+    @classmethod
+    def _before_request(cls):
+        """Record start of request."""
+        flask.g.server_metrics_request_start_time = time.perf_counter()
+        flask.g.server_metrics_database_queries = 0
+
+    @classmethod
+    def _after_request(cls, response):
+        """Record status code of response."""
+        flask.g.server_metrics_response_status = response.status_code
+        return response
+
+    @classmethod
+    def _teardown_request(cls, *args, **kwargs):
+        """Record request duration and number of database queries performed by request."""
+        start_time = flask.g.pop('server_metrics_request_start_time', None)
+        if start_time is None:
+            return
+
+        endpoint = cls._get_request_endpoint()
+        cls.observe(
+            cls.REQUEST_DURATION,
+            time.perf_counter() - start_time,
+            endpoint=endpoint,
+            method=flask.request.method,
+            # Responses are not returned for unhandled exceptions
+            status=flask.g.pop('server_metrics_response_status', 500)
+        )
+        cls.observe(
+            cls.REQUEST_DATABASE_QUERIES,
+            flask.g.pop('server_metrics_database_queries', 0),
+            endpoint=endpoint
+        )
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        """Record start time of database query."""
+        conn.info.setdefault('server_metrics_query_start_time', []).append(time.perf_counter())
+
+    @classmethod
+    def _after_cursor_execute(cls, conn, cursor, statement, parameters, context, executemany):
+        """Record duration of database query and count query against current request."""
+        start_times = conn.info.get('server_metrics_query_start_time')
+        if not start_times:
+            return
+
+        cls.observe(
+            cls.DATABASE_QUERY_DURATION,
+            time.perf_counter() - start_times.pop(),
+            statement=(statement.split(None, 1) or [''])[0].upper()
+        )
+
+        if flask.has_request_context() and 'server_metrics_database_queries' in flask.g:
+            flask.g.server_metrics_database_queries += 1
+
+    @classmethod
+    def register_database_events(cls):
+        """Register handlers for query events of all database engines, if they have not already been registered."""
+        with cls._LOCK:
+            if cls._DATABASE_EVENTS_REGISTERED:
+                return
+            cls._DATABASE_EVENTS_REGISTERED = True
+        sqlalchemy.event.listen(sqlalchemy.engine.Engine, 'before_cursor_execute', cls._before_cursor_execute)
+        sqlalchemy.event.listen(sqlalchemy.engine.Engine, 'after_cursor_execute', cls._after_cursor_execute)
+
+    @classmethod
+    def register_app(cls, app: flask.Flask):
+        """Register request handlers for flask app and handlers for database query events."""
+        app.before_request(cls._before_request)
+        app.after_request(cls._after_request)
+        app.teardown_request(cls._teardown_request)
+        cls.register_database_events()
@@ -10,6 +10,7 @@ from terrareg.models import (
     Example, ExampleFile, ModuleDetails, ModuleVersionFile, Namespace, Module, ModuleProvider,
     ModuleVersion, GitProvider, Submodule, UserGroup, UserGroupNamespacePermission
 )
+from terrareg.cache import Cache
 from terrareg.database import Database
 from terrareg.server import Server
 import terrareg.config
@@ -90,8 +91,8 @@ class BaseTest:
         cls.database_config_url_mock.stop()
 
     def setup_method(self, method):
-        """Empty method for inheritting classes to call super method."""
-        pass
+        """Remove cached values, such as API responses and rendered HTML, as test data may be modified between tests."""
+        Cache.clear_all()
 
     def teardown_method(self, method):
         """Empty method for inheritting classes to call super method."""
@@ -112,15 +113,23 @@ class BaseTest:
             conn.execute(db.user_group_namespace_permission.delete())
             conn.execute(db.user_group.delete())
             conn.execute(db.sub_module.delete())
+            conn.execute(db.module_provider_summary.delete())
+            conn.execute(db.analytics_token_latest.delete())
             conn.execute(db.module_version.delete())
             conn.execute(db.module_provider.delete())
             conn.execute(db.example_file.delete())
             conn.execute(db.module_details.delete())
+            conn.execute(db.blob_store.delete())
             conn.execute(db.git_provider.delete())
             conn.execute(db.analytics.delete())
+            conn.execute(db.analytics_daily.delete())
             conn.execute(db.session.delete())
             conn.execute(db.module_version_file.delete())
             conn.execute(db.namespace.delete())
+            conn.execute(db.global_statistic.delete())
+
+        # Remove cached values, such as module specs and rendered HTML, as module details IDs may be re-used
+        Cache.clear_all()
 
         with cls._patch_audit_event_creation():
 
@@ -172,6 +181,7 @@ class BaseTest:
                         )
                         with Database.get_engine().connect() as conn:
                             res = conn.execute(insert)
+                        module_provider.update_summary()
 
                         # Insert module versions
                         for version_number in (
@@ -188,9 +198,13 @@ class BaseTest:
                                 terraform_graph=version_data.get("terraform_graph", None)
                             )
 
+                            version_major, version_minor, version_patch = ModuleVersion._split_version(version_number)
                             data = {
                                 'module_provider_id': module_provider_attributes['id'],
                                 'version': version_number,
+                                'version_major': version_major,
+                                'version_minor': version_minor,
+                                'version_patch': version_patch,
                                 # Default beta flag to false
                                 'beta': False,
                                 'published_at': datetime.now(),
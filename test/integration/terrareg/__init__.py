@@ -1,7 +1,11 @@
 
+import contextlib
 import unittest.mock
 
+import sqlalchemy
+
 from terrareg.auth import AdminApiKeyAuthMethod
+from terrareg.database import Database
 
 from test import BaseTest
 from .test_data import integration_test_data, integration_git_providers
@@ -17,6 +21,26 @@ class TerraregIntegrationTest(BaseTest):
         """Return path of database file to use."""
         return 'temp-integration.db'
 
+    @staticmethod
+    @contextlib.contextmanager
+    def _record_queries(include_parameters=False):
+        """
+        Record SQL statements executed against the database, yielding list of statements.
+
+        If include_parameters is set, each statement is recorded as a tuple of statement and parameters.
+        """
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, *args, **kwargs):
+            statements.append((statement, parameters) if include_parameters else statement)
+
+        engine = Database.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
     @classmethod
     def setup_class(cls):
         """Setup class method"""
@@ -0,0 +1,172 @@
+
+import datetime
+import gzip
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.analytics_archiver import AnalyticsArchiver
+from terrareg.database import Database
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestAnalyticsArchiver(AnalyticsIntegrationTest):
+    """Test archival of raw analytics older than the retention period."""
+
+    @pytest.fixture(autouse=True)
+    def setup_archive(self, tmp_path):
+        """Remove analytics recorded by previous tests and use temporary data directory."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.delete())
+            conn.execute(db.analytics_daily.delete())
+        GlobalStatistics.reset(GlobalStatistic.DOWNLOAD_COUNT)
+
+        self._data_directory = str(tmp_path)
+        with mock.patch('terrareg.config.Config.DATA_DIRECTORY', self._data_directory):
+            yield
+
+    def _get_module_version(self, version):
+        """Return test module version."""
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), version)
+
+    def _record_downloads(self, module_version, downloads):
+        """Record downloads of module version, for each tuple of timestamp, analytics token and terraform version."""
+        module_provider = module_version._module_provider
+        AnalyticsEngine.record_download_events([
+            {
+                'module_version_id': module_version.pk,
+                'module_provider_id': module_provider.pk,
+                'namespace': module_provider._module._namespace.name,
+                'module': module_provider._module.name,
+                'provider': module_provider.name,
+                'timestamp': timestamp.isoformat(),
+                'analytics_token': analytics_token,
+                'terraform_version': terraform_version,
+                'user_agent': None,
+                'auth_token': None
+            }
+            for timestamp, analytics_token, terraform_version in downloads
+        ])
+
+    def _get_analytics_ids(self):
+        """Return IDs of all raw analytics rows."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return sorted(row['id'] for row in conn.execute(db.analytics.select()))
+
+    def _read_archive(self):
+        """Return all rows from archive files."""
+        rows = []
+        for file_name in sorted(os.listdir(AnalyticsArchiver.get_archive_directory())):
+            assert file_name.endswith('.ndjson.gz')
+            with gzip.open(os.path.join(AnalyticsArchiver.get_archive_directory(), file_name), 'rt') as fh:
+                rows += [json.loads(line) for line in fh]
+        return sorted(rows, key=lambda row: row['id'])
+
+    def test_run(self):
+        """Test that old rows are archived, retaining download counts and latest usage of analytics tokens."""
+        now = datetime.datetime.now()
+        module_version = self._get_module_version('1.5.0')
+        other_module_version = self._get_module_version('1.4.0')
+
+        self._record_downloads(module_version, [
+            (now - datetime.timedelta(days=100), 'old-application', '1.0.0'),
+            (now - datetime.timedelta(days=90), 'old-application', '1.1.0'),
+            (now - datetime.timedelta(days=80), 'old-application', '1.2.0'),
+            (now - datetime.timedelta(days=70), 'current-application', '1.0.0'),
+            (now - datetime.timedelta(days=60), 'current-application', '1.1.0'),
+            (now - datetime.timedelta(days=1), 'current-application', '1.3.0'),
+        ])
+        self._record_downloads(other_module_version, [
+            (now - datetime.timedelta(days=50), 'old-application', '1.0.0'),
+            (now - datetime.timedelta(days=2), 'old-application', '1.1.0'),
+        ])
+        original_ids = self._get_analytics_ids()
+        module_provider = module_version._module_provider
+        original_download_stats = AnalyticsEngine.get_module_provider_download_stats(module_provider)
+        original_token_versions = AnalyticsEngine.get_module_provider_token_versions(module_provider)
+        original_usage = AnalyticsEngine.get_global_module_usage_counts(include_empty_auth_token=True)
+        original_download_count = GlobalStatistics.get(GlobalStatistic.DOWNLOAD_COUNT)[GlobalStatistic.DOWNLOAD_COUNT]
+        assert original_download_count == 8
+
+        assert AnalyticsArchiver(retention_days=30, batch_size=2).run() == 5
+
+        # Ensure latest download of each module version by each analytics token is retained
+        expected_archived_ids = [original_ids[0], original_ids[1], original_ids[3], original_ids[4], original_ids[6]]
+        assert self._get_analytics_ids() == [
+            original_id for original_id in original_ids
+            if original_id not in expected_archived_ids
+        ]
+
+        archived_rows = self._read_archive()
+        assert [row['id'] for row in archived_rows] == expected_archived_ids
+        assert archived_rows[0]['parent_module_version'] == module_version.pk
+        assert archived_rows[0]['analytics_token'] == 'old-application'
+        assert archived_rows[0]['terraform_version'] == '1.0.0'
+        assert archived_rows[0]['environment'] == 'Default'
+        assert datetime.datetime.fromisoformat(archived_rows[0]['timestamp']) == now - datetime.timedelta(days=100)
+
+        assert AnalyticsEngine.get_module_provider_download_stats(module_provider) == original_download_stats
+        assert AnalyticsEngine.get_module_provider_token_versions(module_provider) == original_token_versions
+        assert AnalyticsEngine.get_global_module_usage_counts(include_empty_auth_token=True) == original_usage
+
+        # Ensure re-running does not archive further rows
+        assert AnalyticsArchiver(retention_days=30).run() == 0
+
+        # Ensure deleting analytics removes archived downloads from download count
+        AnalyticsEngine.delete_analytics_for_module_version(module_version)
+        assert GlobalStatistics.get(GlobalStatistic.DOWNLOAD_COUNT)[GlobalStatistic.DOWNLOAD_COUNT] == 2
+
+    def test_run_failure_retains_rows(self):
+        """Test that rows are not removed if they cannot be written to the archive."""
+        now = datetime.datetime.now()
+        self._record_downloads(self._get_module_version('1.5.0'), [
+            (now - datetime.timedelta(days=100), 'old-application', '1.0.0'),
+            (now - datetime.timedelta(days=90), 'old-application', '1.1.0'),
+        ])
+        original_ids = self._get_analytics_ids()
+
+        with mock.patch('terrareg.analytics_archiver.json.dumps', side_effect=Exception('Unittest error')):
+            with pytest.raises(Exception):
+                AnalyticsArchiver(retention_days=30).run()
+
+        assert self._get_analytics_ids() == original_ids
+        assert os.listdir(AnalyticsArchiver.get_archive_directory()) == []
+
+        # Ensure archival can be re-run
+        assert AnalyticsArchiver(retention_days=30).run() == 1
+
+    def test_download_stats_outside_retention_period(self):
+        """Test that all downloads of the first day of intervals outside of the retention period are counted."""
+        now = datetime.datetime.now()
+        module_version = self._get_module_version('1.5.0')
+        self._record_downloads(module_version, [
+            (now - datetime.timedelta(days=6), 'test-application', '1.0.0'),
+            (now - datetime.timedelta(days=31, minutes=1), 'test-application', '1.0.0'),
+            (now - datetime.timedelta(days=31, minutes=2), 'test-application', '1.0.0'),
+        ])
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30):
+            AnalyticsArchiver(retention_days=30).run()
+            stats = AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider)
+
+        # Downloads before the start of the month, on the first day of the month, are counted,
+        # unless the month started just after midnight
+        expected_month = 1
+        if (now - datetime.timedelta(days=31, minutes=2)).date() == (now - datetime.timedelta(days=31)).date():
+            expected_month = 3
+        elif (now - datetime.timedelta(days=31, minutes=1)).date() == (now - datetime.timedelta(days=31)).date():
+            expected_month = 2
+
+        assert stats == {
+            'week': 1,
+            'month': expected_month,
+            'year': 3,
+            'total': 3
+        }
@@ -0,0 +1,149 @@
+
+import datetime
+
+import pytest
+import sqlalchemy
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.global_statistics import GlobalStatistics
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestAnalyticsDaily(AnalyticsIntegrationTest):
+    """Test daily download counts, maintained as downloads are recorded."""
+
+    @pytest.fixture(autouse=True)
+    def remove_analytics(self):
+        """Remove analytics recorded by previous tests."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.delete())
+            conn.execute(db.analytics_daily.delete())
+
+    def _get_module_version(self, version):
+        """Return test module version."""
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), version)
+
+    def _record_downloads(self, module_version, timestamps, analytics_token='test-application', auth_token=None):
+        """Record downloads of module version at each of the timestamps."""
+        module_provider = module_version._module_provider
+        AnalyticsEngine.record_download_events([
+            {
+                'module_version_id': module_version.pk,
+                'module_provider_id': module_provider.pk,
+                'namespace': module_provider._module._namespace.name,
+                'module': module_provider._module.name,
+                'provider': module_provider.name,
+                'timestamp': timestamp.isoformat(),
+                'analytics_token': analytics_token,
+                'terraform_version': '1.3.2',
+                'user_agent': None,
+                'auth_token': auth_token
+            }
+            for timestamp in timestamps
+        ])
+
+    def _get_daily_rows(self):
+        """Return daily download counts, summed by module version, day, environment and analytics token."""
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.analytics_daily.c.parent_module_version,
+            db.analytics_daily.c.day,
+            db.analytics_daily.c.environment,
+            db.analytics_daily.c.analytics_token,
+            sqlalchemy.func.sum(db.analytics_daily.c.download_count)
+        ).group_by(
+            db.analytics_daily.c.parent_module_version,
+            db.analytics_daily.c.day,
+            db.analytics_daily.c.environment,
+            db.analytics_daily.c.analytics_token
+        )
+        with db.get_connection() as conn:
+            return sorted(tuple(row) for row in conn.execute(select))
+
+    def test_daily_counts_maintained(self):
+        """Test that daily download counts are incremented as downloads are recorded."""
+        module_version = self._get_module_version('1.5.0')
+        day = datetime.datetime(2023, 3, 1, 10, 0, 0)
+        previous_day = day - datetime.timedelta(days=1)
+
+        self._record_downloads(module_version, [day, day, previous_day])
+        self._record_downloads(module_version, [day], analytics_token='second-application')
+        self._record_downloads(module_version, [day + datetime.timedelta(hours=5)])
+
+        assert self._get_daily_rows() == [
+            (module_version.pk, previous_day.date(), 'Default', 'test-application', 1),
+            (module_version.pk, day.date(), 'Default', 'second-application', 1),
+            (module_version.pk, day.date(), 'Default', 'test-application', 3),
+        ]
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 5
+        assert AnalyticsEngine.get_total_downloads() == 5
+
+    def test_get_module_provider_download_stats(self):
+        """Test download counts of intervals, including downloads within the first day of each interval."""
+        module_version = self._get_module_version('1.5.0')
+        now = datetime.datetime.now()
+
+        self._record_downloads(module_version, [
+            now,
+            now - datetime.timedelta(days=3),
+            # Within first day of week
+            now - datetime.timedelta(days=7) + datetime.timedelta(minutes=1),
+            # Outside of week, on the same day as the start of the week
+            now - datetime.timedelta(days=7) - datetime.timedelta(minutes=1),
+            now - datetime.timedelta(days=20),
+            now - datetime.timedelta(days=31) + datetime.timedelta(minutes=1),
+            now - datetime.timedelta(days=31) - datetime.timedelta(minutes=1),
+            now - datetime.timedelta(days=200),
+            now - datetime.timedelta(days=400),
+        ])
+        # Ensure downloads of other module providers are not counted
+        self._record_downloads(
+            ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'secondprovider'), '1.0.0'),
+            [now]
+        )
+
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider) == {
+            'week': 3,
+            'month': 6,
+            'year': 8,
+            'total': 9
+        }
+
+    def test_delete_analytics(self):
+        """Test that daily download counts are removed with analytics of module version."""
+        module_version = self._get_module_version('1.5.0')
+        other_module_version = self._get_module_version('1.4.0')
+        self._record_downloads(module_version, [datetime.datetime.now()])
+        self._record_downloads(other_module_version, [datetime.datetime.now()])
+
+        AnalyticsEngine.delete_analytics_for_module_version(module_version)
+
+        assert [row[0] for row in self._get_daily_rows()] == [other_module_version.pk]
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 0
+        assert AnalyticsEngine.get_module_version_total_downloads(other_module_version) == 1
+
+    def test_migrate_analytics(self):
+        """Test that daily download counts are migrated with analytics to new module version."""
+        module_version = self._get_module_version('1.5.0')
+        new_module_version = self._get_module_version('1.4.0')
+        self._record_downloads(module_version, [datetime.datetime.now(), datetime.datetime.now()])
+
+        AnalyticsEngine.migrate_analytics_to_new_module_version(module_version.pk, new_module_version)
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 0
+        assert AnalyticsEngine.get_module_version_total_downloads(new_module_version) == 2
+
+    def test_most_downloaded_module_provider_this_week(self):
+        """Test that most downloaded module provider is calculated from daily download counts."""
+        now = datetime.datetime.now()
+        module_version = self._get_module_version('1.5.0')
+        second_module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'secondmodule'), 'testprovider'), '1.1.1')
+
+        self._record_downloads(module_version, [now, now - datetime.timedelta(days=2)])
+        # Downloads outside of the past week are not counted
+        self._record_downloads(second_module_version, [now] + [now - datetime.timedelta(days=10)] * 3)
+
+        assert GlobalStatistics._calculate_most_downloaded_module_provider_this_week() == module_version._module_provider.pk
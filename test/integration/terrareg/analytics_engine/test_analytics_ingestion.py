@@ -0,0 +1,309 @@
+
+import json
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.analytics_ingestion import AnalyticsIngestion
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestAnalyticsIngestion(AnalyticsIntegrationTest):
+    """Test asynchronous ingestion of module download analytics."""
+
+    @pytest.fixture(autouse=True)
+    def enable_async_ingestion(self, tmp_path):
+        """Enable asynchronous ingestion, with flush interval and batch size that do not trigger background inserts."""
+        self._spool_directory = str(tmp_path)
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_ASYNC', True), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_FLUSH_INTERVAL', 60000), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_BATCH_SIZE', 100), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_SPOOL_DIRECTORY', self._spool_directory):
+            # Force queue to be re-initialised for each test
+            AnalyticsIngestion.stop()
+            AnalyticsIngestion._PID = None
+            yield
+            AnalyticsIngestion.stop()
+
+    def _get_module_version(self, version='1.5.0'):
+        """Return test module version."""
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), version)
+
+    def _record_download(self, module_version):
+        """Record download of module version."""
+        AnalyticsEngine.record_module_version_download(
+            module_version=module_version, terraform_version=None,
+            analytics_token='test-application', user_agent='Terraform/1.3.2', auth_token=None)
+
+    def test_downloads_inserted_in_batch(self):
+        """Test that downloads are queued and inserted in a single batch."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        initial_provider_downloads = AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider)['total']
+        initial_global_downloads = GlobalStatistics.get(GlobalStatistic.DOWNLOAD_COUNT)[GlobalStatistic.DOWNLOAD_COUNT]
+
+        for _ in range(3):
+            self._record_download(module_version)
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads
+        assert AnalyticsIngestion.get_statistics()['queue_depth'] == 3
+
+        AnalyticsIngestion.flush()
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 3
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider)['total'] == initial_provider_downloads + 3
+        assert GlobalStatistics.get(GlobalStatistic.DOWNLOAD_COUNT)[GlobalStatistic.DOWNLOAD_COUNT] == initial_global_downloads + 3
+        assert AnalyticsIngestion.get_statistics() == {
+            'queue_depth': 0,
+            'enqueued': 3,
+            'recorded': 3,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 1,
+        }
+
+        # Ensure terraform version is obtained from user agent
+        assert AnalyticsEngine.get_module_provider_token_versions(module_version._module_provider)['test-application']['terraform_version'] == '1.3.2'
+
+    def test_batch_size(self):
+        """Test that queued downloads are split into batches."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_BATCH_SIZE', 2):
+            # Prevent background thread from inserting downloads once the batch size is reached
+            with mock.patch('terrareg.analytics_ingestion.AnalyticsIngestion._run'):
+                for _ in range(5):
+                    self._record_download(module_version)
+
+            AnalyticsIngestion.flush()
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 5
+        assert AnalyticsIngestion.get_statistics()['batches'] == 3
+
+    def test_background_flush(self):
+        """Test that background thread inserts downloads once the batch size is reached."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_BATCH_SIZE', 2):
+            self._record_download(module_version)
+            self._record_download(module_version)
+
+            # Stop background thread, which inserts any remaining downloads
+            AnalyticsIngestion.stop()
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 2
+        assert AnalyticsIngestion.get_statistics()['recorded'] == 2
+
+    def test_queue_full(self):
+        """Test that downloads are dropped once the queue is full and the timeout has been reached."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_QUEUE_SIZE', 2), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_QUEUE_TIMEOUT', 10):
+            for _ in range(3):
+                self._record_download(module_version)
+
+        statistics = AnalyticsIngestion.get_statistics()
+        assert statistics['queue_depth'] == 2
+        assert statistics['dropped'] == 1
+
+        AnalyticsIngestion.flush()
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 2
+
+    def test_spool(self):
+        """Test that queued downloads are stored in spool file until they are inserted."""
+        module_version = self._get_module_version()
+        self._record_download(module_version)
+
+        spool_path = os.path.join(self._spool_directory, f'{os.getpid()}.ndjson')
+        with open(spool_path, 'r') as fh:
+            events = [json.loads(line) for line in fh]
+        assert len(events) == 1
+        assert events[0]['module_version_id'] == module_version.pk
+        assert events[0]['analytics_token'] == 'test-application'
+
+        AnalyticsIngestion.flush()
+        assert os.listdir(self._spool_directory) == []
+
+    def test_spool_file_kept_open(self):
+        """Test that the spool file is opened once, whilst downloads are appended to it."""
+        module_version = self._get_module_version()
+        with mock.patch('terrareg.analytics_ingestion.open', create=True, wraps=open) as mock_open:
+            for _ in range(3):
+                self._record_download(module_version)
+        assert mock_open.call_count == 1
+
+        spool_path = os.path.join(self._spool_directory, f'{os.getpid()}.ndjson')
+        with open(spool_path, 'r') as fh:
+            assert len([json.loads(line) for line in fh]) == 3
+
+        AnalyticsIngestion.flush()
+        assert os.listdir(self._spool_directory) == []
+
+    def test_recover_spool(self):
+        """Test that downloads in spool files of processes that are no longer running are inserted."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        deleted_module_version = self._get_module_version('1.4.0')
+
+        # Create spool file for process that is no longer running,
+        # containing a download of a module version that has since been deleted
+        with open(os.path.join(self._spool_directory, '999999999.ndjson'), 'w') as fh:
+            for event_module_version in [module_version, module_version, deleted_module_version]:
+                fh.write(json.dumps({
+                    'module_version_id': event_module_version.pk,
+                    'module_provider_id': event_module_version._module_provider.pk,
+                    'namespace': 'testnamespace',
+                    'module': 'publishedmodule',
+                    'provider': 'testprovider',
+                    'timestamp': '2023-03-01T10:00:00',
+                    'analytics_token': 'recovered-application',
+                    'terraform_version': '1.2.0',
+                    'user_agent': None,
+                    'auth_token': None
+                }) + '\n')
+            # Partially written event
+            fh.write('{"module_version_id": ')
+        deleted_module_version.delete()
+
+        self._record_download(module_version)
+        AnalyticsIngestion.flush()
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 3
+        assert os.listdir(self._spool_directory) == []
+
+    def test_failed_insert_retained_in_spool(self):
+        """Test that downloads that cannot be inserted remain in the spool."""
+        module_version = self._get_module_version()
+        self._record_download(module_version)
+
+        with mock.patch('terrareg.analytics.AnalyticsEngine.record_download_events', side_effect=Exception('Unittest error')):
+            AnalyticsIngestion.flush()
+
+        statistics = AnalyticsIngestion.get_statistics()
+        assert statistics['failed'] == 1
+        assert statistics['queue_depth'] == 1
+        spool_files = os.listdir(self._spool_directory)
+        assert len(spool_files) == 1
+        assert spool_files[0].startswith(f'{os.getpid()}-')
+
+    def test_failed_insert_retried(self):
+        """Test that downloads that cannot be inserted are inserted once the database has recovered."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        self._record_download(module_version)
+
+        with mock.patch('terrareg.analytics.AnalyticsEngine.record_download_events', side_effect=Exception('Unittest error')):
+            AnalyticsIngestion.flush()
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads
+
+        self._record_download(module_version)
+        AnalyticsIngestion.flush()
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 2
+        assert AnalyticsIngestion.get_statistics() == {
+            'queue_depth': 0,
+            'enqueued': 2,
+            'recorded': 2,
+            'dropped': 0,
+            'failed': 1,
+            'batches': 2,
+        }
+        assert os.listdir(self._spool_directory) == []
+
+    def test_failed_insert_retried_by_background_thread(self):
+        """Test that downloads that cannot be inserted are retried by the background thread, without a spool directory."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        record_download_events = AnalyticsEngine.record_download_events
+        attempts = []
+        def fail_first_attempt(events):
+            attempts.append(events)
+            if len(attempts) == 1:
+                raise Exception('Unittest error')
+            record_download_events(events)
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_SPOOL_DIRECTORY', ''), \
+                mock.patch('terrareg.analytics_ingestion.AnalyticsIngestion.RETRY_INITIAL_DELAY', 0.01), \
+                mock.patch('terrareg.analytics.AnalyticsEngine.record_download_events', side_effect=fail_first_attempt):
+            self._record_download(module_version)
+            AnalyticsIngestion.flush()
+            assert AnalyticsIngestion.get_statistics()['failed'] == 1
+
+            # Wait for background thread to retry downloads
+            deadline = time.monotonic() + 10
+            while AnalyticsIngestion.get_statistics()['recorded'] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert len(attempts) == 2
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 1
+        assert AnalyticsIngestion.get_statistics()['queue_depth'] == 0
+
+    def test_failed_insert_counted_in_queue_size(self):
+        """Test that downloads waiting to be retried count towards the size of the queue."""
+        module_version = self._get_module_version()
+        self._record_download(module_version)
+        with mock.patch('terrareg.analytics.AnalyticsEngine.record_download_events', side_effect=Exception('Unittest error')):
+            AnalyticsIngestion.flush()
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_QUEUE_SIZE', 2), \
+                mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_QUEUE_TIMEOUT', 10):
+            for _ in range(2):
+                self._record_download(module_version)
+
+        statistics = AnalyticsIngestion.get_statistics()
+        assert statistics['queue_depth'] == 2
+        assert statistics['dropped'] == 1
+
+    def test_failed_batch_inserted_batches_removed_from_spool(self):
+        """Test that only downloads of batches that have not been inserted remain in the spool."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        record_download_events = AnalyticsEngine.record_download_events
+        with mock.patch('terrareg.config.Config.ANALYTICS_INGESTION_BATCH_SIZE', 2):
+            with mock.patch('terrareg.analytics_ingestion.AnalyticsIngestion._run'):
+                for _ in range(5):
+                    self._record_download(module_version)
+
+            # Fail to insert second batch
+            batches = []
+            def record_first_batch(events):
+                batches.append(events)
+                if len(batches) > 1:
+                    raise Exception('Unittest error')
+                record_download_events(events)
+
+            with mock.patch('terrareg.analytics.AnalyticsEngine.record_download_events', side_effect=record_first_batch):
+                AnalyticsIngestion.flush()
+
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads + 2
+        statistics = AnalyticsIngestion.get_statistics()
+        assert statistics['recorded'] == 2
+        assert statistics['failed'] == 3
+
+        spool_files = os.listdir(self._spool_directory)
+        assert len(spool_files) == 1
+        with open(os.path.join(self._spool_directory, spool_files[0]), 'r') as fh:
+            assert len([json.loads(line) for line in fh]) == 3
+
+    def test_failed_batch_rolled_back(self):
+        """Test that downloads and download counts of a batch are not stored, if the batch cannot be inserted."""
+        module_version = self._get_module_version()
+        initial_downloads = AnalyticsEngine.get_module_version_total_downloads(module_version)
+        initial_provider_downloads = AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider)['total']
+        initial_global_downloads = GlobalStatistics.get(GlobalStatistic.DOWNLOAD_COUNT)[GlobalStatistic.DOWNLOAD_COUNT]
+        self._record_download(module_version)
+
+        # Fail once raw analytics and daily download counts have been inserted
+        with mock.patch('terrareg.global_statistics.GlobalStatistics.increment', side_effect=Exception('Unittest error')):
+            AnalyticsIngestion.flush()
+
+        assert AnalyticsIngestion.get_statistics()['failed'] == 1
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == initial_downloads
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider)['total'] == initial_provider_downloads
+        assert GlobalStatistics.get(GlobalStatistic.DOWNLOAD_COUNT)[GlobalStatistic.DOWNLOAD_COUNT] == initial_global_downloads
@@ -0,0 +1,105 @@
+
+import datetime
+from unittest import mock
+
+import pytest
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestGetModuleProviderTokenVersions(AnalyticsIntegrationTest):
+    """Test get_module_provider_token_versions function."""
+
+    @pytest.fixture(autouse=True)
+    def remove_analytics(self):
+        """Remove analytics recorded by previous tests."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.delete())
+            conn.execute(db.analytics_daily.delete())
+            conn.execute(db.analytics_token_latest.delete())
+
+    def _get_module_provider(self):
+        """Return test module provider."""
+        return ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider')
+
+    def _get_latest_rows(self):
+        """Return all rows of analytics_token_latest table."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return conn.execute(db.analytics_token_latest.select()).fetchall()
+
+    def test_get_module_provider_token_versions(self):
+        """Test latest version used by each analytics token, using the highest priority environment."""
+        with mock.patch('terrareg.config.Config.ANALYTICS_AUTH_KEYS', ['dev-key:dev', 'prod-key:prod']):
+            AnalyticsEngine._CONFIG_CACHE.clear()
+            self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+
+            assert AnalyticsEngine.get_module_provider_token_versions(self._get_module_provider()) == {
+                'application-using-old-version': {'environment': 'dev', 'module_version': '1.4.0', 'terraform_version': '0.23.23'},
+                'duplicate-application': {'environment': 'prod', 'module_version': '1.5.0', 'terraform_version': '0.12.5'},
+                'second-application': {'environment': 'prod', 'module_version': '1.5.0', 'terraform_version': '0.12.5'},
+                'test-application': {'environment': 'dev', 'module_version': '1.6.0-beta', 'terraform_version': '0.12.31'},
+                'onlyusedbeta': {'environment': 'dev', 'module_version': '1.6.0-beta', 'terraform_version': '0.23.21'},
+            }
+        AnalyticsEngine._CONFIG_CACHE.clear()
+
+        # Ensure a single row is maintained for each module provider, analytics token and environment
+        latest_rows = self._get_latest_rows()
+        assert len(latest_rows) == len(set(
+            (row['module_provider_id'], row['analytics_token'], row['environment'])
+            for row in latest_rows
+        ))
+
+    def test_older_download_does_not_replace_latest(self):
+        """Test that downloads recorded after newer downloads, such as from a spool file, do not replace the latest download."""
+        module_provider = self._get_module_provider()
+        now = datetime.datetime.now()
+        for version, timestamp in [('1.5.0', now), ('1.4.0', now - datetime.timedelta(days=1))]:
+            module_version = ModuleVersion.get(module_provider, version)
+            AnalyticsEngine.record_download_events([{
+                'module_version_id': module_version.pk,
+                'module_provider_id': module_provider.pk,
+                'namespace': 'testnamespace',
+                'module': 'publishedmodule',
+                'provider': 'testprovider',
+                'timestamp': timestamp.isoformat(),
+                'analytics_token': 'test-application',
+                'terraform_version': '1.0.0',
+                'user_agent': None,
+                'auth_token': None
+            }])
+
+        assert AnalyticsEngine.get_module_provider_token_versions(module_provider)['test-application']['module_version'] == '1.5.0'
+        assert len(self._get_latest_rows()) == 1
+
+    def test_delete_latest_module_version(self):
+        """Test that previous downloads are used once analytics for the latest downloaded module version are deleted."""
+        self._import_test_analytics({
+            'testnamespace/publishedmodule/testprovider/1.4.0': [['test-application', None, '1.0.0']],
+            'testnamespace/publishedmodule/testprovider/1.5.0': [['test-application', None, '1.1.0']],
+        })
+        module_provider = self._get_module_provider()
+        assert AnalyticsEngine.get_module_provider_token_versions(module_provider)['test-application']['module_version'] == '1.5.0'
+
+        AnalyticsEngine.delete_analytics_for_module_version(ModuleVersion.get(module_provider, '1.5.0'))
+
+        assert AnalyticsEngine.get_module_provider_token_versions(module_provider) == {
+            'test-application': {'environment': 'Default', 'module_version': '1.4.0', 'terraform_version': '1.0.0'}
+        }
+
+    def test_migrate_analytics(self):
+        """Test that latest downloads are migrated to new module version."""
+        self._import_test_analytics({
+            'testnamespace/publishedmodule/testprovider/1.5.0': [['test-application', None, '1.1.0']],
+        })
+        module_provider = self._get_module_provider()
+
+        AnalyticsEngine.migrate_analytics_to_new_module_version(
+            ModuleVersion.get(module_provider, '1.5.0').pk,
+            ModuleVersion.get(module_provider, '1.4.0'))
+
+        assert AnalyticsEngine.get_module_provider_token_versions(module_provider)['test-application']['module_version'] == '1.4.0'
@@ -1,19 +1,70 @@
 
 
 from unittest import mock
+
+import sqlalchemy
+
 from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
 from . import AnalyticsIntegrationTest
 
 
 class TestGetPrometheusMetrics(AnalyticsIntegrationTest):
     """Test get_prometheus_metrics method."""
 
+    _TEST_POOL_STATISTICS = {
+        'connections_created': 2,
+        'checkouts': 5,
+        'checkout_wait_seconds': 0.25,
+    }
+
+    _TEST_MODULE_SPECS_CACHE_STATISTICS = {
+        'hits': 10,
+        'misses': 4,
+        'evictions': 1,
+        'entries': 3,
+        'size_bytes': 2048,
+    }
+
+    _TEST_ANALYTICS_INGESTION_STATISTICS = {
+        'queue_depth': 6,
+        'enqueued': 20,
+        'recorded': 12,
+        'dropped': 1,
+        'failed': 2,
+        'batches': 3,
+    }
+
+    _EXPECTED_ANALYTICS_INGESTION_METRICS = """
+# HELP analytics_ingestion_queue_depth Number of module downloads waiting in the analytics ingestion queue, including downloads waiting to be retried
+# TYPE analytics_ingestion_queue_depth gauge
+analytics_ingestion_queue_depth 6
+# HELP analytics_ingestion_enqueued Total number of module downloads added to the analytics ingestion queue
+# TYPE analytics_ingestion_enqueued counter
+analytics_ingestion_enqueued 20
+# HELP analytics_ingestion_recorded Total number of queued module downloads inserted into the database
+# TYPE analytics_ingestion_recorded counter
+analytics_ingestion_recorded 12
+# HELP analytics_ingestion_dropped Total number of module downloads not recorded due to the analytics ingestion queue being full
+# TYPE analytics_ingestion_dropped counter
+analytics_ingestion_dropped 1
+# HELP analytics_ingestion_failed Total number of queued module downloads that could not be inserted into the database and were queued to be retried
+# TYPE analytics_ingestion_failed counter
+analytics_ingestion_failed 2
+# HELP analytics_ingestion_batches Total number of batches of queued module downloads inserted into the database
+# TYPE analytics_ingestion_batches counter
+analytics_ingestion_batches 3
+"""
+
     def test_get_prometheus_with_no_modules(self):
         """Test function with no analytics recorded or module providers."""
         get_total_count_mock = mock.MagicMock(return_value=0)
         get_module_provider_version_statistics_mock = mock.MagicMock(return_value=(0, 0, 0))
         with mock.patch('terrareg.models.ModuleProvider.get_total_count', get_total_count_mock), \
-                mock.patch('terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics', get_module_provider_version_statistics_mock):
+                mock.patch('terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics', get_module_provider_version_statistics_mock), \
+                mock.patch('terrareg.database.Database.get_pool_statistics', mock.MagicMock(return_value=self._TEST_POOL_STATISTICS)), \
+                mock.patch('terrareg.module_specs_cache.ModuleSpecsCache.get_statistics', mock.MagicMock(return_value=self._TEST_MODULE_SPECS_CACHE_STATISTICS)), \
+                mock.patch('terrareg.analytics_ingestion.AnalyticsIngestion.get_statistics', mock.MagicMock(return_value=self._TEST_ANALYTICS_INGESTION_STATISTICS)):
             assert AnalyticsEngine.get_prometheus_metrics() == """
 # HELP module_providers_count Total number of module providers with a published version
 # TYPE module_providers_count counter
@@ -29,11 +80,39 @@ module_version_minor_count 0
 module_version_patch_count 0
 # HELP module_provider_usage Analytics tokens used in a module provider
 # TYPE module_provider_usage counter
-""".strip()
+# HELP database_pool_connections_created Total number of database connections created by the connection pool
+# TYPE database_pool_connections_created counter
+database_pool_connections_created 2
+# HELP database_pool_checkouts Total number of database connections checked out from the connection pool
+# TYPE database_pool_checkouts counter
+database_pool_checkouts 5
+# HELP database_pool_checkout_wait_seconds Total time spent waiting for database connections from the connection pool
+# TYPE database_pool_checkout_wait_seconds counter
+database_pool_checkout_wait_seconds 0.25
+# HELP module_specs_cache_hits Total number of lookups of parsed terraform-docs output found in the cache
+# TYPE module_specs_cache_hits counter
+module_specs_cache_hits 10
+# HELP module_specs_cache_misses Total number of lookups of parsed terraform-docs output not found in the cache
+# TYPE module_specs_cache_misses counter
+module_specs_cache_misses 4
+# HELP module_specs_cache_evictions Total number of parsed terraform-docs outputs removed from the cache due to size limit
+# TYPE module_specs_cache_evictions counter
+module_specs_cache_evictions 1
+# HELP module_specs_cache_entries Number of parsed terraform-docs outputs in the cache
+# TYPE module_specs_cache_entries gauge
+module_specs_cache_entries 3
+# HELP module_specs_cache_size_bytes Estimated size of parsed terraform-docs outputs in the cache
+# TYPE module_specs_cache_size_bytes gauge
+module_specs_cache_size_bytes 2048""".strip() + self._EXPECTED_ANALYTICS_INGESTION_METRICS.rstrip()
 
     def test_get_prometheus_with_no_analytics(self):
         """Test function with no analytics recorded."""
-        assert AnalyticsEngine.get_prometheus_metrics() == """
+        with mock.patch('terrareg.database.Database.get_pool_statistics', mock.MagicMock(return_value=self._TEST_POOL_STATISTICS)), \
+                mock.patch('terrareg.module_specs_cache.ModuleSpecsCache.get_statistics', mock.MagicMock(return_value=self._TEST_MODULE_SPECS_CACHE_STATISTICS)), \
+                mock.patch('terrareg.analytics_ingestion.AnalyticsIngestion.get_statistics', mock.MagicMock(return_value=self._TEST_ANALYTICS_INGESTION_STATISTICS)):
+            prometheus_metrics = AnalyticsEngine.get_prometheus_metrics()
+
+        assert prometheus_metrics == """
 # HELP module_providers_count Total number of module providers with a published version
 # TYPE module_providers_count counter
 module_providers_count 6
@@ -48,13 +127,41 @@ module_version_minor_count 3
 module_version_patch_count 2
 # HELP module_provider_usage Analytics tokens used in a module provider
 # TYPE module_provider_usage counter
-""".strip()
+# HELP database_pool_connections_created Total number of database connections created by the connection pool
+# TYPE database_pool_connections_created counter
+database_pool_connections_created 2
+# HELP database_pool_checkouts Total number of database connections checked out from the connection pool
+# TYPE database_pool_checkouts counter
+database_pool_checkouts 5
+# HELP database_pool_checkout_wait_seconds Total time spent waiting for database connections from the connection pool
+# TYPE database_pool_checkout_wait_seconds counter
+database_pool_checkout_wait_seconds 0.25
+# HELP module_specs_cache_hits Total number of lookups of parsed terraform-docs output found in the cache
+# TYPE module_specs_cache_hits counter
+module_specs_cache_hits 10
+# HELP module_specs_cache_misses Total number of lookups of parsed terraform-docs output not found in the cache
+# TYPE module_specs_cache_misses counter
+module_specs_cache_misses 4
+# HELP module_specs_cache_evictions Total number of parsed terraform-docs outputs removed from the cache due to size limit
+# TYPE module_specs_cache_evictions counter
+module_specs_cache_evictions 1
+# HELP module_specs_cache_entries Number of parsed terraform-docs outputs in the cache
+# TYPE module_specs_cache_entries gauge
+module_specs_cache_entries 3
+# HELP module_specs_cache_size_bytes Estimated size of parsed terraform-docs outputs in the cache
+# TYPE module_specs_cache_size_bytes gauge
+module_specs_cache_size_bytes 2048""".strip() + self._EXPECTED_ANALYTICS_INGESTION_METRICS.rstrip()
 
     def test_get_prometheus(self):
         """Test function with data present"""
         self._import_test_analytics(self._TEST_ANALYTICS_DATA)
 
-        assert AnalyticsEngine.get_prometheus_metrics() == """
+        with mock.patch('terrareg.database.Database.get_pool_statistics', mock.MagicMock(return_value=self._TEST_POOL_STATISTICS)), \
+                mock.patch('terrareg.module_specs_cache.ModuleSpecsCache.get_statistics', mock.MagicMock(return_value=self._TEST_MODULE_SPECS_CACHE_STATISTICS)), \
+                mock.patch('terrareg.analytics_ingestion.AnalyticsIngestion.get_statistics', mock.MagicMock(return_value=self._TEST_ANALYTICS_INGESTION_STATISTICS)):
+            prometheus_metrics = AnalyticsEngine.get_prometheus_metrics()
+
+        assert prometheus_metrics == """
 # HELP module_providers_count Total number of module providers with a published version
 # TYPE module_providers_count counter
 module_providers_count 6
@@ -80,4 +187,82 @@ module_provider_usage{module_provider_id="testnamespace/secondmodule/testprovide
 module_provider_usage{module_provider_id="testnamespace/publishedmodule/testprovider", analytics_token="test-application"} 1
 module_provider_usage{module_provider_id="testnamespace/publishedmodule/testprovider", analytics_token="without-analytics-key"} 1
 module_provider_usage{module_provider_id="testnamespace/noanalyticstoken/testprovider", analytics_token="withoutanalytics"} 1
+# HELP database_pool_connections_created Total number of database connections created by the connection pool
+# TYPE database_pool_connections_created counter
+database_pool_connections_created 2
+# HELP database_pool_checkouts Total number of database connections checked out from the connection pool
+# TYPE database_pool_checkouts counter
+database_pool_checkouts 5
+# HELP database_pool_checkout_wait_seconds Total time spent waiting for database connections from the connection pool
+# TYPE database_pool_checkout_wait_seconds counter
+database_pool_checkout_wait_seconds 0.25
+# HELP module_specs_cache_hits Total number of lookups of parsed terraform-docs output found in the cache
+# TYPE module_specs_cache_hits counter
+module_specs_cache_hits 10
+# HELP module_specs_cache_misses Total number of lookups of parsed terraform-docs output not found in the cache
+# TYPE module_specs_cache_misses counter
+module_specs_cache_misses 4
+# HELP module_specs_cache_evictions Total number of parsed terraform-docs outputs removed from the cache due to size limit
+# TYPE module_specs_cache_evictions counter
+module_specs_cache_evictions 1
+# HELP module_specs_cache_entries Number of parsed terraform-docs outputs in the cache
+# TYPE module_specs_cache_entries gauge
+module_specs_cache_entries 3
+# HELP module_specs_cache_size_bytes Estimated size of parsed terraform-docs outputs in the cache
+# TYPE module_specs_cache_size_bytes gauge
+module_specs_cache_size_bytes 2048""".strip() + self._EXPECTED_ANALYTICS_INGESTION_METRICS.rstrip()
+
+    def test_get_database_pool_metrics(self):
+        """Test database pool metrics for connection pool with pool size statistics."""
+        pool_statistics = dict(self._TEST_POOL_STATISTICS)
+        pool_statistics.update({'size': 5, 'checkedout': 3, 'overflow': -2})
+        with mock.patch('terrareg.database.Database.get_pool_statistics', mock.MagicMock(return_value=pool_statistics)):
+            metrics = AnalyticsEngine.get_database_pool_metrics()
+
+        assert '\n'.join([line for metric in metrics for line in metric.generate()]) == """
+# HELP database_pool_connections_created Total number of database connections created by the connection pool
+# TYPE database_pool_connections_created counter
+database_pool_connections_created 2
+# HELP database_pool_checkouts Total number of database connections checked out from the connection pool
+# TYPE database_pool_checkouts counter
+database_pool_checkouts 5
+# HELP database_pool_checkout_wait_seconds Total time spent waiting for database connections from the connection pool
+# TYPE database_pool_checkout_wait_seconds counter
+database_pool_checkout_wait_seconds 0.25
+# HELP database_pool_size Configured size of the database connection pool
+# TYPE database_pool_size gauge
+database_pool_size 5
+# HELP database_pool_checkedout Number of database connections currently checked out from the connection pool
+# TYPE database_pool_checkedout gauge
+database_pool_checkedout 3
+# HELP database_pool_overflow Number of overflow database connections currently open
+# TYPE database_pool_overflow gauge
+database_pool_overflow -2
 """.strip()
+
+    def test_get_pool_statistics(self):
+        """Test pool statistics are recorded when obtaining database connections."""
+        before_statistics = Database.get_pool_statistics()
+
+        with Database.get_connection() as conn:
+            conn.execute(sqlalchemy.text('SELECT 1'))
+
+        after_statistics = Database.get_pool_statistics()
+        assert after_statistics['checkouts'] == before_statistics['checkouts'] + 1
+        assert after_statistics['checkout_wait_seconds'] >= before_statistics['checkout_wait_seconds']
+
+    def test_get_prometheus_metrics_cached(self):
+        """Test that generated metrics are cached for the configured TTL."""
+        with mock.patch('terrareg.config.Config.PROMETHEUS_METRICS_CACHE_TTL', 10):
+            prometheus_metrics = AnalyticsEngine.get_prometheus_metrics()
+
+            # Ensure analytics recorded after the metrics are generated are not returned
+            self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+            assert AnalyticsEngine.get_prometheus_metrics() == prometheus_metrics
+
+        with mock.patch('terrareg.config.Config.PROMETHEUS_METRICS_CACHE_TTL', 0):
+            assert AnalyticsEngine.get_prometheus_metrics() != prometheus_metrics
+
+    def test_get_module_provider_version_statistics(self):
+        """Test counts of major, minor and patch releases, excluding beta versions."""
+        assert AnalyticsEngine.get_module_provider_version_statistics() == (8, 3, 2)
@@ -146,3 +146,25 @@ module "test-module" {
         with unittest.mock.patch('terrareg.config.Config.TERRAFORM_EXAMPLE_VERSION_TEMPLATE', '>= {major}.{minor}.{patch}, < {major}.{minor_plus_one}.0'), \
                 unittest.mock.patch('terrareg.config.Config.EXAMPLE_ANALYTICS_TOKEN', example_analytics_token):
             assert example_file.get_content(server_hostname='example.com') == expected_output
+
+    def test_create_many(self):
+        """Test creating multiple example files with content."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        example = Example(module_version, 'examples/testreadmeexample')
+
+        example_files = ExampleFile.create_many(example, {
+            'examples/testreadmeexample/create_many_one.tf': 'variable "one" {}',
+            'examples/testreadmeexample/create_many_two.tf': 'variable "two" {}',
+        })
+        try:
+            assert [example_file.path for example_file in example_files] == [
+                'examples/testreadmeexample/create_many_one.tf',
+                'examples/testreadmeexample/create_many_two.tf'
+            ]
+            assert ExampleFile(example, 'examples/testreadmeexample/create_many_one.tf').get_content(server_hostname='localhost') == 'variable "one" {}'
+            assert ExampleFile(example, 'examples/testreadmeexample/create_many_two.tf').get_content(server_hostname='localhost') == 'variable "two" {}'
+        finally:
+            for example_file in example_files:
+                example_file.delete()
+
+        assert ExampleFile.create_many(example, {}) == []
@@ -1,12 +1,15 @@
 
 from datetime import datetime
 import json
+import unittest.mock
 
 import pytest
 import sqlalchemy
 
+from terrareg.blob_store import BlobStore
 from terrareg.database import Database
 from terrareg.models import Example, ExampleFile, Module, ModuleDetails, Namespace, ModuleProvider, ModuleVersion
+from terrareg.module_specs_cache import ModuleSpecsCache
 import terrareg.errors
 from test.integration.terrareg import TerraregIntegrationTest
 
@@ -84,6 +87,147 @@ class TestModuleDetails(TerraregIntegrationTest):
 
         assert res == None
 
+    @staticmethod
+    def _get_db_row(module_details_id):
+        """Return module details row directly from database."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            return conn.execute(
+                db.module_details.select().where(
+                    db.module_details.c.id == module_details_id
+                )
+            ).fetchone()
+
+    @staticmethod
+    def _get_reference_count(sha256):
+        """Return reference count of blob store content, or None if it does not exist."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            row = conn.execute(
+                db.blob_store.select().where(
+                    db.blob_store.c.sha256 == sha256
+                )
+            ).fetchone()
+        return row['reference_count'] if row else None
+
+    def test_update_attributes_blob_store(self):
+        """Test that identical content is de-duplicated in the blob store"""
+        readme_content = 'test blob store readme content'
+        module_details_1 = ModuleDetails.create()
+        module_details_2 = ModuleDetails.create()
+        module_details_1.update_attributes(readme_content=readme_content)
+        module_details_2.update_attributes(readme_content=readme_content)
+
+        row = self._get_db_row(module_details_1.pk)
+        sha256 = row['readme_content_sha256']
+        assert row['readme_content'] is None
+        assert self._get_db_row(module_details_2.pk)['readme_content_sha256'] == sha256
+        assert self._get_reference_count(sha256) == 2
+
+        assert module_details_1.readme_content == Database.encode_blob(readme_content)
+        assert ModuleDetails(module_details_2.pk).readme_content == Database.encode_blob(readme_content)
+
+        # Update content of one object and ensure reference is removed
+        module_details_1.update_attributes(readme_content='new readme content')
+        assert self._get_reference_count(sha256) == 1
+        assert module_details_1.readme_content == Database.encode_blob('new readme content')
+
+        # Delete remaining object and ensure content is removed from blob store
+        module_details_2.delete()
+        assert self._get_reference_count(sha256) is None
+
+        new_sha256 = self._get_db_row(module_details_1.pk)['readme_content_sha256']
+        module_details_1.delete()
+        assert self._get_reference_count(new_sha256) is None
+
+    def test_update_attributes_blob_store_rolled_back(self):
+        """Test that blob store references are not modified if the update is rolled back"""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(readme_content='rollback original content')
+        sha256 = self._get_db_row(module_details.pk)['readme_content_sha256']
+
+        with pytest.raises(Exception, match='Rollback update'):
+            with Database.start_transaction():
+                module_details.update_attributes(readme_content='rollback new content')
+                raise Exception('Rollback update')
+
+        assert self._get_db_row(module_details.pk)['readme_content_sha256'] == sha256
+        assert self._get_reference_count(sha256) == 1
+        assert self._get_reference_count(BlobStore.get_hash(Database.encode_blob('rollback new content'))) is None
+        assert ModuleDetails(module_details.pk).readme_content == Database.encode_blob('rollback original content')
+
+        module_details.delete()
+        assert self._get_reference_count(sha256) is None
+
+    def test_update_attributes_blob_store_disabled(self):
+        """Test that content is stored against module details when the blob store is disabled"""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(readme_content='blob store content')
+        sha256 = self._get_db_row(module_details.pk)['readme_content_sha256']
+
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_STORE', False):
+            module_details.update_attributes(readme_content='inline content')
+
+        row = self._get_db_row(module_details.pk)
+        assert row['readme_content'] == Database.encode_blob('inline content')
+        assert row['readme_content_sha256'] is None
+        assert self._get_reference_count(sha256) is None
+        assert module_details.readme_content == Database.encode_blob('inline content')
+
+        module_details.delete()
+
+    @pytest.mark.parametrize('enable_blob_store', [True, False])
+    def test_deferred_blob_columns(self, enable_blob_store):
+        """Test that blob columns are not obtained with the database row and are obtained individually on access."""
+        module_details = ModuleDetails.create()
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_STORE', enable_blob_store):
+            module_details.update_attributes(
+                readme_content='deferred readme content',
+                tfsec=json.dumps({'results': []})
+            )
+
+        try:
+            module_details = ModuleDetails(module_details.pk)
+            with self._record_queries() as statements:
+                assert not any(column in module_details._get_db_row().keys() for column in ModuleDetails.BLOB_COLUMNS)
+                assert len(statements) == 1
+
+                assert module_details.tfsec == {'results': []}
+                assert len(statements) == 2
+                assert 'readme_content' not in statements[1]
+
+                # Ensure value is cached
+                assert module_details.tfsec == {'results': []}
+                assert len(statements) == 2
+
+                assert module_details.readme_content == Database.encode_blob('deferred readme content')
+                assert len(statements) == 3
+
+            # Ensure cached values are removed when updated
+            module_details.update_attributes(readme_content='updated readme content')
+            assert module_details.readme_content == Database.encode_blob('updated readme content')
+        finally:
+            module_details.delete()
+
+    def test_get_module_specs_cached(self):
+        """Test that parsed terraform-docs output is cached between objects and invalidated on update."""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(terraform_docs=json.dumps({'inputs': [{'name': 'first'}]}))
+
+        try:
+            assert module_details.get_module_specs() == {'inputs': [{'name': 'first'}]}
+
+            with unittest.mock.patch('json.loads') as mock_json_loads:
+                assert ModuleDetails(module_details.pk).get_module_specs() == {'inputs': [{'name': 'first'}]}
+            mock_json_loads.assert_not_called()
+
+            module_details.update_attributes(terraform_docs=json.dumps({'inputs': [{'name': 'second'}]}))
+            assert ModuleDetails(module_details.pk).get_module_specs() == {'inputs': [{'name': 'second'}]}
+
+        finally:
+            module_details.delete()
+        assert ModuleSpecsCache.get(module_details.pk) is None
+
     def test_graph_json(self):
         """Test graph data conversion to JSON"""
         module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace.get("moduledetails"), "graph-test"), "provider"), "1.0.0")
@@ -122,3 +266,47 @@ class TestModuleDetails(TerraregIntegrationTest):
                 {"classes": ["module.main_call-root"], "data": {"id": "root.module.main_call", "source": "module.main_call", "target": "root"}}
             ]
         }
+
+    def test_graph_json_not_stored(self):
+        """Test that graph JSON is generated, without being stored, if it has not been pre-computed."""
+        module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace.get("moduledetails"), "graph-test"), "provider"), "1.0.0")
+        module_details = module_version.module_details
+        module_details.update_attributes(terraform_graph_json=None)
+
+        with unittest.mock.patch('terrareg.models.ModuleDetails.update_attributes') as mock_update_attributes:
+            full_names_graph_json = module_details.get_graph_json(full_resource_names=True, full_module_names=True)
+        mock_update_attributes.assert_not_called()
+        assert {node['data']['label'] for node in full_names_graph_json['nodes']} == {
+            'aws_s3_bucket.test_bucket', 'aws_s3_object.test_obj_root_module',
+            'module.submodule-call.aws_ec2_instance.test_instance', 'module.submodule-call', 'Root Module'
+        }
+        assert ModuleDetails(module_details.pk).terraform_graph_json is None
+
+        module_details.store_graph_json()
+
+    def test_store_graph_json(self):
+        """Test that graph JSON is generated and stored for each combination of graph options."""
+        module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace.get("moduledetails"), "graph-test"), "provider"), "1.0.0")
+        module_details = module_version.module_details
+        module_details.update_attributes(terraform_graph_json=None)
+
+        assert module_details.store_graph_json() is True
+
+        stored_graph_json = ModuleDetails(module_details.pk).terraform_graph_json
+        assert sorted(stored_graph_json.keys()) == [
+            'full_resource_names=false,full_module_names=false',
+            'full_resource_names=false,full_module_names=true',
+            'full_resource_names=true,full_module_names=false',
+            'full_resource_names=true,full_module_names=true',
+        ]
+
+        # Ensure stored graph JSON is used, without generating graph JSON from terraform graph
+        with unittest.mock.patch('terrareg.module_graph.ModuleGraph.generate') as mock_generate:
+            assert ModuleDetails(module_details.pk).get_graph_json(full_resource_names=True, full_module_names=True) == \
+                stored_graph_json['full_resource_names=true,full_module_names=true']
+        mock_generate.assert_not_called()
+
+        # Ensure graph JSON is not replaced, if it has already been stored
+        with unittest.mock.patch('terrareg.models.ModuleDetails.update_attributes') as mock_update_attributes:
+            assert ModuleDetails(module_details.pk).store_graph_json() is False
+        mock_update_attributes.assert_not_called()
@@ -1,10 +1,19 @@
 
+import os
 from unittest import mock
 import pytest
+import sqlalchemy
+from terrareg.analytics import AnalyticsEngine
+from terrareg.audit_action import AuditAction
+from terrareg.cache import CacheTags
 from terrareg.database import Database
 
-from terrareg.models import GitProvider, Module, ModuleVersion, Namespace, ModuleProvider
+from terrareg.models import (
+    Example, ExampleFile, GitProvider, Module, ModuleDetails, ModuleVersion,
+    ModuleVersionFile, Namespace, ModuleProvider, Submodule
+)
 import terrareg.errors
+from terrareg.response_cache import ResponseCache
 from test.integration.terrareg import TerraregIntegrationTest
 
 
@@ -90,6 +99,23 @@ class TestModuleProvider(TerraregIntegrationTest):
             '0.1.1', '0.0.9'
         ]
 
+    def test_module_provider_get_versions_populates_rows(self):
+        """Test that module versions returned by get_versions do not require further queries."""
+        namespace = Namespace(name='testnamespace')
+        module = Module(namespace=namespace, name='wrongversionorder')
+        module_provider = ModuleProvider.get(module=module, name='testprovider')
+
+        with self._record_queries() as statements:
+            module_versions = module_provider.get_versions()
+            assert len(statements) == 1
+
+            for module_version in module_versions:
+                assert module_version.pk
+                assert module_version.published is True
+                assert module_version.beta == (module_version.version == '23.2.3-beta')
+
+        assert len(statements) == 1
+
     def test_module_provider_get_latest_version(self):
         """
         Test that a module provider with versions in the wrong order return correct
@@ -277,6 +303,81 @@ class TestModuleProvider(TerraregIntegrationTest):
                 res = conn.execute(db.module_version.select().where(db.module_version.c.id==mv_pk))
                 assert res.fetchone() is None
 
+    def _create_module_provider_with_versions(self, name, versions):
+        """Create module provider with versions, each containing a submodule, example, example file and additional file."""
+        module = Module(namespace=Namespace.get(name='testnamespace'), name=name)
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+        for version in versions:
+            module_version = ModuleVersion(module_provider=module_provider, version=version)
+            module_version.prepare_module()
+            module_details = ModuleDetails.create()
+            module_details.update_attributes(readme_content='Bulk delete README')
+            module_version.update_attributes(module_details_id=module_details.pk)
+            module_version.publish()
+
+            submodule = Submodule.create(module_version=module_version, module_path='modules/test')
+            submodule.update_attributes(module_details_id=ModuleDetails.create().pk)
+            example = Example.create(module_version=module_version, module_path='examples/test')
+            example_details = ModuleDetails.create()
+            example_details.update_attributes(readme_content='Bulk delete README')
+            example.update_attributes(module_details_id=example_details.pk)
+            ExampleFile.create(example=example, path='examples/test/main.tf')
+            ModuleVersionFile.create(module_version=module_version, path='CHANGELOG.md')
+
+            AnalyticsEngine.record_module_version_download(
+                module_version=module_version,
+                terraform_version='1.0.0',
+                analytics_token='unittest',
+                user_agent='',
+                auth_token=None
+            )
+        return module_provider
+
+    def test_delete_set_based(self, tmp_path):
+        """Test that deleting a module provider removes all related rows using a fixed number of statements."""
+        db = Database.get()
+
+        def count_rows(table):
+            with db.get_connection() as conn:
+                return conn.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(table)).scalar()
+
+        tables = [db.module_version, db.sub_module, db.example_file, db.module_version_file,
+                  db.module_details, db.analytics, db.analytics_daily, db.analytics_token_latest, db.blob_store]
+        original_counts = {table.name: count_rows(table) for table in tables}
+
+        statement_counts = []
+        os.mkdir(os.path.join(tmp_path, 'modules'))
+        with mock.patch('terrareg.config.Config.DATA_DIRECTORY', str(tmp_path)):
+            for name, versions in [('bulk-delete-single', ['1.0.0']),
+                                   ('bulk-delete-multiple', ['1.0.0', '1.1.0', '1.2.0', '2.0.0', '2.1.0'])]:
+                module_provider = self._create_module_provider_with_versions(name, versions)
+                for version in versions:
+                    assert os.path.isdir(os.path.join(module_provider.base_directory, version))
+                module_provider_id = module_provider.id
+
+                with self._record_queries() as statements:
+                    module_provider.delete()
+                statement_counts.append(len(statements))
+
+                # Ensure data directory has been removed
+                assert not os.path.exists(module_provider.base_directory)
+
+                # Ensure a single audit event was created
+                with db.get_connection() as conn:
+                    audit_events = conn.execute(db.audit_history.select().where(
+                        db.audit_history.c.object_id.like(f'{module_provider_id}%'),
+                        db.audit_history.c.action.in_([AuditAction.MODULE_PROVIDER_DELETE, AuditAction.MODULE_VERSION_DELETE])
+                    )).fetchall()
+                assert [(row['action'], row['object_id'], row['old_value']) for row in audit_events] == [
+                    (AuditAction.MODULE_PROVIDER_DELETE, module_provider_id, f'{len(versions)} module versions')
+                ]
+
+        # Ensure number of statements does not depend on the number of versions
+        assert statement_counts[0] == statement_counts[1]
+
+        # Ensure all related rows and blob store content have been removed
+        assert {table.name: count_rows(table) for table in tables} == original_counts
+
     @pytest.mark.parametrize('original_git_provider_id, new_git_provider_id', [
         (None, None),
         (None, 1),
@@ -494,3 +595,138 @@ class TestModuleProvider(TerraregIntegrationTest):
 
         # Ensure base URL hasn't been modified
         assert module_provider._get_db_row()['repo_base_url_template'] == 'old-value'
+
+    def test_invalidate_cache(self):
+        """Test removing cached values generated from module provider."""
+        module_provider = ModuleProvider.get(Module(Namespace.get('testnamespace'), 'noversions'), 'testprovider')
+
+        generation = ResponseCache.get_generation()
+        ResponseCache.put('versions', b'versions', CacheTags.module_provider(
+            'testnamespace', 'noversions', 'testprovider'), generation=generation)
+        ResponseCache.put('module_details', b'module_details', CacheTags.module(
+            'testnamespace', 'noversions'), generation=generation)
+        ResponseCache.put('other_provider_versions', b'other', CacheTags.module_provider(
+            'testnamespace', 'noversions', 'otherprovider'), generation=generation)
+
+        module_provider.invalidate_cache()
+
+        assert [
+            key
+            for key in ['versions', 'module_details', 'other_provider_versions']
+            if ResponseCache.get(key) is not None
+        ] == ['other_provider_versions']
+
+    def test_summary(self, tmp_path):
+        """Test that module provider summary is maintained as module provider and versions are modified."""
+        db = Database.get()
+
+        def get_summary_row(module_provider_pk):
+            with db.get_connection() as conn:
+                return conn.execute(db.module_provider_summary.select().where(
+                    db.module_provider_summary.c.module_provider_id == module_provider_pk
+                )).fetchone()
+
+        os.mkdir(os.path.join(tmp_path, 'modules'))
+        with mock.patch('terrareg.config.Config.DATA_DIRECTORY', str(tmp_path)):
+            module_provider = ModuleProvider.get(
+                module=Module(namespace=Namespace.get(name='testnamespace'), name='summary-test'),
+                name='testprovider', create=True)
+            module_provider_pk = module_provider.pk
+
+            # Ensure summary is created without a latest version
+            row = get_summary_row(module_provider_pk)
+            assert row['namespace'] == 'testnamespace'
+            assert row['module'] == 'summary-test'
+            assert row['provider'] == 'testprovider'
+            assert row['latest_version_id'] is None
+            assert row['download_count'] == 0
+            assert module_provider.get_latest_version() is None
+
+            module_versions = {}
+            for version in ['1.0.0', '1.1.0']:
+                module_versions[version] = ModuleVersion(module_provider=module_provider, version=version)
+                module_versions[version].prepare_module()
+                module_versions[version].publish()
+                module_versions[version].update_attributes(description=f'Description of {version}', owner='Summary Owner')
+
+                row = get_summary_row(module_provider_pk)
+                assert row['latest_version_id'] == module_versions[version].pk
+                assert row['latest_version'] == version
+                assert row['description'] == f'Description of {version}'
+                assert row['owner'] == 'Summary Owner'
+                assert row['internal'] is False
+                assert module_provider.get_latest_version().version == version
+
+            # Ensure downloads are only counted for the latest version
+            for version in ['1.0.0', '1.1.0', '1.1.0']:
+                AnalyticsEngine.record_module_version_download(
+                    module_version=module_versions[version],
+                    terraform_version='1.0.0',
+                    analytics_token='unittest',
+                    user_agent='',
+                    auth_token=None
+                )
+            assert get_summary_row(module_provider_pk)['download_count'] == 2
+            assert module_versions['1.1.0'].get_total_downloads() == 2
+            assert module_versions['1.0.0'].get_total_downloads() == 1
+
+            # Ensure modifying module provider updates summary
+            module_provider.update_attributes(verified=True)
+            assert get_summary_row(module_provider_pk)['verified'] is True
+
+            # Ensure deleting latest version replaces latest version and download count
+            module_versions['1.1.0'].delete()
+            row = get_summary_row(module_provider_pk)
+            assert row['latest_version'] == '1.0.0'
+            assert row['description'] == 'Description of 1.0.0'
+            assert row['download_count'] == 1
+
+            module_provider.delete()
+            assert get_summary_row(module_provider_pk) is None
+
+    def test_update_summary_download_count_calculated_in_update(self):
+        """Test that the download count of the summary is calculated in the update statement, rather than selected beforehand."""
+        module_provider = ModuleProvider.get(Module(Namespace.get('testnamespace'), 'wrongversionorder'), 'testprovider')
+
+        with self._record_queries() as statements:
+            module_provider.update_summary()
+
+        assert [
+            statement
+            for statement in statements
+            if 'analytics_daily' in statement
+        ] == [
+            statement
+            for statement in statements
+            if statement.startswith('UPDATE module_provider_summary')
+        ]
+
+    def test_update_summary_concurrent_insert(self):
+        """Test that the summary is updated if it is inserted by another caller after failing to update it."""
+        module_provider = ModuleProvider.get(Module(Namespace.get('testnamespace'), 'noversions'), 'testprovider')
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            summary_row = dict(conn.execute(db.module_provider_summary.select().where(
+                db.module_provider_summary.c.module_provider_id == module_provider.pk
+            )).fetchone())
+            conn.execute(db.module_provider_summary.delete().where(
+                db.module_provider_summary.c.module_provider_id == module_provider.pk
+            ))
+
+        original_insert = db.module_provider_summary.insert
+
+        def insert_after_concurrent_insert():
+            """Insert summary row, as a concurrent caller, before returning insert statement."""
+            with db.get_engine().connect() as conn:
+                conn.execute(original_insert().values(**dict(summary_row, verified=True)))
+            return original_insert()
+
+        with mock.patch.object(db.module_provider_summary, 'insert', insert_after_concurrent_insert):
+            module_provider.update_summary()
+
+        with db.get_engine().connect() as conn:
+            rows = conn.execute(db.module_provider_summary.select().where(
+                db.module_provider_summary.c.module_provider_id == module_provider.pk
+            )).fetchall()
+        assert len(rows) == 1
+        assert rows[0]['verified'] == summary_row['verified']
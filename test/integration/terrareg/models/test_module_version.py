@@ -9,6 +9,7 @@ from terrareg.database import Database
 
 from terrareg.models import Example, ExampleFile, Module, Namespace, ModuleProvider, ModuleVersion
 import terrareg.errors
+import terrareg.models
 from test.integration.terrareg import TerraregIntegrationTest
 
 class TestModuleVersion(TerraregIntegrationTest):
@@ -78,9 +79,9 @@ class TestModuleVersion(TerraregIntegrationTest):
 
         for attr in ['description', 'module_details_id', 'owner',
                      'published_at', 'repo_base_url_template',
-                     'repo_browse_url_template', 'repo_clone_url_template',
-                     'variable_template']:
+                     'repo_browse_url_template', 'repo_clone_url_template']:
             assert new_db_row[attr] == None
+        assert module_version._get_deferred_column('variable_template') == None
 
     def test_create_beta_version(self):
         """Test creating DB row for beta version"""
@@ -109,9 +110,9 @@ class TestModuleVersion(TerraregIntegrationTest):
 
         for attr in ['description', 'module_details_id', 'owner',
                      'published_at', 'repo_base_url_template',
-                     'repo_browse_url_template', 'repo_clone_url_template',
-                     'variable_template']:
+                     'repo_browse_url_template', 'repo_clone_url_template']:
             assert new_db_row[attr] == None
+        assert module_version._get_deferred_column('variable_template') == None
 
     @pytest.mark.parametrize('module_version_reindex_mode,previous_publish_state,expected_return_value,should_raise_error', [
         # Legacy mode should allow the re-index and ignore pre-existing version for setting published
@@ -151,6 +152,9 @@ class TestModuleVersion(TerraregIntegrationTest):
                     id=10001,
                     module_provider_id=10000,
                     version='1.1.0',
+                    version_major=1,
+                    version_minor=1,
+                    version_patch=0,
                     published=previous_publish_state,
                     beta=False,
                     internal=False
@@ -227,9 +231,9 @@ class TestModuleVersion(TerraregIntegrationTest):
 
             for attr in ['description', 'module_details_id', 'owner',
                         'published_at', 'repo_base_url_template',
-                        'repo_browse_url_template', 'repo_clone_url_template',
-                        'variable_template']:
+                        'repo_browse_url_template', 'repo_clone_url_template']:
                 assert new_db_row[attr] == None
+            assert module_version._get_deferred_column('variable_template') == None
 
             # Ensure that all moduleversion, submodules and example files have been removed
             with db.get_engine().connect() as conn:
@@ -389,6 +393,43 @@ class TestModuleVersion(TerraregIntegrationTest):
             )
             assert analytics_res.fetchone() is None
 
+    def test_get_examples_populates_rows(self):
+        """Test that examples returned by get_examples, and their module details, do not require further queries."""
+        namespace = Namespace.get(name='moduledetails')
+        module = Module(namespace=namespace, name='graph-test')
+        module_provider = ModuleProvider.get(module=module, name='provider')
+        module_version = ModuleVersion.get(module_provider=module_provider, version='1.0.0')
+
+        with self._record_queries() as statements:
+            examples = module_version.get_examples()
+            # Expect a query for the examples and a query for the module details
+            assert len(statements) == 2
+
+            assert [example.path for example in examples] == ['examples/testreadmeexample']
+            for example in examples:
+                assert example.pk
+                assert example.module_details.pk == example._get_db_row()['module_details_id']
+                assert example.module_details._get_db_row() is not None
+
+        assert len(statements) == 2
+
+    def test_variable_template_deferred(self):
+        """Test that the variable template is not obtained with the database row and is obtained on access."""
+        module_provider = ModuleProvider.get(Module(Namespace('moduledetails'), 'withterraformdocs'), 'testprovider')
+        module_version = ModuleVersion.get(module_provider, '1.5.0')
+
+        with self._record_queries() as statements, \
+                unittest.mock.patch('terrareg.config.Config.AUTOGENERATE_USAGE_BUILDER_VARIABLES', False):
+            assert 'variable_template' not in module_version._get_db_row().keys()
+            assert len(statements) == 0
+
+            module_version.variable_template
+            assert len(statements) == 1
+
+            # Ensure value is cached
+            module_version.variable_template
+            assert len(statements) == 1
+
     def test_variable_template(self):
         """Test variable template of module version."""
 
@@ -777,6 +818,28 @@ module &quot;test-usage3&quot; {
 
             assert module_version.get_readme_html(server_hostname='example.com').strip() == expected_output.strip()
 
+    def test_get_readme_html_cached(self):
+        """Test that rendered README HTML is cached and re-rendered when the content or source URL changes."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        module_version.module_details.update_attributes(readme_content='# Test\n\n```\nmodule "test" {\n  source = "./"\n}\n```\n')
+
+        with unittest.mock.patch('terrareg.config.Config.EXAMPLE_ANALYTICS_TOKEN', ''), \
+                unittest.mock.patch('terrareg.models.convert_markdown_to_html',
+                                    side_effect=terrareg.models.convert_markdown_to_html) as mock_convert_markdown_to_html:
+            readme_html = module_version.get_readme_html(server_hostname='example.com')
+            assert 'example.com/moduledetails/readme-tests/provider' in readme_html
+            assert module_version.get_readme_html(server_hostname='example.com') == readme_html
+            assert mock_convert_markdown_to_html.call_count == 1
+
+            # Ensure README is rendered for other hostnames
+            assert 'other.example.com/moduledetails/readme-tests/provider' in module_version.get_readme_html(server_hostname='other.example.com')
+            assert mock_convert_markdown_to_html.call_count == 2
+
+            # Ensure README is rendered after the content is updated
+            module_version.module_details.update_attributes(readme_content='# Updated README')
+            assert 'Updated README' in module_version.get_readme_html(server_hostname='example.com')
+            assert mock_convert_markdown_to_html.call_count == 3
+
     def test_git_path(self):
         """Test git_path property"""
         # Ensure the git_path from the module provider is returned
@@ -1,10 +1,12 @@
 
 import os
 import unittest
+import unittest.mock
 
 import pytest
 
 from terrareg.models import Example, ExampleFile, Module, ModuleVersion, ModuleVersionFile, Namespace, ModuleProvider
+import terrareg.models
 from test.integration.terrareg import TerraregIntegrationTest
 from test.integration.terrareg.module_extractor import UploadTestModule
 
@@ -182,3 +184,42 @@ Should only show alphanumeric in ID
         module_version_file = ModuleVersionFile.create(module_version, file_name)
         module_version_file.update_attributes(content=file_content)
         assert module_version_file.get_content() == expected_output
+
+    def test_create_many(self):
+        """Test creating multiple module version files with content."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+
+        module_version_files = ModuleVersionFile.create_many(module_version, {
+            'CREATE_MANY_ONE.md': '# First file',
+            'CREATE_MANY_TWO.md': '# Second file',
+        })
+        try:
+            assert [module_version_file.path for module_version_file in module_version_files] == ['CREATE_MANY_ONE.md', 'CREATE_MANY_TWO.md']
+            assert ModuleVersionFile.get(module_version, 'CREATE_MANY_ONE.md').get_content() == '<h1 id="terrareg-anchor-CREATE_MANY_ONEmd-first-file">First file</h1>'
+            assert ModuleVersionFile.get(module_version, 'CREATE_MANY_TWO.md').get_content() == '<h1 id="terrareg-anchor-CREATE_MANY_TWOmd-second-file">Second file</h1>'
+        finally:
+            for module_version_file in module_version_files:
+                module_version_file.delete()
+
+        assert ModuleVersionFile.create_many(module_version, {}) == []
+
+    def test_get_content_cached(self):
+        """Test that rendered content is cached and re-rendered when the content is updated."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        module_version_file = ModuleVersionFile.create(module_version, 'CACHED.md')
+        try:
+            module_version_file.update_attributes(content='# Original')
+
+            with unittest.mock.patch('terrareg.models.convert_markdown_to_html',
+                                     side_effect=terrareg.models.convert_markdown_to_html) as mock_convert_markdown_to_html:
+                assert module_version_file.get_content() == '<h1 id="terrareg-anchor-CACHEDmd-original">Original</h1>'
+                assert ModuleVersionFile.get(module_version, 'CACHED.md').get_content() == '<h1 id="terrareg-anchor-CACHEDmd-original">Original</h1>'
+                assert mock_convert_markdown_to_html.call_count == 1
+
+                module_version_file.update_attributes(content='# Updated')
+                assert module_version_file.get_content() == '<h1 id="terrareg-anchor-CACHEDmd-updated">Updated</h1>'
+                assert mock_convert_markdown_to_html.call_count == 2
+        finally:
+            module_version_file.delete()
+
+        assert ModuleVersionFile.get(module_version, 'CACHED.md') is None
@@ -1,11 +1,13 @@
 
 from unittest import mock
+import re
 import pytest
 from terrareg.filters import NamespaceTrustFilter
 
 from terrareg.models import Module, ModuleProvider, Namespace
 from terrareg.module_search import ModuleSearch
 from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
 
 class TestSearchModuleProviders(TerraregIntegrationTest):
 
@@ -407,3 +409,39 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
 
         # Ensure that no results are returned
         assert result.count == 0
+
+    def test_search_does_not_obtain_large_columns(self):
+        """Ensure that searching and generating outlines of results does not obtain large columns."""
+        large_column_re = re.compile(r'\b(variable_template|readme_content|terraform_docs|tfsec|infracost|terraform_graph)\b')
+
+        with self._record_queries() as statements:
+            result = ModuleSearch.search_module_providers(offset=0, limit=10, namespaces=['modulesearch'])
+            assert result.module_providers
+            for module_provider in result.module_providers:
+                module_provider.get_latest_version().get_api_outline()
+
+        assert statements
+        assert [statement for statement in statements if large_column_re.search(statement)] == []
+
+    def test_results_populated_from_summary(self, test_request_context):
+        """Test that API outlines of search results are generated without further queries."""
+        with test_request_context:
+            result = ModuleSearch.search_module_providers(offset=0, limit=50, namespaces=['testnamespace'])
+            assert result.module_providers
+
+            with self._record_queries() as statements:
+                api_outlines = [
+                    module_provider.get_latest_version().get_api_outline()
+                    for module_provider in result.module_providers
+                ]
+
+            assert statements == []
+
+        # Ensure outlines match those generated from newly obtained objects
+        assert api_outlines == [
+            ModuleProvider.get(
+                module=Module(namespace=Namespace.get('testnamespace'), name=api_outline['name']),
+                name=api_outline['provider']
+            ).get_latest_version().get_api_outline()
+            for api_outline in api_outlines
+        ]
@@ -0,0 +1,58 @@
+
+import pytest
+
+from terrareg.cache import Cache
+from test.integration.terrareg import TerraregIntegrationTest
+from test import client
+
+
+class TestApiModuleOutlineQueries(TerraregIntegrationTest):
+    """
+    Test that endpoints returning outlines of many module providers
+    do not perform queries for each module provider, such as for download counts,
+    which are obtained from the module provider summary.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Remove cached responses, so that each request queries the database."""
+        Cache.clear_all()
+        yield
+        Cache.clear_all()
+
+    def _get_statements(self, client, url):
+        """Return SQL statements executed whilst handling request."""
+        with self._record_queries() as statements:
+            res = client.get(url)
+        assert res.status_code == 200
+        return res.json, statements
+
+    @pytest.mark.parametrize('url', [
+        '/v1/modules?limit={limit}',
+        '/v1/modules/search?q=modulesearch&limit={limit}',
+        '/v1/modules/modulesearch?limit={limit}',
+        '/v1/terrareg/modules/modulesearch?limit={limit}',
+        '/v1/modules/searchbynamespace/searchbymodulename1?limit={limit}',
+    ])
+    def test_queries_independent_of_result_count(self, client, url):
+        """Test that the number of queries does not increase with the number of results."""
+        # Perform initial request, to perform any queries that are only performed once
+        self._get_statements(client, url.format(limit=1))
+        Cache.clear_all()
+
+        single_result, single_result_statements = self._get_statements(client, url.format(limit=1))
+        Cache.clear_all()
+        many_results, many_results_statements = self._get_statements(client, url.format(limit=10))
+
+        assert len(single_result['modules']) == 1
+        assert len(many_results['modules']) > 1
+        # Ensure outlines of module providers with versions contain download counts
+        assert len([module for module in many_results['modules'] if 'downloads' in module]) > 1
+        assert len(many_results_statements) == len(single_result_statements)
+
+        # Ensure download counts are not obtained from analytics tables
+        assert [
+            statement
+            for statement in many_results_statements
+            if 'FROM analytics' in statement
+        ] == []
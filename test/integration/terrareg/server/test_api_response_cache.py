@@ -0,0 +1,131 @@
+import time
+import unittest.mock
+
+
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.response_cache import ResponseCache
+from test.integration.terrareg import TerraregIntegrationTest
+from test import client
+
+
+class TestApiResponseCache(TerraregIntegrationTest):
+    """Test caching of Terraform registry API responses."""
+
+    _VERSIONS_URL = '/v1/modules/testnamespace/wrongversionorder/testprovider/versions'
+    _VERSION_DETAILS_URL = '/v1/modules/testnamespace/wrongversionorder/testprovider/1.5.4'
+
+    def _get_module_provider(self):
+        """Return test module provider."""
+        namespace = Namespace.get('testnamespace')
+        return ModuleProvider.get(Module(namespace, 'wrongversionorder'), 'testprovider')
+
+    def test_etag_not_modified(self, client):
+        """Test that responses contain ETag and a matching If-None-Match returns 304 without database access."""
+        res = client.get(self._VERSIONS_URL)
+        assert res.status_code == 200
+        original_response = res.json
+        etag = res.headers['ETag']
+        assert etag
+        assert res.headers['Cache-Control'] == 'max-age=0, must-revalidate'
+
+        with self._record_queries() as statements:
+            res = client.get(self._VERSIONS_URL, headers={'If-None-Match': etag})
+        assert res.status_code == 304
+        assert res.data == b''
+        assert res.headers['ETag'] == etag
+        assert statements == []
+
+        # Ensure a non-matching ETag returns the cached response body
+        with self._record_queries() as statements:
+            res = client.get(self._VERSIONS_URL, headers={'If-None-Match': '"doesnotmatch"'})
+        assert res.status_code == 200
+        assert res.headers['ETag'] == etag
+        assert res.json == original_response
+        assert statements == []
+
+    def test_analytics_token_shares_cache(self, client):
+        """Test that requests with analytics tokens use the same cached response."""
+        res = client.get(self._VERSIONS_URL)
+        etag = res.headers['ETag']
+
+        res = client.get('/v1/modules/test-token__testnamespace/wrongversionorder/testprovider/versions',
+                         headers={'If-None-Match': etag})
+        assert res.status_code == 304
+
+    def test_error_responses_not_cached(self, client):
+        """Test that error responses are not cached."""
+        res = client.get('/v1/modules/testnamespace/wrongversionorder/doesnotexist/versions')
+        assert res.status_code == 404
+        assert 'ETag' not in res.headers
+        assert ResponseCache.get_statistics()['entries'] == 0
+
+    def test_invalidated_on_publish_and_delete(self, client):
+        """Test that cached responses are invalidated when a module version is created, published and deleted."""
+        res = client.get(self._VERSIONS_URL)
+        original_etag = res.headers['ETag']
+
+        module_version = ModuleVersion(self._get_module_provider(), '50.0.0')
+        try:
+            module_version._create_db_row()
+
+            # Ensure response was invalidated, but new version is not returned, as it is not published
+            res = client.get(self._VERSIONS_URL, headers={'If-None-Match': original_etag})
+            assert res.status_code == 304
+
+            module_version.publish()
+            res = client.get(self._VERSIONS_URL, headers={'If-None-Match': original_etag})
+            assert res.status_code == 200
+            assert res.headers['ETag'] != original_etag
+            assert res.json['modules'][0]['versions'][0]['version'] == '50.0.0'
+
+        finally:
+            module_version.delete()
+
+        res = client.get(self._VERSIONS_URL, headers={'If-None-Match': original_etag})
+        assert res.status_code == 304
+
+    def test_invalidated_on_module_provider_settings(self, client):
+        """Test that cached responses are invalidated when module provider attributes are updated."""
+        res = client.get(self._VERSION_DETAILS_URL)
+        assert not res.json['verified']
+
+        module_provider = self._get_module_provider()
+        try:
+            module_provider.update_verified(True)
+
+            res = client.get(self._VERSION_DETAILS_URL)
+            assert res.json['verified'] is True
+        finally:
+            module_provider.update_verified(False)
+
+    def test_not_invalidated_on_download(self, client):
+        """Test that responses are not invalidated when a download is recorded and responses containing download counts expire."""
+        res = client.get(self._VERSION_DETAILS_URL)
+        original_downloads = res.json['downloads']
+        details_etag = res.headers['ETag']
+        versions_etag = client.get(self._VERSIONS_URL).headers['ETag']
+
+        res = client.get('/v1/modules/test-token__testnamespace/wrongversionorder/testprovider/1.5.4/download')
+        assert res.status_code == 204
+
+        for url, etag in [(self._VERSION_DETAILS_URL, details_etag), (self._VERSIONS_URL, versions_etag)]:
+            with self._record_queries() as statements:
+                res = client.get(url, headers={'If-None-Match': etag})
+            assert res.status_code == 304
+            assert statements == []
+
+        # Ensure response containing download counts is regenerated once it has expired
+        with unittest.mock.patch('time.monotonic', unittest.mock.MagicMock(return_value=time.monotonic() + 301)):
+            res = client.get(self._VERSION_DETAILS_URL, headers={'If-None-Match': details_etag})
+            assert res.status_code == 200
+            assert res.json['downloads'] == original_downloads + 1
+
+            # Ensure list of versions, which does not contain downloads, does not expire
+            res = client.get(self._VERSIONS_URL, headers={'If-None-Match': versions_etag})
+            assert res.status_code == 304
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.delete())
+            conn.execute(db.analytics_daily.delete())
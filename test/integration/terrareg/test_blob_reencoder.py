@@ -0,0 +1,52 @@
+
+import unittest.mock
+
+from terrareg.blob_reencoder import BlobReencoder
+from terrareg.database import Database
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestBlobReencoder(TerraregIntegrationTest):
+
+    _CONTENT = '# Test README\n' + ('Some repeated README content.\n' * 100)
+
+    def _get_module_version_file_content(self, id_):
+        """Return raw content of module version file."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            return conn.execute(db.module_version_file.select().where(
+                db.module_version_file.c.id == id_
+            )).fetchone()['content']
+
+    def test_run(self):
+        """Test re-encoding uncompressed values and restoring them when compression is disabled."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            module_version_id = conn.execute(db.module_version.select()).fetchone()['id']
+            id_ = conn.execute(db.module_version_file.insert().values(
+                module_version_id=module_version_id,
+                path='REENCODE_TEST.md',
+                content=self._CONTENT.encode('utf-8')
+            )).inserted_primary_key[0]
+
+        try:
+            with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_COMPRESSION', True):
+                result = BlobReencoder(batch_size=2).run()
+            assert result['module_version_file'] >= 1
+            content = self._get_module_version_file_content(id_)
+            assert content.startswith(Database.COMPRESSED_BLOB_HEADER)
+            assert Database.decode_blob(content) == self._CONTENT
+
+            # Ensure re-running does not modify compressed values
+            with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_COMPRESSION', True):
+                result = BlobReencoder().run()
+            assert result['module_version_file'] == 0
+
+            # Ensure values are decompressed when compression is disabled
+            with unittest.mock.patch('terrareg.config.Config.ENABLE_BLOB_COMPRESSION', False):
+                BlobReencoder().run()
+            assert self._get_module_version_file_content(id_) == self._CONTENT.encode('utf-8')
+
+        finally:
+            with db.get_engine().connect() as conn:
+                conn.execute(db.module_version_file.delete().where(db.module_version_file.c.id == id_))
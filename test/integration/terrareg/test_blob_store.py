@@ -0,0 +1,73 @@
+
+from terrareg.blob_store import BlobStore
+from terrareg.database import Database
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestBlobStore(TerraregIntegrationTest):
+
+    def _get_reference_count(self, sha256):
+        """Return reference count of content."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            row = conn.execute(db.blob_store.select().where(db.blob_store.c.sha256 == sha256)).fetchone()
+        return row['reference_count'] if row else None
+
+    def test_put(self):
+        """Test storing content and obtaining it by hash."""
+        sha256 = BlobStore.put(b'unittest content')
+
+        assert sha256 == '9f5eeb7075da2d846d4341f92a05324ac737d1ac21b4e6421c0a6353c43f6719'
+        assert BlobStore.get(sha256) == b'unittest content'
+        assert self._get_reference_count(sha256) == 1
+
+        BlobStore.release(sha256)
+
+    def test_put_existing(self):
+        """Test storing identical content increments reference count."""
+        sha256 = BlobStore.put(b'duplicate content')
+        assert BlobStore.put(b'duplicate content') == sha256
+        assert self._get_reference_count(sha256) == 2
+
+        BlobStore.release(sha256)
+        assert self._get_reference_count(sha256) == 1
+        assert BlobStore.get(sha256) == b'duplicate content'
+
+        BlobStore.release(sha256)
+        assert self._get_reference_count(sha256) is None
+        assert BlobStore.get(sha256) is None
+
+    def test_get_many(self):
+        """Test obtaining multiple blobs."""
+        sha256_1 = BlobStore.put(b'first content')
+        sha256_2 = BlobStore.put(b'second content')
+
+        assert BlobStore.get_many([sha256_1, sha256_2, 'doesnotexist']) == {
+            sha256_1: b'first content',
+            sha256_2: b'second content'
+        }
+        assert BlobStore.get_many([]) == {}
+
+        BlobStore.release(sha256_1)
+        BlobStore.release(sha256_2)
+
+    def test_release_many(self):
+        """Test releasing multiple references to multiple blobs."""
+        sha256_1 = BlobStore.put(b'first content')
+        BlobStore.put(b'first content')
+        BlobStore.put(b'first content')
+        sha256_2 = BlobStore.put(b'second content')
+        sha256_3 = BlobStore.put(b'third content')
+        BlobStore.put(b'third content')
+
+        BlobStore.release_many([sha256_1, sha256_1, sha256_2, sha256_3])
+
+        assert self._get_reference_count(sha256_1) == 1
+        assert self._get_reference_count(sha256_2) is None
+        assert self._get_reference_count(sha256_3) == 1
+
+        # Ensure releasing no hashes does not error
+        BlobStore.release_many([])
+
+        BlobStore.release(sha256_1)
+        BlobStore.release(sha256_3)
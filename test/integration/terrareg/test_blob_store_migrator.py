@@ -0,0 +1,63 @@
+
+from terrareg.blob_store_migrator import BlobStoreMigrator
+from terrareg.database import Database
+from terrareg.models import ModuleDetails
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestBlobStoreMigrator(TerraregIntegrationTest):
+
+    def _get_row(self, id_):
+        """Return raw module details row."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            return conn.execute(db.module_details.select().where(
+                db.module_details.c.id == id_
+            )).fetchone()
+
+    def _get_reference_count(self, sha256):
+        """Return reference count of content."""
+        db = Database.get()
+        with db.get_engine().connect() as conn:
+            row = conn.execute(db.blob_store.select().where(db.blob_store.c.sha256 == sha256)).fetchone()
+        return row['reference_count'] if row else None
+
+    def test_run(self):
+        """Test moving content stored against module details into the blob store."""
+        db = Database.get()
+        readme_content = Database.encode_blob('migrated README content')
+        with db.get_engine().connect() as conn:
+            ids = [
+                conn.execute(db.module_details.insert().values(
+                    readme_content=readme_content,
+                    infracost=infracost
+                )).inserted_primary_key[0]
+                for infracost in [None, Database.encode_blob('{"migrated": true}')]
+            ]
+
+        try:
+            result = BlobStoreMigrator(batch_size=1).run()
+            assert result >= 2
+
+            rows = [self._get_row(id_) for id_ in ids]
+            sha256 = rows[0]['readme_content_sha256']
+            assert sha256 is not None
+            assert rows[1]['readme_content_sha256'] == sha256
+            assert self._get_reference_count(sha256) == 2
+            for row in rows:
+                assert row['readme_content'] is None
+                assert row['infracost'] is None
+            assert rows[0]['infracost_sha256'] is None
+            assert rows[1]['infracost_sha256'] is not None
+
+            assert ModuleDetails(ids[0]).readme_content == readme_content
+            assert ModuleDetails(ids[1]).infracost == {'migrated': True}
+
+            # Ensure re-running does not modify migrated rows
+            assert BlobStoreMigrator().run() == 0
+            assert self._get_reference_count(sha256) == 2
+
+        finally:
+            for id_ in ids:
+                ModuleDetails(id_).delete()
+            assert self._get_reference_count(sha256) is None
@@ -0,0 +1,124 @@
+
+import datetime
+import os
+from unittest import mock
+
+import pytest
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.global_statistics import GlobalStatistic, GlobalStatistics
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestGlobalStatistics(TerraregIntegrationTest):
+
+    _COUNTERS = [
+        GlobalStatistic.NAMESPACE_COUNT,
+        GlobalStatistic.MODULE_PROVIDER_COUNT,
+        GlobalStatistic.MODULE_VERSION_COUNT,
+        GlobalStatistic.DOWNLOAD_COUNT
+    ]
+
+    @staticmethod
+    def _get_stored_value(statistic):
+        """Return value of statistic stored in database, or None if it is not stored."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            row = conn.execute(db.global_statistic.select().where(
+                db.global_statistic.c.name == statistic.value
+            )).fetchone()
+        return row['value'] if row else None
+
+    @pytest.mark.parametrize('statistic, expected_value', [
+        (GlobalStatistic.NAMESPACE_COUNT, 11),
+        (GlobalStatistic.MODULE_PROVIDER_COUNT, 43),
+    ])
+    def test_get_calculates_missing_statistic(self, statistic, expected_value):
+        """Test that statistics are calculated and stored when they are first obtained."""
+        GlobalStatistics.reset(statistic)
+        assert self._get_stored_value(statistic) is None
+
+        assert GlobalStatistics.get(statistic) == {statistic: expected_value}
+        assert self._get_stored_value(statistic) == expected_value
+
+    def test_counters_maintained(self, tmp_path):
+        """Test that counters are updated as objects are created and deleted."""
+        GlobalStatistics.get(*self._COUNTERS)
+
+        def assert_counters_match_source_tables():
+            assert GlobalStatistics.get(*self._COUNTERS) == {
+                statistic: GlobalStatistics._calculate(statistic)
+                for statistic in self._COUNTERS
+            }
+
+        os.mkdir(os.path.join(tmp_path, 'modules'))
+        with mock.patch('terrareg.config.Config.DATA_DIRECTORY', str(tmp_path)):
+            namespace = Namespace.create(name='global-statistics')
+            module_provider = ModuleProvider.get(
+                module=Module(namespace=namespace, name='counters'), name='testprovider', create=True)
+            assert_counters_match_source_tables()
+
+            original_values = GlobalStatistics.get(*self._COUNTERS)
+            module_versions = []
+            for version in ['1.0.0', '1.1.0']:
+                module_version = ModuleVersion(module_provider=module_provider, version=version)
+                module_version.prepare_module()
+                module_version.publish()
+                module_versions.append(module_version)
+                AnalyticsEngine.record_module_version_download(
+                    module_version=module_version,
+                    terraform_version='1.0.0',
+                    analytics_token='unittest',
+                    user_agent='',
+                    auth_token=None
+                )
+                assert_counters_match_source_tables()
+
+            assert GlobalStatistics.get(*self._COUNTERS) == {
+                GlobalStatistic.NAMESPACE_COUNT: original_values[GlobalStatistic.NAMESPACE_COUNT],
+                GlobalStatistic.MODULE_PROVIDER_COUNT: original_values[GlobalStatistic.MODULE_PROVIDER_COUNT] + 1,
+                GlobalStatistic.MODULE_VERSION_COUNT: original_values[GlobalStatistic.MODULE_VERSION_COUNT] + 2,
+                GlobalStatistic.DOWNLOAD_COUNT: original_values[GlobalStatistic.DOWNLOAD_COUNT] + 2,
+            }
+
+            # Re-index module version, retaining analytics
+            module_versions[0].prepare_module()
+            assert_counters_match_source_tables()
+
+            module_versions[1].delete()
+            assert_counters_match_source_tables()
+
+            module_provider.delete()
+            assert_counters_match_source_tables()
+            assert GlobalStatistics.get(*self._COUNTERS) == original_values
+
+    def test_periodic_statistic_refreshed(self):
+        """Test that periodic statistics are re-calculated once they are older than the refresh interval."""
+        statistic = GlobalStatistic.MOST_DOWNLOADED_MODULE_PROVIDER_THIS_WEEK
+        expected_value = GlobalStatistics._calculate(statistic)
+
+        # Store outdated value
+        db = Database.get()
+        GlobalStatistics.reset(statistic)
+        with db.get_connection() as conn:
+            conn.execute(db.global_statistic.insert().values(
+                name=statistic.value,
+                value=-1,
+                updated_at=datetime.datetime.now() - datetime.timedelta(minutes=30)
+            ))
+
+        with mock.patch('terrareg.config.Config.GLOBAL_STATISTICS_REFRESH_INTERVAL', 3600):
+            assert GlobalStatistics.get(statistic) == {statistic: -1}
+
+        with mock.patch('terrareg.config.Config.GLOBAL_STATISTICS_REFRESH_INTERVAL', 600):
+            assert GlobalStatistics.get(statistic) == {statistic: expected_value}
+
+        assert self._get_stored_value(statistic) == expected_value
+
+    def test_increment_uncalculated_statistic(self):
+        """Test that incrementing a statistic that has not been calculated does not store a value."""
+        GlobalStatistics.reset(GlobalStatistic.DOWNLOAD_COUNT)
+        GlobalStatistics.increment(GlobalStatistic.DOWNLOAD_COUNT, 5)
+        assert self._get_stored_value(GlobalStatistic.DOWNLOAD_COUNT) is None
@@ -0,0 +1,79 @@
+
+from terrareg.identity_map import IdentityMap
+from terrareg.models import Module, ModuleDetails, ModuleProvider, ModuleVersion, Namespace
+from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
+
+
+class TestIdentityMap(TerraregIntegrationTest):
+
+    def test_get_returns_same_object_in_request(self, test_request_context):
+        """Test that get methods return the same object within a request context."""
+        with test_request_context:
+            namespace = Namespace.get('testnamespace')
+            assert Namespace.get('testnamespace') is namespace
+
+            module = Module(namespace=namespace, name='wrongversionorder')
+            module_provider = ModuleProvider.get(module=module, name='testprovider')
+            assert ModuleProvider.get(module=Module(namespace=Namespace('testnamespace'), name='wrongversionorder'),
+                                      name='testprovider') is module_provider
+
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.5.4')
+            assert ModuleVersion.get(module_provider=module_provider, version='1.5.4') is module_version
+
+    def test_get_outside_of_request_context(self):
+        """Test that objects are not shared outside of a request context."""
+        namespace = Namespace.get('testnamespace')
+        assert Namespace.get('testnamespace') is not namespace
+        assert IdentityMap.get(namespace) is None
+
+    def test_new_objects_reuse_rows(self, test_request_context):
+        """Test that new objects for the same identity do not re-query the database."""
+        with test_request_context:
+            module_provider = ModuleProvider.get(
+                module=Module(namespace=Namespace.get('testnamespace'), name='wrongversionorder'),
+                name='testprovider')
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.5.4')
+            module_details_id = module_version._get_db_row()['module_details_id']
+            ModuleDetails(id=module_details_id)._get_db_row()
+
+            with self._record_queries() as statements:
+                for _ in range(5):
+                    namespace = Namespace('testnamespace')
+                    module_provider = ModuleProvider(module=Module(namespace=namespace, name='wrongversionorder'), name='testprovider')
+                    module_version = ModuleVersion(module_provider=module_provider, version='1.5.4')
+                    assert namespace.pk is not None
+                    assert module_provider.pk == 17
+                    assert module_version.published is True
+                    assert ModuleDetails(id=module_details_id)._get_db_row() is not None
+
+            assert statements == []
+
+    def test_update_attributes_invalidates(self, test_request_context):
+        """Test that updating an object removes it from the identity map."""
+        with test_request_context:
+            module_provider = ModuleProvider.get(
+                module=Module(namespace=Namespace.get('testnamespace'), name='wrongversionorder'),
+                name='testprovider')
+            assert IdentityMap.get(module_provider) is module_provider
+            original_git_path = module_provider._get_db_row()['git_path']
+
+            try:
+                module_provider.update_attributes(git_path='/identity-map-test')
+                assert IdentityMap.get(module_provider) is None
+
+                # Ensure new object obtains updated row
+                new_module_provider = ModuleProvider(
+                    module=Module(namespace=Namespace('testnamespace'), name='wrongversionorder'),
+                    name='testprovider')
+                assert new_module_provider._get_db_row()['git_path'] == '/identity-map-test'
+                assert IdentityMap.get(module_provider) is new_module_provider
+            finally:
+                module_provider.update_attributes(git_path=original_git_path)
+
+    def test_non_existent_objects_not_registered(self, test_request_context):
+        """Test that objects without a database row are not added to the identity map."""
+        with test_request_context:
+            namespace = Namespace('doesnotexist')
+            assert Namespace.get('doesnotexist') is None
+            assert IdentityMap.get(namespace) is None
@@ -0,0 +1,37 @@
+
+from terrareg.database import Database
+from terrareg.models import ModuleDetails
+from terrareg.module_graph_backfiller import ModuleGraphBackfiller
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestModuleGraphBackfiller(TerraregIntegrationTest):
+
+    _TERRAFORM_GRAPH = 'digraph {\n\tsubgraph "root" {\n\t\t"[root] aws_s3_bucket.backfill (expand)" [label = "aws_s3_bucket.backfill", shape = "box"]\n\t}\n}\n'
+
+    def test_run(self):
+        """Test generating graph JSON for module details with terraform graph output."""
+        with_graph = ModuleDetails.create()
+        with_graph.update_attributes(terraform_graph=self._TERRAFORM_GRAPH)
+        without_graph = ModuleDetails.create()
+        invalid_graph = ModuleDetails.create()
+        invalid_graph.update_attributes(terraform_graph='not a graph')
+
+        try:
+            assert ModuleGraphBackfiller(batch_size=1).run() >= 1
+
+            graph_json = ModuleDetails(with_graph.pk).terraform_graph_json
+            assert 'aws_s3_bucket.backfill' in [
+                node['data']['label']
+                for node in graph_json['full_resource_names=false,full_module_names=false']['nodes']
+            ]
+            assert ModuleDetails(without_graph.pk).terraform_graph_json is None
+            assert ModuleDetails(invalid_graph.pk).terraform_graph_json is None
+
+            # Ensure re-running does not modify module details that have graph JSON
+            assert ModuleGraphBackfiller().run() == 0
+            assert ModuleDetails(with_graph.pk).terraform_graph_json == graph_json
+
+        finally:
+            for module_details in [with_graph, without_graph, invalid_graph]:
+                module_details.delete()
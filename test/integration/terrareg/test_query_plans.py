@@ -0,0 +1,139 @@
+
+import re
+
+import pytest
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import (
+    Example, ExampleFile, Module, ModuleProvider, ModuleVersion,
+    ModuleVersionFile, Namespace, Session
+)
+from terrareg.module_search import ModuleSearch
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+def _get_module_provider():
+    """Return test module provider with many versions."""
+    return ModuleProvider.get(
+        module=Module(namespace=Namespace.get('testnamespace'), name='wrongversionorder'),
+        name='testprovider'
+    )
+
+
+def _get_module_version():
+    """Return test module version."""
+    return ModuleVersion.get(module_provider=_get_module_provider(), version='1.5.4')
+
+
+def _get_example_module_version():
+    """Return module version containing example."""
+    module_provider = ModuleProvider.get(
+        module=Module(namespace=Namespace.get('moduledetails'), name='readme-tests'),
+        name='provider'
+    )
+    return ModuleVersion.get(module_provider=module_provider, version='1.0.0')
+
+
+class TestQueryPlans(TerraregIntegrationTest):
+    """
+    Ensure that queries for common lookups make use of indexes.
+
+    The queries executed by each operation are captured and the query plan
+    is obtained from the database, failing if any table is fully scanned,
+    unless the scan is expected for the operation.
+    """
+
+    # Regex to match full table scans in output of SQLite's EXPLAIN QUERY PLAN.
+    # Older versions of SQLite include 'TABLE' before the table name.
+    _SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+    _SQLITE_INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX|USING INTEGER PRIMARY KEY')
+
+    @classmethod
+    def _get_full_table_scans(cls, conn, statement, parameters):
+        """Return list of tables that are fully scanned by statement."""
+        table_names = Database.get().get_meta().tables.keys()
+        dialect_name = conn.engine.dialect.name
+        cursor = conn.connection.cursor()
+        try:
+            if dialect_name == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+                # Rows contain id, parent, notused and detail
+                return [
+                    match.group(1)
+                    for match in [
+                        cls._SQLITE_SCAN_RE.match(row[3])
+                        for row in cursor.fetchall()
+                        if not cls._SQLITE_INDEX_RE.search(row[3])
+                    ]
+                    if match and match.group(1) in table_names
+                ]
+
+            elif dialect_name == 'mysql':
+                cursor.execute(f'EXPLAIN {statement}', parameters)
+                columns = [column[0] for column in cursor.description]
+                return [
+                    row['table']
+                    for row in [dict(zip(columns, row)) for row in cursor.fetchall()]
+                    if row['type'] == 'ALL' and row['table'] in table_names
+                ]
+
+            pytest.skip(f'Query plans not supported for {dialect_name}')
+        finally:
+            cursor.close()
+
+    @pytest.mark.parametrize('operation, allowed_full_scans', [
+        # models.py
+        (lambda: Namespace.get('testnamespace'), []),
+        (lambda: _get_module_provider(), []),
+        (lambda: _get_module_version(), []),
+        (lambda: _get_module_provider().get_versions(), []),
+        (lambda: _get_module_provider().get_latest_version(), []),
+        (lambda: Namespace.get('testnamespace').get_module_providers(offset=0, limit=10), []),
+        (lambda: _get_module_version().get_submodules(), []),
+        (lambda: _get_example_module_version().get_examples(), []),
+        (lambda: [
+            example.get_files()
+            for example in _get_example_module_version().get_examples()
+        ], []),
+        (lambda: ExampleFile(
+            example=Example(module_version=_get_example_module_version(), module_path='examples/testreadmeexample'),
+            path='examples/testreadmeexample/main.tf')._get_db_row(), []),
+        (lambda: ModuleVersionFile(module_version=_get_module_version(), path='doesnotexist.md')._get_db_row(), []),
+        (lambda: Session.check_session('doesnotexist'), []),
+
+        # analytics.py
+        (lambda: AnalyticsEngine.get_module_version_total_downloads(_get_module_version()), []),
+        (lambda: AnalyticsEngine.get_module_provider_download_stats(_get_module_provider()), []),
+        (lambda: AnalyticsEngine.get_module_provider_token_versions(_get_module_provider()), []),
+        # Version statistics are calculated across all module versions in a single query
+        (lambda: AnalyticsEngine.get_module_provider_version_statistics(), ['module_version']),
+
+        # module_search.py
+        (lambda: ModuleSearch.search_module_providers(offset=0, limit=10, namespaces=['testnamespace']), []),
+        # Free-text search must match against all module provider summaries
+        (lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='test'), ['module_provider_summary']),
+        (lambda: ModuleSearch.get_most_recently_published(), []),
+        (lambda: ModuleSearch.get_most_downloaded_module_provider_this_Week(), []),
+    ])
+    def test_query_plans(self, operation, allowed_full_scans):
+        """Ensure that queries performed by operation do not perform unexpected full table scans."""
+        with self._record_queries(include_parameters=True) as statements:
+            operation()
+
+        # Only obtain query plans for SELECT statements
+        statements = [
+            (statement, parameters)
+            for statement, parameters in statements
+            if statement.lstrip().upper().startswith('SELECT')
+        ]
+        assert statements
+
+        full_table_scans = []
+        with Database.get_engine().connect() as conn:
+            for statement, parameters in statements:
+                for table_name in self._get_full_table_scans(conn, statement, parameters):
+                    if table_name not in allowed_full_scans:
+                        full_table_scans.append((table_name, statement))
+
+        assert full_table_scans == []
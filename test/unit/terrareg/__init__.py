@@ -7,6 +7,7 @@ import unittest.mock
 
 import pytest
 
+from terrareg.cache import Cache, CacheTags
 from terrareg.database import Database
 from terrareg.errors import DuplicateNamespaceDisplayNameError, NamespaceAlreadyExistsError
 import terrareg.models
@@ -163,6 +164,10 @@ def mock_module(request):
     
 
 def mock_module_details(request):
+    # Remove cached module specs and rendered HTML from previous tests,
+    # as module details IDs are re-used between tests
+    Cache.clear_all()
+
     def create(cls):
         """Mock create method"""
         global TEST_MODULE_DETAILS_ITX
@@ -178,12 +183,29 @@ def mock_module_details(request):
 
     def update_attributes(self, **kwargs):
         TEST_MODULE_DETAILS[str(self._id)].update(**kwargs)
+        self._cache_blobs.clear()
+        Cache.invalidate_tags(CacheTags.module_details(self._id))
     mock_method(request, 'terrareg.models.ModuleDetails.update_attributes', update_attributes)
 
     def _get_db_row(self):
-        return dict(TEST_MODULE_DETAILS[str(self._id)])
+        """Return mock DB row, excluding deferred blob columns."""
+        row = {
+            column: value
+            for column, value in TEST_MODULE_DETAILS[str(self._id)].items()
+            if column not in terrareg.models.ModuleDetails.BLOB_COLUMNS
+        }
+        row.update({
+            f'{column}_sha256': None
+            for column in terrareg.models.ModuleDetails.BLOB_COLUMNS
+        })
+        return row
     mock_method(request, 'terrareg.models.ModuleDetails._get_db_row', _get_db_row)
 
+    def _get_deferred_column(self, column):
+        """Return mock blob column value."""
+        return TEST_MODULE_DETAILS[str(self._id)].get(column)
+    mock_method(request, 'terrareg.models.ModuleDetails._get_deferred_column', _get_deferred_column)
+
 
 def mock_module_version(request):
     @property
@@ -243,7 +265,6 @@ def mock_module_version(request):
                 datetime.datetime(year=2020, month=1, day=1,
                                   hour=23, minute=18, second=12)
             ),
-            'variable_template': Database.encode_blob(unittest_data.get('variable_template', '{}')),
             'internal': unittest_data.get('internal', False),
             'published': unittest_data.get('published', False),
             'beta': unittest_data.get('beta', False),
@@ -252,6 +273,16 @@ def mock_module_version(request):
         }
     mock_method(request, 'terrareg.models.ModuleVersion._get_db_row', _get_db_row)
 
+    def _get_deferred_column(self, column):
+        """Return mock value of deferred column."""
+        unittest_data = get_module_version_mock_data(self)
+        if unittest_data is None:
+            return None
+        return {
+            'variable_template': Database.encode_blob(unittest_data.get('variable_template', '{}')),
+        }[column]
+    mock_method(request, 'terrareg.models.ModuleVersion._get_deferred_column', _get_deferred_column)
+
 
 def mock_module_version_file(request):
 
@@ -438,6 +469,16 @@ def mock_namespace(request):
         ]
     mock_method(request, 'terrareg.models.Namespace.get_all_modules', get_all_modules)
 
+    def get_module_providers(self, offset=0, limit=None):
+        """Return module providers for namespace."""
+        module_providers = [
+            module_provider
+            for module in self.get_all_modules()
+            for module_provider in module.get_providers()
+        ]
+        return module_providers[offset:(offset + limit) if limit is not None else None]
+    mock_method(request, 'terrareg.models.Namespace.get_module_providers', get_module_providers)
+
 MOCK_SESSIONS = {}
 
 def mock_session(request):
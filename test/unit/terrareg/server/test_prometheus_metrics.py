@@ -17,12 +17,18 @@ class TestPrometheusMetrics(TerraregUnitTest):
         ):
         """Test update of repository URL."""
         with client, \
-                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_prometheus_metrics') as mock_get_prometheus_metrics:
+                unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_prometheus_metrics') as mock_get_prometheus_metrics, \
+                unittest.mock.patch('terrareg.server_metrics.ServerMetrics.generate') as mock_generate_server_metrics:
 
             mock_get_prometheus_metrics.return_value = """
 # HELP unittest_output_count Unittest test output
 # # TYPE unittest_output_count counter
 # unittest_output_count 5
+""".strip()
+            mock_generate_server_metrics.return_value = """
+# HELP unittest_server_count Unittest server output
+# TYPE unittest_server_count counter
+unittest_server_count 2
 """.strip()
 
             res = client.get('/metrics')
@@ -31,8 +37,12 @@ class TestPrometheusMetrics(TerraregUnitTest):
 # HELP unittest_output_count Unittest test output
 # # TYPE unittest_output_count counter
 # unittest_output_count 5
+# HELP unittest_server_count Unittest server output
+# TYPE unittest_server_count counter
+unittest_server_count 2
 """.strip()
             assert res.status_code == 200
             assert res.headers['Content-Type'] == 'text/plain; version=0.0.4'
 
             mock_get_prometheus_metrics.assert_called_once()
+            mock_generate_server_metrics.assert_called_once()
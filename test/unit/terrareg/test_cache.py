@@ -0,0 +1,351 @@
+
+import fnmatch
+import os
+import unittest.mock
+
+import pytest
+import redis
+
+from terrareg.cache import Cache, CacheTags, FilesystemCacheBackend, MemoryCacheBackend, RedisCacheBackend
+import terrareg.config
+from terrareg.database import Database
+from test.unit.terrareg import TerraregUnitTest
+from test import test_request_context
+
+
+class FakeRedisClient:
+    """In-memory implementation of the Redis client methods used by the cache backend."""
+
+    def __init__(self, data):
+        """Store data, which may be shared between clients."""
+        self._data = data
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._data[key] = value
+
+    def mget(self, keys):
+        return [self._data.get(key) for key in keys]
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self._data[key] = value.encode('utf-8') if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        for key in keys:
+            self._data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self._data) if fnmatch.fnmatch(key, match)]
+
+
+class TestCacheTags(TerraregUnitTest):
+
+    def test_module_provider(self):
+        """Test tags for module provider."""
+        assert CacheTags.module_provider('testnamespace', 'testmodule', 'testprovider') == [
+            'module_provider:testnamespace/testmodule/testprovider',
+        ]
+
+
+class TestCacheBackends(TerraregUnitTest):
+    """Test behaviour common to all cache backends."""
+
+    @pytest.fixture(params=['memory', 'filesystem', 'redis'])
+    def create_backend(self, request, tmp_path):
+        """Return function to create backends of the parametrized type, which share storage."""
+        redis_data = {}
+        with unittest.mock.patch('redis.Redis.from_url', lambda url: FakeRedisClient(redis_data)):
+            memory_backend = MemoryCacheBackend(name='test')
+            yield {
+                # Memory backends are not shared, so return the same instance
+                'memory': lambda: memory_backend,
+                'filesystem': lambda: FilesystemCacheBackend(name='test', directory=str(tmp_path)),
+                'redis': lambda: RedisCacheBackend(name='test', url='redis://localhost'),
+            }[request.param]
+
+    def test_get_set(self, create_backend):
+        """Test storing, retrieving and deleting values."""
+        backend = create_backend()
+        assert backend.get('key') is None
+
+        backend.set('key', {'value': 1}, size=10, max_size=1000, ttl=None, tags=[])
+        assert backend.get('key') == {'value': 1}
+        assert create_backend().get('key') == {'value': 1}
+        assert backend.get('other') is None
+
+        backend.delete('key')
+        assert backend.get('key') is None
+
+    def test_invalidate_tags(self, create_backend):
+        """Test that invalidating tags removes values with the tags, including from other instances sharing storage."""
+        backend = create_backend()
+        backend.set('first', 'first', size=5, max_size=1000, ttl=None, tags=['tag-a', 'tag-b'])
+        backend.set('second', 'second', size=6, max_size=1000, ttl=None, tags=['tag-b'])
+        backend.set('third', 'third', size=5, max_size=1000, ttl=None, tags=['tag-c'])
+
+        create_backend().invalidate_tags(['tag-a'])
+        assert backend.get('first') is None
+        assert backend.get('second') == 'second'
+        assert backend.get('third') == 'third'
+
+        backend.invalidate_tags(['tag-b', 'tag-c'])
+        assert backend.get('second') is None
+        assert backend.get('third') is None
+
+        # Ensure values stored after invalidation are returned
+        backend.set('first', 'new', size=3, max_size=1000, ttl=None, tags=['tag-a'])
+        assert backend.get('first') == 'new'
+
+    def test_clear(self, create_backend):
+        """Test removing all values."""
+        backend = create_backend()
+        backend.set('first', 'first', size=5, max_size=1000, ttl=None, tags=[])
+        backend.set('second', 'second', size=6, max_size=1000, ttl=None, tags=[])
+        backend.clear()
+        assert backend.get('first') is None
+        assert backend.get('second') is None
+
+
+class TestMemoryCacheBackend(TerraregUnitTest):
+
+    def test_eviction(self):
+        """Test that least-recently-used entries are evicted when the size limit is exceeded."""
+        backend = MemoryCacheBackend(name='test')
+        assert backend.set('first', 'a', size=40, max_size=100, ttl=None, tags=['tag']) == 0
+        assert backend.set('second', 'b', size=40, max_size=100, ttl=None, tags=['tag']) == 0
+        # Access first entry, so that second entry is least recently used
+        assert backend.get('first') == 'a'
+
+        assert backend.set('third', 'c', size=40, max_size=100, ttl=None, tags=['tag']) == 1
+        assert backend.get('first') == 'a'
+        assert backend.get('second') is None
+        assert backend.get('third') == 'c'
+        assert backend.get_size() == (2, 80)
+
+    def test_expiry(self):
+        """Test that expired values are not returned."""
+        backend = MemoryCacheBackend(name='test')
+        with unittest.mock.patch('time.monotonic', unittest.mock.MagicMock(return_value=1000)):
+            backend.set('key', 'value', size=5, max_size=100, ttl=60, tags=[])
+            backend.set('no_expiry', 'value', size=5, max_size=100, ttl=None, tags=[])
+
+        with unittest.mock.patch('time.monotonic', unittest.mock.MagicMock(return_value=1059)):
+            assert backend.get('key') == 'value'
+
+        with unittest.mock.patch('time.monotonic', unittest.mock.MagicMock(return_value=1061)):
+            assert backend.get('key') is None
+            assert backend.get('no_expiry') == 'value'
+        assert backend.get_size() == (1, 5)
+
+
+class TestFilesystemCacheBackend(TerraregUnitTest):
+
+    def test_expiry(self, tmp_path):
+        """Test that expired values are not returned."""
+        backend = FilesystemCacheBackend(name='test', directory=str(tmp_path))
+        with unittest.mock.patch('time.time', unittest.mock.MagicMock(return_value=1000)):
+            backend.set('key', 'value', size=5, max_size=1000, ttl=60, tags=[])
+
+        with unittest.mock.patch('time.time', unittest.mock.MagicMock(return_value=1059)):
+            assert backend.get('key') == 'value'
+
+        with unittest.mock.patch('time.time', unittest.mock.MagicMock(return_value=1061)):
+            assert backend.get('key') is None
+        assert backend.get_size() == (0, 0)
+
+    def test_prune(self, tmp_path):
+        """Test that least-recently-read entries are removed when the size limit is exceeded."""
+        backend = FilesystemCacheBackend(name='test', directory=str(tmp_path))
+        backend.set('first', 'a' * 100, size=100, max_size=1000, ttl=None, tags=[])
+        backend.set('second', 'b' * 100, size=100, max_size=1000, ttl=None, tags=[])
+        _, size = backend.get_size()
+        entry_size = size // 2
+
+        # Mark second entry as least recently read
+        os.utime(os.path.join(backend._entry_directory, backend._get_file_name('second')), (1, 1))
+
+        assert backend.set('third', 'c' * 100, size=100, max_size=(entry_size * 2) + 10, ttl=None, tags=[]) == 1
+        assert backend.get('first') == 'a' * 100
+        assert backend.get('second') is None
+        assert backend.get('third') == 'c' * 100
+        assert backend.get_size() == (2, entry_size * 2)
+
+
+class TestRedisCacheBackend(TerraregUnitTest):
+
+    def test_server_error(self):
+        """Test that errors communicating with the server are treated as cache misses."""
+        mock_client = unittest.mock.MagicMock()
+        for method in ['get', 'set', 'delete', 'mset', 'scan_iter']:
+            getattr(mock_client, method).side_effect = redis.ConnectionError('Connection refused')
+        with unittest.mock.patch('redis.Redis.from_url', unittest.mock.MagicMock(return_value=mock_client)):
+            backend = RedisCacheBackend(name='test', url='redis://localhost')
+
+        assert backend.set('key', 'value', size=5, max_size=100, ttl=60, tags=[]) == 0
+        assert backend.get('key') is None
+
+        # Ensure removing and invalidating values does not raise errors
+        backend.delete('key')
+        backend.invalidate_tags(['tag'])
+        backend.clear()
+
+    def test_ttl(self):
+        """Test that expiry is passed to server."""
+        mock_client = unittest.mock.MagicMock()
+        with unittest.mock.patch('redis.Redis.from_url', unittest.mock.MagicMock(return_value=mock_client)) as mock_from_url:
+            backend = RedisCacheBackend(name='test', url='redis://localhost:6379/1')
+        mock_from_url.assert_called_once_with('redis://localhost:6379/1')
+
+        backend.set('key', 'value', size=5, max_size=100, ttl=60, tags=[])
+        mock_client.set.assert_called_once_with('terrareg:cache:test:entry:key', unittest.mock.ANY, ex=60)
+
+
+class TestCache(TerraregUnitTest):
+
+    @pytest.fixture(autouse=True)
+    def isolate_caches(self):
+        """Isolate caches created by tests from caches used by the application."""
+        with unittest.mock.patch('terrareg.cache.Cache._CACHES', []), \
+                unittest.mock.patch('terrareg.config.Config.CACHE_BACKEND', terrareg.config.CacheBackendType.MEMORY):
+            yield
+
+    def test_get_set(self):
+        """Test storing values and statistics."""
+        cache = Cache('test')
+        assert cache.get('key') is None
+        assert cache.set('key', b'value', tags=['tag']) is True
+        assert cache.get('key') == b'value'
+
+        assert cache.get_statistics() == {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+            'invalidations': 0,
+            'entries': 1,
+            'size_bytes': 5,
+        }
+
+    @pytest.mark.parametrize('max_size, value', [
+        # Value larger than cache
+        (10, b'a' * 11),
+        # Cache disabled
+        (0, b''),
+    ])
+    def test_set_not_stored(self, max_size, value):
+        """Test that values are not stored when larger than the cache or when the cache is disabled."""
+        cache = Cache('test', max_size_config='MODULE_SPECS_CACHE_MAX_SIZE')
+        with unittest.mock.patch('terrareg.config.Config.MODULE_SPECS_CACHE_MAX_SIZE', max_size):
+            assert cache.set('key', value) is False
+        assert cache.get('key') is None
+
+    def test_set_after_invalidation(self):
+        """Test that values generated whilst one of their tags is invalidated are not stored."""
+        cache = Cache('test')
+        generation = Cache.get_generation()
+        Cache.invalidate_tags(['tag'])
+
+        assert cache.set('key', 'value', tags=['other-tag', 'tag'], generation=generation) is False
+        assert cache.get('key') is None
+
+    def test_set_after_unrelated_invalidation(self):
+        """Test that values generated whilst other tags are invalidated are stored."""
+        cache = Cache('test')
+        generation = Cache.get_generation()
+        Cache.invalidate_tags(['unrelated-tag'])
+
+        assert cache.set('key', 'value', tags=['tag'], generation=generation) is True
+        assert cache.set('untagged', 'value', generation=generation) is True
+        assert cache.get('key') == 'value'
+
+    def test_set_after_clear(self):
+        """Test that values generated whilst a cache is cleared are not stored."""
+        cache = Cache('test')
+        generation = Cache.get_generation()
+        cache.clear()
+
+        assert cache.set('key', 'value', tags=['tag'], generation=generation) is False
+
+    def test_set_after_tag_generations_removed(self):
+        """Test that values are not stored if the generation of invalidation of their tags is no longer held."""
+        cache = Cache('test')
+        generation = Cache.get_generation()
+        with unittest.mock.patch('terrareg.cache.Cache._MAX_TAG_GENERATIONS', 2):
+            Cache.invalidate_tags(['tag'])
+            Cache.invalidate_tags(['second-tag', 'third-tag'])
+
+            assert 'tag' not in Cache._TAG_GENERATIONS
+            assert cache.set('key', 'value', tags=['tag'], generation=generation) is False
+
+            # Ensure values generated after the invalidation are stored
+            assert cache.set('key', 'value', tags=['tag'], generation=Cache.get_generation()) is True
+
+    def test_invalidate_tags(self):
+        """Test that invalidating tags removes values from all caches."""
+        first_cache = Cache('first')
+        second_cache = Cache('second')
+        first_cache.set('key', 'first', tags=['tag-a'])
+        second_cache.set('key', 'second', tags=['tag-a', 'tag-b'])
+        second_cache.set('other', 'other', tags=['tag-b'])
+
+        Cache.invalidate_tags(['tag-a'])
+        assert first_cache.get('key') is None
+        assert second_cache.get('key') is None
+        assert second_cache.get('other') == 'other'
+
+        # Ensure invalidating a single cache does not affect other caches
+        first_cache.set('key', 'first', tags=['tag-b'])
+        second_cache.invalidate(['tag-b'])
+        assert first_cache.get('key') == 'first'
+        assert second_cache.get('other') is None
+
+    def test_invalidate_within_transaction(self, test_request_context):
+        """Test that invalidations within a transaction are repeated once the transaction has ended."""
+        cache = Cache('test')
+        with test_request_context:
+            with Database.start_transaction():
+                Cache.invalidate_tags(['tag'])
+
+                # Store value, as generated by another request, from data prior to the transaction
+                cache.set('key', 'value', tags=['tag'])
+                assert cache.get('key') == 'value'
+
+            assert cache.get('key') is None
+            Database.release_request_connection()
+
+    def test_get_or_set(self):
+        """Test generating values that are not cached."""
+        cache = Cache('test')
+        generate = unittest.mock.MagicMock(return_value={'value': 1})
+        assert cache.get_or_set('key', generate) == {'value': 1}
+        assert cache.get_or_set('key', generate) == {'value': 1}
+        generate.assert_called_once_with()
+
+    @pytest.mark.parametrize('backend_type, local, expected_class', [
+        (terrareg.config.CacheBackendType.MEMORY, False, MemoryCacheBackend),
+        (terrareg.config.CacheBackendType.FILESYSTEM, False, FilesystemCacheBackend),
+        (terrareg.config.CacheBackendType.REDIS, False, RedisCacheBackend),
+        # Ensure local caches always use memory backend
+        (terrareg.config.CacheBackendType.REDIS, True, MemoryCacheBackend),
+    ])
+    def test_backend_type(self, backend_type, local, expected_class):
+        """Test that backend is created from configured backend type."""
+        cache = Cache('test', local=local)
+        with unittest.mock.patch('terrareg.config.Config.CACHE_BACKEND', backend_type):
+            assert isinstance(cache.get_backend(), expected_class)
+
+            # Ensure backend is re-used
+            assert cache.get_backend() is cache.get_backend()
+
+    def test_clear_all(self):
+        """Test removing values from all caches."""
+        first_cache = Cache('first')
+        second_cache = Cache('second')
+        first_cache.set('key', 'first')
+        second_cache.set('key', 'second')
+
+        Cache.clear_all()
+        assert first_cache.get('key') is None
+        assert second_cache.get('key') is None
@@ -38,6 +38,12 @@ class TestConfig:
             print('Untested configs: ', untested_properties)
         assert untested_properties == []
 
+    @pytest.fixture(autouse=True)
+    def reload_config(self):
+        """Reload config after each test, as tests modify environment variables."""
+        yield
+        terrareg.config.Config.reload()
+
     @classmethod
     def register_checked_config(cls, config):
         """Register a config item as having been tested."""
@@ -54,7 +60,6 @@ class TestConfig:
         ('DATA_DIRECTORY', 'unittest-value/data'),
         ('EXAMPLES_DIRECTORY', None),
         ('EXAMPLE_ANALYTICS_TOKEN', None),
-        ('GIT_PROVIDER_CONFIG', None),
         ('LOGO_URL', None),
         ('MODULES_DIRECTORY', None),
         ('SECRET_KEY', None),
@@ -67,7 +72,6 @@ class TestConfig:
         ('INFRACOST_PRICING_API_ENDPOINT', None),
         ('DOMAIN_NAME', None),
         ('PUBLIC_URL', None),
-        ('ADDITIONAL_MODULE_TABS', None),
         ('OPENID_CONNECT_LOGIN_TEXT', None),
         ('OPENID_CONNECT_CLIENT_ID', None),
         ('OPENID_CONNECT_CLIENT_SECRET', None),
@@ -81,36 +85,59 @@ class TestConfig:
         ('SAML2_PUBLIC_KEY', None),
         ('SAML2_GROUP_ATTRIBUTE', None),
         ('INTERNAL_EXTRACTION_ANALYITCS_TOKEN', None),
-        ('MODULE_LINKS', None),
         ('DEFAULT_TERRAFORM_VERSION', None),
         ('TERRAFORM_ARCHIVE_MIRROR', None),
-        ('SENTRY_DSN', None)
+        ('SENTRY_DSN', None),
+        ('CACHE_DIRECTORY', None),
+        ('CACHE_REDIS_URL', None),
+        ('SERVER_METRICS_DIRECTORY', None),
+        ('ANALYTICS_INGESTION_SPOOL_DIRECTORY', None)
     ])
     def test_string_configs(self, config_name, override_expected_value):
         """Test string configs to ensure they are overriden with environment variables."""
         self.register_checked_config(config_name)
         with unittest.mock.patch('os.environ', {config_name: 'unittest-value'}):
-            assert getattr(terrareg.config.Config(), config_name) == (override_expected_value if override_expected_value is not None else 'unittest-value')
+            assert getattr(terrareg.config.Config.reload(), config_name) == (override_expected_value if override_expected_value is not None else 'unittest-value')
 
     @pytest.mark.parametrize('config_name, test_value, test_expected', [
-        ('SENTRY_TRACES_SAMPLE_RATE', '1.523', 1.523)
+        ('SENTRY_TRACES_SAMPLE_RATE', '1.523', 1.523),
+        # JSON configs must contain valid JSON, as it is parsed when the config is loaded
+        ('GIT_PROVIDER_CONFIG', '[{"name": "unittest"}]', '[{"name": "unittest"}]'),
+        ('ADDITIONAL_MODULE_TABS', '[["unittest", ["UNITTEST.md"]]]', '[["unittest", ["UNITTEST.md"]]]'),
+        ('MODULE_LINKS', '[{"text": "unittest", "url": "https://example.com"}]', '[{"text": "unittest", "url": "https://example.com"}]')
     ])
     def test_custom_string_configs(self, config_name, test_value, test_expected):
         """Test string configs with custom values to ensure they are overriden with environment variables."""
         self.register_checked_config(config_name)
         with unittest.mock.patch('os.environ', {config_name: test_value}):
-            assert getattr(terrareg.config.Config(), config_name) == test_expected
+            assert getattr(terrareg.config.Config.reload(), config_name) == test_expected
 
     @pytest.mark.parametrize('config_name', [
         'ADMIN_SESSION_EXPIRY_MINS',
         'LISTEN_PORT',
-        'GIT_CLONE_TIMEOUT'
+        'GIT_CLONE_TIMEOUT',
+        'DATABASE_POOL_SIZE',
+        'DATABASE_POOL_MAX_OVERFLOW',
+        'DATABASE_POOL_TIMEOUT',
+        'DATABASE_POOL_RECYCLE',
+        'MODULE_SPECS_CACHE_MAX_SIZE',
+        'RENDERED_HTML_CACHE_MAX_SIZE',
+        'API_RESPONSE_CACHE_MAX_SIZE',
+        'API_RESPONSE_CACHE_CONTROL_MAX_AGE',
+        'API_RESPONSE_CACHE_DOWNLOADS_TTL',
+        'GLOBAL_STATISTICS_REFRESH_INTERVAL',
+        'PROMETHEUS_METRICS_CACHE_TTL',
+        'ANALYTICS_INGESTION_QUEUE_SIZE',
+        'ANALYTICS_INGESTION_QUEUE_TIMEOUT',
+        'ANALYTICS_INGESTION_BATCH_SIZE',
+        'ANALYTICS_INGESTION_FLUSH_INTERVAL',
+        'ANALYTICS_RETENTION_DAYS'
     ])
     def test_integer_configs(self, config_name):
         """Test integer configs to ensure they are overriden with environment variables."""
         self.register_checked_config(config_name)
         with unittest.mock.patch('os.environ', {config_name: '582612'}):
-            assert getattr(terrareg.config.Config(), config_name) == 582612
+            assert getattr(terrareg.config.Config.reload(), config_name) == 582612
 
     @pytest.mark.parametrize('test_value,expected_value', [
         # Check empty value produces an empty array
@@ -135,16 +162,18 @@ class TestConfig:
         ('IGNORE_ANALYTICS_TOKEN_AUTH_KEYS'),
         ('OPENID_CONNECT_SCOPES'),
         ('EXAMPLE_FILE_EXTENSIONS'),
+        ('DATABASE_READ_URL'),
     ])
     def test_list_configs(self, config_name, test_value, expected_value):
         """Test list configs to ensure they are overriden with environment variables."""
         self.register_checked_config(config_name)
         # Check that input value produces expected list value
         with unittest.mock.patch('os.environ', {config_name: test_value}):
-            assert getattr(terrareg.config.Config(), config_name) == expected_value
+            assert getattr(terrareg.config.Config.reload(), config_name) == expected_value
 
     @pytest.mark.parametrize('config_name,enum,expected_default', [
-        ('MODULE_VERSION_REINDEX_MODE', terrareg.config.ModuleVersionReindexMode, terrareg.config.ModuleVersionReindexMode.LEGACY)
+        ('MODULE_VERSION_REINDEX_MODE', terrareg.config.ModuleVersionReindexMode, terrareg.config.ModuleVersionReindexMode.LEGACY),
+        ('CACHE_BACKEND', terrareg.config.CacheBackendType, terrareg.config.CacheBackendType.MEMORY)
     ])
     def test_enum_configs(self, config_name, enum, expected_default):
         """Test enum configs to ensure they are overriden with environment variables."""
@@ -158,7 +187,7 @@ class TestConfig:
         for test_env_value, expected_enum in check_dict.items():
             os_env = {} if test_env_value is None else {config_name: test_env_value}
             with unittest.mock.patch('os.environ', os_env):
-                assert getattr(terrareg.config.Config(), config_name) == expected_enum
+                assert getattr(terrareg.config.Config.reload(), config_name) == expected_enum
 
     @pytest.mark.parametrize('test_value,expected_value', [
         ('true', True),
@@ -192,12 +221,60 @@ class TestConfig:
         'SAML2_DEBUG',
         'OPENID_CONNECT_DEBUG',
         "MANAGE_TERRAFORM_RC_FILE",
-        'DISABLE_ANALYTICS'
+        'DISABLE_ANALYTICS',
+        'ANALYTICS_INGESTION_ASYNC',
+        'DATABASE_POOL_PRE_PING',
+        'ENABLE_BLOB_STORE',
+        'ENABLE_BLOB_COMPRESSION'
     ])
     def test_boolean_configs(self, config_name, test_value, expected_value):
         """Test boolean configs to ensure they are overriden with environment variables."""
         self.register_checked_config(config_name)
         # Check that input value generates the expected boolean value
         with unittest.mock.patch('os.environ', {config_name: test_value}):
-            assert getattr(terrareg.config.Config(), config_name) is expected_value
+            assert getattr(terrareg.config.Config.reload(), config_name) is expected_value
+
+    def test_snapshot(self):
+        """Test that the same snapshot is returned until config is reloaded."""
+        with unittest.mock.patch('os.environ', {'APPLICATION_NAME': 'first-value'}):
+            config = terrareg.config.Config.reload()
+        assert terrareg.config.Config() is config
+
+        with unittest.mock.patch('os.environ', {'APPLICATION_NAME': 'second-value'}):
+            assert terrareg.config.Config().APPLICATION_NAME == 'first-value'
+            assert terrareg.config.Config.reload().APPLICATION_NAME == 'second-value'
+        assert terrareg.config.Config().APPLICATION_NAME == 'second-value'
+
+    def test_immutable(self):
+        """Test that config values cannot be modified."""
+        config = terrareg.config.Config()
+        with pytest.raises(AttributeError):
+            config.APPLICATION_NAME = 'modified'
+        with pytest.raises(AttributeError):
+            config.other_attribute = 'modified'
+
+    @pytest.mark.parametrize('config_name, value', [
+        ('ENABLE_ACCESS_CONTROLS', 'not-a-boolean'),
+        ('LISTEN_PORT', 'not-an-integer'),
+        ('MODULE_VERSION_REINDEX_MODE', 'not-a-mode'),
+        ('MODULE_LINKS', 'not-json'),
+    ])
+    def test_reload_invalid_config(self, config_name, value):
+        """Test that invalid config raises an error when the config is loaded."""
+        with unittest.mock.patch('os.environ', {config_name: value}):
+            with pytest.raises(Exception):
+                terrareg.config.Config.reload()
+
+    def test_derived_values(self):
+        """Test values parsed from config are calculated once and follow replaced config values."""
+        with unittest.mock.patch('os.environ', {'MODULE_LINKS': '[{"text": "unittest", "url": "https://example.com"}]',
+                                                'IGNORE_ANALYTICS_TOKEN_AUTH_KEYS': 'first,second'}):
+            config = terrareg.config.Config.reload()
+
+        assert config.module_links == [{"text": "unittest", "url": "https://example.com"}]
+        assert config.module_links is config.module_links
+        assert config.ignore_analytics_token_auth_key_set == frozenset(['first', 'second'])
 
+        with unittest.mock.patch('terrareg.config.Config.MODULE_LINKS', '[]'):
+            assert config.module_links == []
+        assert config.module_links == [{"text": "unittest", "url": "https://example.com"}]
@@ -490,18 +490,8 @@ disable_checkpoint = true
         mock_example = unittest.mock.MagicMock()
         mock_example.path = './subdirectory'
 
-        created_example_files = {}
-
-        def mock_create_example_file(example, path):
-            """Mock ExampleFile.create to return mock instance of ExampleFile"""
-            assert example is mock_example
-            mock_example_file = unittest.mock.MagicMock()
-            created_example_files[path] = mock_example_file
-            return mock_example_file
-
-        # Create mock for ExampleFile and mock .create
+        # Create mock for ExampleFile
         mock_example_file = unittest.mock.MagicMock()
-        mock_example_file.create = unittest.mock.MagicMock(side_effect=mock_create_example_file)
 
         # Create module version object with mocked git path,
         # to allow mock.patch to read the previous property value
@@ -529,15 +519,14 @@ disable_checkpoint = true
             '/tmp/extraction_test/subdirectory/blah.ext3'
         ]
 
-        # Ensure each returned file had an example created for
-        assert list(created_example_files.keys()) == [
+        # Ensure all example files were created, with content, in a single call
+        mock_example_file.create.assert_not_called()
+        mock_example_file.create_many.assert_called_once_with(
+            example=mock_example,
+            files=file_contents
+        )
+        assert list(mock_example_file.create_many.call_args.kwargs['files'].keys()) == [
             'subdirectory/main.tf',
             'subdirectory/output.tf',
             'subdirectory/blah.ext3'
-        ]
-
-        # Ensure each example file was updated with correct content of file
-        for example_path, mock_example_file_instance in created_example_files.items():
-            mock_example_file_instance.update_attributes.assert_called_once_with(
-                content=file_contents[example_path]
-            )
\ No newline at end of file
+        ]
\ No newline at end of file
@@ -0,0 +1,92 @@
+
+import unittest.mock
+
+import pytest
+
+from terrareg.module_specs_cache import ModuleSpecsCache
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestModuleSpecsCache(TerraregUnitTest):
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Clear cache and statistics before each test."""
+        ModuleSpecsCache.clear()
+        ModuleSpecsCache._CACHE.reset_statistics()
+        with unittest.mock.patch('terrareg.config.Config.MODULE_SPECS_CACHE_MAX_SIZE', 100):
+            yield
+        ModuleSpecsCache.clear()
+
+    def test_get_put(self):
+        """Test storing and retrieving module specs."""
+        assert ModuleSpecsCache.get(1) is None
+
+        module_specs = {'inputs': []}
+        ModuleSpecsCache.put(1, module_specs, size=20)
+        assert ModuleSpecsCache.get(1) is module_specs
+
+        assert ModuleSpecsCache.get_statistics() == {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+            'invalidations': 0,
+            'entries': 1,
+            'size_bytes': 20,
+        }
+
+    def test_terraform_docs_hash_mismatch(self):
+        """Test that cached module specs are not returned if the terraform docs hash does not match."""
+        ModuleSpecsCache.put(1, {'inputs': []}, size=20, terraform_docs_sha256='abcdef')
+        assert ModuleSpecsCache.get(1, terraform_docs_sha256='abcdef') == {'inputs': []}
+        assert ModuleSpecsCache.get(1, terraform_docs_sha256='123456') is None
+        assert ModuleSpecsCache.get(1) is None
+
+    def test_eviction(self):
+        """Test that least-recently-used entries are evicted when the size limit is exceeded."""
+        ModuleSpecsCache.put(1, {'id': 1}, size=40)
+        ModuleSpecsCache.put(2, {'id': 2}, size=40)
+        # Access first entry, so that second entry is least recently used
+        assert ModuleSpecsCache.get(1) == {'id': 1}
+
+        ModuleSpecsCache.put(3, {'id': 3}, size=40)
+
+        assert ModuleSpecsCache.get(1) == {'id': 1}
+        assert ModuleSpecsCache.get(2) is None
+        assert ModuleSpecsCache.get(3) == {'id': 3}
+        statistics = ModuleSpecsCache.get_statistics()
+        assert statistics['evictions'] == 1
+        assert statistics['entries'] == 2
+        assert statistics['size_bytes'] == 80
+
+    def test_put_existing(self):
+        """Test replacing existing entry updates the size of the cache."""
+        ModuleSpecsCache.put(1, {'id': 1}, size=40)
+        ModuleSpecsCache.put(1, {'id': 'new'}, size=10)
+        assert ModuleSpecsCache.get(1) == {'id': 'new'}
+        assert ModuleSpecsCache.get_statistics()['size_bytes'] == 10
+
+    @pytest.mark.parametrize('max_size, size', [
+        # Value larger than cache
+        (100, 101),
+        # Cache disabled
+        (0, 0),
+    ])
+    def test_put_not_cached(self, max_size, size):
+        """Test that values are not cached when larger than the cache or when the cache is disabled."""
+        with unittest.mock.patch('terrareg.config.Config.MODULE_SPECS_CACHE_MAX_SIZE', max_size):
+            ModuleSpecsCache.put(1, {'id': 1}, size=size)
+        assert ModuleSpecsCache.get(1) is None
+        assert ModuleSpecsCache.get_statistics()['entries'] == 0
+
+    def test_invalidate(self):
+        """Test invalidating entry."""
+        ModuleSpecsCache.put(1, {'id': 1}, size=40)
+        ModuleSpecsCache.put(2, {'id': 2}, size=20)
+        ModuleSpecsCache.invalidate(1)
+        # Ensure invalidating non-existent entry does not error
+        ModuleSpecsCache.invalidate(3)
+
+        assert ModuleSpecsCache.get(1) is None
+        assert ModuleSpecsCache.get(2) == {'id': 2}
+        assert ModuleSpecsCache.get_statistics()['size_bytes'] == 20
@@ -0,0 +1,86 @@
+
+import unittest.mock
+
+import pytest
+
+from terrareg.rendered_html_cache import RenderedHtmlCache
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestRenderedHtmlCache(TerraregUnitTest):
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Clear cache and statistics before each test."""
+        RenderedHtmlCache.clear()
+        RenderedHtmlCache._CACHE.reset_statistics()
+        with unittest.mock.patch('terrareg.config.Config.RENDERED_HTML_CACHE_MAX_SIZE', 100):
+            yield
+        RenderedHtmlCache.clear()
+
+    def test_get_put(self):
+        """Test storing and retrieving rendered HTML."""
+        assert RenderedHtmlCache.get(1, 'README.md', ('example.com',)) is None
+
+        RenderedHtmlCache.put(1, 'README.md', ('example.com',), '<h1>Test</h1>')
+        assert RenderedHtmlCache.get(1, 'README.md', ('example.com',)) == '<h1>Test</h1>'
+
+        # Ensure other files and keys are not returned
+        assert RenderedHtmlCache.get(1, 'CHANGELOG.md', ('example.com',)) is None
+        assert RenderedHtmlCache.get(1, 'README.md', ('other.example.com',)) is None
+        assert RenderedHtmlCache.get(2, 'README.md', ('example.com',)) is None
+
+        assert RenderedHtmlCache.get_statistics() == {
+            'hits': 1,
+            'misses': 4,
+            'evictions': 0,
+            'invalidations': 0,
+            'entries': 1,
+            'size_bytes': 13,
+        }
+
+    def test_eviction(self):
+        """Test that least-recently-used entries are evicted when the size limit is exceeded."""
+        RenderedHtmlCache.put(1, 'README.md', (), 'a' * 40)
+        RenderedHtmlCache.put(2, 'README.md', (), 'b' * 40)
+        # Access first entry, so that second entry is least recently used
+        assert RenderedHtmlCache.get(1, 'README.md', ()) is not None
+
+        RenderedHtmlCache.put(3, 'README.md', (), 'c' * 40)
+
+        assert RenderedHtmlCache.get(1, 'README.md', ()) is not None
+        assert RenderedHtmlCache.get(2, 'README.md', ()) is None
+        assert RenderedHtmlCache.get(3, 'README.md', ()) is not None
+        statistics = RenderedHtmlCache.get_statistics()
+        assert statistics['evictions'] == 1
+        assert statistics['entries'] == 2
+        assert statistics['size_bytes'] == 80
+
+    @pytest.mark.parametrize('max_size, size', [
+        # Value larger than cache
+        (100, 101),
+        # Cache disabled
+        (0, 0),
+    ])
+    def test_put_not_cached(self, max_size, size):
+        """Test that values are not cached when larger than the cache or when the cache is disabled."""
+        with unittest.mock.patch('terrareg.config.Config.RENDERED_HTML_CACHE_MAX_SIZE', max_size):
+            RenderedHtmlCache.put(1, 'README.md', (), 'a' * size)
+        assert RenderedHtmlCache.get(1, 'README.md', ()) is None
+        assert RenderedHtmlCache.get_statistics()['entries'] == 0
+
+    def test_invalidate(self):
+        """Test invalidating all entries for module details."""
+        RenderedHtmlCache.put(1, 'README.md', ('example.com',), 'a' * 10)
+        RenderedHtmlCache.put(1, 'README.md', ('other.example.com',), 'b' * 10)
+        RenderedHtmlCache.put(1, 'CHANGELOG.md', (), 'c' * 10)
+        RenderedHtmlCache.put(2, 'README.md', ('example.com',), 'd' * 20)
+        RenderedHtmlCache.invalidate(1)
+        # Ensure invalidating module details without entries does not error
+        RenderedHtmlCache.invalidate(3)
+
+        assert RenderedHtmlCache.get(1, 'README.md', ('example.com',)) is None
+        assert RenderedHtmlCache.get(1, 'README.md', ('other.example.com',)) is None
+        assert RenderedHtmlCache.get(1, 'CHANGELOG.md', ()) is None
+        assert RenderedHtmlCache.get(2, 'README.md', ('example.com',)) == 'd' * 20
+        assert RenderedHtmlCache.get_statistics()['size_bytes'] == 20
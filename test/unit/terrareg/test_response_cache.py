@@ -0,0 +1,96 @@
+
+import unittest.mock
+
+import pytest
+
+from terrareg.cache import Cache
+from terrareg.response_cache import ResponseCache
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestResponseCache(TerraregUnitTest):
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Clear cache and statistics before each test."""
+        ResponseCache.clear()
+        ResponseCache._CACHE.reset_statistics()
+        with unittest.mock.patch('terrareg.config.Config.API_RESPONSE_CACHE_MAX_SIZE', 100):
+            yield
+        ResponseCache.clear()
+
+    def _put(self, key, body, tags):
+        """Store response using current generation."""
+        return ResponseCache.put(key=key, body=body, tags=tags, generation=ResponseCache.get_generation())
+
+    def test_get_put(self):
+        """Test storing and retrieving responses."""
+        assert ResponseCache.get('key') is None
+
+        etag = self._put('key', b'{"modules": []}', ['tag'])
+        assert etag == ResponseCache.get_etag(b'{"modules": []}')
+        assert ResponseCache.get('key') == (b'{"modules": []}', etag)
+
+        assert ResponseCache.get_statistics() == {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+            'invalidations': 0,
+            'entries': 1,
+            'size_bytes': 15,
+        }
+
+    def test_etag(self):
+        """Test that ETag is derived from response body."""
+        assert ResponseCache.get_etag(b'body') == ResponseCache.get_etag(b'body')
+        assert ResponseCache.get_etag(b'body') != ResponseCache.get_etag(b'other body')
+
+    def test_invalidate(self):
+        """Test that invalidating tags removes only entries with the tags."""
+        self._put('first', b'first', ['tag-a', 'tag-b'])
+        self._put('second', b'second', ['tag-b'])
+        self._put('third', b'third', ['tag-c'])
+
+        Cache.invalidate_tags(['tag-a'])
+        assert ResponseCache.get('first') is None
+        assert ResponseCache.get('second') is not None
+        assert ResponseCache.get('third') is not None
+
+        Cache.invalidate_tags(['tag-b', 'tag-c'])
+        assert ResponseCache.get('second') is None
+        assert ResponseCache.get('third') is None
+        assert ResponseCache.get_statistics()['size_bytes'] == 0
+
+    def test_put_after_invalidation(self):
+        """Test that responses generated whilst one of their tags is invalidated are not stored."""
+        generation = ResponseCache.get_generation()
+        Cache.invalidate_tags(['tag'])
+
+        etag = ResponseCache.put(key='key', body=b'body', tags=['tag'], generation=generation)
+        assert etag == ResponseCache.get_etag(b'body')
+        assert ResponseCache.get('key') is None
+
+        # Ensure responses are stored, if only other tags have been invalidated
+        ResponseCache.put(key='other', body=b'body', tags=['other-tag'], generation=generation)
+        assert ResponseCache.get('other') is not None
+
+    def test_eviction(self):
+        """Test that least-recently-used entries are evicted when the size limit is exceeded."""
+        self._put('first', b'a' * 40, ['tag'])
+        self._put('second', b'b' * 40, ['tag'])
+        # Access first entry, so that second entry is least recently used
+        assert ResponseCache.get('first') is not None
+
+        self._put('third', b'c' * 40, ['tag'])
+        assert ResponseCache.get('first') is not None
+        assert ResponseCache.get('second') is None
+        assert ResponseCache.get('third') is not None
+        assert ResponseCache.get_statistics()['evictions'] == 1
+
+    @pytest.mark.parametrize('max_size', [0, 10])
+    def test_not_stored(self, max_size):
+        """Test that responses are not stored when the cache is disabled or the response exceeds the maximum size."""
+        with unittest.mock.patch('terrareg.config.Config.API_RESPONSE_CACHE_MAX_SIZE', max_size):
+            etag = self._put('key', b'a' * 20, ['tag'])
+        assert etag == ResponseCache.get_etag(b'a' * 20)
+        assert ResponseCache.get('key') is None
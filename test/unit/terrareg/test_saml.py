@@ -181,7 +181,7 @@ class TestSaml(TerraregUnitTest):
     def test_get_idp_metadata(self):
         """Obtain metadata from IdP"""
 
-        mock_idp_metadata = mock.MagicMock()
+        mock_idp_metadata = {'idp': {'entityId': 'https://unittestmetadata.com'}}
         with mock.patch('onelogin.saml2.idp_metadata_parser.OneLogin_Saml2_IdPMetadataParser.parse_remote',
                         mock.MagicMock(return_value=mock_idp_metadata)) as mock_parse_remote, \
                 mock.patch('terrareg.config.Config.SAML2_IDP_METADATA_URL', 'https://unittestmetadata.com/endpoint'):
@@ -201,7 +201,7 @@ class TestSaml(TerraregUnitTest):
 
             with mock.patch('terrareg.config.Config.SAML2_ISSUER_ENTITY_ID', 'unittest-entity'):
 
-                # Call with entity URL and assert that it is passed to parse remote method
-                Saml2._IDP_METADATA = None
+                # Call with entity URL and assert that it is passed to parse remote method,
+                # as the cached metadata is specific to the entity ID
                 assert Saml2.get_idp_metadata() == mock_idp_metadata
                 mock_parse_remote.assert_called_once_with('https://unittestmetadata.com/endpoint', entity_id='unittest-entity')
@@ -0,0 +1,135 @@
+
+import json
+import os
+import unittest.mock
+
+import flask
+import pytest
+import sqlalchemy
+
+from terrareg.database import Database
+from terrareg.server_metrics import Histogram, ServerMetrics
+from test.unit.terrareg import TerraregUnitTest
+from test import client, app_context, test_request_context
+
+
+class TestServerMetrics(TerraregUnitTest):
+
+    _TEST_HISTOGRAM = Histogram(
+        name='unittest_duration_seconds',
+        help='Unit test histogram',
+        label_names=['stage'],
+        buckets=[0.1, 1.0]
+    )
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        """Remove observations before each test."""
+        ServerMetrics.reset()
+        with unittest.mock.patch('terrareg.config.Config.SERVER_METRICS_DIRECTORY', ''):
+            yield
+        ServerMetrics.reset()
+
+    def _get_values(self, histogram):
+        """Return values of histogram for current process."""
+        return {
+            tuple(label_values): value
+            for label_values, value in ServerMetrics._export_values()[histogram.name]
+        }
+
+    def test_histogram_generate(self):
+        """Test prometheus output of histogram."""
+        with unittest.mock.patch('terrareg.server_metrics.ServerMetrics.HISTOGRAMS', [self._TEST_HISTOGRAM]):
+            ServerMetrics.reset()
+            ServerMetrics.observe(self._TEST_HISTOGRAM, 0.05, stage='clone')
+            ServerMetrics.observe(self._TEST_HISTOGRAM, 0.5, stage='clone')
+            ServerMetrics.observe(self._TEST_HISTOGRAM, 2, stage='archive')
+
+            assert ServerMetrics.generate() == """
+# HELP unittest_duration_seconds Unit test histogram
+# TYPE unittest_duration_seconds histogram
+unittest_duration_seconds_bucket{stage="archive", le="0.1"} 0
+unittest_duration_seconds_bucket{stage="archive", le="1.0"} 0
+unittest_duration_seconds_bucket{stage="archive", le="+Inf"} 1
+unittest_duration_seconds_sum{stage="archive"} 2.0
+unittest_duration_seconds_count{stage="archive"} 1
+unittest_duration_seconds_bucket{stage="clone", le="0.1"} 1
+unittest_duration_seconds_bucket{stage="clone", le="1.0"} 2
+unittest_duration_seconds_bucket{stage="clone", le="+Inf"} 2
+unittest_duration_seconds_sum{stage="clone"} 0.55
+unittest_duration_seconds_count{stage="clone"} 2
+""".strip()
+
+    def test_time(self):
+        """Test timing of context, including when an exception is raised."""
+        with pytest.raises(ValueError):
+            with ServerMetrics.time(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, stage='clone'):
+                raise ValueError('Test')
+
+        values = self._get_values(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION)
+        assert list(values) == [('clone',)]
+        assert values[('clone',)]['count'] == 1
+
+    def test_combine_processes(self, tmpdir):
+        """Test that metrics stored by other processes are combined with the current process."""
+        ServerMetrics.observe(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, 0.2, stage='clone')
+
+        # Store metrics from another process
+        other_value = ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION.get_empty_value()
+        ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION.add_observation(other_value, 20)
+        with open(os.path.join(tmpdir, '1.json'), 'w') as fh:
+            json.dump({'module_extraction_stage_duration_seconds': [[['clone'], other_value]]}, fh)
+
+        with unittest.mock.patch('terrareg.config.Config.SERVER_METRICS_DIRECTORY', str(tmpdir)):
+            output = ServerMetrics.generate()
+
+        # Ensure metrics of current process have been stored
+        assert os.path.isfile(os.path.join(tmpdir, f'{os.getpid()}.json'))
+
+        assert 'module_extraction_stage_duration_seconds_bucket{stage="clone", le="0.5"} 1' in output.split('\n')
+        assert 'module_extraction_stage_duration_seconds_bucket{stage="clone", le="+Inf"} 2' in output.split('\n')
+        assert 'module_extraction_stage_duration_seconds_count{stage="clone"} 2' in output.split('\n')
+
+    def test_combine_processes_removes_exited_processes(self, tmpdir):
+        """Test that metrics stored by processes that are no longer running are removed."""
+        for pid in [1, 2]:
+            with open(os.path.join(tmpdir, f'{pid}.json'), 'w') as fh:
+                json.dump({}, fh)
+
+        with unittest.mock.patch('terrareg.config.Config.SERVER_METRICS_DIRECTORY', str(tmpdir)), \
+                unittest.mock.patch('terrareg.server_metrics.ServerMetrics._is_process_running',
+                                    unittest.mock.MagicMock(side_effect=lambda pid: pid == 1)):
+            ServerMetrics.generate()
+
+        assert sorted(os.listdir(tmpdir)) == sorted(['1.json', f'{os.getpid()}.json'])
+
+    def test_forked_process_discards_values(self):
+        """Test that values recorded by a parent process are not included in a child process."""
+        ServerMetrics.observe(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION, 0.2, stage='clone')
+        with unittest.mock.patch('os.getpid', unittest.mock.MagicMock(return_value=-1)):
+            assert self._get_values(ServerMetrics.MODULE_EXTRACTION_STAGE_DURATION) == {}
+
+    def test_request_metrics(self, client):
+        """Test that request duration and database queries are recorded by endpoint class."""
+        with unittest.mock.patch('terrareg.analytics.AnalyticsEngine.get_prometheus_metrics', unittest.mock.MagicMock(return_value='')):
+            res = client.get('/metrics')
+        assert res.status_code == 200
+
+        request_durations = self._get_values(ServerMetrics.REQUEST_DURATION)
+        assert list(request_durations) == [('PrometheusMetrics', 'GET', '200')]
+        assert request_durations[('PrometheusMetrics', 'GET', '200')]['count'] == 1
+        assert list(self._get_values(ServerMetrics.REQUEST_DATABASE_QUERIES)) == [('PrometheusMetrics',)]
+
+    def test_database_query_metrics(self, test_request_context):
+        """Test that database queries are recorded and counted against the current request."""
+        ServerMetrics.register_database_events()
+        with test_request_context:
+            ServerMetrics._before_request()
+            with Database.get_connection() as conn:
+                conn.execute(sqlalchemy.text('SELECT 1'))
+                # Ensure statements starting with other whitespace are labelled by statement type
+                conn.execute(sqlalchemy.text('\n  SELECT\n\t2'))
+            assert flask.g.server_metrics_database_queries == 2
+
+        assert list(self._get_values(ServerMetrics.DATABASE_QUERY_DURATION)) == [('SELECT',)]
+        assert self._get_values(ServerMetrics.DATABASE_QUERY_DURATION)[('SELECT',)]['count'] == 2